@@ -60,13 +60,7 @@ while running:
 
     origin_pos = pygame.mouse.get_pos()
 
-    for x in range(ray_count):
-        point = geometry.raycast(
-            origin_pos,
-            x / ray_count * 360,
-            -1,
-            colliders,
-        )
+    for point in geometry.raycast_fan(origin_pos, 0, 360, ray_count, -1, colliders):
         if point:
             pygame.draw.line(screen, (255, 0, 0), origin_pos, point, 1)
 
@@ -7,6 +7,11 @@ from typing import (
     Callable,
     List,
     Iterator,
+    Any,
+    Sized,
+    TypeVar,
+    Dict,
+    SupportsIndex,
 )
 
 from pygame._common import RectValue
@@ -15,6 +20,7 @@ from typing_extensions import Protocol
 
 from pygame.math import Vector2, Vector3
 from pygame.rect import Rect
+from pygame.mask import Mask
 
 Coordinate = Union[Sequence[float, float], Vector2, Sequence[int, int]]
 
@@ -38,6 +44,10 @@ LineValue = Union[_CanBeLine, _HasLineAttribute]
 
 _CanBeCircle = Union[Vector3, Circle, Tuple[float, float, float], Sequence[float]]
 _CanBeCollided = Union[Circle, Rect, Line, Polygon, Sequence[int, int]]
+_T = TypeVar("_T")
+_K = TypeVar("_K")
+_V = TypeVar("_V")
+_Key = Optional[Union[str, Callable[[Any], _CanBeCollided]]]
 
 class _HasCirclettribute(Protocol):
     # An object that has a circle attribute that is either a circle, or a function
@@ -90,6 +100,45 @@ class Line(Sequence[float]):
     @overload
     def update(self, single_arg: LineValue) -> None: ...
     def collideswith(self, other: _CanBeCollided) -> bool: ...
+    def penetration(
+        self, other: Union[Circle, Rect, Line, Polygon]
+    ) -> Optional[Penetration]: ...
+    def collidelist(self, colliders: Sequence[_CanBeCollided]) -> int: ...
+    @overload
+    def collidelistall(
+        self,
+        colliders: Sequence[_CanBeCollided],
+        *,
+        output: Literal["list"] = "list",
+    ) -> List[int]: ...
+    @overload
+    def collidelistall(
+        self,
+        colliders: Sequence[_CanBeCollided],
+        *,
+        output: Literal["indices", "bitmask"],
+        out: None = None,
+    ) -> memoryview: ...
+    @overload
+    def collidelistall(
+        self,
+        colliders: Sequence[_CanBeCollided],
+        *,
+        output: Literal["indices", "bitmask"],
+        out: Any,
+    ) -> int: ...
+    def collideobjects(
+        self, objects: Sequence[_T], *, key: _Key = None
+    ) -> Optional[_T]: ...
+    def collideobjectsall(
+        self, objects: Sequence[_T], *, key: _Key = None
+    ) -> List[_T]: ...
+    def collidedict(
+        self, objects: Dict[_K, _V], values: bool = False, *, key: _Key = None
+    ) -> Optional[Tuple[_K, _V]]: ...
+    def collidedictall(
+        self, objects: Dict[_K, _V], values: bool = False, *, key: _Key = None
+    ) -> List[Tuple[_K, _V]]: ...
     @overload
     def collidepoint(self, x: float, y: float) -> bool: ...
     @overload
@@ -186,8 +235,45 @@ class Circle:
     @overload
     def colliderect(self, x: int, y: int, w: int, h: int) -> bool: ...
     def collideswith(self, other: _CanBeCollided) -> bool: ...
+    def penetration(
+        self, other: Union[Circle, Rect, Line, Polygon]
+    ) -> Optional[Penetration]: ...
     def collidelist(self, colliders: Sequence[_CanBeCollided]) -> int: ...
-    def collidelistall(self, colliders: Sequence[_CanBeCollided]) -> List[int]: ...
+    @overload
+    def collidelistall(
+        self,
+        colliders: Sequence[_CanBeCollided],
+        *,
+        output: Literal["list"] = "list",
+    ) -> List[int]: ...
+    @overload
+    def collidelistall(
+        self,
+        colliders: Sequence[_CanBeCollided],
+        *,
+        output: Literal["indices", "bitmask"],
+        out: None = None,
+    ) -> memoryview: ...
+    @overload
+    def collidelistall(
+        self,
+        colliders: Sequence[_CanBeCollided],
+        *,
+        output: Literal["indices", "bitmask"],
+        out: Any,
+    ) -> int: ...
+    def collideobjects(
+        self, objects: Sequence[_T], *, key: _Key = None
+    ) -> Optional[_T]: ...
+    def collideobjectsall(
+        self, objects: Sequence[_T], *, key: _Key = None
+    ) -> List[_T]: ...
+    def collidedict(
+        self, objects: Dict[_K, _V], values: bool = False, *, key: _Key = None
+    ) -> Optional[Tuple[_K, _V]]: ...
+    def collidedictall(
+        self, objects: Dict[_K, _V], values: bool = False, *, key: _Key = None
+    ) -> List[Tuple[_K, _V]]: ...
     def __copy__(self) -> Circle: ...
 
     copy = __copy__
@@ -271,12 +357,141 @@ class Polygon:
     def collidecircle(self, polygon: CircleValue, only_edges: bool = False) -> bool: ...
     @overload
     def collidecircle(self, *circle, only_edges: bool = False) -> bool: ...
+    @overload
+    def collidepolygon(
+        self, polygon: Union[Polygon, Sequence[Coordinate]], only_edges: bool = False
+    ) -> bool: ...
+    @overload
+    def collidepolygon(self, *coords, only_edges: bool = False) -> bool: ...
+    @overload
+    def colliderect(self, rect: RectValue, only_edges: bool = False) -> bool: ...
+    @overload
+    def colliderect(
+        self, left_top: Coordinate, width_height: Coordinate, only_edges: bool = False
+    ) -> bool: ...
+    @overload
+    def colliderect(
+        self,
+        left: float,
+        top: float,
+        width: float,
+        height: float,
+        only_edges: bool = False,
+    ) -> bool: ...
+    def collideswith(self, other: _CanBeCollided) -> bool: ...
+    def penetration(
+        self, other: Union[Circle, Rect, Line, Polygon]
+    ) -> Optional[Penetration]: ...
+    def collidelist(self, colliders: Sequence[_CanBeCollided]) -> int: ...
+    @overload
+    def collidelistall(
+        self,
+        colliders: Sequence[_CanBeCollided],
+        *,
+        output: Literal["list"] = "list",
+    ) -> List[int]: ...
+    @overload
+    def collidelistall(
+        self,
+        colliders: Sequence[_CanBeCollided],
+        *,
+        output: Literal["indices", "bitmask"],
+        out: None = None,
+    ) -> memoryview: ...
+    @overload
+    def collidelistall(
+        self,
+        colliders: Sequence[_CanBeCollided],
+        *,
+        output: Literal["indices", "bitmask"],
+        out: Any,
+    ) -> int: ...
+    def collideobjects(
+        self, objects: Sequence[_T], *, key: _Key = None
+    ) -> Optional[_T]: ...
+    def collideobjectsall(
+        self, objects: Sequence[_T], *, key: _Key = None
+    ) -> List[_T]: ...
+    def collidedict(
+        self, objects: Dict[_K, _V], values: bool = False, *, key: _Key = None
+    ) -> Optional[Tuple[_K, _V]]: ...
+    def collidedictall(
+        self, objects: Dict[_K, _V], values: bool = False, *, key: _Key = None
+    ) -> List[Tuple[_K, _V]]: ...
     def insert_vertex(self, index: int, vertex: Coordinate) -> None: ...
     def remove_vertex(self, index: int) -> None: ...
     def pop_vertex(self, index: int) -> Coordinate: ...
     def scale(self, factor: float) -> Polygon: ...
     def scale_ip(self, factor: float) -> None: ...
 
+class Ray:
+    origin: Tuple[float, float]
+    direction: Tuple[float, float]
+    angle: float
+    max_dist: float
+
+    @overload
+    def __init__(
+        self,
+        origin: Coordinate,
+        direction: Union[Coordinate, float],
+        max_dist: float = -1,
+    ) -> None: ...
+    @overload
+    def __init__(self, line: LineValue) -> None: ...
+    def __copy__(self) -> Ray: ...
+    copy = __copy__
+    def at(self, distance: float) -> Tuple[float, float]: ...
+
+class RaycastHit(Tuple[Tuple[float, float], Tuple[float, float], float, int]):
+    point: Tuple[float, float]
+    normal: Tuple[float, float]
+    distance: float
+    index: int
+
+class RaycastGrid(Sized):
+    colliders: Tuple[Union[Rect, Circle, Line, Polygon], ...]
+    cell_size: float
+    size: Tuple[int, int]
+
+    def __init__(
+        self,
+        colliders: Sequence[Union[Rect, Circle, Line, Polygon]],
+        cell_size: Optional[float] = None,
+    ) -> None: ...
+    def __len__(self) -> int: ...
+
+class RaycastBVH(Sized):
+    colliders: Tuple[Union[Rect, Circle, Line, Polygon], ...]
+    leaf_size: int
+    depth: int
+
+    def __init__(
+        self,
+        colliders: Sequence[Union[Rect, Circle, Line, Polygon]],
+        leaf_size: int = 4,
+    ) -> None: ...
+    def __len__(self) -> int: ...
+
+class Penetration(Tuple[Tuple[float, float], float, Tuple[Tuple[float, float], ...]]):
+    normal: Tuple[float, float]
+    depth: float
+    points: Tuple[Tuple[float, float], ...]
+
+class DistanceCache:
+    count: int
+
+    def __init__(self) -> None: ...
+    def clear(self) -> None: ...
+
+class DistanceResult(Tuple[float, Tuple[float, float], Tuple[float, float], int]):
+    distance: float
+    point_a: Tuple[float, float]
+    point_b: Tuple[float, float]
+    iterations: int
+
+Colliders = Union[Sequence[Union[Rect, Circle, Line, Polygon]], RaycastGrid, RaycastBVH]
+
 def regular_polygon(
     sides: int, center: Coordinate, radius: float, angle: float = 0
 ) -> Polygon: ...
@@ -285,18 +500,27 @@ def raycast(
     origin: Coordinate,
     direction: Coordinate,
     max_dist: float,
-    colliders: Sequence[Union[Rect, Circle, Line]],
-) -> Optional[Tuple[float, float]]: ...
+    colliders: Colliders,
+    *,
+    return_hit: bool = False,
+    layers: Optional[Sequence[SupportsIndex]] = None,
+    mask: SupportsIndex = -1,
+) -> Optional[Union[Tuple[float, float], RaycastHit]]: ...
 @overload
 def raycast(
     origin: Coordinate,
     angle: float,
     max_dist: float,
-    colliders: Sequence[Union[Rect, Circle, Line]],
-) -> Optional[Tuple[float, float]]: ...
+    colliders: Colliders,
+    *,
+    return_hit: bool = False,
+    layers: Optional[Sequence[SupportsIndex]] = None,
+    mask: SupportsIndex = -1,
+) -> Optional[Union[Tuple[float, float], RaycastHit]]: ...
 
-Ray = Union[
+RayValue = Union[
     Line,
+    Ray,
     Tuple[Coordinate, Coordinate, float],
     Tuple[Coordinate, float, float],
     Tuple[Coordinate, Coordinate],
@@ -304,14 +528,243 @@ Ray = Union[
 
 @overload
 def raycast(
-    line: Line,
-    colliders: Sequence[Union[Rect, Circle, Line]],
-) -> Optional[Tuple[float, float]]: ...
+    line: Union[Line, Ray],
+    colliders: Colliders,
+    *,
+    return_hit: bool = False,
+    layers: Optional[Sequence[SupportsIndex]] = None,
+    mask: SupportsIndex = -1,
+) -> Optional[Union[Tuple[float, float], RaycastHit]]: ...
 @overload
 def multiraycast(
-    rays: Sequence[Ray],
-    colliders: Sequence[Union[Rect, Circle, Line]],
-) -> Sequence[Optional[Tuple[float, float]]]: ...
+    rays: Sequence[RayValue],
+    colliders: Colliders,
+    *,
+    return_hit: bool = False,
+    layers: Optional[Sequence[SupportsIndex]] = None,
+    mask: SupportsIndex = -1,
+    threads: int = 1,
+) -> Sequence[Optional[Union[Tuple[float, float], RaycastHit]]]: ...
+@overload
+def raycast_all(
+    origin: Coordinate,
+    direction: Coordinate,
+    max_dist: float,
+    colliders: Colliders,
+    *,
+    return_hit: bool = False,
+    layers: Optional[Sequence[SupportsIndex]] = None,
+    mask: SupportsIndex = -1,
+) -> List[Union[Tuple[float, float], RaycastHit]]: ...
+@overload
+def raycast_all(
+    origin: Coordinate,
+    angle: float,
+    max_dist: float,
+    colliders: Colliders,
+    *,
+    return_hit: bool = False,
+    layers: Optional[Sequence[SupportsIndex]] = None,
+    mask: SupportsIndex = -1,
+) -> List[Union[Tuple[float, float], RaycastHit]]: ...
+@overload
+def raycast_all(
+    line: Union[Line, Ray],
+    colliders: Colliders,
+    *,
+    return_hit: bool = False,
+    layers: Optional[Sequence[SupportsIndex]] = None,
+    mask: SupportsIndex = -1,
+) -> List[Union[Tuple[float, float], RaycastHit]]: ...
+@overload
+def raycast_mask(
+    origin: Coordinate,
+    direction: Coordinate,
+    max_dist: float,
+    mask: Mask,
+    *,
+    offset: Coordinate = (0, 0),
+    return_hit: bool = False,
+) -> Optional[Union[Tuple[float, float], RaycastHit]]: ...
+@overload
+def raycast_mask(
+    origin: Coordinate,
+    angle: float,
+    max_dist: float,
+    mask: Mask,
+    *,
+    offset: Coordinate = (0, 0),
+    return_hit: bool = False,
+) -> Optional[Union[Tuple[float, float], RaycastHit]]: ...
+@overload
+def raycast_mask(
+    line: Union[Line, Ray],
+    mask: Mask,
+    *,
+    offset: Coordinate = (0, 0),
+    return_hit: bool = False,
+) -> Optional[Union[Tuple[float, float], RaycastHit]]: ...
+def raycast_fan(
+    origin: Coordinate,
+    start_angle: float,
+    angle_span: float,
+    ray_count: int,
+    max_dist: float,
+    colliders: Colliders,
+    *,
+    return_hit: bool = False,
+    layers: Optional[Sequence[SupportsIndex]] = None,
+    mask: SupportsIndex = -1,
+) -> List[Optional[Union[Tuple[float, float], RaycastHit]]]: ...
+@overload
+def raycast_bounce(
+    origin: Coordinate,
+    direction: Coordinate,
+    max_dist: float,
+    max_bounces: int,
+    colliders: Colliders,
+) -> Tuple[List[Tuple[float, float]], List[int]]: ...
+@overload
+def raycast_bounce(
+    origin: Coordinate,
+    angle: float,
+    max_dist: float,
+    max_bounces: int,
+    colliders: Colliders,
+) -> Tuple[List[Tuple[float, float]], List[int]]: ...
+@overload
+def raycast_bounce(
+    line: Union[Line, Ray],
+    max_bounces: int,
+    colliders: Colliders,
+) -> Tuple[List[Tuple[float, float]], List[int]]: ...
+def multiraycast_buffer(
+    rays: Any,
+    colliders: Colliders,
+    *,
+    out: Optional[Any] = None,
+    out_index: Optional[Any] = None,
+    layers: Optional[Sequence[SupportsIndex]] = None,
+    mask: SupportsIndex = -1,
+) -> Tuple[Any, Any]: ...
+def multiraycast_all(
+    rays: Sequence[RayValue],
+    colliders: Colliders,
+    *,
+    return_hit: bool = False,
+    layers: Optional[Sequence[SupportsIndex]] = None,
+    mask: SupportsIndex = -1,
+) -> List[List[Union[Tuple[float, float], RaycastHit]]]: ...
+@overload
+def circlecast(
+    origin: Coordinate,
+    direction: Coordinate,
+    radius: float,
+    max_dist: float,
+    colliders: Colliders,
+    *,
+    return_hit: bool = False,
+    layers: Optional[Sequence[SupportsIndex]] = None,
+    mask: SupportsIndex = -1,
+) -> Optional[Union[Tuple[float, float], RaycastHit]]: ...
+@overload
+def circlecast(
+    origin: Coordinate,
+    angle: float,
+    radius: float,
+    max_dist: float,
+    colliders: Colliders,
+    *,
+    return_hit: bool = False,
+    layers: Optional[Sequence[SupportsIndex]] = None,
+    mask: SupportsIndex = -1,
+) -> Optional[Union[Tuple[float, float], RaycastHit]]: ...
+@overload
+def circlecast(
+    line: Union[Line, Ray],
+    radius: float,
+    colliders: Colliders,
+    *,
+    return_hit: bool = False,
+    layers: Optional[Sequence[SupportsIndex]] = None,
+    mask: SupportsIndex = -1,
+) -> Optional[Union[Tuple[float, float], RaycastHit]]: ...
+
+CircleCast = Union[
+    Tuple[Line, float],
+    Tuple[Coordinate, Coordinate, float, float],
+    Tuple[Coordinate, float, float, float],
+]
+
+def multicirclecast(
+    casts: Sequence[CircleCast],
+    colliders: Colliders,
+    *,
+    return_hit: bool = False,
+    layers: Optional[Sequence[SupportsIndex]] = None,
+    mask: SupportsIndex = -1,
+) -> List[Optional[Union[Tuple[float, float], RaycastHit]]]: ...
+@overload
+def polygoncast(
+    polygon: Polygon,
+    move_by: Coordinate,
+    colliders: Colliders,
+    *,
+    return_hit: bool = False,
+    layers: Optional[Sequence[SupportsIndex]] = None,
+    mask: SupportsIndex = -1,
+) -> Optional[Union[Tuple[float, float], RaycastHit]]: ...
+@overload
+def polygoncast(
+    polygon: Polygon,
+    direction: Coordinate,
+    max_dist: float,
+    colliders: Colliders,
+    *,
+    return_hit: bool = False,
+    layers: Optional[Sequence[SupportsIndex]] = None,
+    mask: SupportsIndex = -1,
+) -> Optional[Union[Tuple[float, float], RaycastHit]]: ...
+@overload
+def polygoncast(
+    polygon: Polygon,
+    angle: float,
+    max_dist: float,
+    colliders: Colliders,
+    *,
+    return_hit: bool = False,
+    layers: Optional[Sequence[SupportsIndex]] = None,
+    mask: SupportsIndex = -1,
+) -> Optional[Union[Tuple[float, float], RaycastHit]]: ...
+def visibility_matrix(
+    points: Any,
+    colliders: Colliders,
+    *,
+    out: Optional[Any] = None,
+    layers: Optional[Sequence[SupportsIndex]] = None,
+    mask: SupportsIndex = -1,
+) -> Any: ...
+def visibility_polygon(
+    origin: Coordinate,
+    colliders: Colliders,
+    bounds: RectValue,
+    *,
+    layers: Optional[Sequence[SupportsIndex]] = None,
+    mask: SupportsIndex = -1,
+) -> Polygon: ...
+def collide_pairs(
+    shapes: Sequence[Union[Rect, Circle, Line, Polygon]],
+) -> memoryview: ...
+def collide_lists(
+    a: Sequence[Union[Rect, Circle, Line, Polygon]],
+    b: Sequence[Union[Rect, Circle, Line, Polygon]],
+) -> memoryview: ...
+def distance(
+    a: Union[Rect, Circle, Line, Polygon, Coordinate],
+    b: Union[Rect, Circle, Line, Polygon, Coordinate],
+    *,
+    cache: Optional[DistanceCache] = None,
+) -> DistanceResult: ...
 def rect_to_polygon(rect: Rect) -> Polygon: ...
 def is_line(obj) -> bool: ...
 def is_circle(obj) -> bool: ...
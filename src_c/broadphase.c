@@ -0,0 +1,533 @@
+#include "include/geometry.h"
+#include "include/collisions.h"
+
+/* The interval a collider covers on the sweep axis */
+typedef struct {
+    double min, max;
+    Py_ssize_t index;
+} pgSweepItem;
+
+/* The largest number of pairs of colliders of two lists that are all tested,
+ * and the largest average number of grid cells the colliders can overlap
+ * for the lists to be binned into a grid rather than swept */
+#define PG_BROADPHASE_BRUTE_FORCE_MAX 4096
+#define PG_BROADPHASE_GRID_MAX_CELLS 4
+
+/* A growable array of pairs of collider indices */
+typedef struct {
+    int64_t *items;
+    Py_ssize_t count, capacity;
+} pgPairList;
+
+static int
+_pg_sweep_item_compare(const void *a, const void *b)
+{
+    const pgSweepItem *item_a = (const pgSweepItem *)a;
+    const pgSweepItem *item_b = (const pgSweepItem *)b;
+    int nan_a = isnan(item_a->min), nan_b = isnan(item_b->min);
+
+    /* the intervals with NaN values are sorted last so that the order stays
+     * consistent */
+    if (nan_a != nan_b) {
+        return nan_a - nan_b;
+    }
+    if (!nan_a && item_a->min != item_b->min) {
+        return item_a->min < item_b->min ? -1 : 1;
+    }
+    return (item_a->index > item_b->index) - (item_a->index < item_b->index);
+}
+
+static int
+_pg_pair_compare(const void *a, const void *b)
+{
+    const int64_t *pair_a = (const int64_t *)a;
+    const int64_t *pair_b = (const int64_t *)b;
+
+    if (pair_a[0] != pair_b[0]) {
+        return pair_a[0] < pair_b[0] ? -1 : 1;
+    }
+    return (pair_a[1] > pair_b[1]) - (pair_a[1] < pair_b[1]);
+}
+
+static void
+pgPairList_Init(pgPairList *pairs)
+{
+    pairs->items = NULL;
+    pairs->count = pairs->capacity = 0;
+}
+
+static void
+pgPairList_Free(pgPairList *pairs)
+{
+    PyMem_Free(pairs->items);
+    pgPairList_Init(pairs);
+}
+
+/*
+ * Adds a pair of indices to the list.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+pgPairList_Add(pgPairList *pairs, Py_ssize_t a, Py_ssize_t b)
+{
+    int64_t *items;
+    Py_ssize_t capacity;
+
+    if (pairs->count == pairs->capacity) {
+        capacity = pairs->capacity ? pairs->capacity * 2 : 64;
+        if (!(items = PyMem_Realloc(pairs->items,
+                                    capacity * 2 * sizeof(int64_t)))) {
+            PyErr_NoMemory();
+            return 0;
+        }
+        pairs->items = items;
+        pairs->capacity = capacity;
+    }
+
+    pairs->items[pairs->count * 2] = (int64_t)a;
+    pairs->items[pairs->count * 2 + 1] = (int64_t)b;
+    pairs->count++;
+
+    return 1;
+}
+
+/* Sorts the pairs by their first index, then by their second one */
+static void
+pgPairList_Sort(pgPairList *pairs)
+{
+    if (pairs->count > 1) {
+        qsort(pairs->items, pairs->count, 2 * sizeof(int64_t),
+              _pg_pair_compare);
+    }
+}
+
+/*
+ * Gets the pairs as a new memoryview of int64 values of shape (N, 2).
+ *
+ * sets the error messages
+ * the memoryview if success
+ * NULL if it fails
+ */
+static PyObject *
+pgPairList_AsMemoryView(pgPairList *pairs)
+{
+    PyObject *ret;
+    Py_buffer view;
+
+    if (!_pg_get_out_buffer(NULL, "q", pairs->count * 2, 2, "out", &ret,
+                            &view)) {
+        return NULL;
+    }
+    if (pairs->count) {
+        memcpy(view.buf, pairs->items, pairs->count * 2 * sizeof(int64_t));
+    }
+    PyBuffer_Release(&view);
+
+    return ret;
+}
+
+/* Tests whether the bounding boxes of two colliders overlap or touch */
+static PG_FORCE_INLINE int
+_pg_broadphase_overlap(pgCollider *A, pgCollider *B)
+{
+    return A->min_x <= B->max_x && B->min_x <= A->max_x &&
+           A->min_y <= B->max_y && B->min_y <= A->max_y;
+}
+
+/* Tests whether the bounding box of a collider has no NaN values, as the
+ * ones that do can't collide with anything */
+static PG_FORCE_INLINE int
+_pg_broadphase_valid(pgCollider *collider)
+{
+    return collider->min_x <= collider->max_x &&
+           collider->min_y <= collider->max_y;
+}
+
+/* Adds the pair (a, b) to the list if the colliders A and B collide, 0 if it
+ * fails */
+static PG_FORCE_INLINE int
+_pg_broadphase_test(pgCollider *A, pgCollider *B, Py_ssize_t a, Py_ssize_t b,
+                    pgPairList *pairs)
+{
+    if (!_pg_broadphase_overlap(A, B) || !pgCollision_ColliderCollider(A, B)) {
+        return 1;
+    }
+    return pgPairList_Add(pairs, a, b);
+}
+
+/* Adds the centers of the colliders to the sums used by _pg_sweep_axis,
+ * which are the sums of the x, y, x^2 and y^2 values. */
+static void
+_pg_sweep_sums(pgCollider *colliders, Py_ssize_t colliders_num, double *sums)
+{
+    double x, y;
+    Py_ssize_t i;
+
+    for (i = 0; i < colliders_num; i++) {
+        x = (colliders[i].min_x + colliders[i].max_x) / 2;
+        y = (colliders[i].min_y + colliders[i].max_y) / 2;
+        sums[0] += x;
+        sums[1] += y;
+        sums[2] += x * x;
+        sums[3] += y * y;
+    }
+}
+
+/* Gets the axis along which the centers of colliders_num colliders are the
+ * most spread, 0 for the x axis and 1 for the y axis. Sweeping along it
+ * leaves the fewest intervals overlapping. */
+static int
+_pg_sweep_axis(double *sums, Py_ssize_t colliders_num)
+{
+    /* the variances multiplied by colliders_num ^ 2 */
+    return sums[3] * colliders_num - sums[1] * sums[1] >
+           sums[2] * colliders_num - sums[0] * sums[0];
+}
+
+/* Gets the intervals covered by the colliders on an axis, sorted by their
+ * start. They must be freed with PyMem_Free. Sets the error message and
+ * returns NULL if it fails. */
+static pgSweepItem *
+_pg_sweep_items_new(pgCollider *colliders, Py_ssize_t colliders_num, int axis)
+{
+    pgSweepItem *items;
+    Py_ssize_t i;
+
+    if (!(items = PyMem_New(pgSweepItem, MAX(colliders_num, 1)))) {
+        PyErr_NoMemory();
+        return NULL;
+    }
+
+    for (i = 0; i < colliders_num; i++) {
+        items[i].min = axis ? colliders[i].min_y : colliders[i].min_x;
+        items[i].max = axis ? colliders[i].max_y : colliders[i].max_x;
+        items[i].index = i;
+    }
+    qsort(items, colliders_num, sizeof(pgSweepItem), _pg_sweep_item_compare);
+
+    return items;
+}
+
+/*
+ * Finds every pair of colliding colliders with sweep and prune. The
+ * bounding boxes are sorted along the axis where they're the most spread,
+ * then each one is only compared with the following ones until they start
+ * past its end, and only the pairs whose boxes also overlap on the other
+ * axis go through the exact collision test. The pairs are added to pairs,
+ * sorted and with the smallest index first.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+pgBroadphase_SweepPairs(pgCollider *colliders, Py_ssize_t colliders_num,
+                        pgPairList *pairs)
+{
+    double sums[4] = {0, 0, 0, 0};
+    pgSweepItem *items;
+    Py_ssize_t i, j;
+
+    _pg_sweep_sums(colliders, colliders_num, sums);
+    if (!(items = _pg_sweep_items_new(colliders, colliders_num,
+                                      _pg_sweep_axis(sums, colliders_num)))) {
+        return 0;
+    }
+
+    for (i = 0; i < colliders_num; i++) {
+        for (j = i + 1; j < colliders_num && items[j].min <= items[i].max;
+             j++) {
+            if (!_pg_broadphase_test(
+                    &colliders[items[i].index], &colliders[items[j].index],
+                    MIN(items[i].index, items[j].index),
+                    MAX(items[i].index, items[j].index), pairs)) {
+                PyMem_Free(items);
+                return 0;
+            }
+        }
+    }
+
+    PyMem_Free(items);
+    pgPairList_Sort(pairs);
+
+    return 1;
+}
+
+/* Tests every collider of a against every collider of b, 0 if it fails */
+static int
+_pg_broadphase_brute_force(pgCollider *a, Py_ssize_t a_num, pgCollider *b,
+                           Py_ssize_t b_num, pgPairList *pairs)
+{
+    Py_ssize_t i, j;
+
+    for (i = 0; i < a_num; i++) {
+        for (j = 0; j < b_num; j++) {
+            if (!_pg_broadphase_test(&a[i], &b[j], i, j, pairs)) {
+                return 0;
+            }
+        }
+    }
+
+    return 1;
+}
+
+/* Sweeps the colliders of a and b together, only comparing the colliders of
+ * a with the ones of b, 0 if it fails */
+static int
+_pg_broadphase_sweep(pgCollider *a, Py_ssize_t a_num, pgCollider *b,
+                     Py_ssize_t b_num, pgPairList *pairs)
+{
+    double sums[4] = {0, 0, 0, 0};
+    pgSweepItem *items_a, *items_b;
+    Py_ssize_t i = 0, j = 0, k;
+    int axis, result = 1;
+
+    _pg_sweep_sums(a, a_num, sums);
+    _pg_sweep_sums(b, b_num, sums);
+    axis = _pg_sweep_axis(sums, a_num + b_num);
+
+    if (!(items_a = _pg_sweep_items_new(a, a_num, axis))) {
+        return 0;
+    }
+    if (!(items_b = _pg_sweep_items_new(b, b_num, axis))) {
+        PyMem_Free(items_a);
+        return 0;
+    }
+
+    /* the interval starting first is compared with the intervals of the
+     * other list starting before its end, then it's done with */
+    while (result && i < a_num && j < b_num) {
+        if (items_a[i].min <= items_b[j].min) {
+            for (k = j;
+                 result && k < b_num && items_b[k].min <= items_a[i].max;
+                 k++) {
+                result = _pg_broadphase_test(
+                    &a[items_a[i].index], &b[items_b[k].index],
+                    items_a[i].index, items_b[k].index, pairs);
+            }
+            i++;
+        }
+        else {
+            for (k = i;
+                 result && k < a_num && items_a[k].min <= items_b[j].max;
+                 k++) {
+                result = _pg_broadphase_test(
+                    &a[items_a[k].index], &b[items_b[j].index],
+                    items_a[k].index, items_b[j].index, pairs);
+            }
+            j++;
+        }
+    }
+
+    PyMem_Free(items_a);
+    PyMem_Free(items_b);
+
+    return result;
+}
+
+/* Bins the colliders of b into a grid and tests each collider of a against
+ * the colliders of the cells it overlaps, 0 if it fails. A pair is only
+ * tested in the cell containing the top left corner of the overlap of the
+ * boxes so that it isn't found twice. The lists are swept instead when the
+ * colliders overlap too many cells on average. */
+static int
+_pg_broadphase_grid(pgCollider *a, Py_ssize_t a_num, pgCollider *b,
+                    Py_ssize_t b_num, pgPairList *pairs)
+{
+    Py_ssize_t *cell_start, *cell_items, items_num = 0, valid_num = 0;
+    Py_ssize_t sizes_num = 0;
+    Py_ssize_t i, k, cell, cols, rows, x0, y0, x1, y1, cx, cy;
+    double min_x = 0, min_y = 0, max_x = 0, max_y = 0;
+    double width, height, size, log_sizes = 0, cell_size, cells_num = 0;
+    pgCollider *A, *B;
+    int result = 1;
+
+    for (i = 0; i < b_num; i++) {
+        if (!_pg_broadphase_valid(&b[i])) {
+            continue;
+        }
+        if (!valid_num++) {
+            min_x = b[i].min_x;
+            min_y = b[i].min_y;
+            max_x = b[i].max_x;
+            max_y = b[i].max_y;
+        }
+        min_x = MIN(min_x, b[i].min_x);
+        min_y = MIN(min_y, b[i].min_y);
+        max_x = MAX(max_x, b[i].max_x);
+        max_y = MAX(max_y, b[i].max_y);
+        size = MAX(b[i].max_x - b[i].min_x, b[i].max_y - b[i].min_y);
+        if (size > 0) {
+            log_sizes += log(size);
+            sizes_num++;
+        }
+    }
+    if (!valid_num) {
+        return 1;
+    }
+    width = max_x - min_x;
+    height = max_y - min_y;
+
+    /* the cells are about as big as the colliders, using the geometric mean
+     * of their sizes so that a few big colliders don't make every cell big,
+     * but there are never more than about 12 cells per collider */
+    cell_size = MAX(sizes_num ? exp(log_sizes / sizes_num) : 0,
+                    sqrt(width * height / (4.0 * valid_num)));
+    cell_size = MAX(cell_size, MAX(width, height) / (4.0 * valid_num));
+    if (!(cell_size > 0) || !isfinite(cell_size) || !isfinite(width) ||
+        !isfinite(height)) {
+        return _pg_broadphase_sweep(a, a_num, b, b_num, pairs);
+    }
+    cols = (Py_ssize_t)MAX(ceil(width / cell_size), 1);
+    rows = (Py_ssize_t)MAX(ceil(height / cell_size), 1);
+
+#define _PG_CELL_RANGE(collider)                                         \
+    x0 = _pg_raycastgrid_cell_coord((collider)->min_x, min_x, cell_size, \
+                                    cols);                               \
+    y0 = _pg_raycastgrid_cell_coord((collider)->min_y, min_y, cell_size, \
+                                    rows);                               \
+    x1 = _pg_raycastgrid_cell_coord((collider)->max_x, min_x, cell_size, \
+                                    cols);                               \
+    y1 = _pg_raycastgrid_cell_coord((collider)->max_y, min_y, cell_size, rows)
+
+    /* colliders much bigger than the others, like long lines, overlap so
+     * many cells that sweeping the lists is faster */
+    for (i = 0; i < a_num + b_num; i++) {
+        A = i < a_num ? &a[i] : &b[i - a_num];
+        if (_pg_broadphase_valid(A)) {
+            _PG_CELL_RANGE(A);
+            cells_num += (double)(x1 - x0 + 1) * (y1 - y0 + 1);
+        }
+    }
+    if (cells_num > PG_BROADPHASE_GRID_MAX_CELLS * (double)(a_num + b_num)) {
+        return _pg_broadphase_sweep(a, a_num, b, b_num, pairs);
+    }
+
+    if (!(cell_start = PyMem_New(Py_ssize_t, cols * rows + 1))) {
+        PyErr_NoMemory();
+        return 0;
+    }
+    memset(cell_start, 0, (cols * rows + 1) * sizeof(Py_ssize_t));
+
+    /* the cells are laid out like in a RaycastGrid */
+    for (i = 0; i < b_num; i++) {
+        if (!_pg_broadphase_valid(&b[i])) {
+            continue;
+        }
+        _PG_CELL_RANGE(&b[i]);
+        for (cy = y0; cy <= y1; cy++) {
+            for (cx = x0; cx <= x1; cx++) {
+                cell_start[cy * cols + cx + 1]++;
+                items_num++;
+            }
+        }
+    }
+    for (i = 0; i < cols * rows; i++) {
+        cell_start[i + 1] += cell_start[i];
+    }
+
+    if (!(cell_items = PyMem_New(Py_ssize_t, MAX(items_num, 1)))) {
+        PyMem_Free(cell_start);
+        PyErr_NoMemory();
+        return 0;
+    }
+
+    for (i = b_num - 1; i >= 0; i--) {
+        if (!_pg_broadphase_valid(&b[i])) {
+            continue;
+        }
+        _PG_CELL_RANGE(&b[i]);
+        for (cy = y0; cy <= y1; cy++) {
+            for (cx = x0; cx <= x1; cx++) {
+                cell = cy * cols + cx;
+                cell_items[--cell_start[cell + 1]] = i;
+            }
+        }
+    }
+    memmove(cell_start, cell_start + 1, cols * rows * sizeof(Py_ssize_t));
+    cell_start[cols * rows] = items_num;
+
+    for (i = 0; result && i < a_num; i++) {
+        A = &a[i];
+        if (!_pg_broadphase_valid(A)) {
+            continue;
+        }
+        _PG_CELL_RANGE(A);
+        for (cy = y0; result && cy <= y1; cy++) {
+            for (cx = x0; result && cx <= x1; cx++) {
+                cell = cy * cols + cx;
+                for (k = cell_start[cell]; result && k < cell_start[cell + 1];
+                     k++) {
+                    B = &b[cell_items[k]];
+                    if (!_pg_broadphase_overlap(A, B) ||
+                        _pg_raycastgrid_cell_coord(MAX(A->min_x, B->min_x),
+                                                   min_x, cell_size,
+                                                   cols) != cx ||
+                        _pg_raycastgrid_cell_coord(MAX(A->min_y, B->min_y),
+                                                   min_y, cell_size,
+                                                   rows) != cy) {
+                        continue;
+                    }
+                    result =
+                        _pg_broadphase_test(A, B, i, cell_items[k], pairs);
+                }
+            }
+        }
+    }
+
+#undef _PG_CELL_RANGE
+
+    PyMem_Free(cell_start);
+    PyMem_Free(cell_items);
+
+    return result;
+}
+
+/*
+ * Finds every pair of a collider of a and a collider of b that collide, as
+ * pairs of an index in a and an index in b, which are added to pairs,
+ * sorted. When there are few pairs, they're all tested, otherwise the
+ * smallest list is binned into a grid which the other one is tested
+ * against, or when the colliders are too big for the cells of the grid, the
+ * lists are swept together like in pgBroadphase_SweepPairs.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+pgBroadphase_CollideLists(pgCollider *a, Py_ssize_t a_num, pgCollider *b,
+                          Py_ssize_t b_num, pgPairList *pairs)
+{
+    Py_ssize_t i, start = pairs->count;
+    int64_t tmp;
+    int result;
+
+    if (!a_num || !b_num) {
+        return 1;
+    }
+
+    if ((double)a_num * b_num <= PG_BROADPHASE_BRUTE_FORCE_MAX) {
+        return _pg_broadphase_brute_force(a, a_num, b, b_num, pairs);
+    }
+    if (a_num >= b_num) {
+        result = _pg_broadphase_grid(a, a_num, b, b_num, pairs);
+    }
+    else {
+        /* the pairs found with the lists swapped are swapped back */
+        result = _pg_broadphase_grid(b, b_num, a, a_num, pairs);
+        for (i = start; result && i < pairs->count; i++) {
+            tmp = pairs->items[i * 2];
+            pairs->items[i * 2] = pairs->items[i * 2 + 1];
+            pairs->items[i * 2 + 1] = tmp;
+        }
+    }
+
+    if (result) {
+        pgPairList_Sort(pairs);
+    }
+    return result;
+}
@@ -0,0 +1,334 @@
+#include "include/geometry.h"
+
+/* The size of the items of the buffer formats used by the geometry functions,
+ * 1 byte for bools and 8 bytes for doubles and int64 */
+#define _PG_BUFFER_ITEMSIZE(code) (strchr("?bB", (code)) ? 1 : 8)
+
+/* Checks that a buffer holds items of the expected size whose native format
+ * code is one of the given codes */
+static int
+_pg_buffer_has_format(Py_buffer *view, const char *codes)
+{
+    const char *format = view->format ? view->format : "B";
+
+    if (*format == '@' || *format == '=' ||
+#if PY_LITTLE_ENDIAN
+        *format == '<'
+#else
+        *format == '>' || *format == '!'
+#endif
+    ) {
+        format++;
+    }
+
+    if (!format[0] || format[1] || !strchr(codes, format[0])) {
+        return 0;
+    }
+
+    return view->itemsize == _PG_BUFFER_ITEMSIZE(format[0]);
+}
+
+/*
+ * Gets a writable view of an output buffer that must hold exactly
+ * items_count items of one of the given formats. If obj is NULL a new
+ * memoryview is created, with shape (items_count / cols, cols) if cols is
+ * nonzero. *ret is set to a new reference to the object owning the buffer.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+_pg_get_out_buffer(PyObject *obj, const char *codes, Py_ssize_t items_count,
+                   Py_ssize_t cols, const char *name, PyObject **ret,
+                   Py_buffer *view)
+{
+    PyObject *bytes, *mview;
+    Py_ssize_t itemsize = _PG_BUFFER_ITEMSIZE(codes[0]);
+
+    if (obj) {
+        Py_INCREF(obj);
+    }
+    else {
+        if (!(bytes = PyByteArray_FromStringAndSize(NULL,
+                                                    items_count * itemsize))) {
+            return 0;
+        }
+        mview = PyMemoryView_FromObject(bytes);
+        Py_DECREF(bytes);
+        if (!mview) {
+            return 0;
+        }
+        /* memoryviews with a zero in their shape can't be cast */
+        if (cols && items_count) {
+            obj = PyObject_CallMethod(mview, "cast", "s#(nn)", codes,
+                                      (Py_ssize_t)1, items_count / cols, cols);
+        }
+        else {
+            obj =
+                PyObject_CallMethod(mview, "cast", "s#", codes, (Py_ssize_t)1);
+        }
+        Py_DECREF(mview);
+        if (!obj) {
+            return 0;
+        }
+    }
+
+    if (PyObject_GetBuffer(
+            obj, view, PyBUF_WRITABLE | PyBUF_C_CONTIGUOUS | PyBUF_FORMAT)) {
+        Py_DECREF(obj);
+        return 0;
+    }
+
+    if (!_pg_buffer_has_format(view, codes)) {
+        PyErr_Format(PyExc_TypeError, "%s must be a buffer of %s", name,
+                     codes[0] == 'd'   ? "float64 values"
+                     : codes[0] == '?' ? "bool values"
+                                       : "int64 values");
+        goto error;
+    }
+    if (view->len != items_count * itemsize) {
+        PyErr_Format(PyExc_ValueError,
+                     "%s must have room for exactly %zd items", name,
+                     items_count);
+        goto error;
+    }
+
+    *ret = obj;
+    return 1;
+
+error:
+    PyBuffer_Release(view);
+    Py_DECREF(obj);
+    return 0;
+}
+
+/* The formats collidelistall can return the indices of the hit colliders
+ * in */
+#define PG_HITS_LIST 0
+#define PG_HITS_INDICES 1
+#define PG_HITS_BITMASK 2
+
+/* Collects the indices of the colliders hit by collidelistall, into a list,
+ * an int64 buffer of indices or a packed bitmask holding one bit per
+ * collider. */
+typedef struct {
+    int format;
+    /* the list or the object owning the buffer, NULL until allocated */
+    PyObject *ret;
+    /* the out keyword argument, NULL if it wasn't given */
+    PyObject *out;
+    Py_buffer view;
+    int64_t *indices;
+    unsigned char *bits;
+    /* the number of colliders the buffer has room for */
+    Py_ssize_t length;
+    Py_ssize_t count;
+} pgHitList;
+
+/*
+ * Parses the arguments of collidelistall, colliders, *, output="list",
+ * out=None, and prepares the hit list for the given colliders.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+_pg_hits_init(pgHitList *hits, PyObject *const *args, Py_ssize_t nargs,
+              PyObject *kwnames)
+{
+    Py_ssize_t i, length, size;
+    const char *output;
+
+    hits->format = PG_HITS_LIST;
+    hits->ret = hits->out = NULL;
+    hits->indices = NULL;
+    hits->bits = NULL;
+    hits->length = hits->count = 0;
+
+    if (nargs != 1) {
+        PyErr_SetString(PyExc_TypeError,
+                        "collidelistall requires exactly one positional "
+                        "argument");
+        return 0;
+    }
+    if (!PySequence_Check(args[0])) {
+        PyErr_SetString(PyExc_TypeError, "Argument must be a sequence");
+        return 0;
+    }
+
+    for (i = 0; kwnames && i < PyTuple_GET_SIZE(kwnames); i++) {
+        PyObject *name = PyTuple_GET_ITEM(kwnames, i);
+        PyObject *value = args[nargs + i];
+
+        if (!PyUnicode_CompareWithASCIIString(name, "output")) {
+            if (!PyUnicode_Check(value) ||
+                !(output = PyUnicode_AsUTF8(value))) {
+                PyErr_SetString(PyExc_TypeError, "output must be a string");
+                return 0;
+            }
+            if (!strcmp(output, "list")) {
+                hits->format = PG_HITS_LIST;
+            }
+            else if (!strcmp(output, "indices")) {
+                hits->format = PG_HITS_INDICES;
+            }
+            else if (!strcmp(output, "bitmask")) {
+                hits->format = PG_HITS_BITMASK;
+            }
+            else {
+                PyErr_SetString(PyExc_ValueError,
+                                "output must be 'list', 'indices' or "
+                                "'bitmask'");
+                return 0;
+            }
+        }
+        else if (!PyUnicode_CompareWithASCIIString(name, "out")) {
+            hits->out = value != Py_None ? value : NULL;
+        }
+        else {
+            PyErr_Format(PyExc_TypeError,
+                         "'%U' is an invalid keyword argument", name);
+            return 0;
+        }
+    }
+
+    if (hits->format == PG_HITS_LIST) {
+        if (hits->out) {
+            PyErr_SetString(PyExc_ValueError,
+                            "out requires output to be 'indices' or "
+                            "'bitmask'");
+            return 0;
+        }
+        return (hits->ret = PyList_New(0)) != NULL;
+    }
+
+    if ((length = PySequence_Length(args[0])) == -1) {
+        return 0;
+    }
+    hits->length = length;
+    /* every collider can be hit, so the indices need one item per collider
+     * and the bitmask one bit per collider */
+    size = hits->format == PG_HITS_INDICES ? length * 8 : (length + 7) / 8;
+
+    if (!hits->out) {
+        if (!(hits->ret = PyByteArray_FromStringAndSize(NULL, size))) {
+            return 0;
+        }
+        hits->indices = (int64_t *)PyByteArray_AS_STRING(hits->ret);
+        hits->bits = (unsigned char *)PyByteArray_AS_STRING(hits->ret);
+    }
+    else {
+        if (PyObject_GetBuffer(
+                hits->out, &hits->view,
+                PyBUF_WRITABLE | PyBUF_C_CONTIGUOUS | PyBUF_FORMAT)) {
+            return 0;
+        }
+        if (!_pg_buffer_has_format(
+                &hits->view, hits->format == PG_HITS_INDICES ? "ql" : "Bb?")) {
+            PyErr_SetString(PyExc_TypeError,
+                            hits->format == PG_HITS_INDICES
+                                ? "out must be a buffer of int64 values"
+                                : "out must be a buffer of bytes");
+            PyBuffer_Release(&hits->view);
+            return 0;
+        }
+        if (hits->view.len < size) {
+            PyErr_Format(PyExc_ValueError,
+                         "out must have room for at least %zd items",
+                         hits->format == PG_HITS_INDICES ? length : size);
+            PyBuffer_Release(&hits->view);
+            return 0;
+        }
+        hits->indices = (int64_t *)hits->view.buf;
+        hits->bits = (unsigned char *)hits->view.buf;
+    }
+
+    if (hits->format == PG_HITS_BITMASK) {
+        memset(hits->bits, 0, size);
+    }
+
+    return 1;
+}
+
+/* Adds the index of a hit collider, 0 if it fails */
+static PG_FORCEINLINE int
+_pg_hits_add(pgHitList *hits, Py_ssize_t index)
+{
+    PyObject *num;
+
+    if (hits->format != PG_HITS_LIST && index >= hits->length) {
+        PyErr_SetString(PyExc_RuntimeError,
+                        "colliders changed size during iteration");
+        return 0;
+    }
+
+    switch (hits->format) {
+        case PG_HITS_INDICES:
+            hits->indices[hits->count] = (int64_t)index;
+            break;
+        case PG_HITS_BITMASK:
+            hits->bits[index >> 3] |= (unsigned char)(1 << (index & 7));
+            break;
+        default:
+            if (!(num = PyLong_FromSsize_t(index))) {
+                return 0;
+            }
+            if (PyList_Append(hits->ret, num)) {
+                Py_DECREF(num);
+                return 0;
+            }
+            Py_DECREF(num);
+    }
+
+    hits->count++;
+    return 1;
+}
+
+/* Releases the hit list after an error */
+static void
+_pg_hits_free(pgHitList *hits)
+{
+    if (hits->out) {
+        PyBuffer_Release(&hits->view);
+    }
+    Py_XDECREF(hits->ret);
+}
+
+/* Gets the result of collidelistall and releases the hit list. That's the
+ * number of hits if an out buffer was given, a list or a new memoryview of
+ * the collected indices or bits otherwise. */
+static PyObject *
+_pg_hits_finish(pgHitList *hits)
+{
+    PyObject *mview, *ret;
+
+    if (hits->out) {
+        PyBuffer_Release(&hits->view);
+        return PyLong_FromSsize_t(hits->count);
+    }
+    if (hits->format == PG_HITS_LIST) {
+        return hits->ret;
+    }
+
+    /* the indices buffer was allocated for every collider to be hit */
+    if (hits->format == PG_HITS_INDICES &&
+        PyByteArray_Resize(hits->ret, hits->count * 8)) {
+        Py_DECREF(hits->ret);
+        return NULL;
+    }
+
+    mview = PyMemoryView_FromObject(hits->ret);
+    Py_DECREF(hits->ret);
+    if (!mview) {
+        return NULL;
+    }
+    if (hits->format == PG_HITS_BITMASK) {
+        return mview;
+    }
+
+    ret = PyObject_CallMethod(mview, "cast", "s", "q");
+    Py_DECREF(mview);
+    return ret;
+}
@@ -363,6 +363,16 @@ pg_circle_collideswith(pgCircleObject *self, PyObject *arg)
     return PyBool_FromLong(result);
 }
 
+static PyObject *
+pg_circle_penetration(pgCircleObject *self, PyObject *arg)
+{
+    pgCollider collider;
+
+    collider.type = PG_COLLIDER_CIRCLE;
+    collider.shape.circle = self->circle;
+    return pgPenetration_ColliderObject(&collider, arg);
+}
+
 static PyObject *
 pg_circle_as_rect(pgCircleObject *self, PyObject *_null)
 {
@@ -647,21 +657,19 @@ pg_circle_collidelist(pgCircleObject *self, PyObject *arg)
 }
 
 static PyObject *
-pg_circle_collidelistall(pgCircleObject *self, PyObject *arg)
+pg_circle_collidelistall(pgCircleObject *self, PyObject *const *args,
+                         Py_ssize_t nargs, PyObject *kwnames)
 {
-    PyObject *ret, **items;
     Py_ssize_t i;
     pgCircleBase *scirc = &self->circle;
+    PyObject *arg;
+    pgHitList hits;
     int colliding;
 
-    if (!PySequence_Check(arg)) {
-        return RAISE(PyExc_TypeError, "Argument must be a sequence");
-    }
-
-    ret = PyList_New(0);
-    if (!ret) {
+    if (!_pg_hits_init(&hits, args, nargs, kwnames)) {
         return NULL;
     }
+    arg = args[0];
 
     /* fast path */
     if (PySequence_FAST_CHECK(arg)) {
@@ -670,66 +678,80 @@ pg_circle_collidelistall(pgCircleObject *self, PyObject *arg)
         for (i = 0; i < PySequence_Fast_GET_SIZE(arg); i++) {
             if ((colliding = _pg_circle_collideswith(scirc, items[i])) == -1) {
                 /*invalid shape*/
-                Py_DECREF(ret);
-                return NULL;
-            }
-
-            if (!colliding) {
-                continue;
-            }
-
-            PyObject *num = PyLong_FromSsize_t(i);
-            if (!num) {
-                Py_DECREF(ret);
+                _pg_hits_free(&hits);
                 return NULL;
             }
 
-            if (PyList_Append(ret, num)) {
-                Py_DECREF(num);
-                Py_DECREF(ret);
+            if (colliding && !_pg_hits_add(&hits, i)) {
+                _pg_hits_free(&hits);
                 return NULL;
             }
-            Py_DECREF(num);
         }
 
-        return ret;
+        return _pg_hits_finish(&hits);
     }
 
     /* general sequence path */
     for (i = 0; i < PySequence_Length(arg); i++) {
         PyObject *obj = PySequence_GetItem(arg, i);
         if (!obj) {
-            Py_DECREF(ret);
+            _pg_hits_free(&hits);
             return NULL;
         }
 
         if ((colliding = _pg_circle_collideswith(scirc, obj)) == -1) {
             /*invalid shape*/
-            Py_DECREF(ret);
+            _pg_hits_free(&hits);
             Py_DECREF(obj);
             return NULL;
         }
         Py_DECREF(obj);
 
-        if (!colliding) {
-            continue;
-        }
-
-        PyObject *num = PyLong_FromSsize_t(i);
-        if (!num) {
-            Py_DECREF(ret);
+        if (colliding && !_pg_hits_add(&hits, i)) {
+            _pg_hits_free(&hits);
             return NULL;
         }
-
-        if (PyList_Append(ret, num)) {
-            Py_DECREF(num);
-            Py_DECREF(ret);
-            return NULL;
-        }
-        Py_DECREF(num);
     }
 
-    return ret;
+    return _pg_hits_finish(&hits);
+}
+
+static int
+_pg_circle_collideswith_shape(void *circle, PyObject *arg)
+{
+    return _pg_circle_collideswith((pgCircleBase *)circle, arg);
+}
+
+static PyObject *
+pg_circle_collideobjects(pgCircleObject *self, PyObject *const *args,
+                         Py_ssize_t nargs, PyObject *kwnames)
+{
+    return pg_shape_collideobjects(
+        &self->circle, _pg_circle_collideswith_shape, args, nargs, kwnames, 0);
+}
+
+static PyObject *
+pg_circle_collideobjectsall(pgCircleObject *self, PyObject *const *args,
+                            Py_ssize_t nargs, PyObject *kwnames)
+{
+    return pg_shape_collideobjects(
+        &self->circle, _pg_circle_collideswith_shape, args, nargs, kwnames, 1);
+}
+
+static PyObject *
+pg_circle_collidedict(pgCircleObject *self, PyObject *const *args,
+                      Py_ssize_t nargs, PyObject *kwnames)
+{
+    return pg_shape_collidedict(&self->circle, _pg_circle_collideswith_shape,
+                                args, nargs, kwnames, 0);
+}
+
+static PyObject *
+pg_circle_collidedictall(pgCircleObject *self, PyObject *const *args,
+                         Py_ssize_t nargs, PyObject *kwnames)
+{
+    return pg_shape_collidedict(&self->circle, _pg_circle_collideswith_shape,
+                                args, nargs, kwnames, 1);
 }
 
 static PyObject *
@@ -761,10 +783,20 @@ static struct PyMethodDef pg_circle_methods[] = {
     {"collidepoint", (PyCFunction)pg_circle_collidepoint, METH_FASTCALL, NULL},
     {"colliderect", (PyCFunction)pg_circle_colliderect, METH_FASTCALL, NULL},
     {"collideswith", (PyCFunction)pg_circle_collideswith, METH_O, NULL},
+    {"penetration", (PyCFunction)pg_circle_penetration, METH_O, NULL},
     {"collidepolygon", (PyCFunction)pg_circle_collidepolygon, METH_FASTCALL,
      NULL},
     {"collidelist", (PyCFunction)pg_circle_collidelist, METH_O, NULL},
-    {"collidelistall", (PyCFunction)pg_circle_collidelistall, METH_O, NULL},
+    {"collidelistall", (PyCFunction)pg_circle_collidelistall,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"collideobjects", (PyCFunction)pg_circle_collideobjects,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"collideobjectsall", (PyCFunction)pg_circle_collideobjectsall,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"collidedict", (PyCFunction)pg_circle_collidedict,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"collidedictall", (PyCFunction)pg_circle_collidedictall,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
     {"as_rect", (PyCFunction)pg_circle_as_rect, METH_NOARGS, NULL},
     {"update", (PyCFunction)pg_circle_update, METH_FASTCALL, NULL},
     {"move", (PyCFunction)pg_circle_move, METH_FASTCALL, NULL},
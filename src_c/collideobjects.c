@@ -0,0 +1,262 @@
+#include "include/geometry.h"
+
+/* Tests whether a shape collides with an object, 1 if they collide, 0 if
+ * they don't and -1 if the object isn't a shape or a point */
+typedef int (*pgCollideFunc)(void *shape, PyObject *obj);
+
+/*
+ * Parses the arguments of the collideobjects and collidedict methods,
+ * objects, [values], *, key=None, where values is only accepted by the dict
+ * variants. The key is either NULL, a callable or an interned attribute
+ * name, and must be released by the caller.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+_pg_collideobjects_parse_args(PyObject *const *args, Py_ssize_t nargs,
+                              PyObject *kwnames, int dict, PyObject **key,
+                              int *values)
+{
+    Py_ssize_t i;
+    PyObject *key_obj = NULL, *values_obj = NULL;
+
+    if (nargs < 1 || nargs > 1 + dict) {
+        PyErr_Format(PyExc_TypeError,
+                     "Invalid number of arguments, expected %s",
+                     dict ? "1 or 2 arguments" : "exactly 1 argument");
+        return 0;
+    }
+    if (nargs == 2) {
+        values_obj = args[1];
+    }
+
+    for (i = 0; kwnames && i < PyTuple_GET_SIZE(kwnames); i++) {
+        PyObject *name = PyTuple_GET_ITEM(kwnames, i);
+
+        if (!PyUnicode_CompareWithASCIIString(name, "key")) {
+            key_obj = args[nargs + i];
+        }
+        else if (dict && !values_obj &&
+                 !PyUnicode_CompareWithASCIIString(name, "values")) {
+            values_obj = args[nargs + i];
+        }
+        else {
+            PyErr_Format(PyExc_TypeError,
+                         "'%U' is an invalid keyword argument", name);
+            return 0;
+        }
+    }
+
+    if (dict) {
+        if (!PyDict_Check(args[0])) {
+            PyErr_SetString(PyExc_TypeError, "Argument must be a dict");
+            return 0;
+        }
+        if ((*values = values_obj ? PyObject_IsTrue(values_obj) : 0) == -1) {
+            return 0;
+        }
+    }
+    else if (!PySequence_Check(args[0])) {
+        PyErr_SetString(PyExc_TypeError, "Argument must be a sequence");
+        return 0;
+    }
+
+    if (!key_obj || key_obj == Py_None) {
+        *key = NULL;
+        return 1;
+    }
+    if (PyUnicode_Check(key_obj)) {
+        /* attribute names are interned so that looking them up on every
+         * object only compares pointers */
+        Py_INCREF(key_obj);
+        PyUnicode_InternInPlace(&key_obj);
+        *key = key_obj;
+        return 1;
+    }
+    if (!PyCallable_Check(key_obj)) {
+        PyErr_SetString(PyExc_TypeError,
+                        "key must be a callable, an attribute name or None");
+        return 0;
+    }
+
+    Py_INCREF(key_obj);
+    *key = key_obj;
+    return 1;
+}
+
+/* Tests whether a shape collides with the shape given by an object and a
+ * key, 1 if they collide, 0 if they don't and -1 if it fails */
+static PG_FORCEINLINE int
+_pg_collideobjects_test(void *shape, pgCollideFunc collide, PyObject *key,
+                        PyObject *obj)
+{
+    PyObject *other;
+    int result;
+
+    if (!key) {
+        return collide(shape, obj);
+    }
+
+    other = PyUnicode_Check(key)
+                ? PyObject_GetAttr(obj, key)
+                : PyObject_CallFunctionObjArgs(key, obj, NULL);
+    if (!other) {
+        return -1;
+    }
+
+    result = collide(shape, other);
+    Py_DECREF(other);
+
+    return result;
+}
+
+/*
+ * Implements collideobjects and collideobjectsall, returning the first
+ * object colliding with the shape, or None, or the list of every colliding
+ * object if all is set.
+ */
+static PyObject *
+pg_shape_collideobjects(void *shape, pgCollideFunc collide,
+                        PyObject *const *args, Py_ssize_t nargs,
+                        PyObject *kwnames, int all)
+{
+    PyObject *objects, *obj, *key, *ret = NULL;
+    Py_ssize_t i;
+    int colliding, fast;
+
+    if (!_pg_collideobjects_parse_args(args, nargs, kwnames, 0, &key, NULL)) {
+        return NULL;
+    }
+    objects = args[0];
+
+    if (all && !(ret = PyList_New(0))) {
+        Py_XDECREF(key);
+        return NULL;
+    }
+
+    /* the size is checked on every iteration as the key can change it */
+    fast = PySequence_FAST_CHECK(objects);
+    for (i = 0; i < (fast ? PySequence_Fast_GET_SIZE(objects)
+                          : PySequence_Length(objects));
+         i++) {
+        if (fast) {
+            obj = PySequence_Fast_GET_ITEM(objects, i);
+            Py_INCREF(obj);
+        }
+        else if (!(obj = PySequence_GetItem(objects, i))) {
+            goto error;
+        }
+
+        if ((colliding = _pg_collideobjects_test(shape, collide, key, obj)) ==
+            -1) {
+            Py_DECREF(obj);
+            goto error;
+        }
+
+        if (colliding) {
+            if (!all) {
+                Py_XDECREF(key);
+                return obj;
+            }
+            if (PyList_Append(ret, obj)) {
+                Py_DECREF(obj);
+                goto error;
+            }
+        }
+        Py_DECREF(obj);
+    }
+
+    /* a general sequence fails to give its length with a -1 */
+    if (!fast && PyErr_Occurred()) {
+        goto error;
+    }
+
+    Py_XDECREF(key);
+    if (!all) {
+        Py_RETURN_NONE;
+    }
+    return ret;
+
+error:
+    Py_XDECREF(key);
+    Py_XDECREF(ret);
+    return NULL;
+}
+
+/*
+ * Implements collidedict and collidedictall, testing the keys of a dict or
+ * its values if values is set, and returning the (key, value) pair of the
+ * first colliding item, or None, or the list of every colliding pair if all
+ * is set.
+ */
+static PyObject *
+pg_shape_collidedict(void *shape, pgCollideFunc collide, PyObject *const *args,
+                     Py_ssize_t nargs, PyObject *kwnames, int all)
+{
+    PyObject *dict, *dict_key, *dict_value, *pair, *key, *ret = NULL;
+    Py_ssize_t pos = 0, size;
+    int colliding, values;
+
+    if (!_pg_collideobjects_parse_args(args, nargs, kwnames, 1, &key,
+                                       &values)) {
+        return NULL;
+    }
+    dict = args[0];
+    size = PyDict_GET_SIZE(dict);
+
+    if (all && !(ret = PyList_New(0))) {
+        Py_XDECREF(key);
+        return NULL;
+    }
+
+    while (PyDict_Next(dict, &pos, &dict_key, &dict_value)) {
+        /* the key can run any code, so the items are kept alive while
+         * they're tested */
+        Py_INCREF(dict_key);
+        Py_INCREF(dict_value);
+
+        pair = NULL;
+        colliding = _pg_collideobjects_test(shape, collide, key,
+                                            values ? dict_value : dict_key);
+        if (colliding == 1) {
+            pair = PyTuple_Pack(2, dict_key, dict_value);
+        }
+        Py_DECREF(dict_key);
+        Py_DECREF(dict_value);
+
+        if (colliding == -1 || (colliding && !pair)) {
+            goto error;
+        }
+        if (PyDict_GET_SIZE(dict) != size) {
+            Py_XDECREF(pair);
+            PyErr_SetString(PyExc_RuntimeError,
+                            "dictionary changed size during iteration");
+            goto error;
+        }
+
+        if (colliding) {
+            if (!all) {
+                Py_XDECREF(key);
+                return pair;
+            }
+            if (PyList_Append(ret, pair)) {
+                Py_DECREF(pair);
+                goto error;
+            }
+            Py_DECREF(pair);
+        }
+    }
+
+    Py_XDECREF(key);
+    if (!all) {
+        Py_RETURN_NONE;
+    }
+    return ret;
+
+error:
+    Py_XDECREF(key);
+    Py_XDECREF(ret);
+    return NULL;
+}
@@ -511,43 +511,81 @@ pgRaycast_LineLine(pgLineBase *A, pgLineBase *B, double max_t, double *T)
     return 0;
 }
 
-static int
-pgRaycast_LineRect(pgLineBase *line, SDL_Rect *rect, double max_t, double *T)
+/*
+ * Slab test of a ray against an axis aligned bounding box, giving the t
+ * values where the ray enters and leaves the box. The box is only missed
+ * when the ray's line doesn't cross it, t_enter being negative when the
+ * ray's origin is inside of it or past it.
+ */
+static PG_FORCE_INLINE int
+_pg_raycast_slabs(pgRayBase *ray, double min_x, double min_y, double max_x,
+                  double max_y, double *t_enter, double *t_exit)
 {
-#if AVX2_IS_SUPPORTED
-    if (pg_HasAVX2())
-        return pgRaycast_LineRect_avx2(line, rect, max_t, T);
-#endif /* ~__AVX2__ */
+    double tx_min = -DBL_MAX, tx_max = DBL_MAX;
+    double ty_min = -DBL_MAX, ty_max = DBL_MAX;
+    double t1, t2;
+
+    if (ray->inv_dx != 0) {
+        t1 = (min_x - ray->x) * ray->inv_dx;
+        t2 = (max_x - ray->x) * ray->inv_dx;
+        tx_min = MIN(t1, t2);
+        tx_max = MAX(t1, t2);
+    }
+    else if (ray->x < min_x || ray->x > max_x) {
+        return 0;
+    }
 
+    if (ray->inv_dy != 0) {
+        t1 = (min_y - ray->y) * ray->inv_dy;
+        t2 = (max_y - ray->y) * ray->inv_dy;
+        ty_min = MIN(t1, t2);
+        ty_max = MAX(t1, t2);
+    }
+    else if (ray->y < min_y || ray->y > max_y) {
+        return 0;
+    }
+
+    *t_enter = MAX(tx_min, ty_min);
+    *t_exit = MIN(tx_max, ty_max);
+
+    return *t_enter <= *t_exit;
+}
+
+static int
+pgRaycast_RayRect(pgRayBase *ray, SDL_Rect *rect, double max_t, double *T)
+{
     double x = (double)rect->x;
     double y = (double)rect->y;
     double w = (double)rect->w;
     double h = (double)rect->h;
+    double t_enter, t_exit;
 
-    pgLineBase a = {x, y, x + w, y};
-    pgLineBase b = {x, y, x, y + h};
-    pgLineBase c = {x, y + h, x + w, y + h};
-    pgLineBase d = {x + w, y, x + w, y + h};
+    if (!_pg_raycast_slabs(ray, MIN(x, x + w), MIN(y, y + h), MAX(x, x + w),
+                           MAX(y, y + h), &t_enter, &t_exit)) {
+        return 0;
+    }
 
-    int ret = 0;
+    /* a ray starting inside of the rect hits it where it leaves it */
+    if (t_enter < 0) {
+        t_enter = t_exit;
+    }
+    if (t_enter < 0 || t_enter > max_t) {
+        return 0;
+    }
 
-    double temp_t = DBL_MAX;
-    double final_t = DBL_MAX;
+    *T = t_enter;
 
-    ret |= pgRaycast_LineLine(line, &a, max_t, &temp_t);
-    final_t = MIN(temp_t, final_t);
-    ret |= pgRaycast_LineLine(line, &b, max_t, &temp_t);
-    final_t = MIN(temp_t, final_t);
-    ret |= pgRaycast_LineLine(line, &c, max_t, &temp_t);
-    final_t = MIN(temp_t, final_t);
-    ret |= pgRaycast_LineLine(line, &d, max_t, &temp_t);
-    final_t = MIN(temp_t, final_t);
+    return 1;
+}
 
-    if (ret && final_t <= max_t) {
-        *T = final_t;
-    }
+static int
+pgRaycast_LineRect(pgLineBase *line, SDL_Rect *rect, double max_t, double *T)
+{
+    pgRayBase ray;
 
-    return ret;
+    pgRay_FromLine(line, max_t, &ray);
+
+    return pgRaycast_RayRect(&ray, rect, max_t, T);
 }
 
 static int
@@ -583,12 +621,842 @@ pgRaycast_LineCircle(pgLineBase *line, pgCircleBase *circle, double max_t,
         }
     }
 
-    if (t <= max_t)
-        *T = t;
+    if (t > max_t)
+        return 0;
+
+    *T = t;
+
+    return 1;
+}
+
+static int
+pgRaycast_RayAABB(pgRayBase *ray, double min_x, double min_y, double max_x,
+                  double max_y, double max_t, double *T)
+{
+    /* Slab test of the ray's [0, max_t] range against an axis aligned
+     * bounding box. T is set to the t value where the ray enters the box,
+     * which is 0 if the ray's origin is inside of it. */
+    double t_enter, t_exit;
+
+    if (!_pg_raycast_slabs(ray, min_x, min_y, max_x, max_y, &t_enter,
+                           &t_exit)) {
+        return 0;
+    }
+
+    t_enter = MAX(t_enter, 0);
+    t_exit = MIN(t_exit, max_t);
+
+    if (t_enter > t_exit)
+        return 0;
+
+    if (T)
+        *T = t_enter;
 
     return 1;
 }
 
+static int
+pgRaycast_LineAABB(pgLineBase *line, double min_x, double min_y, double max_x,
+                   double max_y, double max_t, double *T)
+{
+    pgRayBase ray;
+
+    pgRay_FromLine(line, max_t, &ray);
+
+    return pgRaycast_RayAABB(&ray, min_x, min_y, max_x, max_y, max_t, T);
+}
+
+/* Gets the t value where the ray crosses the boundary of the cell of index
+ * cell along one axis, going in the direction of step. */
+#define _PG_RAYCAST_CELL_EXIT(origin, offset, cell, step, inv) \
+    (((offset) + (cell) + ((step) > 0) - (origin)) * (inv))
+
+static int
+pgRaycast_RayMask(pgRayBase *ray, bitmask_t *mask, double offset_x,
+                  double offset_y, double max_t, double *T, double *nx,
+                  double *ny)
+{
+    /* Walks the pixels of the mask crossed by the ray's [0, max_t] range in
+     * order (Amanatides & Woo's grid traversal), stopping at the first set
+     * one. Each pixel (x, y) covers the unit square at (offset_x + x,
+     * offset_y + y). T is set to the t value where the ray enters the pixel
+     * and (nx, ny) to the normal of the pixel's side it crossed, which is
+     * the opposite of the ray's direction if its origin is in the pixel. */
+    double t_enter, t_exit, t, tx, ty, length;
+    double t_max_x = DBL_MAX, t_max_y = DBL_MAX;
+    int cx, cy, step_x = ray->inv_dx > 0 ? 1 : -1,
+                step_y = ray->inv_dy > 0 ? 1 : -1;
+    double normal_x, normal_y;
+
+    if (mask->w <= 0 || mask->h <= 0 ||
+        !_pg_raycast_slabs(ray, offset_x, offset_y, offset_x + mask->w,
+                           offset_y + mask->h, &t_enter, &t_exit)) {
+        return 0;
+    }
+
+    t_exit = MIN(t_exit, max_t);
+    if (t_exit < 0 || t_enter > t_exit) {
+        return 0;
+    }
+
+    if (t_enter > 0) {
+        /* the ray enters the mask through the side it reaches the last */
+        tx = ray->inv_dx != 0
+                 ? ((step_x > 0 ? offset_x : offset_x + mask->w) - ray->x) *
+                       ray->inv_dx
+                 : -DBL_MAX;
+        ty = ray->inv_dy != 0
+                 ? ((step_y > 0 ? offset_y : offset_y + mask->h) - ray->y) *
+                       ray->inv_dy
+                 : -DBL_MAX;
+        normal_x = tx >= ty ? -step_x : 0;
+        normal_y = tx >= ty ? 0 : -step_y;
+        t = t_enter;
+    }
+    else {
+        length = sqrt(ray->dx * ray->dx + ray->dy * ray->dy);
+        normal_x = ray->dx != 0 ? -ray->dx / length : 0;
+        normal_y = ray->dy != 0 ? -ray->dy / length : 0;
+        t = 0;
+    }
+
+    cx = (int)floor(ray->x + t * ray->dx - offset_x);
+    cy = (int)floor(ray->y + t * ray->dy - offset_y);
+    cx = MAX(0, MIN(cx, mask->w - 1));
+    cy = MAX(0, MIN(cy, mask->h - 1));
+
+    if (ray->inv_dx != 0) {
+        t_max_x =
+            _PG_RAYCAST_CELL_EXIT(ray->x, offset_x, cx, step_x, ray->inv_dx);
+    }
+    if (ray->inv_dy != 0) {
+        t_max_y =
+            _PG_RAYCAST_CELL_EXIT(ray->y, offset_y, cy, step_y, ray->inv_dy);
+    }
+
+    for (;;) {
+        if (bitmask_getbit(mask, cx, cy)) {
+            *T = t;
+            *nx = normal_x;
+            *ny = normal_y;
+            return 1;
+        }
+
+        if (t_max_x < t_max_y) {
+            t = t_max_x;
+            cx += step_x;
+            if (t > t_exit || cx < 0 || cx >= mask->w) {
+                return 0;
+            }
+            t_max_x = _PG_RAYCAST_CELL_EXIT(ray->x, offset_x, cx, step_x,
+                                            ray->inv_dx);
+            normal_x = -step_x;
+            normal_y = 0;
+        }
+        else {
+            t = t_max_y;
+            cy += step_y;
+            if (t > t_exit || cy < 0 || cy >= mask->h) {
+                return 0;
+            }
+            t_max_y = _PG_RAYCAST_CELL_EXIT(ray->y, offset_y, cy, step_y,
+                                            ray->inv_dy);
+            normal_x = 0;
+            normal_y = -step_y;
+        }
+    }
+}
+
+static int
+pgRaycast_LinePolygon(pgLineBase *line, pgPolygonBase *poly, double max_t,
+                      double *T)
+{
+    Py_ssize_t i, j;
+    double *vertices = poly->vertices;
+    double min_x, min_y, max_x, max_y;
+    double temp_t, final_t = max_t;
+    int ret = 0;
+
+    min_x = max_x = vertices[0];
+    min_y = max_y = vertices[1];
+
+    for (i = 2; i < poly->verts_num * 2; i += 2) {
+        min_x = MIN(min_x, vertices[i]);
+        max_x = MAX(max_x, vertices[i]);
+        min_y = MIN(min_y, vertices[i + 1]);
+        max_y = MAX(max_y, vertices[i + 1]);
+    }
+
+    /* the ray can't hit any edge if it misses the bounding box */
+    if (!pgRaycast_LineAABB(line, min_x, min_y, max_x, max_y, max_t, NULL))
+        return 0;
+
+    for (i = 0, j = poly->verts_num - 1; i < poly->verts_num; j = i++) {
+        pgLineBase edge = {vertices[j * 2], vertices[j * 2 + 1],
+                           vertices[i * 2], vertices[i * 2 + 1]};
+
+        /* only look for hits closer than the current closest one */
+        if (pgRaycast_LineLine(line, &edge, final_t, &temp_t)) {
+            final_t = temp_t;
+            ret = 1;
+        }
+    }
+
+    if (ret)
+        *T = final_t;
+
+    return ret;
+}
+
+static int
+pgRaycast_LineCollider(pgLineBase *line, pgCollider *collider, double max_t,
+                       double *T)
+{
+    switch (collider->type) {
+        case PG_COLLIDER_LINE:
+            return pgRaycast_LineLine(line, &collider->shape.line, max_t, T);
+        case PG_COLLIDER_CIRCLE:
+            return pgRaycast_LineCircle(line, &collider->shape.circle, max_t,
+                                        T);
+        case PG_COLLIDER_RECT:
+            return pgRaycast_LineRect(line, &collider->shape.rect, max_t, T);
+        case PG_COLLIDER_POLYGON:
+            return pgRaycast_LinePolygon(line, &collider->shape.polygon, max_t,
+                                         T);
+    }
+
+    return 0;
+}
+
+/* Squared distance between a point and the closest point of a segment */
+static double
+pgDistanceSquared_PointSegment(double x, double y, double xa, double ya,
+                               double xb, double yb)
+{
+    double ex = xb - xa, ey = yb - ya;
+    double len_sqr = ex * ex + ey * ey;
+    double t = 0;
+
+    if (len_sqr > 0) {
+        t = ((x - xa) * ex + (y - ya) * ey) / len_sqr;
+        t = MAX(0, MIN(1, t));
+    }
+
+    x -= xa + t * ex;
+    y -= ya + t * ey;
+
+    return x * x + y * y;
+}
+
+/* How deep a shape can overlap a collider at the start of a cast and still
+ * only be touching it, which covers the rounding errors of a shape placed
+ * at the contact point returned by an earlier cast */
+#define PG_SHAPECAST_TOUCH_EPSILON 1e-9
+
+/*
+ * Tells whether a cast starting at distance dist from a convex shape touches
+ * it at 0, where target is the distance at which they touch and (nx, ny)
+ * points from the shape to the start. Starting on the shape, a cast moving
+ * into it touches it right away, while a cast moving away from it or along
+ * it never touches it because the shape is convex.
+ *
+ * 1 if the cast touches the shape at 0
+ * 0 if it never touches it
+ * -1 if the cast starts away from the shape
+ */
+static int
+_pgCirclecast_StartTouch(pgLineBase *line, double dist, double target,
+                         double nx, double ny)
+{
+    if (fabs(dist - target) > PG_SHAPECAST_TOUCH_EPSILON) {
+        return -1;
+    }
+    return (line->xb - line->xa) * nx + (line->yb - line->ya) * ny < 0;
+}
+
+static int
+pgCirclecast_LineSegment(pgLineBase *line, double xa, double ya, double xb,
+                         double yb, double radius, double max_t, double *T)
+{
+    /* The circle touches the segment when its center enters the capsule
+     * made of the segment moved by radius on both sides and of the circles
+     * around its endpoints. The center is assumed to start outside of it. */
+    double ex = xb - xa, ey = yb - ya;
+    double len = sqrt(ex * ex + ey * ey);
+    double temp_t, final_t = DBL_MAX, u = 0, px, py;
+    pgCircleBase cap = {xa, ya, radius};
+    int ret = 0;
+
+    /* the center starts on the capsule */
+    if (len > 0) {
+        u = ((line->xa - xa) * ex + (line->ya - ya) * ey) / (len * len);
+        u = MAX(0, MIN(1, u));
+    }
+    px = line->xa - (xa + u * ex);
+    py = line->ya - (ya + u * ey);
+    if ((ret = _pgCirclecast_StartTouch(line, sqrt(px * px + py * py), radius,
+                                        px, py)) != -1) {
+        if (ret) {
+            *T = 0;
+        }
+        return ret;
+    }
+    ret = 0;
+
+    if (len > 0) {
+        double nx = -ey / len * radius, ny = ex / len * radius;
+        pgLineBase side_a = {xa + nx, ya + ny, xb + nx, yb + ny};
+        pgLineBase side_b = {xa - nx, ya - ny, xb - nx, yb - ny};
+
+        if (pgRaycast_LineLine(line, &side_a, max_t, &temp_t) &&
+            temp_t < final_t) {
+            final_t = temp_t;
+            ret = 1;
+        }
+        if (pgRaycast_LineLine(line, &side_b, max_t, &temp_t) &&
+            temp_t < final_t) {
+            final_t = temp_t;
+            ret = 1;
+        }
+    }
+
+    if (pgRaycast_LineCircle(line, &cap, max_t, &temp_t) && temp_t < final_t) {
+        final_t = temp_t;
+        ret = 1;
+    }
+    cap.x = xb;
+    cap.y = yb;
+    if (pgRaycast_LineCircle(line, &cap, max_t, &temp_t) && temp_t < final_t) {
+        final_t = temp_t;
+        ret = 1;
+    }
+
+    /* a root at 0 can come out as -0.0 */
+    if (ret)
+        *T = MAX(final_t, 0);
+
+    return ret;
+}
+
+static int
+pgCirclecast_LinePolygon(pgLineBase *line, double radius, double *vertices,
+                         Py_ssize_t verts_num, double max_t, double *T)
+{
+    Py_ssize_t i, j;
+    double temp_t, final_t = max_t;
+    int ret = 0;
+
+    for (i = 0, j = verts_num - 1; i < verts_num; j = i++) {
+        /* only look for hits closer than the current closest one */
+        if (pgCirclecast_LineSegment(
+                line, vertices[j * 2], vertices[j * 2 + 1], vertices[i * 2],
+                vertices[i * 2 + 1], radius, final_t, &temp_t) &&
+            (!ret || temp_t < final_t)) {
+            final_t = temp_t;
+            ret = 1;
+        }
+    }
+
+    if (ret)
+        *T = final_t;
+
+    return ret;
+}
+
+static int
+pgCirclecast_LineCollider(pgLineBase *line, double radius,
+                          pgCollider *collider, double max_t, double *T)
+{
+    /* Finds the t value of the line at which a circle of the given radius
+     * centered on it first touches the collider. A circle already
+     * overlapping the collider at the start of the line touches it at 0. */
+    double x = line->xa, y = line->ya;
+    double r_sqr = radius * radius;
+
+    switch (collider->type) {
+        case PG_COLLIDER_LINE: {
+            pgLineBase *seg = &collider->shape.line;
+            if (pgDistanceSquared_PointSegment(x, y, seg->xa, seg->ya, seg->xb,
+                                               seg->yb) < r_sqr) {
+                *T = 0;
+                return 1;
+            }
+            return pgCirclecast_LineSegment(line, seg->xa, seg->ya, seg->xb,
+                                            seg->yb, radius, max_t, T);
+        }
+        case PG_COLLIDER_CIRCLE: {
+            pgCircleBase inflated = collider->shape.circle;
+            double dx = x - inflated.x, dy = y - inflated.y;
+            int touch;
+            inflated.r += radius;
+            if (dx * dx + dy * dy < inflated.r * inflated.r) {
+                *T = 0;
+                return 1;
+            }
+            if ((touch = _pgCirclecast_StartTouch(
+                     line, sqrt(dx * dx + dy * dy), inflated.r, dx, dy)) !=
+                -1) {
+                if (touch) {
+                    *T = 0;
+                }
+                return touch;
+            }
+            if (!pgRaycast_LineCircle(line, &inflated, max_t, T)) {
+                return 0;
+            }
+            *T = MAX(*T, 0);
+            return 1;
+        }
+        case PG_COLLIDER_RECT: {
+            double vertices[8] = {collider->min_x, collider->min_y,
+                                  collider->max_x, collider->min_y,
+                                  collider->max_x, collider->max_y,
+                                  collider->min_x, collider->max_y};
+            double dx = x - MAX(collider->min_x, MIN(x, collider->max_x));
+            double dy = y - MAX(collider->min_y, MIN(y, collider->max_y));
+            if (dx * dx + dy * dy < r_sqr) {
+                *T = 0;
+                return 1;
+            }
+            return pgCirclecast_LinePolygon(line, radius, vertices, 4, max_t,
+                                            T);
+        }
+        case PG_COLLIDER_POLYGON: {
+            pgPolygonBase *poly = &collider->shape.polygon;
+            Py_ssize_t i, j;
+            if (pgCollision_PolygonPoint(poly, x, y)) {
+                *T = 0;
+                return 1;
+            }
+            for (i = 0, j = poly->verts_num - 1; i < poly->verts_num;
+                 j = i++) {
+                if (pgDistanceSquared_PointSegment(
+                        x, y, poly->vertices[j * 2], poly->vertices[j * 2 + 1],
+                        poly->vertices[i * 2],
+                        poly->vertices[i * 2 + 1]) < r_sqr) {
+                    *T = 0;
+                    return 1;
+                }
+            }
+            return pgCirclecast_LinePolygon(line, radius, poly->vertices,
+                                            poly->verts_num, max_t, T);
+        }
+    }
+
+    return 0;
+}
+
+static void
+_pg_polygon_bounds(pgPolygonBase *poly, double *min_x, double *min_y,
+                   double *max_x, double *max_y)
+{
+    Py_ssize_t i;
+    double *vertices = poly->vertices;
+
+    *min_x = *max_x = vertices[0];
+    *min_y = *max_y = vertices[1];
+
+    for (i = 2; i < poly->verts_num * 2; i += 2) {
+        *min_x = MIN(*min_x, vertices[i]);
+        *max_x = MAX(*max_x, vertices[i]);
+        *min_y = MIN(*min_y, vertices[i + 1]);
+        *max_y = MAX(*max_y, vertices[i + 1]);
+    }
+}
+
+/*
+ * Tests whether the line of one of the edges of the convex polygon A has all
+ * of the polygon B strictly on its outer side. This is the separating axis
+ * test on the normals of the edges of A, where the projection of A on the
+ * normal of an edge ends at the edge, so only the vertices of B need to be
+ * projected, stopping at the first one inside.
+ */
+static int
+_pg_polygon_separating_edge(pgPolygonBase *A, pgPolygonBase *B)
+{
+    Py_ssize_t i, j, k;
+    double *va = A->vertices, *vb = B->vertices;
+    double ex, ey, orientation;
+
+    /* the sign of the cross products of the edges going around A, which is
+     * also the sign of the cross product of an edge and a point inside */
+    orientation =
+        (va[2] - va[0]) * (va[5] - va[3]) - (va[3] - va[1]) * (va[4] - va[2]);
+
+    for (i = 0, j = A->verts_num - 1; i < A->verts_num; j = i++) {
+        ex = va[i * 2] - va[j * 2];
+        ey = va[i * 2 + 1] - va[j * 2 + 1];
+
+        for (k = 0; k < B->verts_num; k++) {
+            if ((ex * (vb[k * 2 + 1] - va[j * 2 + 1]) -
+                 ey * (vb[k * 2] - va[j * 2])) *
+                    orientation >=
+                0) {
+                break;
+            }
+        }
+        if (k == B->verts_num) {
+            return 1;
+        }
+    }
+
+    return 0;
+}
+
+/* Tests whether an edge of A crosses an edge of B */
+static int
+_pgCollision_polyedges_polyedges(pgPolygonBase *A, pgPolygonBase *B)
+{
+    Py_ssize_t i, j;
+
+    for (i = 0, j = B->verts_num - 1; i < B->verts_num; j = i++) {
+        if (_pgCollision_line_polyedges(
+                &(pgLineBase){B->vertices[j * 2], B->vertices[j * 2 + 1],
+                              B->vertices[i * 2], B->vertices[i * 2 + 1]},
+                A)) {
+            return 1;
+        }
+    }
+
+    return 0;
+}
+
+static int
+pgCollision_PolygonPolygon(pgPolygonBase *A, pgPolygonBase *B, int only_edges)
+{
+    double a_min_x, a_min_y, a_max_x, a_max_y;
+    double b_min_x, b_min_y, b_max_x, b_max_y;
+
+    /* the polygons can't collide if their bounding boxes don't */
+    _pg_polygon_bounds(A, &a_min_x, &a_min_y, &a_max_x, &a_max_y);
+    _pg_polygon_bounds(B, &b_min_x, &b_min_y, &b_max_x, &b_max_y);
+    if (a_max_x < b_min_x || b_max_x < a_min_x || a_max_y < b_min_y ||
+        b_max_y < a_min_y) {
+        return 0;
+    }
+
+    /* convex polygons collide unless an edge normal separates them, which
+     * doesn't need to find the crossing edges or test the containment */
+    if (!only_edges && _pg_polygon_is_convex_helper(A) &&
+        _pg_polygon_is_convex_helper(B)) {
+        return !_pg_polygon_separating_edge(A, B) &&
+               !_pg_polygon_separating_edge(B, A);
+    }
+
+    if (_pgCollision_polyedges_polyedges(A, B)) {
+        return 1;
+    }
+    if (only_edges) {
+        return 0;
+    }
+
+    /* no edges cross, so the polygons collide only if one contains the
+     * other */
+    return pgCollision_PolygonPoint(A, B->vertices[0], B->vertices[1]) ||
+           pgCollision_PolygonPoint(B, A->vertices[0], A->vertices[1]);
+}
+
+static int
+pgCollision_PolygonRect(pgPolygonBase *poly, SDL_Rect *rect, int only_edges)
+{
+    double vertices[8], min_x, min_y, max_x, max_y;
+    pgPolygonBase rect_poly = {4, vertices, 0, 0};
+
+    /* like with Rect.colliderect, a rect without area collides with nothing */
+    if (!rect->w || !rect->h) {
+        return 0;
+    }
+
+    vertices[0] = vertices[6] = (double)rect->x;
+    vertices[1] = vertices[3] = (double)rect->y;
+    vertices[2] = vertices[4] = (double)rect->x + rect->w;
+    vertices[5] = vertices[7] = (double)rect->y + rect->h;
+
+    _pg_polygon_bounds(poly, &min_x, &min_y, &max_x, &max_y);
+    if (max_x < MIN(vertices[0], vertices[2]) ||
+        MAX(vertices[0], vertices[2]) < min_x ||
+        max_y < MIN(vertices[1], vertices[5]) ||
+        MAX(vertices[1], vertices[5]) < min_y) {
+        return 0;
+    }
+
+    /* the normals of the edges of the rect are the x and y axes, on which
+     * the bounding boxes overlap, so only the polygon's normals are left to
+     * test */
+    if (!only_edges && _pg_polygon_is_convex_helper(poly)) {
+        return !_pg_polygon_separating_edge(poly, &rect_poly);
+    }
+
+    return pgCollision_PolygonPolygon(poly, &rect_poly, only_edges);
+}
+
+/* Tests whether two colliders of any shapes collide, two rects colliding like
+ * with Rect.colliderect */
+static int
+pgCollision_ColliderCollider(pgCollider *A, pgCollider *B)
+{
+    pgCollider *tmp;
+
+    /* only the pairs where A's shape comes first need to be handled */
+    if (A->type > B->type) {
+        tmp = A;
+        A = B;
+        B = tmp;
+    }
+
+    switch (A->type * 4 + B->type) {
+        case PG_COLLIDER_LINE * 4 + PG_COLLIDER_LINE:
+            return pgCollision_LineLine(&A->shape.line, &B->shape.line);
+        case PG_COLLIDER_LINE * 4 + PG_COLLIDER_CIRCLE:
+            return pgCollision_LineCircle(&A->shape.line, &B->shape.circle);
+        case PG_COLLIDER_LINE * 4 + PG_COLLIDER_RECT:
+            return pgCollision_RectLine(&B->shape.rect, &A->shape.line);
+        case PG_COLLIDER_LINE * 4 + PG_COLLIDER_POLYGON:
+            return pgCollision_PolygonLine(&B->shape.polygon, &A->shape.line,
+                                           0);
+        case PG_COLLIDER_CIRCLE * 4 + PG_COLLIDER_CIRCLE:
+            return pgCollision_CircleCircle(&A->shape.circle,
+                                            &B->shape.circle);
+        case PG_COLLIDER_CIRCLE * 4 + PG_COLLIDER_RECT:
+            return pgCollision_RectCircle(&B->shape.rect, &A->shape.circle);
+        case PG_COLLIDER_CIRCLE * 4 + PG_COLLIDER_POLYGON:
+            return pgCollision_CirclePolygon(&A->shape.circle,
+                                             &B->shape.polygon, 0);
+        case PG_COLLIDER_RECT * 4 + PG_COLLIDER_RECT:
+            return A->min_x < A->max_x && A->min_y < A->max_y &&
+                   B->min_x < B->max_x && B->min_y < B->max_y &&
+                   A->min_x < B->max_x && B->min_x < A->max_x &&
+                   A->min_y < B->max_y && B->min_y < A->max_y;
+        case PG_COLLIDER_RECT * 4 + PG_COLLIDER_POLYGON:
+            return pgCollision_PolygonRect(&B->shape.polygon, &A->shape.rect,
+                                           0);
+        case PG_COLLIDER_POLYGON * 4 + PG_COLLIDER_POLYGON:
+            return pgCollision_PolygonPolygon(&A->shape.polygon,
+                                              &B->shape.polygon, 0);
+    }
+
+    return 0;
+}
+
+/*
+ * Casts the vertices of a shape moving by t * (dx, dy) against the edges of
+ * another shape, whose last edge goes from its last vertex to its first one
+ * unless it is open. vertex and edge are set to the indices of the vertex
+ * and of the edge of the closest hit.
+ */
+static int
+_pgShapecast_VerticesEdges(double *vertices, Py_ssize_t verts_num, double dx,
+                           double dy, double *edges,
+                           Py_ssize_t edges_verts_num, int open, double max_t,
+                           double *T, Py_ssize_t *vertex, Py_ssize_t *edge)
+{
+    Py_ssize_t i, j, k,
+        edges_num = open ? edges_verts_num - 1 : edges_verts_num;
+    double temp_t, final_t = max_t;
+    pgLineBase ray, segment;
+    int ret = 0;
+
+    for (i = 0; i < verts_num; i++) {
+        ray.xa = vertices[i * 2];
+        ray.ya = vertices[i * 2 + 1];
+        ray.xb = ray.xa + dx;
+        ray.yb = ray.ya + dy;
+
+        for (j = 0; j < edges_num; j++) {
+            k = j + 1 < edges_verts_num ? j + 1 : 0;
+            segment.xa = edges[j * 2];
+            segment.ya = edges[j * 2 + 1];
+            segment.xb = edges[k * 2];
+            segment.yb = edges[k * 2 + 1];
+
+            if (pgRaycast_LineLine(&ray, &segment, final_t, &temp_t) &&
+                (!ret || temp_t < final_t)) {
+                final_t = temp_t;
+                *vertex = i;
+                *edge = j;
+                ret = 1;
+            }
+        }
+    }
+
+    if (ret)
+        *T = final_t;
+
+    return ret;
+}
+
+/* Sets normal to the unit normal of an edge, facing against (dx, dy) */
+static void
+_pgShapecast_EdgeNormal(double *edges, Py_ssize_t edges_verts_num,
+                        Py_ssize_t edge, double dx, double dy, double *normal)
+{
+    Py_ssize_t k = edge + 1 < edges_verts_num ? edge + 1 : 0;
+    double ex = edges[k * 2] - edges[edge * 2];
+    double ey = edges[k * 2 + 1] - edges[edge * 2 + 1];
+    double len = sqrt(ex * ex + ey * ey);
+
+    normal[0] = normal[1] = 0;
+    if (len == 0) {
+        return;
+    }
+
+    normal[0] = -ey / len;
+    normal[1] = ex / len;
+    if (normal[0] * dx + normal[1] * dy > 0) {
+        normal[0] = -normal[0];
+        normal[1] = -normal[1];
+    }
+}
+
+/*
+ * Finds the t value at which a polygon moving by t * (dx, dy) first touches
+ * the collider. hit is set to the contact point followed by the unit normal
+ * of the touched surface, facing against the motion. A polygon overlapping
+ * the collider, or touching it and moving into it, touches it at 0, the
+ * contact point then being the polygon's center.
+ */
+static int
+pgShapecast_PolygonCollider(pgPolygonBase *poly, double dx, double dy,
+                            pgCollider *collider, double max_t, double *T,
+                            double *hit)
+{
+    double buffer[8], *vertices = buffer, temp_t, len;
+    Py_ssize_t verts_num, vertex, edge, other_vertex, other_edge;
+    pgPolygonBase rect;
+    int overlap, open = 0, ret;
+
+    switch (collider->type) {
+        case PG_COLLIDER_LINE:
+            buffer[0] = collider->shape.line.xa;
+            buffer[1] = collider->shape.line.ya;
+            buffer[2] = collider->shape.line.xb;
+            buffer[3] = collider->shape.line.yb;
+            verts_num = 2;
+            open = 1;
+            overlap = pgCollision_PolygonLine(poly, &collider->shape.line, 0);
+            break;
+        case PG_COLLIDER_CIRCLE:
+            overlap =
+                pgCollision_CirclePolygon(&collider->shape.circle, poly, 0);
+            break;
+        case PG_COLLIDER_RECT:
+            buffer[0] = buffer[6] = collider->min_x;
+            buffer[1] = buffer[3] = collider->min_y;
+            buffer[2] = buffer[4] = collider->max_x;
+            buffer[5] = buffer[7] = collider->max_y;
+            verts_num = 4;
+            rect.vertices = buffer;
+            rect.verts_num = 4;
+            overlap = pgCollision_PolygonPolygon(poly, &rect, 0);
+            break;
+        case PG_COLLIDER_POLYGON:
+            vertices = collider->shape.polygon.vertices;
+            verts_num = collider->shape.polygon.verts_num;
+            overlap =
+                pgCollision_PolygonPolygon(poly, &collider->shape.polygon, 0);
+            break;
+        default:
+            return 0;
+    }
+
+    /* a polygon that only touches the collider stops without moving when it
+     * moves into the contact. Moving away from it or sliding along it, the
+     * axis the shapes touch along keeps separating them, so it never hits */
+    if (overlap) {
+        pgGJKShape shape_a, shape_b;
+        pgPenetration penetration;
+        pgCollider moving;
+
+        moving.type = PG_COLLIDER_POLYGON;
+        moving.shape.polygon = *poly;
+        pgGJKShape_FromCollider(&moving, &shape_a);
+        pgGJKShape_FromCollider(collider, &shape_b);
+        pgPenetration_ShapeShape(&shape_a, &shape_b, &penetration);
+        if (penetration.depth <= PG_SHAPECAST_TOUCH_EPSILON &&
+            dx * penetration.normal_x + dy * penetration.normal_y <= 0) {
+            return 0;
+        }
+    }
+
+    if (overlap) {
+        *T = 0;
+        len = sqrt(dx * dx + dy * dy);
+        hit[0] = poly->centerx;
+        hit[1] = poly->centery;
+        hit[2] = len != 0 ? -dx / len : 0;
+        hit[3] = len != 0 ? -dy / len : 0;
+        return 1;
+    }
+
+    if (collider->type == PG_COLLIDER_CIRCLE) {
+        /* the circle moving against the motion touches an edge */
+        pgCircleBase *circle = &collider->shape.circle;
+        pgLineBase ray = {circle->x, circle->y, circle->x - dx,
+                          circle->y - dy};
+        double final_t = max_t, *v = poly->vertices;
+        Py_ssize_t i, j;
+
+        ret = 0;
+        for (i = 0, j = poly->verts_num - 1; i < poly->verts_num; j = i++) {
+            if (pgCirclecast_LineSegment(&ray, v[j * 2], v[j * 2 + 1],
+                                         v[i * 2], v[i * 2 + 1], circle->r,
+                                         final_t, &temp_t) &&
+                (!ret || temp_t < final_t)) {
+                final_t = temp_t;
+                edge = j;
+                ret = 1;
+            }
+        }
+        if (!ret) {
+            return 0;
+        }
+
+        /* the contact point is the point of the moved edge closest to the
+         * circle's center */
+        i = edge + 1 < poly->verts_num ? edge + 1 : 0;
+        double xa = v[edge * 2] + dx * final_t;
+        double ya = v[edge * 2 + 1] + dy * final_t;
+        double ex = v[i * 2] + dx * final_t - xa;
+        double ey = v[i * 2 + 1] + dy * final_t - ya;
+        double u = ex * ex + ey * ey;
+
+        u = u > 0 ? ((circle->x - xa) * ex + (circle->y - ya) * ey) / u : 0;
+        u = MAX(0, MIN(1, u));
+        hit[0] = xa + u * ex;
+        hit[1] = ya + u * ey;
+        hit[2] = (hit[0] - circle->x) / circle->r;
+        hit[3] = (hit[1] - circle->y) / circle->r;
+
+        *T = final_t;
+        return 1;
+    }
+
+    /* the first contact is either a vertex of the polygon touching an edge
+     * of the collider, or a vertex of the collider touching an edge of the
+     * polygon */
+    ret = _pgShapecast_VerticesEdges(poly->vertices, poly->verts_num, dx, dy,
+                                     vertices, verts_num, open, max_t, T,
+                                     &vertex, &edge);
+    if (_pgShapecast_VerticesEdges(
+            vertices, verts_num, -dx, -dy, poly->vertices, poly->verts_num, 0,
+            ret ? *T : max_t, &temp_t, &other_vertex, &other_edge) &&
+        (!ret || temp_t < *T)) {
+        *T = temp_t;
+        hit[0] = vertices[other_vertex * 2];
+        hit[1] = vertices[other_vertex * 2 + 1];
+        _pgShapecast_EdgeNormal(poly->vertices, poly->verts_num, other_edge,
+                                dx, dy, hit + 2);
+        return 1;
+    }
+    if (ret) {
+        hit[0] = poly->vertices[vertex * 2] + dx * *T;
+        hit[1] = poly->vertices[vertex * 2 + 1] + dy * *T;
+        _pgShapecast_EdgeNormal(vertices, verts_num, edge, dx, dy, hit + 2);
+    }
+
+    return ret;
+}
+
 static int
 pgIntersection_CircleCircle(pgCircleBase *A, pgCircleBase *B,
                             double *intersections)
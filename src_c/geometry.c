@@ -1,18 +1,56 @@
+#include "buffer.c"
+#include "collideobjects.c"
 #include "line.c"
+#include "ray.c"
 #include "circle.c"
 #include "polygon.c"
 #include "collisions.c"
+#include "raycast_scene.c"
+#include "broadphase.c"
+#include "gjk.c"
+#include "penetration.c"
+#include "visibility.c"
 #ifdef __AVX2__
 #include "simd_collisions_avx2.c"
 #endif /* ~__AVX2__ */
 
 #define PYGAMEAPI_GEOMETRY_NUMSLOTS 18
 
+/*
+ * Scales a ray going from its origin to its direction point so that it is
+ * max_dist long, a negative max_dist making the ray infinite.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+_pg_ray_apply_max_dist(pgLineBase *line, double max_dist, double *max_t)
+{
+    if (max_dist < 0 || max_dist == DBL_MAX) {
+        *max_t = DBL_MAX;
+        return 1;
+    }
+    else if (max_dist == 0) {
+        PyErr_SetString(
+            PyExc_ValueError,
+            "Invalid max distance value, must be nonzero numeric value");
+        return 0;
+    }
+    line->xb = (line->xb - line->xa) * max_dist + line->xa;
+    line->yb = (line->yb - line->ya) * max_dist + line->ya;
+
+    *max_t = max_dist / pgLine_Length(line);
+
+    return 1;
+}
+
 /*
  * origin, direction, max_dist
  * origin, angle, max_dist
  * origin, end
  * line
+ * ray
  *
  * sets the error messages
  * 1 if success
@@ -23,6 +61,10 @@ _pg_extract_ray_from_object_fastcall(PyObject *const *args, Py_ssize_t nargs,
                                      pgLineBase *line, double *max_t)
 {
     if (nargs == 1) {
+        if (pgRay_Check(args[0])) {
+            pgRay_AsLine(&pgRay_AsRay(args[0]), line, max_t);
+            return 1;
+        }
         if (!pgLine_FromObject(args[0], line)) {
             PyErr_SetString(
                 PyExc_TypeError,
@@ -84,349 +126,2754 @@ _pg_extract_ray_from_object_fastcall(PyObject *const *args, Py_ssize_t nargs,
                 "Invalid ray max distance threshold value, must be numeric");
             return 0;
         }
-        if (max_dist < 0 || max_dist == DBL_MAX) {
-            *max_t = DBL_MAX;
-            return 1;
+
+        return _pg_ray_apply_max_dist(line, max_dist, max_t);
+    }
+    else {
+        PyErr_SetString(PyExc_TypeError, "Invalid number of arguments");
+        return 0;
+    }
+}
+
+/*
+ * line
+ * ray
+ * (origin, direction, max_dist)
+ * (origin, angle, max_dist)
+ * (origin, end)
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+_pg_extract_ray_from_object(PyObject *obj, pgLineBase *line, double *max_t)
+{
+    if (pgLine_Check(obj)) {
+        *line = pgLine_AsLine(obj);
+        *max_t = 1.0;
+        return 1;
+    }
+    else if (pgRay_Check(obj)) {
+        pgRay_AsLine(&pgRay_AsRay(obj), line, max_t);
+        return 1;
+    }
+    else if (PyTuple_Check(obj)) {
+        return _pg_extract_ray_from_object_fastcall(
+            (PyObject *const *)PySequence_Fast_ITEMS(obj),
+            PyTuple_GET_SIZE(obj), line, max_t);
+    }
+
+    PyErr_SetString(PyExc_TypeError,
+                    "rays must be a sequence of lines, rays or tuples");
+    return 0;
+}
+
+/* Gets the inverse direction of a ray used by the slab tests, which Ray
+ * objects keep so that it doesn't need to be computed again. */
+static void
+_pg_ray_get_slab(PyObject *obj, pgLineBase *line, double max_t,
+                 pgRayBase *slab)
+{
+    if (pgRay_Check(obj)) {
+        *slab = pgRay_AsRay(obj);
+        return;
+    }
+    pgRay_FromLine(line, max_t, slab);
+}
+
+static PyTypeObject *pgRaycastHit_Type = NULL;
+
+static PyStructSequence_Field _pg_raycasthit_fields[] = {
+    {"point", "the point where the ray hit the collider"},
+    {"normal", "the unit normal of the collider's surface at the hit point"},
+    {"distance", "the distance between the ray's origin and the hit point"},
+    {"index", "the index of the hit collider in the colliders sequence"},
+    {NULL, NULL}};
+
+static PyStructSequence_Desc _pg_raycasthit_desc = {
+    "pygame.RaycastHit",
+    "Information about the closest hit of a ray",
+    _pg_raycasthit_fields,
+    4,
+};
+
+/* The highest number of threads a raycast function can use */
+#define PG_RAYCAST_MAX_THREADS 256
+
+/* The keyword-only options accepted by a raycast function */
+#define PG_RAYCAST_OPT_RETURN_HIT 0x1
+#define PG_RAYCAST_OPT_LAYERS 0x2
+#define PG_RAYCAST_OPT_OUT 0x4
+#define PG_RAYCAST_OPT_OUT_INDEX 0x8
+#define PG_RAYCAST_OPT_THREADS 0x10
+#define PG_RAYCAST_OPT_OFFSET 0x20
+
+typedef struct {
+    int return_hit;
+    /* colliders are only tested if their layer bits intersect the mask */
+    Uint32 mask;
+    /* the layers keyword argument, NULL if it wasn't given */
+    PyObject *layers_obj;
+    /* the layer bits of every collider, NULL if no layers were given */
+    Uint32 *layers;
+    /* the out and out_index keyword arguments, NULL if they weren't given */
+    PyObject *out;
+    PyObject *out_index;
+    /* the number of threads the rays are split across */
+    int threads;
+    /* the position of the mask a ray is cast against */
+    double offset_x, offset_y;
+} pgRaycastOptions;
+
+/*
+ * Converts an integer, or an object with __index__ such as a numpy integer,
+ * to layer bits. Negative values down to -2**31 are taken in two's
+ * complement, so that -1 stands for every layer.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+_pg_raycast_layer_bits(PyObject *obj, const char *name, const char *type,
+                       Uint32 *bits)
+{
+    PyObject *index;
+    long long value;
+    int overflow;
+
+    if (!PyIndex_Check(obj)) {
+        PyErr_Format(PyExc_TypeError, "%s must be %s", name, type);
+        return 0;
+    }
+    if (!(index = PyNumber_Index(obj))) {
+        return 0;
+    }
+    value = PyLong_AsLongLongAndOverflow(index, &overflow);
+    Py_DECREF(index);
+    if (value == -1 && PyErr_Occurred()) {
+        return 0;
+    }
+    if (overflow || value < -0x80000000LL || value > 0xFFFFFFFFLL) {
+        PyErr_Format(PyExc_OverflowError, "%s must fit in 32 bits", name);
+        return 0;
+    }
+
+    *bits = (Uint32)value;
+    return 1;
+}
+
+/*
+ * Parses the keyword-only arguments shared by the raycast functions.
+ * kwargs points to the first keyword argument value and allowed is a
+ * combination of the PG_RAYCAST_OPT_* flags supported by the function.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+_pg_raycast_parse_options(PyObject *const *kwargs, PyObject *kwnames,
+                          int allowed, pgRaycastOptions *options)
+{
+    Py_ssize_t i;
+
+    options->return_hit = 0;
+    options->mask = 0xFFFFFFFF;
+    options->layers_obj = NULL;
+    options->layers = NULL;
+    options->out = NULL;
+    options->out_index = NULL;
+    options->threads = 1;
+    options->offset_x = options->offset_y = 0;
+
+    if (!kwnames) {
+        return 1;
+    }
+
+    for (i = 0; i < PyTuple_GET_SIZE(kwnames); i++) {
+        PyObject *name = PyTuple_GET_ITEM(kwnames, i);
+
+        if ((allowed & PG_RAYCAST_OPT_RETURN_HIT) &&
+            !PyUnicode_CompareWithASCIIString(name, "return_hit")) {
+            options->return_hit = PyObject_IsTrue(kwargs[i]);
+            if (options->return_hit == -1) {
+                return 0;
+            }
         }
-        else if (max_dist == 0) {
-            PyErr_SetString(
-                PyExc_ValueError,
-                "Invalid max distance value, must be nonzero numeric value");
+        else if ((allowed & PG_RAYCAST_OPT_LAYERS) &&
+                 !PyUnicode_CompareWithASCIIString(name, "mask")) {
+            if (!_pg_raycast_layer_bits(kwargs[i], "mask", "an integer",
+                                        &options->mask)) {
+                return 0;
+            }
+        }
+        else if ((allowed & PG_RAYCAST_OPT_LAYERS) &&
+                 !PyUnicode_CompareWithASCIIString(name, "layers")) {
+            if (!PySequence_FAST_CHECK(kwargs[i])) {
+                PyErr_SetString(PyExc_TypeError,
+                                "layers must be a sequence of integers");
+                return 0;
+            }
+            options->layers_obj = kwargs[i];
+        }
+        else if ((allowed & PG_RAYCAST_OPT_OUT) &&
+                 !PyUnicode_CompareWithASCIIString(name, "out")) {
+            options->out = kwargs[i] != Py_None ? kwargs[i] : NULL;
+        }
+        else if ((allowed & PG_RAYCAST_OPT_OUT_INDEX) &&
+                 !PyUnicode_CompareWithASCIIString(name, "out_index")) {
+            options->out_index = kwargs[i] != Py_None ? kwargs[i] : NULL;
+        }
+        else if ((allowed & PG_RAYCAST_OPT_THREADS) &&
+                 !PyUnicode_CompareWithASCIIString(name, "threads")) {
+            long threads;
+            if (!PyLong_Check(kwargs[i])) {
+                PyErr_SetString(PyExc_TypeError, "threads must be an integer");
+                return 0;
+            }
+            threads = PyLong_AsLong(kwargs[i]);
+            if (threads == -1 && PyErr_Occurred()) {
+                return 0;
+            }
+            if (threads < 1 || threads > PG_RAYCAST_MAX_THREADS) {
+                PyErr_Format(PyExc_ValueError,
+                             "threads must be between 1 and %d",
+                             PG_RAYCAST_MAX_THREADS);
+                return 0;
+            }
+            options->threads = (int)threads;
+        }
+        else if ((allowed & PG_RAYCAST_OPT_OFFSET) &&
+                 !PyUnicode_CompareWithASCIIString(name, "offset")) {
+            if (!pg_TwoDoublesFromObj(kwargs[i], &options->offset_x,
+                                      &options->offset_y)) {
+                PyErr_SetString(PyExc_TypeError,
+                                "offset must be a pair of numeric values");
+                return 0;
+            }
+        }
+        else {
+            PyErr_Format(PyExc_TypeError,
+                         "'%U' is an invalid keyword argument", name);
             return 0;
         }
-        line->xb = (line->xb - line->xa) * max_dist + line->xa;
-        line->yb = (line->yb - line->ya) * max_dist + line->ya;
+    }
 
-        *max_t = max_dist / pgLine_Length(line);
+    return 1;
+}
+
+/*
+ * Converts the layers given to the raycast functions into an array of layer
+ * bits, one for each collider. The array must be released with
+ * _pg_raycast_free_options.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+_pg_raycast_load_layers(pgRaycastOptions *options, Py_ssize_t colliders_length)
+{
+    PyObject **items;
+    Py_ssize_t i;
 
+    if (!options->layers_obj) {
         return 1;
     }
-    else {
-        PyErr_SetString(PyExc_TypeError, "Invalid number of arguments");
+
+    if (PySequence_Fast_GET_SIZE(options->layers_obj) != colliders_length) {
+        PyErr_SetString(PyExc_ValueError,
+                        "layers must have the same length as colliders");
         return 0;
     }
+
+    if (!(options->layers = PyMem_New(Uint32, MAX(colliders_length, 1)))) {
+        PyErr_NoMemory();
+        return 0;
+    }
+
+    items = PySequence_Fast_ITEMS(options->layers_obj);
+    for (i = 0; i < colliders_length; i++) {
+        if (!_pg_raycast_layer_bits(items[i], "layers",
+                                    "a sequence of integers",
+                                    &options->layers[i])) {
+            return 0;
+        }
+    }
+
+    return 1;
 }
 
-static PyObject *
-pg_raycast(PyObject *_null, PyObject *const *args, Py_ssize_t nargs)
+static void
+_pg_raycast_free_options(pgRaycastOptions *options)
 {
-    PyObject **colliders;
-    Py_ssize_t colliders_length;
-    Py_ssize_t loop;
-    double max_t;
-    double x, y;
-    pgLineBase line;
+    PyMem_Free(options->layers);
+    options->layers = NULL;
+}
 
-    if (nargs != 2 && nargs != 4) {
-        return RAISE(PyExc_TypeError, "Invalid number of arguments");
+/* Checks if the collider at index is filtered out by the options. */
+#define _PG_RAYCAST_SKIP(options, index) \
+    ((options)->layers && !((options)->layers[index] & (options)->mask))
+
+/* The colliders a ray is cast against, either the items of a sequence or
+ * the colliders of a prepared RaycastGrid or RaycastBVH */
+typedef struct {
+    PyObject **objects;
+    Py_ssize_t length;
+    /* the copies of the colliders of a prepared scene, NULL for sequences
+     * unless they were copied to be used without holding the GIL */
+    pgCollider *shapes;
+    pgRaycastGridObject *grid;
+    pgRaycastBVHObject *bvh;
+} pgRaycastColliders;
+
+/*
+ * Gets the colliders from a sequence, a RaycastGrid or a RaycastBVH.
+ *
+ * 1 if success
+ * 0 if the object is none of them, no error is set
+ */
+static int
+_pg_raycast_get_colliders(PyObject *obj, pgRaycastColliders *colliders)
+{
+    PyObject *objects;
+
+    colliders->grid = NULL;
+    colliders->bvh = NULL;
+
+    if (pgRaycastGrid_Check(obj)) {
+        colliders->grid = pgRaycastGrid_CAST(obj);
+        colliders->shapes = colliders->grid->shapes;
+        colliders->length = colliders->grid->shapes_num;
+        objects = colliders->grid->colliders;
+    }
+    else if (pgRaycastBVH_Check(obj)) {
+        colliders->bvh = pgRaycastBVH_CAST(obj);
+        colliders->shapes = colliders->bvh->shapes;
+        colliders->length = colliders->bvh->shapes_num;
+        objects = colliders->bvh->colliders;
+    }
+    else {
+        objects = NULL;
     }
 
-    if (!_pg_extract_ray_from_object_fastcall(args, nargs - 1, &line,
-                                              &max_t)) {
-        return NULL;
+    if (colliders->grid || colliders->bvh) {
+        colliders->objects =
+            colliders->length ? PySequence_Fast_ITEMS(objects) : NULL;
+        return 1;
     }
 
-    if (!PySequence_FAST_CHECK(args[nargs - 1])) {
-        return RAISE(PyExc_TypeError,
-                     "colliders parameter must be a sequence");
+    if (!PySequence_FAST_CHECK(obj)) {
+        return 0;
     }
-    colliders = PySequence_Fast_ITEMS(args[nargs - 1]);
-    colliders_length = PySequence_Fast_GET_SIZE(args[nargs - 1]);
 
-    // find the best t
-    double record_t = max_t;
+    colliders->shapes = NULL;
+    colliders->objects = PySequence_Fast_ITEMS(obj);
+    colliders->length = PySequence_Fast_GET_SIZE(obj);
+    return 1;
+}
+
+/*
+ * Casts a ray against a single collider object.
+ *
+ * sets the error messages
+ * 1 if the ray hits the collider, T is set to the hit's t value
+ * 0 if the ray misses the collider
+ * -1 if the object is not a valid collider
+ */
+static PG_FORCEINLINE int
+_pg_raycast_object(pgLineBase *ray, pgRayBase *slab, PyObject *obj,
+                   double max_t, double *T)
+{
+    if (pgCircle_Check(obj)) {
+        return pgRaycast_LineCircle(ray, &pgCircle_AsCircle(obj), max_t, T);
+    }
+    else if (pgLine_Check(obj)) {
+        return pgRaycast_LineLine(ray, &pgLine_AsLine(obj), max_t, T);
+    }
+    else if (pgRect_Check(obj)) {
+        return pgRaycast_RayRect(slab, &pgRect_AsRect(obj), max_t, T);
+    }
+    else if (pgPolygon_Check(obj)) {
+        return pgRaycast_LinePolygon(ray, &pgPolygon_AsPolygon(obj), max_t, T);
+    }
+
+    PyErr_SetString(PyExc_TypeError,
+                    "collisions must be a sequence of "
+                    "Line, Circle, Rect or Polygon objects");
+    return -1;
+}
+
+/* Casts a ray against the copy of a collider, testing rects with the
+ * inverse direction of slab. */
+static PG_FORCEINLINE int
+_pg_raycast_shape(pgLineBase *ray, pgRayBase *slab, pgCollider *collider,
+                  double max_t, double *T)
+{
+    if (collider->type == PG_COLLIDER_RECT) {
+        return pgRaycast_RayRect(slab, &collider->shape.rect, max_t, T);
+    }
+    return pgRaycast_LineCollider(ray, collider, max_t, T);
+}
+
+/*
+ * Finds the closest hit of a ray against the colliders.
+ * record_t is set to the t value of the closest hit and record_index to the
+ * index of the hit collider, or -1 if the ray didn't hit anything.
+ * slab holds the ray's inverse direction, computed from the ray
+ * when it's NULL.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+_pg_raycast_colliders(pgLineBase *ray, pgRayBase *slab,
+                      pgRaycastColliders *colliders, double max_t,
+                      pgRaycastOptions *options, double *record_t,
+                      Py_ssize_t *record_index)
+{
+    Py_ssize_t loop;
     double temp_t = 0;
+    pgRayBase ray_slab;
+    int result;
 
-    for (loop = 0; loop < colliders_length; loop++) {
-        PyObject *obj = colliders[loop];
+    if (colliders->grid) {
+        pgRaycastGrid_Raycast(colliders->grid, ray, NULL, max_t,
+                              options->layers, options->mask, record_t,
+                              record_index);
+        return 1;
+    }
+    if (colliders->bvh) {
+        pgRaycastBVH_Raycast(colliders->bvh, ray, NULL, max_t, options->layers,
+                             options->mask, record_t, record_index);
+        return 1;
+    }
 
-        if (pgCircle_Check(obj)) {
-            if (pgRaycast_LineCircle(&line, &pgCircle_AsCircle(obj), max_t,
-                                     &temp_t)) {
-                record_t = MIN(record_t, temp_t);
-            }
-        }
-        else if (pgLine_Check(obj)) {
-            if (pgRaycast_LineLine(&line, &pgLine_AsLine(obj), max_t,
-                                   &temp_t)) {
-                record_t = MIN(record_t, temp_t);
-            }
+    *record_t = max_t;
+    *record_index = -1;
+
+    if (!slab) {
+        pgRay_FromLine(ray, max_t, &ray_slab);
+        slab = &ray_slab;
+    }
+
+    for (loop = 0; loop < colliders->length; loop++) {
+        if (_PG_RAYCAST_SKIP(options, loop)) {
+            continue;
         }
-        else if (pgRect_Check(obj)) {
-            if (pgRaycast_LineRect(&line, &pgRect_AsRect(obj), max_t,
-                                   &temp_t)) {
-                record_t = MIN(record_t, temp_t);
-            }
+        /* the copies of the colliders are tested when there are some */
+        if (colliders->shapes) {
+            result = _pg_raycast_shape(ray, slab, &colliders->shapes[loop],
+                                       max_t, &temp_t);
         }
         else {
-            return RAISE(PyExc_TypeError,
-                         "collisions must be a sequence of "
-                         "Line, Circle or Rect objects");
+            result = _pg_raycast_object(ray, slab, colliders->objects[loop],
+                                        max_t, &temp_t);
         }
+        if (result == -1) {
+            return 0;
+        }
+        if (result && temp_t < *record_t) {
+            *record_t = temp_t;
+            *record_index = loop;
+        }
+    }
+
+    return 1;
+}
+
+/* Computes the unit normal of the surface of the collider at index at the
+ * hit point, oriented so that it faces against the ray's direction. */
+static void
+_pg_raycast_normal(pgLineBase *ray, pgRaycastColliders *colliders,
+                   Py_ssize_t index, double x, double y, double *nx,
+                   double *ny)
+{
+    pgCollider collider;
+
+    if (colliders->shapes) {
+        pgCollider_RayNormal(&colliders->shapes[index], ray, x, y, nx, ny);
+        return;
+    }
+
+    /* the collider was already validated by the raycast */
+    pgCollider_FromObject(colliders->objects[index], &collider, 0);
+    pgCollider_RayNormal(&collider, ray, x, y, nx, ny);
+}
+
+static PyObject *
+_pg_raycasthit_from_values(double x, double y, double nx, double ny,
+                           double distance, Py_ssize_t index)
+{
+    PyObject *hit, *tmp;
+
+    if (!(hit = PyStructSequence_New(pgRaycastHit_Type))) {
+        return NULL;
+    }
+
+    if (!(tmp = pg_TupleFromDoublePair(x, y))) {
+        Py_DECREF(hit);
+        return NULL;
+    }
+    PyStructSequence_SET_ITEM(hit, 0, tmp);
+
+    if (!(tmp = pg_TupleFromDoublePair(nx, ny))) {
+        Py_DECREF(hit);
+        return NULL;
+    }
+    PyStructSequence_SET_ITEM(hit, 1, tmp);
+
+    if (!(tmp = PyFloat_FromDouble(distance))) {
+        Py_DECREF(hit);
+        return NULL;
+    }
+    PyStructSequence_SET_ITEM(hit, 2, tmp);
+
+    if (!(tmp = PyLong_FromSsize_t(index))) {
+        Py_DECREF(hit);
+        return NULL;
     }
+    PyStructSequence_SET_ITEM(hit, 3, tmp);
+
+    return hit;
+}
+
+static PyObject *
+_pg_raycasthit_new(pgLineBase *ray, pgRaycastColliders *colliders,
+                   Py_ssize_t index, double t)
+{
+    double x, y, nx, ny;
+
+    pgLine_At(ray, t, &x, &y);
+    _pg_raycast_normal(ray, colliders, index, x, y, &nx, &ny);
+
+    return _pg_raycasthit_from_values(x, y, nx, ny, t * pgLine_Length(ray),
+                                      index);
+}
+
+/* Builds the result of a single ray, None if the ray didn't hit anything,
+ * otherwise the hit point or a RaycastHit depending on return_hit. */
+static PyObject *
+_pg_raycast_result(pgLineBase *ray, pgRaycastColliders *colliders,
+                   double record_t, Py_ssize_t record_index, int return_hit)
+{
+    double x, y;
 
-    if (record_t == max_t) {
+    if (record_index == -1) {
         Py_RETURN_NONE;
     }
 
-    pgLine_At(&line, record_t, &x, &y);
+    if (return_hit) {
+        return _pg_raycasthit_new(ray, colliders, record_index, record_t);
+    }
+
+    pgLine_At(ray, record_t, &x, &y);
 
     return pg_TupleFromDoublePair(x, y);
 }
 
+typedef struct {
+    double t;
+    Py_ssize_t index;
+} pgRaycastRecord;
+
+static int
+_pg_raycast_record_compare(const void *a, const void *b)
+{
+    const pgRaycastRecord *rec_a = (const pgRaycastRecord *)a;
+    const pgRaycastRecord *rec_b = (const pgRaycastRecord *)b;
+
+    if (rec_a->t != rec_b->t) {
+        return rec_a->t < rec_b->t ? -1 : 1;
+    }
+    /* keep the sort stable for hits at the same distance */
+    return (rec_a->index > rec_b->index) - (rec_a->index < rec_b->index);
+}
+
+/*
+ * Finds every collider hit by a ray, storing the hits in records sorted by
+ * their t value. records must have room for one item per collider and slab
+ * holds the ray's inverse direction.
+ *
+ * sets the error messages
+ * the number of hits if success
+ * -1 if it fails
+ */
+static Py_ssize_t
+_pg_raycast_colliders_all(pgLineBase *ray, pgRayBase *slab,
+                          pgRaycastColliders *colliders, double max_t,
+                          pgRaycastOptions *options, pgRaycastRecord *records)
+{
+    Py_ssize_t loop, count = 0;
+    double temp_t = 0;
+    int result;
+
+    for (loop = 0; loop < colliders->length; loop++) {
+        if (_PG_RAYCAST_SKIP(options, loop)) {
+            continue;
+        }
+        /* every collider of a prepared scene is tested, using its copy */
+        if (colliders->shapes) {
+            result = _pg_raycast_shape(ray, slab, &colliders->shapes[loop],
+                                       max_t, &temp_t);
+        }
+        else {
+            result = _pg_raycast_object(ray, slab, colliders->objects[loop],
+                                        max_t, &temp_t);
+        }
+        if (result == -1) {
+            return -1;
+        }
+        if (result && temp_t < max_t) {
+            records[count].t = temp_t;
+            records[count].index = loop;
+            count++;
+        }
+    }
+
+    if (count > 1) {
+        qsort(records, count, sizeof(pgRaycastRecord),
+              _pg_raycast_record_compare);
+    }
+
+    return count;
+}
+
+/* Builds the list of hits of a single ray, containing either the hit points
+ * or RaycastHits depending on return_hit. */
+static PyObject *
+_pg_raycast_all_result(pgLineBase *ray, pgRaycastColliders *colliders,
+                       pgRaycastRecord *records, Py_ssize_t count,
+                       int return_hit)
+{
+    Py_ssize_t i;
+    PyObject *list, *item;
+
+    if (!(list = PyList_New(count))) {
+        return NULL;
+    }
+
+    for (i = 0; i < count; i++) {
+        item = _pg_raycast_result(ray, colliders, records[i].t,
+                                  records[i].index, return_hit);
+        if (!item) {
+            Py_DECREF(list);
+            return NULL;
+        }
+        PyList_SET_ITEM(list, i, item);
+    }
+
+    return list;
+}
+
+static PyObject *
+pg_raycast(PyObject *_null, PyObject *const *args, Py_ssize_t nargs,
+           PyObject *kwnames)
+{
+    pgRaycastColliders colliders;
+    Py_ssize_t record_index;
+    double max_t, record_t;
+    pgLineBase line;
+    pgRayBase slab;
+    pgRaycastOptions options;
+
+    if (!_pg_raycast_parse_options(
+            args + nargs, kwnames,
+            PG_RAYCAST_OPT_RETURN_HIT | PG_RAYCAST_OPT_LAYERS, &options)) {
+        return NULL;
+    }
+
+    if (nargs != 2 && nargs != 4) {
+        return RAISE(PyExc_TypeError, "Invalid number of arguments");
+    }
+
+    if (!_pg_extract_ray_from_object_fastcall(args, nargs - 1, &line,
+                                              &max_t)) {
+        return NULL;
+    }
+
+    if (!_pg_raycast_get_colliders(args[nargs - 1], &colliders)) {
+        return RAISE(PyExc_TypeError,
+                     "colliders parameter must be a sequence, a RaycastGrid "
+                     "or a RaycastBVH");
+    }
+
+    if (!_pg_raycast_load_layers(&options, colliders.length)) {
+        _pg_raycast_free_options(&options);
+        return NULL;
+    }
+
+    _pg_ray_get_slab(args[0], &line, max_t, &slab);
+
+    // find the best t
+    if (!_pg_raycast_colliders(&line, &slab, &colliders, max_t, &options,
+                               &record_t, &record_index)) {
+        _pg_raycast_free_options(&options);
+        return NULL;
+    }
+
+    _pg_raycast_free_options(&options);
+
+    return _pg_raycast_result(&line, &colliders, record_t, record_index,
+                              options.return_hit);
+}
+
+static PyObject *
+geometry_raycast_mask(PyObject *_null, PyObject *const *args, Py_ssize_t nargs,
+                      PyObject *kwnames)
+{
+    double max_t, t, x, y, nx, ny;
+    pgLineBase line;
+    pgRayBase slab;
+    pgRaycastOptions options;
+    bitmask_t *mask;
+
+    if (!_pg_raycast_parse_options(
+            args + nargs, kwnames,
+            PG_RAYCAST_OPT_RETURN_HIT | PG_RAYCAST_OPT_OFFSET, &options)) {
+        return NULL;
+    }
+
+    if (nargs != 2 && nargs != 4) {
+        return RAISE(PyExc_TypeError, "Invalid number of arguments");
+    }
+
+    if (!_pg_extract_ray_from_object_fastcall(args, nargs - 1, &line,
+                                              &max_t)) {
+        return NULL;
+    }
+
+    if (!pgMask_Check(args[nargs - 1])) {
+        return RAISE(PyExc_TypeError, "mask parameter must be a Mask");
+    }
+    mask = pgMask_AsBitmap(args[nargs - 1]);
+
+    _pg_ray_get_slab(args[0], &line, max_t, &slab);
+
+    /* like the other colliders, a mask hit at exactly max_t is ignored */
+    if (!pgRaycast_RayMask(&slab, mask, options.offset_x, options.offset_y,
+                           max_t, &t, &nx, &ny) ||
+        !(t < max_t)) {
+        Py_RETURN_NONE;
+    }
+
+    pgLine_At(&line, t, &x, &y);
+
+    if (options.return_hit) {
+        return _pg_raycasthit_from_values(x, y, nx, ny,
+                                          t * pgLine_Length(&line), 0);
+    }
+
+    return pg_TupleFromDoublePair(x, y);
+}
+
+static PyObject *
+geometry_regular_polygon(PyObject *_null, PyObject *const *args,
+                         Py_ssize_t nargs)
+{
+    Py_ssize_t sides;
+    double radius;
+    double angle = 0;
+    double Cx, Cy;
+
+    if (nargs < 3 || nargs > 4) {
+        return RAISE(PyExc_TypeError,
+                     "invalid number of arguments, expected 3 or 4 arguments");
+    }
+    sides = PyLong_AsSsize_t(args[0]);
+    if (PyErr_Occurred()) {
+        return NULL;
+    }
+
+    if (sides < 3) {
+        if (sides < 0) {
+            return RAISE(PyExc_ValueError,
+                         "the sides can not be a negative number");
+        }
+        return RAISE(PyExc_ValueError, "polygons need at least 3 sides");
+    }
+
+    if (!pg_TwoDoublesFromObj(args[1], &Cx, &Cy)) {
+        return RAISE(PyExc_TypeError,
+                     "the second parameter must be a sequence of 2 numbers");
+    }
+
+    if (!pg_DoubleFromObj(args[2], &radius)) {
+        return RAISE(PyExc_TypeError, "the third parameter must be a number");
+    }
+    if (nargs == 4) {
+        if (!pg_DoubleFromObj(args[3], &angle)) {
+            return RAISE(PyExc_TypeError,
+                         "the forth parameter must be a number");
+        }
+        angle = DEG_TO_RAD(angle);
+    }
+
+    double *vertices = PyMem_New(double, sides * 2);
+    if (!vertices) {
+        return RAISE(PyExc_MemoryError,
+                     "cannot allocate memory for the polygon vertices");
+    }
+
+    Py_ssize_t loop;
+    double fac = M_TWOPI / sides;
+
+    /*If the number of sides is even, mirror the vertices*/
+    if (sides % 2 == 0) {
+        for (loop = 0; loop < sides / 2; loop++) {
+            double ang = angle + fac * loop;
+            double radi_cos_a = radius * cos(ang);
+            double radi_sin_a = radius * sin(ang);
+
+            vertices[loop * 2] = Cx + radi_cos_a;
+            vertices[loop * 2 + 1] = Cy + radi_sin_a;
+
+            vertices[sides + loop * 2] = Cx - radi_cos_a;
+            vertices[sides + loop * 2 + 1] = Cy - radi_sin_a;
+        }
+    }
+    else {
+        for (loop = 0; loop < sides; loop++) {
+            double ang = angle + fac * loop;
+            vertices[loop * 2] = Cx + radius * cos(ang);
+            vertices[loop * 2 + 1] = Cy + radius * sin(ang);
+        }
+    }
+
+    pgPolygonObject *ret =
+        (pgPolygonObject *)pgPolygon_Type.tp_new(&pgPolygon_Type, NULL, NULL);
+
+    if (!ret) {
+        PyMem_Free(vertices);
+        return NULL;
+    }
+
+    /* replace the vertices allocated by tp_new */
+    PyMem_Free(ret->polygon.vertices);
+    ret->polygon.vertices = vertices;
+    ret->polygon.verts_num = sides;
+    ret->polygon.centerx = Cx;
+    ret->polygon.centery = Cy;
+
+    return (PyObject *)ret;
+}
+
+#if AVX2_IS_SUPPORTED
+/* Number of rays multiraycast casts together on CPUs supporting AVX2 */
+#define PG_RAYCAST_PACKET_SIZE 4
+
+/* Casts the 4 rays of a packet against a polygon one by one, as polygons
+ * have any number of edges. Returns the mask of the rays hitting it. */
+static __m256d
+_pg_raycast_packet_polygon(pgLineBase *rays, double *max_t,
+                           pgPolygonBase *poly, __m256d *T)
+{
+    long long lanes_hit[PG_RAYCAST_PACKET_SIZE];
+    double lanes_t[PG_RAYCAST_PACKET_SIZE];
+    int lane;
+
+    for (lane = 0; lane < PG_RAYCAST_PACKET_SIZE; lane++) {
+        lanes_t[lane] = DBL_MAX;
+        lanes_hit[lane] = -pgRaycast_LinePolygon(&rays[lane], poly,
+                                                 max_t[lane], &lanes_t[lane]);
+    }
+    *T = _mm256_loadu_pd(lanes_t);
+
+    return _mm256_castsi256_pd(_mm256_loadu_si256((__m256i *)lanes_hit));
+}
+
+/*
+ * Finds the closest hit of each of the 4 rays of a packet against a
+ * sequence of colliders or their copies, testing the 4 rays against every
+ * collider at once, slabs holding the inverse directions of the rays.
+ * Gives the same results as calling _pg_raycast_colliders on every ray.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+_pg_raycast_colliders_packet(pgLineBase *rays, pgRayBase *slabs, double *max_t,
+                             pgRaycastColliders *colliders,
+                             pgRaycastOptions *options, double *record_t,
+                             Py_ssize_t *record_index)
+{
+    pgRayPacket packet;
+    __m256d max_t_256d, best_t_256d, t_256d, hit_256d;
+    __m256d best_index_256d = _mm256_castsi256_pd(_mm256_set1_epi64x(-1));
+    long long lanes_index[PG_RAYCAST_PACKET_SIZE];
+    PyObject *obj;
+    Py_ssize_t loop;
+    int lane;
+
+    packet.xa = _mm256_set_pd(rays[3].xa, rays[2].xa, rays[1].xa, rays[0].xa);
+    packet.ya = _mm256_set_pd(rays[3].ya, rays[2].ya, rays[1].ya, rays[0].ya);
+    packet.xb = _mm256_set_pd(rays[3].xb, rays[2].xb, rays[1].xb, rays[0].xb);
+    packet.yb = _mm256_set_pd(rays[3].yb, rays[2].yb, rays[1].yb, rays[0].yb);
+    packet.inv_dx = _mm256_set_pd(slabs[3].inv_dx, slabs[2].inv_dx,
+                                  slabs[1].inv_dx, slabs[0].inv_dx);
+    packet.inv_dy = _mm256_set_pd(slabs[3].inv_dy, slabs[2].inv_dy,
+                                  slabs[1].inv_dy, slabs[0].inv_dy);
+    max_t_256d = _mm256_loadu_pd(max_t);
+    best_t_256d = max_t_256d;
+
+    for (loop = 0; loop < colliders->length; loop++) {
+        if (_PG_RAYCAST_SKIP(options, loop)) {
+            continue;
+        }
+        if (colliders->shapes) {
+            pgCollider *shape = &colliders->shapes[loop];
+            switch (shape->type) {
+                case PG_COLLIDER_CIRCLE:
+                    hit_256d = pgRaycast_PacketCircle_avx2(
+                        &packet, &shape->shape.circle, max_t_256d, &t_256d);
+                    break;
+                case PG_COLLIDER_LINE:
+                    hit_256d = pgRaycast_PacketLine_avx2(
+                        &packet, &shape->shape.line, max_t_256d, &t_256d);
+                    break;
+                case PG_COLLIDER_RECT:
+                    hit_256d = pgRaycast_PacketRect_avx2(
+                        &packet, &shape->shape.rect, max_t_256d, &t_256d);
+                    break;
+                default:
+                    hit_256d = _pg_raycast_packet_polygon(
+                        rays, max_t, &shape->shape.polygon, &t_256d);
+                    break;
+            }
+            goto keep_closest;
+        }
+
+        obj = colliders->objects[loop];
+
+        if (pgCircle_Check(obj)) {
+            hit_256d = pgRaycast_PacketCircle_avx2(
+                &packet, &pgCircle_AsCircle(obj), max_t_256d, &t_256d);
+        }
+        else if (pgLine_Check(obj)) {
+            hit_256d = pgRaycast_PacketLine_avx2(&packet, &pgLine_AsLine(obj),
+                                                 max_t_256d, &t_256d);
+        }
+        else if (pgRect_Check(obj)) {
+            hit_256d = pgRaycast_PacketRect_avx2(&packet, &pgRect_AsRect(obj),
+                                                 max_t_256d, &t_256d);
+        }
+        else if (pgPolygon_Check(obj)) {
+            hit_256d = _pg_raycast_packet_polygon(
+                rays, max_t, &pgPolygon_AsPolygon(obj), &t_256d);
+        }
+        else {
+            PyErr_SetString(PyExc_TypeError,
+                            "collisions must be a sequence of "
+                            "Line, Circle, Rect or Polygon objects");
+            return 0;
+        }
+
+    keep_closest:
+        /* only keep the hits closer than the closest ones so far */
+        hit_256d = _mm256_and_pd(
+            hit_256d, _mm256_cmp_pd(t_256d, best_t_256d, _CMP_LT_OQ));
+        if (!_mm256_movemask_pd(hit_256d)) {
+            continue;
+        }
+        best_t_256d = _mm256_blendv_pd(best_t_256d, t_256d, hit_256d);
+        best_index_256d = _mm256_blendv_pd(
+            best_index_256d,
+            _mm256_castsi256_pd(_mm256_set1_epi64x((long long)loop)),
+            hit_256d);
+    }
+
+    _mm256_storeu_pd(record_t, best_t_256d);
+    _mm256_storeu_si256((__m256i *)lanes_index,
+                        _mm256_castpd_si256(best_index_256d));
+    for (lane = 0; lane < PG_RAYCAST_PACKET_SIZE; lane++) {
+        record_index[lane] = (Py_ssize_t)lanes_index[lane];
+    }
+
+    return 1;
+}
+#endif /* ~AVX2_IS_SUPPORTED */
+
+/* The least number of rays worth giving to a thread of multiraycast */
+#define PG_RAYCAST_THREAD_MIN_RAYS 64
+
+/* The rays cast by one of the threads of multiraycast */
+typedef struct {
+    pgLineBase *rays;
+    pgRayBase *slabs;
+    double *max_t;
+    Py_ssize_t start, end;
+    pgRaycastColliders *colliders;
+    pgRaycastOptions *options;
+    double *record_t;
+    Py_ssize_t *record_index;
+    /* released by the thread once it cast every ray, NULL if the job is
+     * run by the calling thread */
+    PyThread_type_lock done;
+} pgRaycastJob;
+
+/* Casts the rays of a job. The colliders must be copies, so that this can
+ * run without holding the GIL. */
+static void
+_pg_raycast_run_job(pgRaycastJob *job)
+{
+    Py_ssize_t i = job->start;
+
+#if AVX2_IS_SUPPORTED
+    if (!job->colliders->grid && !job->colliders->bvh && pg_HasAVX2()) {
+        for (; i + PG_RAYCAST_PACKET_SIZE <= job->end;
+             i += PG_RAYCAST_PACKET_SIZE) {
+            _pg_raycast_colliders_packet(
+                &job->rays[i], &job->slabs[i], &job->max_t[i], job->colliders,
+                job->options, &job->record_t[i], &job->record_index[i]);
+        }
+    }
+#endif /* ~AVX2_IS_SUPPORTED */
+
+    for (; i < job->end; i++) {
+        _pg_raycast_colliders(&job->rays[i], &job->slabs[i], job->colliders,
+                              job->max_t[i], job->options, &job->record_t[i],
+                              &job->record_index[i]);
+    }
+}
+
+static void
+_pg_raycast_job_thread(void *arg)
+{
+    pgRaycastJob *job = (pgRaycastJob *)arg;
+
+    _pg_raycast_run_job(job);
+    PyThread_release_lock(job->done);
+}
+
+/*
+ * Casts the rays of multiraycast across several threads and fills list with
+ * the results. The rays and the colliders of a sequence are copied first,
+ * then the GIL is released while the rays are cast.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+_pg_multiraycast_threaded(PyObject **ray_objects, Py_ssize_t rays_length,
+                          pgRaycastColliders *colliders,
+                          pgRaycastOptions *options, PyObject *list)
+{
+    pgRaycastJob jobs[PG_RAYCAST_MAX_THREADS];
+    pgRaycastColliders copies = *colliders;
+    pgLineBase *rays = PyMem_New(pgLineBase, rays_length);
+    pgRayBase *slabs = PyMem_New(pgRayBase, rays_length);
+    double *max_t = PyMem_New(double, rays_length);
+    double *record_t = PyMem_New(double, rays_length);
+    Py_ssize_t *record_index = PyMem_New(Py_ssize_t, rays_length);
+    Py_ssize_t i, chunk;
+    PyObject *result;
+    int threads, t, busy = 0, ret = 0;
+
+    if (!rays || !slabs || !max_t || !record_t || !record_index) {
+        PyErr_NoMemory();
+        goto end;
+    }
+
+    for (i = 0; i < rays_length; i++) {
+        if (!_pg_extract_ray_from_object(ray_objects[i], &rays[i],
+                                         &max_t[i])) {
+            goto end;
+        }
+        _pg_ray_get_slab(ray_objects[i], &rays[i], max_t[i], &slabs[i]);
+    }
+
+    if (!copies.shapes && !(copies.shapes = pgCollider_FromSequence(
+                                copies.objects, copies.length))) {
+        goto end;
+    }
+
+    /* the cells or nodes of a prepared scene are read in place, so it must
+     * not be reinitialized until the results are built */
+    if (colliders->grid) {
+        colliders->grid->busy++;
+    }
+    else if (colliders->bvh) {
+        colliders->bvh->busy++;
+    }
+    busy = 1;
+
+    threads = (int)MIN(options->threads,
+                       (rays_length + PG_RAYCAST_THREAD_MIN_RAYS - 1) /
+                           PG_RAYCAST_THREAD_MIN_RAYS);
+    chunk = (rays_length + threads - 1) / threads;
+    for (t = 0; t < threads; t++) {
+        jobs[t].rays = rays;
+        jobs[t].slabs = slabs;
+        jobs[t].max_t = max_t;
+        jobs[t].start = MIN(t * chunk, rays_length);
+        jobs[t].end = MIN((t + 1) * chunk, rays_length);
+        jobs[t].colliders = &copies;
+        jobs[t].options = options;
+        jobs[t].record_t = record_t;
+        jobs[t].record_index = record_index;
+        jobs[t].done = NULL;
+    }
+
+    /* the first job is run by this thread, as well as the ones whose thread
+     * couldn't be started */
+    for (t = 1; t < threads; t++) {
+        if (!(jobs[t].done = PyThread_allocate_lock())) {
+            break;
+        }
+        PyThread_acquire_lock(jobs[t].done, WAIT_LOCK);
+        if (PyThread_start_new_thread(_pg_raycast_job_thread, &jobs[t]) ==
+            PYTHREAD_INVALID_THREAD_ID) {
+            PyThread_free_lock(jobs[t].done);
+            jobs[t].done = NULL;
+            break;
+        }
+    }
+
+    Py_BEGIN_ALLOW_THREADS;
+    for (t = 0; t < threads; t++) {
+        if (!jobs[t].done) {
+            _pg_raycast_run_job(&jobs[t]);
+        }
+    }
+    for (t = 0; t < threads; t++) {
+        if (jobs[t].done) {
+            PyThread_acquire_lock(jobs[t].done, WAIT_LOCK);
+        }
+    }
+    Py_END_ALLOW_THREADS;
+
+    for (t = 0; t < threads; t++) {
+        if (jobs[t].done) {
+            PyThread_free_lock(jobs[t].done);
+        }
+    }
+
+    for (i = 0; i < rays_length; i++) {
+        if (!(result =
+                  _pg_raycast_result(&rays[i], &copies, record_t[i],
+                                     record_index[i], options->return_hit))) {
+            goto end;
+        }
+        PyList_SET_ITEM(list, i, result);
+    }
+
+    ret = 1;
+
+end:
+    if (busy && colliders->grid) {
+        colliders->grid->busy--;
+    }
+    else if (busy && colliders->bvh) {
+        colliders->bvh->busy--;
+    }
+    if (copies.shapes != colliders->shapes) {
+        pgCollider_Free(copies.shapes, copies.length);
+    }
+    PyMem_Free(rays);
+    PyMem_Free(slabs);
+    PyMem_Free(max_t);
+    PyMem_Free(record_t);
+    PyMem_Free(record_index);
+
+    return ret;
+}
+
+static PyObject *
+geometry_multiraycast(PyObject *_null, PyObject *const *args, Py_ssize_t nargs,
+                      PyObject *kwnames)
+{
+    PyObject **rays, *list;
+    Py_ssize_t rays_length, i;
+    pgRaycastColliders colliders;
+    pgRaycastOptions options;
+
+    if (!_pg_raycast_parse_options(args + nargs, kwnames,
+                                   PG_RAYCAST_OPT_RETURN_HIT |
+                                       PG_RAYCAST_OPT_LAYERS |
+                                       PG_RAYCAST_OPT_THREADS,
+                                   &options)) {
+        return NULL;
+    }
+
+    if (nargs != 2) {
+        return RAISE(PyExc_TypeError,
+                     "Invalid number of arguments, expected "
+                     "exactly 2 arguments");
+    }
+
+    if (!PySequence_FAST_CHECK(args[0])) {
+        return RAISE(PyExc_TypeError,
+                     "Invalid rays parameter, expected a sequence");
+    }
+
+    rays_length = PySequence_Fast_GET_SIZE(args[0]);
+
+    /*If there are no rays, return an empty list*/
+    if (!rays_length) {
+        return PyList_New(0);
+    }
+
+    if (!_pg_raycast_get_colliders(args[1], &colliders)) {
+        return RAISE(PyExc_TypeError,
+                     "Invalid colliders parameter, expected "
+                     "a sequence, a RaycastGrid or a RaycastBVH");
+    }
+
+    if (!_pg_raycast_load_layers(&options, colliders.length)) {
+        _pg_raycast_free_options(&options);
+        return NULL;
+    }
+
+    /*If there are no colliders, return a list of None objects,
+     * with the same length as the rays*/
+    if (!colliders.length) {
+        _pg_raycast_free_options(&options);
+        list = PyList_New(rays_length);
+        if (!list) {
+            return NULL;
+        }
+        for (i = 0; i < rays_length; i++) {
+            Py_INCREF(Py_None);
+            PyList_SET_ITEM(list, i, Py_None);
+        }
+
+        return list;
+    }
+
+    rays = PySequence_Fast_ITEMS(args[0]);
+
+    /*Create a list to store the results*/
+    list = PyList_New(rays_length);
+    if (!list) {
+        _pg_raycast_free_options(&options);
+        return NULL;
+    }
+
+    if (options.threads > 1 && rays_length > PG_RAYCAST_THREAD_MIN_RAYS) {
+        if (!_pg_multiraycast_threaded(rays, rays_length, &colliders, &options,
+                                       list)) {
+            goto error;
+        }
+        _pg_raycast_free_options(&options);
+        return list;
+    }
+
+    i = 0;
+
+#if AVX2_IS_SUPPORTED
+    /* cast the rays against sequences of colliders in packets, the rays
+     * left over are cast one by one below */
+    if (!colliders.shapes && pg_HasAVX2()) {
+        pgLineBase packet_rays[PG_RAYCAST_PACKET_SIZE];
+        pgRayBase packet_slabs[PG_RAYCAST_PACKET_SIZE];
+        double packet_max_t[PG_RAYCAST_PACKET_SIZE];
+        double packet_t[PG_RAYCAST_PACKET_SIZE];
+        Py_ssize_t packet_index[PG_RAYCAST_PACKET_SIZE];
+        int lane;
+
+        for (; i + PG_RAYCAST_PACKET_SIZE <= rays_length;
+             i += PG_RAYCAST_PACKET_SIZE) {
+            for (lane = 0; lane < PG_RAYCAST_PACKET_SIZE; lane++) {
+                if (!_pg_extract_ray_from_object(rays[i + lane],
+                                                 &packet_rays[lane],
+                                                 &packet_max_t[lane])) {
+                    goto error;
+                }
+                _pg_ray_get_slab(rays[i + lane], &packet_rays[lane],
+                                 packet_max_t[lane], &packet_slabs[lane]);
+            }
+
+            if (!_pg_raycast_colliders_packet(
+                    packet_rays, packet_slabs, packet_max_t, &colliders,
+                    &options, packet_t, packet_index)) {
+                goto error;
+            }
+
+            for (lane = 0; lane < PG_RAYCAST_PACKET_SIZE; lane++) {
+                PyObject *result = _pg_raycast_result(
+                    &packet_rays[lane], &colliders, packet_t[lane],
+                    packet_index[lane], options.return_hit);
+                if (!result) {
+                    goto error;
+                }
+                PyList_SET_ITEM(list, i + lane, result);
+            }
+        }
+    }
+#endif /* ~AVX2_IS_SUPPORTED */
+
+    pgLineBase ray;
+    pgRayBase slab;
+    for (; i < rays_length; i++) {
+        PyObject *ray_obj = rays[i];
+        double max_t = 0;
+
+        /*Convert the PyObject into a ray*/
+        if (!_pg_extract_ray_from_object(ray_obj, &ray, &max_t)) {
+            goto error;
+        }
+        _pg_ray_get_slab(ray_obj, &ray, max_t, &slab);
+
+        double record_t;
+        Py_ssize_t record_index;
+        if (!_pg_raycast_colliders(&ray, &slab, &colliders, max_t, &options,
+                                   &record_t, &record_index)) {
+            goto error;
+        }
+
+        PyObject *result = _pg_raycast_result(
+            &ray, &colliders, record_t, record_index, options.return_hit);
+        if (!result) {
+            goto error;
+        }
+        PyList_SET_ITEM(list, i, result);
+    }
+
+    _pg_raycast_free_options(&options);
+
+    return list;
+
+error:
+    _pg_raycast_free_options(&options);
+    Py_DECREF(list);
+    return NULL;
+}
+
+/* Number of rays cast by raycast_fan before the incrementally rotated
+ * direction is recomputed with trigonometry to stop error accumulation */
+#define PG_RAYCAST_FAN_RESYNC 64
+
+static PyObject *
+geometry_raycast_fan(PyObject *_null, PyObject *const *args, Py_ssize_t nargs,
+                     PyObject *kwnames)
+{
+    PyObject *list, *result;
+    Py_ssize_t ray_count, record_index, i;
+    pgRaycastColliders colliders;
+    double ox, oy, start_angle, angle_span, max_dist, max_t, record_t;
+    double step, cos_step, sin_step, dx, dy, tmp;
+    pgLineBase ray;
+    pgRaycastOptions options;
+
+    if (!_pg_raycast_parse_options(
+            args + nargs, kwnames,
+            PG_RAYCAST_OPT_RETURN_HIT | PG_RAYCAST_OPT_LAYERS, &options)) {
+        return NULL;
+    }
+
+    if (nargs != 6) {
+        return RAISE(PyExc_TypeError,
+                     "Invalid number of arguments, expected "
+                     "exactly 6 arguments");
+    }
+
+    if (!pg_TwoDoublesFromObj(args[0], &ox, &oy)) {
+        return RAISE(
+            PyExc_TypeError,
+            "Invalid ray origin value, must be a pair of numeric values");
+    }
+
+    if (!pg_DoubleFromObj(args[1], &start_angle)) {
+        return RAISE(PyExc_TypeError,
+                     "Invalid start angle value, must be numeric");
+    }
+
+    if (!pg_DoubleFromObj(args[2], &angle_span)) {
+        return RAISE(PyExc_TypeError,
+                     "Invalid angle span value, must be numeric");
+    }
+
+    if (!PyLong_Check(args[3])) {
+        return RAISE(PyExc_TypeError, "ray count must be an integer");
+    }
+    ray_count = PyLong_AsSsize_t(args[3]);
+    if (ray_count == -1 && PyErr_Occurred()) {
+        return NULL;
+    }
+    if (ray_count < 0) {
+        return RAISE(PyExc_ValueError, "ray count can not be negative");
+    }
+
+    if (!pg_DoubleFromObj(args[4], &max_dist)) {
+        return RAISE(
+            PyExc_ValueError,
+            "Invalid ray max distance threshold value, must be numeric");
+    }
+    if (max_dist == 0) {
+        return RAISE(
+            PyExc_ValueError,
+            "Invalid max distance value, must be nonzero numeric value");
+    }
+    if (max_dist < 0 || max_dist == DBL_MAX) {
+        /* the ray is a unit vector that is allowed to extend forever */
+        max_dist = 1.0;
+        max_t = DBL_MAX;
+    }
+    else {
+        max_t = 1.0;
+    }
+
+    if (!_pg_raycast_get_colliders(args[5], &colliders)) {
+        return RAISE(PyExc_TypeError,
+                     "Invalid colliders parameter, expected "
+                     "a sequence, a RaycastGrid or a RaycastBVH");
+    }
+
+    if (!_pg_raycast_load_layers(&options, colliders.length)) {
+        _pg_raycast_free_options(&options);
+        return NULL;
+    }
+
+    if (!(list = PyList_New(ray_count))) {
+        _pg_raycast_free_options(&options);
+        return NULL;
+    }
+
+    start_angle = DEG_TO_RAD(start_angle);
+    step = ray_count ? DEG_TO_RAD(angle_span) / ray_count : 0;
+    cos_step = cos(step);
+    sin_step = sin(step);
+
+    ray.xa = ox;
+    ray.ya = oy;
+    dx = dy = 0;
+
+    for (i = 0; i < ray_count; i++) {
+        /* rotate the direction of the previous ray instead of calling
+         * cos/sin for every ray, resyncing from time to time */
+        if (i % PG_RAYCAST_FAN_RESYNC == 0) {
+            dx = -cos(start_angle + step * i);
+            dy = -sin(start_angle + step * i);
+        }
+        else {
+            tmp = dx * cos_step - dy * sin_step;
+            dy = dx * sin_step + dy * cos_step;
+            dx = tmp;
+        }
+
+        ray.xb = ox + dx * max_dist;
+        ray.yb = oy + dy * max_dist;
+
+        if (!_pg_raycast_colliders(&ray, NULL, &colliders, max_t, &options,
+                                   &record_t, &record_index)) {
+            goto error;
+        }
+
+        if (!(result = _pg_raycast_result(&ray, &colliders, record_t,
+                                          record_index, options.return_hit))) {
+            goto error;
+        }
+        PyList_SET_ITEM(list, i, result);
+    }
+
+    _pg_raycast_free_options(&options);
+
+    return list;
+
+error:
+    _pg_raycast_free_options(&options);
+    Py_DECREF(list);
+    return NULL;
+}
+
+/* Distance the origin of a bounced ray is pushed away from the surface it
+ * bounced off, so that it doesn't hit the same surface again at t = 0. Far
+ * from the origin the push grows with the coordinates, as a fixed one would
+ * be lost to rounding there. */
+#define PG_RAYCAST_BOUNCE_OFFSET 1e-7
+#define PG_RAYCAST_BOUNCE_RELATIVE_OFFSET (1024 * DBL_EPSILON)
+
+/*
+ * origin, direction, max_dist, max_bounces, colliders
+ * origin, angle, max_dist, max_bounces, colliders
+ * line, max_bounces, colliders
+ */
+static PyObject *
+geometry_raycast_bounce(PyObject *_null, PyObject *const *args,
+                        Py_ssize_t nargs)
+{
+    PyObject *points = NULL, *indices = NULL, *tmp, *ret;
+    Py_ssize_t max_bounces, record_index, bounce;
+    pgRaycastColliders colliders;
+    double max_t, record_t, length, remaining, dx, dy, x, y, nx, ny, dot;
+    double offset;
+    pgLineBase ray;
+    pgRaycastOptions options;
+
+    /* raycast_bounce takes no keyword arguments, this sets the defaults */
+    _pg_raycast_parse_options(NULL, NULL, 0, &options);
+
+    if (nargs != 3 && nargs != 5) {
+        return RAISE(PyExc_TypeError, "Invalid number of arguments");
+    }
+
+    if (!_pg_extract_ray_from_object_fastcall(args, nargs - 2, &ray, &max_t)) {
+        return NULL;
+    }
+
+    if (!PyLong_Check(args[nargs - 2])) {
+        return RAISE(PyExc_TypeError, "max bounces must be an integer");
+    }
+    max_bounces = PyLong_AsSsize_t(args[nargs - 2]);
+    if (max_bounces == -1 && PyErr_Occurred()) {
+        return NULL;
+    }
+    if (max_bounces < 0) {
+        return RAISE(PyExc_ValueError, "max bounces can not be negative");
+    }
+
+    if (!_pg_raycast_get_colliders(args[nargs - 1], &colliders)) {
+        return RAISE(PyExc_TypeError,
+                     "colliders parameter must be a sequence, a RaycastGrid "
+                     "or a RaycastBVH");
+    }
+
+    length = pgLine_Length(&ray);
+    if (length == 0) {
+        return RAISE(PyExc_ValueError, "the ray can not have a zero length");
+    }
+
+    /* the ray is traced with a unit direction and the distance it still has
+     * left to travel, DBL_MAX meaning it can travel forever */
+    dx = (ray.xb - ray.xa) / length;
+    dy = (ray.yb - ray.ya) / length;
+    remaining = max_t == DBL_MAX ? DBL_MAX : max_t * length;
+
+    if (!(points = PyList_New(0)) || !(indices = PyList_New(0))) {
+        goto error;
+    }
+
+    if (!(tmp = pg_TupleFromDoublePair(ray.xa, ray.ya))) {
+        goto error;
+    }
+    if (PyList_Append(points, tmp)) {
+        Py_DECREF(tmp);
+        goto error;
+    }
+    Py_DECREF(tmp);
+
+    for (bounce = 0; bounce <= max_bounces; bounce++) {
+        if (remaining == DBL_MAX) {
+            ray.xb = ray.xa + dx;
+            ray.yb = ray.ya + dy;
+        }
+        else {
+            ray.xb = ray.xa + dx * remaining;
+            ray.yb = ray.ya + dy * remaining;
+            max_t = 1.0;
+        }
+
+        if (!_pg_raycast_colliders(&ray, NULL, &colliders, max_t, &options,
+                                   &record_t, &record_index)) {
+            goto error;
+        }
+
+        if (record_index == -1) {
+            /* a finite ray ends where it runs out of distance */
+            if (remaining != DBL_MAX) {
+                if (!(tmp = pg_TupleFromDoublePair(ray.xb, ray.yb))) {
+                    goto error;
+                }
+                if (PyList_Append(points, tmp)) {
+                    Py_DECREF(tmp);
+                    goto error;
+                }
+                Py_DECREF(tmp);
+            }
+            break;
+        }
+
+        pgLine_At(&ray, record_t, &x, &y);
+
+        if (!(tmp = pg_TupleFromDoublePair(x, y))) {
+            goto error;
+        }
+        if (PyList_Append(points, tmp)) {
+            Py_DECREF(tmp);
+            goto error;
+        }
+        Py_DECREF(tmp);
+
+        if (!(tmp = PyLong_FromSsize_t(record_index))) {
+            goto error;
+        }
+        if (PyList_Append(indices, tmp)) {
+            Py_DECREF(tmp);
+            goto error;
+        }
+        Py_DECREF(tmp);
+
+        if (remaining != DBL_MAX) {
+            remaining -= record_t * pgLine_Length(&ray);
+            if (remaining <= 0) {
+                break;
+            }
+        }
+
+        /* reflect the direction around the surface normal */
+        _pg_raycast_normal(&ray, &colliders, record_index, x, y, &nx, &ny);
+        dot = dx * nx + dy * ny;
+        dx -= 2 * dot * nx;
+        dy -= 2 * dot * ny;
+
+        /* the push counts as travelled distance, so that a finite ray still
+         * ends after max_dist */
+        offset =
+            MAX(PG_RAYCAST_BOUNCE_OFFSET,
+                MAX(fabs(x), fabs(y)) * PG_RAYCAST_BOUNCE_RELATIVE_OFFSET);
+        if (remaining != DBL_MAX) {
+            if (remaining <= offset) {
+                break;
+            }
+            remaining -= offset;
+        }
+        ray.xa = x + nx * offset;
+        ray.ya = y + ny * offset;
+    }
+
+    ret = PyTuple_Pack(2, points, indices);
+    Py_DECREF(points);
+    Py_DECREF(indices);
+    return ret;
+
+error:
+    Py_XDECREF(points);
+    Py_XDECREF(indices);
+    return NULL;
+}
+
+/*
+ * rays, colliders, *, out=None, out_index=None, layers=None, mask=-1
+ *
+ * rays is a C-contiguous float64 buffer of shape (N, 4) holding the end
+ * points of every ray, or of shape (N, 5) holding the origin, direction and
+ * max distance of every ray.
+ */
+static PyObject *
+geometry_multiraycast_buffer(PyObject *_null, PyObject *const *args,
+                             Py_ssize_t nargs, PyObject *kwnames)
+{
+    PyObject *out = NULL, *out_index = NULL, *ret = NULL;
+    Py_ssize_t rays_length, cols, record_index, i;
+    pgRaycastColliders colliders;
+    Py_buffer rays_view, out_view, index_view;
+    double *rays, *hits, max_t, record_t;
+    int64_t *indices;
+    pgLineBase ray;
+    pgRaycastOptions options;
+
+    if (!_pg_raycast_parse_options(args + nargs, kwnames,
+                                   PG_RAYCAST_OPT_LAYERS | PG_RAYCAST_OPT_OUT |
+                                       PG_RAYCAST_OPT_OUT_INDEX,
+                                   &options)) {
+        return NULL;
+    }
+
+    if (nargs != 2) {
+        return RAISE(PyExc_TypeError,
+                     "Invalid number of arguments, expected "
+                     "exactly 2 arguments");
+    }
+
+    if (!_pg_raycast_get_colliders(args[1], &colliders)) {
+        return RAISE(PyExc_TypeError,
+                     "Invalid colliders parameter, expected "
+                     "a sequence, a RaycastGrid or a RaycastBVH");
+    }
+
+    if (PyObject_GetBuffer(args[0], &rays_view,
+                           PyBUF_C_CONTIGUOUS | PyBUF_FORMAT)) {
+        return NULL;
+    }
+
+    if (!_pg_buffer_has_format(&rays_view, "d") || rays_view.ndim != 2 ||
+        (rays_view.shape[1] != 4 && rays_view.shape[1] != 5)) {
+        PyBuffer_Release(&rays_view);
+        return RAISE(PyExc_TypeError,
+                     "rays must be a buffer of float64 values with a shape "
+                     "of (N, 4) or (N, 5)");
+    }
+    rays = (double *)rays_view.buf;
+    rays_length = rays_view.shape[0];
+    cols = rays_view.shape[1];
+
+    if (!_pg_raycast_load_layers(&options, colliders.length)) {
+        goto release_rays;
+    }
+
+    if (!_pg_get_out_buffer(options.out, "d", rays_length * 3, 3, "out", &out,
+                            &out_view)) {
+        goto release_rays;
+    }
+    if (!_pg_get_out_buffer(options.out_index, "ql", rays_length, 0,
+                            "out_index", &out_index, &index_view)) {
+        goto release_out;
+    }
+    hits = (double *)out_view.buf;
+    indices = (int64_t *)index_view.buf;
+
+    for (i = 0; i < rays_length; i++, rays += cols) {
+        ray.xa = rays[0];
+        ray.ya = rays[1];
+        ray.xb = rays[2];
+        ray.yb = rays[3];
+        max_t = 1.0;
+
+        if (cols == 5 && !_pg_ray_apply_max_dist(&ray, rays[4], &max_t)) {
+            goto release_all;
+        }
+
+        if (!_pg_raycast_colliders(&ray, NULL, &colliders, max_t, &options,
+                                   &record_t, &record_index)) {
+            goto release_all;
+        }
+
+        if (record_index == -1) {
+            hits[i * 3] = hits[i * 3 + 1] = hits[i * 3 + 2] = Py_NAN;
+        }
+        else {
+            pgLine_At(&ray, record_t, &hits[i * 3], &hits[i * 3 + 1]);
+            hits[i * 3 + 2] = record_t * pgLine_Length(&ray);
+        }
+        indices[i] = record_index;
+    }
+
+    ret = PyTuple_Pack(2, out, out_index);
+
+release_all:
+    PyBuffer_Release(&index_view);
+    Py_DECREF(out_index);
+release_out:
+    PyBuffer_Release(&out_view);
+    Py_DECREF(out);
+release_rays:
+    PyBuffer_Release(&rays_view);
+    _pg_raycast_free_options(&options);
+    return ret;
+}
+
+/*
+ * points, colliders, *, out=None, layers=None, mask=-1
+ *
+ * points is a C-contiguous float64 buffer of shape (N, 2).
+ */
+static PyObject *
+geometry_visibility_matrix(PyObject *_null, PyObject *const *args,
+                           Py_ssize_t nargs, PyObject *kwnames)
+{
+    PyObject *out = NULL, *ret = NULL;
+    pgRaycastColliders colliders;
+    pgRaycastOptions options;
+    Py_buffer points_view, out_view;
+    pgCollider *shapes = NULL;
+    Py_ssize_t points_num, i;
+
+    if (!_pg_raycast_parse_options(args + nargs, kwnames,
+                                   PG_RAYCAST_OPT_LAYERS | PG_RAYCAST_OPT_OUT,
+                                   &options)) {
+        return NULL;
+    }
+
+    if (nargs != 2) {
+        return RAISE(PyExc_TypeError,
+                     "Invalid number of arguments, expected "
+                     "exactly 2 arguments");
+    }
+
+    if (!_pg_raycast_get_colliders(args[1], &colliders)) {
+        return RAISE(PyExc_TypeError,
+                     "Invalid colliders parameter, expected "
+                     "a sequence, a RaycastGrid or a RaycastBVH");
+    }
+
+    if (PyObject_GetBuffer(args[0], &points_view,
+                           PyBUF_C_CONTIGUOUS | PyBUF_FORMAT)) {
+        return NULL;
+    }
+
+    if (!_pg_buffer_has_format(&points_view, "d") || points_view.ndim != 2 ||
+        points_view.shape[1] != 2) {
+        PyBuffer_Release(&points_view);
+        return RAISE(PyExc_TypeError,
+                     "points must be a buffer of float64 values with a shape "
+                     "of (N, 2)");
+    }
+    points_num = points_view.shape[0];
+
+    if (!_pg_raycast_load_layers(&options, colliders.length)) {
+        goto release_points;
+    }
+
+    /* the colliders of a sequence are borrowed for the whole call */
+    if (!colliders.shapes) {
+        if (!(shapes = PyMem_New(pgCollider, MAX(colliders.length, 1)))) {
+            PyErr_NoMemory();
+            goto release_points;
+        }
+        for (i = 0; i < colliders.length; i++) {
+            if (!pgCollider_FromObject(colliders.objects[i], &shapes[i], 0)) {
+                PyErr_SetString(PyExc_TypeError,
+                                "collisions must be a sequence of "
+                                "Line, Circle, Rect or Polygon objects");
+                goto release_points;
+            }
+        }
+    }
+
+    if (!_pg_get_out_buffer(options.out, "?B", points_num * points_num,
+                            points_num, "out", &out, &out_view)) {
+        goto release_points;
+    }
+
+    if (pgVisibility_Matrix(shapes ? shapes : colliders.shapes,
+                            colliders.length, options.layers, options.mask,
+                            (double *)points_view.buf, points_num,
+                            (unsigned char *)out_view.buf)) {
+        Py_INCREF(out);
+        ret = out;
+    }
+
+    PyBuffer_Release(&out_view);
+    Py_DECREF(out);
+release_points:
+    PyMem_Free(shapes);
+    PyBuffer_Release(&points_view);
+    _pg_raycast_free_options(&options);
+    return ret;
+}
+
+static PyObject *
+geometry_raycast_all(PyObject *_null, PyObject *const *args, Py_ssize_t nargs,
+                     PyObject *kwnames)
+{
+    PyObject *list;
+    Py_ssize_t count;
+    pgRaycastColliders colliders;
+    double max_t;
+    pgLineBase line;
+    pgRayBase slab;
+    pgRaycastOptions options;
+    pgRaycastRecord *records;
+
+    if (!_pg_raycast_parse_options(
+            args + nargs, kwnames,
+            PG_RAYCAST_OPT_RETURN_HIT | PG_RAYCAST_OPT_LAYERS, &options)) {
+        return NULL;
+    }
+
+    if (nargs != 2 && nargs != 4) {
+        return RAISE(PyExc_TypeError, "Invalid number of arguments");
+    }
+
+    if (!_pg_extract_ray_from_object_fastcall(args, nargs - 1, &line,
+                                              &max_t)) {
+        return NULL;
+    }
+
+    if (!_pg_raycast_get_colliders(args[nargs - 1], &colliders)) {
+        return RAISE(PyExc_TypeError,
+                     "colliders parameter must be a sequence, a RaycastGrid "
+                     "or a RaycastBVH");
+    }
+
+    if (!_pg_raycast_load_layers(&options, colliders.length)) {
+        _pg_raycast_free_options(&options);
+        return NULL;
+    }
+
+    if (!colliders.length) {
+        _pg_raycast_free_options(&options);
+        return PyList_New(0);
+    }
+
+    if (!(records = PyMem_New(pgRaycastRecord, colliders.length))) {
+        _pg_raycast_free_options(&options);
+        return PyErr_NoMemory();
+    }
+
+    _pg_ray_get_slab(args[0], &line, max_t, &slab);
+
+    count = _pg_raycast_colliders_all(&line, &slab, &colliders, max_t,
+                                      &options, records);
+    if (count == -1) {
+        PyMem_Free(records);
+        _pg_raycast_free_options(&options);
+        return NULL;
+    }
+
+    list = _pg_raycast_all_result(&line, &colliders, records, count,
+                                  options.return_hit);
+
+    PyMem_Free(records);
+    _pg_raycast_free_options(&options);
+
+    return list;
+}
+
+static PyObject *
+geometry_multiraycast_all(PyObject *_null, PyObject *const *args,
+                          Py_ssize_t nargs, PyObject *kwnames)
+{
+    PyObject **rays, *list, *hits;
+    Py_ssize_t rays_length, count, i;
+    pgRaycastColliders colliders;
+    double max_t;
+    pgLineBase ray;
+    pgRayBase slab;
+    pgRaycastOptions options;
+    pgRaycastRecord *records;
+
+    if (!_pg_raycast_parse_options(
+            args + nargs, kwnames,
+            PG_RAYCAST_OPT_RETURN_HIT | PG_RAYCAST_OPT_LAYERS, &options)) {
+        return NULL;
+    }
+
+    if (nargs != 2) {
+        return RAISE(PyExc_TypeError,
+                     "Invalid number of arguments, expected "
+                     "exactly 2 arguments");
+    }
+
+    if (!PySequence_FAST_CHECK(args[0])) {
+        return RAISE(PyExc_TypeError,
+                     "Invalid rays parameter, expected a sequence");
+    }
+
+    if (!_pg_raycast_get_colliders(args[1], &colliders)) {
+        return RAISE(PyExc_TypeError,
+                     "Invalid colliders parameter, expected "
+                     "a sequence, a RaycastGrid or a RaycastBVH");
+    }
+
+    rays = PySequence_Fast_ITEMS(args[0]);
+    rays_length = PySequence_Fast_GET_SIZE(args[0]);
+
+    if (!_pg_raycast_load_layers(&options, colliders.length)) {
+        _pg_raycast_free_options(&options);
+        return NULL;
+    }
+
+    if (!(list = PyList_New(rays_length))) {
+        _pg_raycast_free_options(&options);
+        return NULL;
+    }
+
+    /*The records are shared between all the rays*/
+    if (!(records = PyMem_New(pgRaycastRecord, MAX(colliders.length, 1)))) {
+        _pg_raycast_free_options(&options);
+        Py_DECREF(list);
+        return PyErr_NoMemory();
+    }
+
+    for (i = 0; i < rays_length; i++) {
+        if (!_pg_extract_ray_from_object(rays[i], &ray, &max_t)) {
+            goto error;
+        }
+        _pg_ray_get_slab(rays[i], &ray, max_t, &slab);
+
+        count = _pg_raycast_colliders_all(&ray, &slab, &colliders, max_t,
+                                          &options, records);
+        if (count == -1) {
+            goto error;
+        }
+
+        if (!(hits = _pg_raycast_all_result(&ray, &colliders, records, count,
+                                            options.return_hit))) {
+            goto error;
+        }
+        PyList_SET_ITEM(list, i, hits);
+    }
+
+    PyMem_Free(records);
+    _pg_raycast_free_options(&options);
+
+    return list;
+
+error:
+    PyMem_Free(records);
+    _pg_raycast_free_options(&options);
+    Py_DECREF(list);
+    return NULL;
+}
+
+/*
+ * line, radius
+ * origin, direction, radius, max_dist
+ * origin, angle, radius, max_dist
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+_pg_extract_circlecast_fastcall(PyObject *const *args, Py_ssize_t nargs,
+                                pgLineBase *line, double *radius,
+                                double *max_t)
+{
+    PyObject *ray_args[3];
+    PyObject *radius_obj;
+
+    if (nargs == 2) {
+        if (!_pg_extract_ray_from_object_fastcall(args, 1, line, max_t)) {
+            return 0;
+        }
+        radius_obj = args[1];
+    }
+    else if (nargs == 4) {
+        ray_args[0] = args[0];
+        ray_args[1] = args[1];
+        ray_args[2] = args[3];
+        if (!_pg_extract_ray_from_object_fastcall(ray_args, 3, line, max_t)) {
+            return 0;
+        }
+        radius_obj = args[2];
+    }
+    else {
+        PyErr_SetString(PyExc_TypeError, "Invalid number of arguments");
+        return 0;
+    }
+
+    if (!pg_DoubleFromObj(radius_obj, radius)) {
+        PyErr_SetString(PyExc_TypeError,
+                        "Invalid radius value, must be numeric");
+        return 0;
+    }
+    if (!(*radius > 0)) {
+        PyErr_SetString(PyExc_ValueError, "radius must be a positive number");
+        return 0;
+    }
+
+    return 1;
+}
+
+/*
+ * Finds the first collider touched by the shape of a cast moving along a
+ * ray. record_t is set to the t value of the ray at which the shape is when
+ * the contact happens and record_index to the index of the touched
+ * collider, or -1 if the shape didn't touch anything.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+_pg_shapecast_colliders(pgLineBase *ray, pgCastShape *cast,
+                        pgRaycastColliders *colliders, double max_t,
+                        pgRaycastOptions *options, double *record_t,
+                        Py_ssize_t *record_index)
+{
+    Py_ssize_t loop;
+    pgCollider collider, *shape;
+    double temp_t = 0;
+
+    if (colliders->grid) {
+        pgRaycastGrid_Raycast(colliders->grid, ray, cast, max_t,
+                              options->layers, options->mask, record_t,
+                              record_index);
+        return 1;
+    }
+    if (colliders->bvh) {
+        pgRaycastBVH_Raycast(colliders->bvh, ray, cast, max_t, options->layers,
+                             options->mask, record_t, record_index);
+        return 1;
+    }
+
+    *record_t = max_t;
+    *record_index = -1;
+
+    for (loop = 0; loop < colliders->length; loop++) {
+        if (_PG_RAYCAST_SKIP(options, loop)) {
+            continue;
+        }
+        if (colliders->shapes) {
+            shape = &colliders->shapes[loop];
+        }
+        else if (pgCollider_FromObject(colliders->objects[loop], &collider,
+                                       0)) {
+            shape = &collider;
+        }
+        else {
+            PyErr_SetString(PyExc_TypeError,
+                            "collisions must be a sequence of "
+                            "Line, Circle, Rect or Polygon objects");
+            return 0;
+        }
+        if (pgCastShape_Collider(cast, ray, shape, max_t, &temp_t) &&
+            temp_t < *record_t) {
+            *record_t = temp_t;
+            *record_index = loop;
+        }
+    }
+
+    return 1;
+}
+
+/* Builds the result of a single circle cast, None if the circle didn't
+ * touch anything, otherwise the position of its center at the contact or a
+ * RaycastHit depending on return_hit. */
+static PyObject *
+_pg_circlecast_result(pgLineBase *ray, pgRaycastColliders *colliders,
+                      double record_t, Py_ssize_t record_index, int return_hit)
+{
+    double x, y, px, py, nx, ny, len;
+    pgCollider collider, *shape;
+
+    if (record_index == -1) {
+        Py_RETURN_NONE;
+    }
+
+    pgLine_At(ray, record_t, &x, &y);
+
+    if (!return_hit) {
+        return pg_TupleFromDoublePair(x, y);
+    }
+
+    if (colliders->shapes) {
+        shape = &colliders->shapes[record_index];
+    }
+    else {
+        /* the collider was already validated by the circle cast */
+        pgCollider_FromObject(colliders->objects[record_index], &collider, 0);
+        shape = &collider;
+    }
+
+    /* the normal goes from the contact point to the circle's center, or
+     * against the ray if the circle started inside of the collider */
+    pgCollider_ClosestPoint(shape, x, y, &px, &py);
+    nx = x - px;
+    ny = y - py;
+    len = sqrt(nx * nx + ny * ny);
+    if (len == 0) {
+        nx = ray->xa - ray->xb;
+        ny = ray->ya - ray->yb;
+        len = sqrt(nx * nx + ny * ny);
+    }
+    if (len != 0) {
+        nx /= len;
+        ny /= len;
+    }
+
+    return _pg_raycasthit_from_values(
+        px, py, nx, ny, record_t * pgLine_Length(ray), record_index);
+}
+
+static PyObject *
+geometry_circlecast(PyObject *_null, PyObject *const *args, Py_ssize_t nargs,
+                    PyObject *kwnames)
+{
+    pgRaycastColliders colliders;
+    Py_ssize_t record_index;
+    double max_t, radius, record_t;
+    pgLineBase line;
+    pgRaycastOptions options;
+    pgCastShape cast;
+
+    if (!_pg_raycast_parse_options(
+            args + nargs, kwnames,
+            PG_RAYCAST_OPT_RETURN_HIT | PG_RAYCAST_OPT_LAYERS, &options)) {
+        return NULL;
+    }
+
+    if (nargs != 3 && nargs != 5) {
+        return RAISE(PyExc_TypeError, "Invalid number of arguments");
+    }
+
+    if (!_pg_extract_circlecast_fastcall(args, nargs - 1, &line, &radius,
+                                         &max_t)) {
+        return NULL;
+    }
+
+    if (!_pg_raycast_get_colliders(args[nargs - 1], &colliders)) {
+        return RAISE(PyExc_TypeError,
+                     "colliders parameter must be a sequence, a RaycastGrid "
+                     "or a RaycastBVH");
+    }
+
+    if (!_pg_raycast_load_layers(&options, colliders.length)) {
+        _pg_raycast_free_options(&options);
+        return NULL;
+    }
+
+    cast.radius = radius;
+    cast.polygon = NULL;
+    if (!_pg_shapecast_colliders(&line, &cast, &colliders, max_t, &options,
+                                 &record_t, &record_index)) {
+        _pg_raycast_free_options(&options);
+        return NULL;
+    }
+
+    _pg_raycast_free_options(&options);
+
+    return _pg_circlecast_result(&line, &colliders, record_t, record_index,
+                                 options.return_hit);
+}
+
+static PyObject *
+geometry_multicirclecast(PyObject *_null, PyObject *const *args,
+                         Py_ssize_t nargs, PyObject *kwnames)
+{
+    PyObject **casts, *list, *result;
+    Py_ssize_t casts_length, i, record_index;
+    pgRaycastColliders colliders;
+    pgRaycastOptions options;
+    double max_t, radius, record_t;
+    pgCastShape cast = {0, NULL};
+    pgLineBase line;
+
+    if (!_pg_raycast_parse_options(
+            args + nargs, kwnames,
+            PG_RAYCAST_OPT_RETURN_HIT | PG_RAYCAST_OPT_LAYERS, &options)) {
+        return NULL;
+    }
+
+    if (nargs != 2) {
+        return RAISE(PyExc_TypeError,
+                     "Invalid number of arguments, expected "
+                     "exactly 2 arguments");
+    }
+
+    if (!PySequence_FAST_CHECK(args[0])) {
+        return RAISE(PyExc_TypeError,
+                     "Invalid casts parameter, expected a sequence");
+    }
+
+    if (!_pg_raycast_get_colliders(args[1], &colliders)) {
+        return RAISE(PyExc_TypeError,
+                     "Invalid colliders parameter, expected "
+                     "a sequence, a RaycastGrid or a RaycastBVH");
+    }
+
+    if (!_pg_raycast_load_layers(&options, colliders.length)) {
+        _pg_raycast_free_options(&options);
+        return NULL;
+    }
+
+    casts = PySequence_Fast_ITEMS(args[0]);
+    casts_length = PySequence_Fast_GET_SIZE(args[0]);
+
+    if (!(list = PyList_New(casts_length))) {
+        _pg_raycast_free_options(&options);
+        return NULL;
+    }
+
+    for (i = 0; i < casts_length; i++) {
+        if (!PyTuple_Check(casts[i])) {
+            PyErr_SetString(PyExc_TypeError,
+                            "casts must be a sequence of tuples");
+            goto error;
+        }
+
+        if (!_pg_extract_circlecast_fastcall(
+                (PyObject *const *)PySequence_Fast_ITEMS(casts[i]),
+                PyTuple_GET_SIZE(casts[i]), &line, &radius, &max_t)) {
+            goto error;
+        }
+
+        cast.radius = radius;
+        if (!_pg_shapecast_colliders(&line, &cast, &colliders, max_t, &options,
+                                     &record_t, &record_index)) {
+            goto error;
+        }
+
+        if (!(result =
+                  _pg_circlecast_result(&line, &colliders, record_t,
+                                        record_index, options.return_hit))) {
+            goto error;
+        }
+        PyList_SET_ITEM(list, i, result);
+    }
+
+    _pg_raycast_free_options(&options);
+
+    return list;
+
+error:
+    _pg_raycast_free_options(&options);
+    Py_DECREF(list);
+    return NULL;
+}
+
+static PyObject *
+geometry_polygoncast(PyObject *_null, PyObject *const *args, Py_ssize_t nargs,
+                     PyObject *kwnames)
+{
+    pgRaycastColliders colliders;
+    pgRaycastOptions options;
+    pgPolygonBase *poly;
+    pgCollider collider, *shape;
+    Py_ssize_t record_index;
+    double max_t, max_dist, record_t, hit[4];
+    pgCastShape cast;
+    pgLineBase line;
+
+    if (!_pg_raycast_parse_options(
+            args + nargs, kwnames,
+            PG_RAYCAST_OPT_RETURN_HIT | PG_RAYCAST_OPT_LAYERS, &options)) {
+        return NULL;
+    }
+
+    if (nargs != 3 && nargs != 4) {
+        return RAISE(PyExc_TypeError, "Invalid number of arguments");
+    }
+
+    if (!pgPolygon_Check(args[0])) {
+        return RAISE(PyExc_TypeError, "polygon parameter must be a Polygon");
+    }
+    poly = &pgPolygon_AsPolygon(args[0]);
+
+    /* the polygon's center moves along the ray */
+    line.xa = poly->centerx;
+    line.ya = poly->centery;
+
+    if (nargs == 3) {
+        if (!pg_TwoDoublesFromObj(args[1], &line.xb, &line.yb)) {
+            return RAISE(
+                PyExc_TypeError,
+                "Invalid move_by value, must be a pair of numeric values");
+        }
+        line.xb += line.xa;
+        line.yb += line.ya;
+        max_t = 1.0;
+    }
+    else {
+        if (PyNumber_Check(args[1])) {
+            double angle;
+            if (!pg_DoubleFromObj(args[1], &angle)) {
+                return RAISE(PyExc_TypeError,
+                             "Invalid angle value, must be numeric");
+            }
+            angle = DEG_TO_RAD(angle);
+            line.xb = line.xa - cos(angle);
+            line.yb = line.ya - sin(angle);
+        }
+        else if (pg_TwoDoublesFromObj(args[1], &line.xb, &line.yb)) {
+            line.xb += line.xa;
+            line.yb += line.ya;
+        }
+        else {
+            return RAISE(PyExc_TypeError,
+                         "expected a pair of floats or a single float");
+        }
+
+        if (!pg_DoubleFromObj(args[2], &max_dist)) {
+            return RAISE(PyExc_ValueError,
+                         "Invalid max distance value, must be numeric");
+        }
+        if (!_pg_ray_apply_max_dist(&line, max_dist, &max_t)) {
+            return NULL;
+        }
+    }
+
+    if (!_pg_raycast_get_colliders(args[nargs - 1], &colliders)) {
+        return RAISE(PyExc_TypeError,
+                     "colliders parameter must be a sequence, a RaycastGrid "
+                     "or a RaycastBVH");
+    }
+
+    if (!_pg_raycast_load_layers(&options, colliders.length)) {
+        _pg_raycast_free_options(&options);
+        return NULL;
+    }
+
+    cast.radius = 0;
+    cast.polygon = poly;
+    if (!_pg_shapecast_colliders(&line, &cast, &colliders, max_t, &options,
+                                 &record_t, &record_index)) {
+        _pg_raycast_free_options(&options);
+        return NULL;
+    }
+
+    _pg_raycast_free_options(&options);
+
+    if (record_index == -1) {
+        Py_RETURN_NONE;
+    }
+
+    if (!options.return_hit) {
+        return pg_TupleFromDoublePair(
+            line.xa + (line.xb - line.xa) * record_t,
+            line.ya + (line.yb - line.ya) * record_t);
+    }
+
+    if (colliders.shapes) {
+        shape = &colliders.shapes[record_index];
+    }
+    else {
+        /* the collider was already validated by the cast */
+        pgCollider_FromObject(colliders.objects[record_index], &collider, 0);
+        shape = &collider;
+    }
+    pgShapecast_PolygonCollider(poly, line.xb - line.xa, line.yb - line.ya,
+                                shape, record_t + 1, &record_t, hit);
+
+    return _pg_raycasthit_from_values(hit[0], hit[1], hit[2], hit[3],
+                                      record_t * pgLine_Length(&line),
+                                      record_index);
+}
+
+static PyObject *
+geometry_rect_to_polygon(PyObject *_null, PyObject *arg)
+{
+    SDL_Rect rect, *tmp;
+
+    if (!(tmp = pgRect_FromObject(arg, &rect))) {
+        if (PyErr_Occurred()) {
+            return NULL;
+        }
+        return RAISE(PyExc_TypeError, "rect must be a valid Rect object");
+    }
+
+    _normalize_rect(tmp);
+
+    double vertices[] = {tmp->x, tmp->y,          tmp->x + tmp->w,
+                         tmp->y, tmp->x + tmp->w, tmp->y + tmp->h,
+                         tmp->x, tmp->y + tmp->h};
+
+    return pgPolygon_New4(vertices, 4, tmp->x + tmp->w / 2,
+                          tmp->y + tmp->h / 2);
+}
+
 static PyObject *
-geometry_regular_polygon(PyObject *_null, PyObject *const *args,
-                         Py_ssize_t nargs)
+geometry_visibility_polygon(PyObject *_null, PyObject *const *args,
+                            Py_ssize_t nargs, PyObject *kwnames)
 {
-    Py_ssize_t sides;
-    double radius;
-    double angle = 0;
-    double Cx, Cy;
+    pgVisibilitySegments segments = {NULL, 0, 0};
+    pgRaycastColliders colliders;
+    pgRaycastOptions options;
+    pgCollider collider;
+    SDL_Rect bounds, *tmp;
+    PyObject *polygon = NULL;
+    double ox, oy, *vertices = NULL;
+    Py_ssize_t i, verts_num;
+    int result;
+
+    if (!_pg_raycast_parse_options(args + nargs, kwnames,
+                                   PG_RAYCAST_OPT_LAYERS, &options)) {
+        return NULL;
+    }
 
-    if (nargs < 3 || nargs > 4) {
+    if (nargs != 3) {
         return RAISE(PyExc_TypeError,
-                     "invalid number of arguments, expected 3 or 4 arguments");
+                     "Invalid number of arguments, expected "
+                     "exactly 3 arguments");
     }
-    sides = PyLong_AsSsize_t(args[0]);
-    if (PyErr_Occurred()) {
-        return NULL;
+
+    if (!pg_TwoDoublesFromObj(args[0], &ox, &oy)) {
+        return RAISE(PyExc_TypeError,
+                     "Invalid origin value, must be a pair of numeric values");
     }
 
-    if (sides < 3) {
-        if (sides < 0) {
-            return RAISE(PyExc_ValueError,
-                         "the sides can not be a negative number");
+    if (!_pg_raycast_get_colliders(args[1], &colliders)) {
+        return RAISE(PyExc_TypeError,
+                     "Invalid colliders parameter, expected "
+                     "a sequence, a RaycastGrid or a RaycastBVH");
+    }
+
+    if (!(tmp = pgRect_FromObject(args[2], &bounds))) {
+        if (PyErr_Occurred()) {
+            return NULL;
         }
-        return RAISE(PyExc_ValueError, "polygons need at least 3 sides");
+        return RAISE(PyExc_TypeError, "bounds must be a valid Rect object");
     }
+    _normalize_rect(tmp);
 
-    if (!pg_TwoDoublesFromObj(args[1], &Cx, &Cy)) {
-        return RAISE(PyExc_TypeError,
-                     "the second parameter must be a sequence of 2 numbers");
+    if (!(tmp->x < ox && ox < tmp->x + tmp->w && tmp->y < oy &&
+          oy < tmp->y + tmp->h)) {
+        return RAISE(PyExc_ValueError, "origin must be inside of bounds");
     }
 
-    if (!pg_DoubleFromObj(args[2], &radius)) {
-        return RAISE(PyExc_TypeError, "the third parameter must be a number");
+    if (!_pg_raycast_load_layers(&options, colliders.length)) {
+        _pg_raycast_free_options(&options);
+        return NULL;
     }
-    if (nargs == 4) {
-        if (!pg_DoubleFromObj(args[3], &angle)) {
-            return RAISE(PyExc_TypeError,
-                         "the forth parameter must be a number");
+
+    for (i = 0; i < colliders.length; i++) {
+        if (_PG_RAYCAST_SKIP(&options, i)) {
+            continue;
+        }
+        if (colliders.shapes) {
+            collider = colliders.shapes[i];
+        }
+        else {
+            result = pgCollider_FromObject(colliders.objects[i], &collider, 0);
+            if (result != 1) {
+                PyErr_SetString(PyExc_TypeError,
+                                "collisions must be a sequence of "
+                                "Line, Circle, Rect or Polygon objects");
+                goto end;
+            }
+        }
+        if (!_pg_visibility_add_collider(&segments, &collider, ox, oy)) {
+            goto end;
         }
-        angle = DEG_TO_RAD(angle);
     }
 
-    double *vertices = PyMem_New(double, sides * 2);
-    if (!vertices) {
-        return RAISE(PyExc_MemoryError,
-                     "cannot allocate memory for the polygon vertices");
+    if (!_pg_visibility_add_segment(&segments, tmp->x, tmp->y, tmp->x + tmp->w,
+                                    tmp->y) ||
+        !_pg_visibility_add_segment(&segments, tmp->x + tmp->w, tmp->y,
+                                    tmp->x + tmp->w, tmp->y + tmp->h) ||
+        !_pg_visibility_add_segment(&segments, tmp->x + tmp->w,
+                                    tmp->y + tmp->h, tmp->x,
+                                    tmp->y + tmp->h) ||
+        !_pg_visibility_add_segment(&segments, tmp->x, tmp->y + tmp->h, tmp->x,
+                                    tmp->y)) {
+        goto end;
     }
 
-    Py_ssize_t loop;
-    double fac = M_TWOPI / sides;
+    verts_num = pgVisibility_Polygon(&segments, ox, oy, &vertices);
+    if (verts_num != -1) {
+        polygon = pgPolygon_New2(vertices, verts_num);
+    }
 
-    /*If the number of sides is even, mirror the vertices*/
-    if (sides % 2 == 0) {
-        for (loop = 0; loop < sides / 2; loop++) {
-            double ang = angle + fac * loop;
-            double radi_cos_a = radius * cos(ang);
-            double radi_sin_a = radius * sin(ang);
+end:
+    _pg_raycast_free_options(&options);
+    PyMem_Free(segments.items);
+    PyMem_Free(vertices);
 
-            vertices[loop * 2] = Cx + radi_cos_a;
-            vertices[loop * 2 + 1] = Cy + radi_sin_a;
+    return polygon;
+}
 
-            vertices[sides + loop * 2] = Cx - radi_cos_a;
-            vertices[sides + loop * 2 + 1] = Cy - radi_sin_a;
-        }
+/*
+ * Gets the colliders of a sequence of shapes, with the rects normalized and
+ * the polygons' vertices borrowed from the sequence kept in *seq, which must
+ * be released along with freeing the colliders with PyMem_Free. No Python
+ * code may run while they're in use.
+ *
+ * sets the error messages
+ * the colliders if success
+ * NULL if it fails
+ */
+static pgCollider *
+_pg_collide_get_colliders(PyObject *obj, const char *name, PyObject **seq,
+                          Py_ssize_t *length)
+{
+    pgCollider *colliders;
+    PyObject **items;
+    Py_ssize_t i;
+    int result;
+
+    if (!(*seq = PySequence_Fast(obj, ""))) {
+        PyErr_Format(PyExc_TypeError, "%s must be a sequence", name);
+        return NULL;
     }
-    else {
-        for (loop = 0; loop < sides; loop++) {
-            double ang = angle + fac * loop;
-            vertices[loop * 2] = Cx + radius * cos(ang);
-            vertices[loop * 2 + 1] = Cy + radius * sin(ang);
+    items = PySequence_Fast_ITEMS(*seq);
+    *length = PySequence_Fast_GET_SIZE(*seq);
+
+    if (!(colliders = PyMem_New(pgCollider, MAX(*length, 1)))) {
+        Py_DECREF(*seq);
+        PyErr_NoMemory();
+        return NULL;
+    }
+
+    for (i = 0; i < *length; i++) {
+        if ((result = pgCollider_FromObject(items[i], &colliders[i], 0)) !=
+            1) {
+            if (!result) {
+                PyErr_Format(PyExc_TypeError,
+                             "%s must be a sequence of "
+                             "Line, Circle, Rect or Polygon objects",
+                             name);
+            }
+            PyMem_Free(colliders);
+            Py_DECREF(*seq);
+            return NULL;
+        }
+        if (colliders[i].type == PG_COLLIDER_RECT) {
+            _normalize_rect(&colliders[i].shape.rect);
         }
     }
 
-    pgPolygonObject *ret =
-        (pgPolygonObject *)pgPolygon_Type.tp_new(&pgPolygon_Type, NULL, NULL);
+    return colliders;
+}
 
-    if (!ret) {
-        PyMem_Free(vertices);
+static PyObject *
+geometry_collide_pairs(PyObject *_null, PyObject *arg)
+{
+    PyObject *seq, *ret = NULL;
+    pgCollider *colliders;
+    pgPairList pairs;
+    Py_ssize_t length;
+
+    if (!(colliders =
+              _pg_collide_get_colliders(arg, "shapes", &seq, &length))) {
         return NULL;
     }
 
-    ret->polygon.vertices = vertices;
-    ret->polygon.verts_num = sides;
-    ret->polygon.centerx = Cx;
-    ret->polygon.centery = Cy;
+    pgPairList_Init(&pairs);
+    if (pgBroadphase_SweepPairs(colliders, length, &pairs)) {
+        ret = pgPairList_AsMemoryView(&pairs);
+    }
+    pgPairList_Free(&pairs);
 
-    return (PyObject *)ret;
+    PyMem_Free(colliders);
+    Py_DECREF(seq);
+
+    return ret;
 }
 
 static PyObject *
-geometry_multiraycast(PyObject *_null, PyObject *const *args, Py_ssize_t nargs)
+geometry_collide_lists(PyObject *_null, PyObject *const *args,
+                       Py_ssize_t nargs)
 {
-    PyObject **colliders, **rays, *list;
-    Py_ssize_t colliders_length, rays_length, i, j;
+    PyObject *seq_a, *seq_b, *ret = NULL;
+    pgCollider *colliders_a, *colliders_b;
+    pgPairList pairs;
+    Py_ssize_t length_a, length_b;
 
     if (nargs != 2) {
         return RAISE(PyExc_TypeError,
-                     "Invalid number of arguments, expected "
-                     "exactly 2 arguments");
+                     "Invalid number of arguments, expected 2 arguments");
     }
 
-    if (!PySequence_FAST_CHECK(args[0])) {
-        return RAISE(PyExc_TypeError,
-                     "Invalid rays parameter, expected a sequence");
+    if (!(colliders_a =
+              _pg_collide_get_colliders(args[0], "a", &seq_a, &length_a))) {
+        return NULL;
     }
-
-    rays_length = PySequence_Fast_GET_SIZE(args[0]);
-
-    /*If there are no rays, return an empty list*/
-    if (!rays_length) {
-        return PyList_New(0);
+    if (!(colliders_b =
+              _pg_collide_get_colliders(args[1], "b", &seq_b, &length_b))) {
+        PyMem_Free(colliders_a);
+        Py_DECREF(seq_a);
+        return NULL;
     }
 
-    if (!PySequence_FAST_CHECK(args[1])) {
-        return RAISE(PyExc_TypeError,
-                     "Invalid colliders parameter, expected a sequence");
+    pgPairList_Init(&pairs);
+    if (pgBroadphase_CollideLists(colliders_a, length_a, colliders_b, length_b,
+                                  &pairs)) {
+        ret = pgPairList_AsMemoryView(&pairs);
     }
+    pgPairList_Free(&pairs);
 
-    colliders_length = PySequence_Fast_GET_SIZE(args[1]);
+    PyMem_Free(colliders_a);
+    PyMem_Free(colliders_b);
+    Py_DECREF(seq_a);
+    Py_DECREF(seq_b);
 
-    /*If there are no colliders, return a list of None objects,
-     * with the same length as the rays*/
-    if (!colliders_length) {
-        list = PyList_New(rays_length);
-        if (!list) {
-            return NULL;
-        }
-        for (i = 0; i < rays_length; i++) {
-            Py_INCREF(Py_None);
-            PyList_SET_ITEM(list, i, Py_None);
+    return ret;
+}
+
+static PyTypeObject *pgDistanceResult_Type = NULL;
+
+static PyStructSequence_Field _pg_distanceresult_fields[] = {
+    {"distance", "the distance between the shapes, 0 if they overlap"},
+    {"point_a", "the point of the first shape closest to the second one"},
+    {"point_b", "the point of the second shape closest to the first one"},
+    {"iterations", "the number of iterations the query took"},
+    {NULL, NULL}};
+
+static PyStructSequence_Desc _pg_distanceresult_desc = {
+    "pygame.DistanceResult",
+    "The distance between two shapes and their closest points",
+    _pg_distanceresult_fields,
+    4,
+};
+
+/*
+ * Gets the GJK shape of a Line, Circle, Rect, Polygon or point.
+ * Polygons keep pointing to the vertices of the object.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+_pg_distance_get_shape(PyObject *obj, const char *name, pgGJKShape *shape)
+{
+    pgCollider collider;
+    double x, y;
+    int result;
+
+    if ((result = pgCollider_FromObject(obj, &collider, 0)) == 1) {
+        if (collider.type == PG_COLLIDER_RECT) {
+            _normalize_rect(&collider.shape.rect);
         }
+        pgGJKShape_FromCollider(&collider, shape);
+        return 1;
+    }
+    if (result == -1) {
+        return 0;
+    }
 
-        return list;
+    if (pg_TwoDoublesFromObj(obj, &x, &y)) {
+        pgGJKShape_FromPoint(x, y, shape);
+        return 1;
     }
 
-    rays = PySequence_Fast_ITEMS(args[0]);
-    colliders = PySequence_Fast_ITEMS(args[1]);
+    PyErr_Format(PyExc_TypeError,
+                 "%s must be a Line, Circle, Rect, Polygon or point", name);
+    return 0;
+}
 
-    /*Create a list to store the results*/
-    list = PyList_New(rays_length);
-    if (!list) {
-        return NULL;
+static PyObject *
+geometry_distance(PyObject *_null, PyObject *const *args, Py_ssize_t nargs,
+                  PyObject *kwnames)
+{
+    PyObject *result, *point_a, *point_b;
+    pgGJKShape shape_a, shape_b;
+    pgGJKCache *cache = NULL;
+    double distance, a[2], b[2];
+    int iterations;
+    Py_ssize_t i;
+
+    if (nargs != 2) {
+        return RAISE(PyExc_TypeError,
+                     "Invalid number of arguments, expected 2 arguments");
     }
 
-    pgLineBase ray;
-    for (i = 0; i < rays_length; i++) {
-        PyObject *ray_obj = rays[i];
-        double max_t = 0;
+    for (i = 0; kwnames && i < PyTuple_GET_SIZE(kwnames); i++) {
+        PyObject *name = PyTuple_GET_ITEM(kwnames, i);
+        PyObject *value = args[nargs + i];
 
-        /*Convert the PyObject into a ray*/
-        if (pgLine_Check(ray_obj)) {
-            ray = pgLine_AsLine(ray_obj);
-            max_t = 1.0;
+        if (PyUnicode_CompareWithASCIIString(name, "cache")) {
+            return PyErr_Format(PyExc_TypeError,
+                                "'%U' is an invalid keyword argument", name);
         }
-        else if (PyTuple_Check(ray_obj)) {
-            PyObject *const *ray_items =
-                (PyObject *const *)PySequence_Fast_ITEMS(ray_obj);
-
-            if (!_pg_extract_ray_from_object_fastcall(
-                    ray_items, PyTuple_GET_SIZE(ray_obj), &ray, &max_t)) {
-                Py_DECREF(list);
-                return NULL;
-            }
+        if (value == Py_None) {
+            cache = NULL;
+        }
+        else if (pgDistanceCache_Check(value)) {
+            cache = &pgDistanceCache_CAST(value)->cache;
         }
         else {
-            Py_DECREF(list);
             return RAISE(PyExc_TypeError,
-                         "rays must be a sequence of lines or tuples");
-        }
-
-        double record_t = max_t;
-        double temp_t = 0;
-        for (j = 0; j < colliders_length; j++) {
-            PyObject *obj = colliders[j];
-
-            if (pgCircle_Check(obj)) {
-                if (pgRaycast_LineCircle(&ray, &pgCircle_AsCircle(obj), max_t,
-                                         &temp_t)) {
-                    record_t = MIN(record_t, temp_t);
-                }
-            }
-            else if (pgLine_Check(obj)) {
-                if (pgRaycast_LineLine(&ray, &pgLine_AsLine(obj), max_t,
-                                       &temp_t)) {
-                    record_t = MIN(record_t, temp_t);
-                }
-            }
-            else if (pgRect_Check(obj)) {
-                if (pgRaycast_LineRect(&ray, &pgRect_AsRect(obj), max_t,
-                                       &temp_t)) {
-                    record_t = MIN(record_t, temp_t);
-                }
-            }
-            else {
-                Py_DECREF(list);
-                return RAISE(PyExc_TypeError,
-                             "collisions must be a sequence of "
-                             "Line, Circle or Rect objects");
-            }
+                         "cache must be a DistanceCache or None");
         }
+    }
 
-        if (record_t == max_t) {
-            Py_INCREF(Py_None);
-            PyList_SET_ITEM(list, i, Py_None);
-        }
-        else {
-            double x, y;
-            pgLine_At(&ray, record_t, &x, &y);
-            PyObject *point = pg_TupleFromDoublePair(x, y);
-            if (!point) {
-                Py_DECREF(list);
-                return NULL;
-            }
-            PyList_SET_ITEM(list, i, point);
-        }
+    if (!_pg_distance_get_shape(args[0], "a", &shape_a) ||
+        !_pg_distance_get_shape(args[1], "b", &shape_b)) {
+        return NULL;
     }
 
-    return list;
-}
+    iterations = pgGJK_Distance(&shape_a, &shape_b, cache, &distance, a, b);
 
-static PG_FORCE_INLINE void
-_normalize_rect(SDL_Rect *rect)
-{
-    if (rect->w < 0) {
-        rect->x += rect->w;
-        rect->w = -rect->w;
+    if (!(result = PyStructSequence_New(pgDistanceResult_Type))) {
+        return NULL;
     }
-    if (rect->h < 0) {
-        rect->y += rect->h;
-        rect->h = -rect->h;
+    if (!(point_a = pg_TupleFromDoublePair(a[0], a[1]))) {
+        Py_DECREF(result);
+        return NULL;
     }
-}
-
-static PyObject *
-geometry_rect_to_polygon(PyObject *_null, PyObject *arg)
-{
-    SDL_Rect rect, *tmp;
-
-    if (!(tmp = pgRect_FromObject(arg, &rect))) {
-        if (PyErr_Occurred()) {
-            return NULL;
-        }
-        return RAISE(PyExc_TypeError, "rect must be a valid Rect object");
+    PyStructSequence_SET_ITEM(result, 1, point_a);
+    if (!(point_b = pg_TupleFromDoublePair(b[0], b[1]))) {
+        Py_DECREF(result);
+        return NULL;
+    }
+    PyStructSequence_SET_ITEM(result, 2, point_b);
+    PyStructSequence_SET_ITEM(result, 0, PyFloat_FromDouble(distance));
+    PyStructSequence_SET_ITEM(result, 3, PyLong_FromLong(iterations));
+    if (!PyStructSequence_GET_ITEM(result, 0) ||
+        !PyStructSequence_GET_ITEM(result, 3)) {
+        Py_DECREF(result);
+        return NULL;
     }
 
-    _normalize_rect(tmp);
-
-    double vertices[] = {tmp->x, tmp->y,          tmp->x + tmp->w,
-                         tmp->y, tmp->x + tmp->w, tmp->y + tmp->h,
-                         tmp->x, tmp->y + tmp->h};
-
-    return pgPolygon_New4(vertices, 4, tmp->x + tmp->w / 2,
-                          tmp->y + tmp->h / 2);
+    return result;
 }
 
 static PyObject *
@@ -459,8 +2906,36 @@ geometry_is_polygon(PyObject *_null, PyObject *arg)
 static PyMethodDef _pg_module_methods[] = {
     {"regular_polygon", (PyCFunction)geometry_regular_polygon, METH_FASTCALL,
      NULL},
-    {"multiraycast", (PyCFunction)geometry_multiraycast, METH_FASTCALL, NULL},
-    {"raycast", (PyCFunction)pg_raycast, METH_FASTCALL, NULL},
+    {"multiraycast", (PyCFunction)geometry_multiraycast,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"raycast", (PyCFunction)pg_raycast, METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"raycast_mask", (PyCFunction)geometry_raycast_mask,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"raycast_fan", (PyCFunction)geometry_raycast_fan,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"raycast_bounce", (PyCFunction)geometry_raycast_bounce, METH_FASTCALL,
+     NULL},
+    {"multiraycast_buffer", (PyCFunction)geometry_multiraycast_buffer,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"visibility_matrix", (PyCFunction)geometry_visibility_matrix,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"raycast_all", (PyCFunction)geometry_raycast_all,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"multiraycast_all", (PyCFunction)geometry_multiraycast_all,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"circlecast", (PyCFunction)geometry_circlecast,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"multicirclecast", (PyCFunction)geometry_multicirclecast,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"polygoncast", (PyCFunction)geometry_polygoncast,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"visibility_polygon", (PyCFunction)geometry_visibility_polygon,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"collide_pairs", (PyCFunction)geometry_collide_pairs, METH_O, NULL},
+    {"collide_lists", (PyCFunction)geometry_collide_lists, METH_FASTCALL,
+     NULL},
+    {"distance", (PyCFunction)geometry_distance, METH_FASTCALL | METH_KEYWORDS,
+     NULL},
     {"rect_to_polygon", (PyCFunction)geometry_rect_to_polygon, METH_O, NULL},
     {"is_line", (PyCFunction)geometry_is_line, METH_O, NULL},
     {"is_circle", (PyCFunction)geometry_is_circle, METH_O, NULL},
@@ -486,6 +2961,7 @@ MODINIT_DEFINE(geometry)
 
     import_pygame_base();
     import_pygame_rect();
+    import_pygame_mask();
 
     if (PyErr_Occurred()) {
         return NULL;
@@ -501,6 +2977,32 @@ MODINIT_DEFINE(geometry)
     if (PyType_Ready(&pgPolygon_Type) < 0) {
         return NULL;
     }
+    if (PyType_Ready(&pgRay_Type) < 0) {
+        return NULL;
+    }
+    if (PyType_Ready(&pgRaycastGrid_Type) < 0) {
+        return NULL;
+    }
+
+    if (PyType_Ready(&pgRaycastBVH_Type) < 0) {
+        return NULL;
+    }
+    if (PyType_Ready(&pgDistanceCache_Type) < 0) {
+        return NULL;
+    }
+    if (!pgRaycastHit_Type && !(pgRaycastHit_Type = PyStructSequence_NewType(
+                                    &_pg_raycasthit_desc))) {
+        return NULL;
+    }
+    if (!pgPenetration_Type && !(pgPenetration_Type = PyStructSequence_NewType(
+                                     &_pg_penetration_desc))) {
+        return NULL;
+    }
+    if (!pgDistanceResult_Type &&
+        !(pgDistanceResult_Type =
+              PyStructSequence_NewType(&_pg_distanceresult_desc))) {
+        return NULL;
+    }
 
     module = PyModule_Create(&_module);
     if (module == NULL) {
@@ -547,6 +3049,61 @@ MODINIT_DEFINE(geometry)
         return NULL;
     }
 
+    Py_INCREF(&pgRay_Type);
+    if (PyModule_AddObject(module, "Ray", (PyObject *)&pgRay_Type)) {
+        Py_DECREF(&pgRay_Type);
+        Py_DECREF(module);
+        return NULL;
+    }
+
+    Py_INCREF(&pgRaycastGrid_Type);
+    if (PyModule_AddObject(module, "RaycastGrid",
+                           (PyObject *)&pgRaycastGrid_Type)) {
+        Py_DECREF(&pgRaycastGrid_Type);
+        Py_DECREF(module);
+        return NULL;
+    }
+
+    Py_INCREF(&pgRaycastBVH_Type);
+    if (PyModule_AddObject(module, "RaycastBVH",
+                           (PyObject *)&pgRaycastBVH_Type)) {
+        Py_DECREF(&pgRaycastBVH_Type);
+        Py_DECREF(module);
+        return NULL;
+    }
+
+    Py_INCREF(pgRaycastHit_Type);
+    if (PyModule_AddObject(module, "RaycastHit",
+                           (PyObject *)pgRaycastHit_Type)) {
+        Py_DECREF(pgRaycastHit_Type);
+        Py_DECREF(module);
+        return NULL;
+    }
+
+    Py_INCREF(&pgDistanceCache_Type);
+    if (PyModule_AddObject(module, "DistanceCache",
+                           (PyObject *)&pgDistanceCache_Type)) {
+        Py_DECREF(&pgDistanceCache_Type);
+        Py_DECREF(module);
+        return NULL;
+    }
+
+    Py_INCREF(pgPenetration_Type);
+    if (PyModule_AddObject(module, "Penetration",
+                           (PyObject *)pgPenetration_Type)) {
+        Py_DECREF(pgPenetration_Type);
+        Py_DECREF(module);
+        return NULL;
+    }
+
+    Py_INCREF(pgDistanceResult_Type);
+    if (PyModule_AddObject(module, "DistanceResult",
+                           (PyObject *)pgDistanceResult_Type)) {
+        Py_DECREF(pgDistanceResult_Type);
+        Py_DECREF(module);
+        return NULL;
+    }
+
     /* export the c api */
     c_api[0] = &pgLine_Type;
     c_api[1] = pgLine_New;
@@ -575,4 +3132,3 @@ MODINIT_DEFINE(geometry)
     }
     return module;
 }
- 
\ No newline at end of file
@@ -0,0 +1,495 @@
+#include "include/geometry.h"
+#include "include/collisions.h"
+
+/* The most iterations a GJK query can take, which is only reached when
+ * rounding errors make the vertices it picks cycle */
+#define PG_GJK_MAX_ITERATIONS 32
+
+/* A point of the simplex, the difference of a vertex of A and a vertex of
+ * B, along with its weight in the point of the simplex closest to the
+ * origin */
+typedef struct {
+    double ax, ay, bx, by, wx, wy;
+    double weight;
+    Py_ssize_t index_a, index_b;
+} pgGJKVertex;
+
+typedef struct {
+    pgGJKVertex v[3];
+    int count;
+} pgGJKSimplex;
+
+static void
+pgGJKShape_FromCollider(pgCollider *collider, pgGJKShape *shape)
+{
+    shape->vertices = shape->buffer;
+    shape->radius = 0;
+
+    switch (collider->type) {
+        case PG_COLLIDER_LINE: {
+            pgLineBase *line = &collider->shape.line;
+            shape->buffer[0] = line->xa;
+            shape->buffer[1] = line->ya;
+            shape->buffer[2] = line->xb;
+            shape->buffer[3] = line->yb;
+            shape->verts_num = 2;
+            break;
+        }
+        case PG_COLLIDER_CIRCLE: {
+            pgCircleBase *circle = &collider->shape.circle;
+            shape->buffer[0] = circle->x;
+            shape->buffer[1] = circle->y;
+            shape->verts_num = 1;
+            shape->radius = circle->r;
+            break;
+        }
+        case PG_COLLIDER_RECT: {
+            SDL_Rect *rect = &collider->shape.rect;
+            shape->buffer[0] = shape->buffer[6] = (double)rect->x;
+            shape->buffer[1] = shape->buffer[3] = (double)rect->y;
+            shape->buffer[2] = shape->buffer[4] = (double)rect->x + rect->w;
+            shape->buffer[5] = shape->buffer[7] = (double)rect->y + rect->h;
+            shape->verts_num = 4;
+            break;
+        }
+        case PG_COLLIDER_POLYGON:
+            shape->vertices = collider->shape.polygon.vertices;
+            shape->verts_num = collider->shape.polygon.verts_num;
+            break;
+    }
+}
+
+static void
+pgGJKShape_FromPoint(double x, double y, pgGJKShape *shape)
+{
+    shape->vertices = shape->buffer;
+    shape->buffer[0] = x;
+    shape->buffer[1] = y;
+    shape->verts_num = 1;
+    shape->radius = 0;
+}
+
+/* Gets the index of the vertex of a shape the furthest along (dx, dy) */
+static PG_FORCE_INLINE Py_ssize_t
+_pg_gjk_support(pgGJKShape *shape, double dx, double dy)
+{
+    Py_ssize_t i, best = 0;
+    double dot, best_dot = shape->vertices[0] * dx + shape->vertices[1] * dy;
+
+    for (i = 1; i < shape->verts_num; i++) {
+        dot = shape->vertices[i * 2] * dx + shape->vertices[i * 2 + 1] * dy;
+        if (dot > best_dot) {
+            best = i;
+            best_dot = dot;
+        }
+    }
+
+    return best;
+}
+
+static PG_FORCE_INLINE void
+_pg_gjk_set_vertex(pgGJKVertex *v, pgGJKShape *A, pgGJKShape *B,
+                   Py_ssize_t index_a, Py_ssize_t index_b)
+{
+    v->index_a = index_a;
+    v->index_b = index_b;
+    v->ax = A->vertices[index_a * 2];
+    v->ay = A->vertices[index_a * 2 + 1];
+    v->bx = B->vertices[index_b * 2];
+    v->by = B->vertices[index_b * 2 + 1];
+    v->wx = v->ax - v->bx;
+    v->wy = v->ay - v->by;
+    v->weight = 1;
+}
+
+/* Gets the size of the simplex, its length or its area */
+static double
+_pg_gjk_metric(pgGJKSimplex *s)
+{
+    switch (s->count) {
+        case 2:
+            return hypot(s->v[1].wx - s->v[0].wx, s->v[1].wy - s->v[0].wy);
+        case 3:
+            return fabs((s->v[1].wx - s->v[0].wx) * (s->v[2].wy - s->v[0].wy) -
+                        (s->v[1].wy - s->v[0].wy) * (s->v[2].wx - s->v[0].wx));
+    }
+    return 0;
+}
+
+/* Starts the simplex from the cache, or from the first vertices of the
+ * shapes when the cache is empty or no longer matches the shapes */
+static void
+_pg_gjk_read_cache(pgGJKSimplex *s, pgGJKCache *cache, pgGJKShape *A,
+                   pgGJKShape *B)
+{
+    double metric;
+    int i;
+
+    s->count = 0;
+
+    for (i = 0; cache && i < cache->count; i++) {
+        if (cache->index_a[i] < 0 || cache->index_a[i] >= A->verts_num ||
+            cache->index_b[i] < 0 || cache->index_b[i] >= B->verts_num) {
+            s->count = 0;
+            break;
+        }
+        _pg_gjk_set_vertex(&s->v[i], A, B, cache->index_a[i],
+                           cache->index_b[i]);
+        s->count++;
+    }
+
+    /* the shapes moved or changed too much since the simplex was cached */
+    if (s->count > 1) {
+        metric = _pg_gjk_metric(s);
+        if (metric < 0.5 * cache->metric || 2.0 * cache->metric < metric ||
+            metric < DBL_EPSILON) {
+            s->count = 0;
+        }
+    }
+
+    if (!s->count) {
+        _pg_gjk_set_vertex(&s->v[0], A, B, 0, 0);
+        s->count = 1;
+    }
+}
+
+static void
+_pg_gjk_write_cache(pgGJKSimplex *s, pgGJKCache *cache)
+{
+    int i;
+
+    cache->count = s->count;
+    for (i = 0; i < s->count; i++) {
+        cache->index_a[i] = s->v[i].index_a;
+        cache->index_b[i] = s->v[i].index_b;
+    }
+    cache->metric = _pg_gjk_metric(s);
+}
+
+/* Reduces a segment simplex to its part closest to the origin */
+static void
+_pg_gjk_solve2(pgGJKSimplex *s)
+{
+    pgGJKVertex *v1 = &s->v[0], *v2 = &s->v[1];
+    double ex = v2->wx - v1->wx, ey = v2->wy - v1->wy;
+    double d1 = v2->wx * ex + v2->wy * ey;
+    double d2 = -(v1->wx * ex + v1->wy * ey);
+
+    /* the origin is past the first vertex */
+    if (d2 <= 0) {
+        v1->weight = 1;
+        s->count = 1;
+        return;
+    }
+
+    /* the origin is past the second vertex */
+    if (d1 <= 0) {
+        v2->weight = 1;
+        *v1 = *v2;
+        s->count = 1;
+        return;
+    }
+
+    v1->weight = d1 / (d1 + d2);
+    v2->weight = d2 / (d1 + d2);
+}
+
+/* Reduces a triangle simplex to its part closest to the origin, which is
+ * the whole triangle when the origin is inside of it */
+static void
+_pg_gjk_solve3(pgGJKSimplex *s)
+{
+    pgGJKVertex *v1 = &s->v[0], *v2 = &s->v[1], *v3 = &s->v[2];
+    double w1x = v1->wx, w1y = v1->wy;
+    double w2x = v2->wx, w2y = v2->wy;
+    double w3x = v3->wx, w3y = v3->wy;
+
+    /* the barycentric coordinates of the origin on the edges, unnormalized */
+    double e12x = w2x - w1x, e12y = w2y - w1y;
+    double d12_1 = w2x * e12x + w2y * e12y;
+    double d12_2 = -(w1x * e12x + w1y * e12y);
+
+    double e13x = w3x - w1x, e13y = w3y - w1y;
+    double d13_1 = w3x * e13x + w3y * e13y;
+    double d13_2 = -(w1x * e13x + w1y * e13y);
+
+    double e23x = w3x - w2x, e23y = w3y - w2y;
+    double d23_1 = w3x * e23x + w3y * e23y;
+    double d23_2 = -(w2x * e23x + w2y * e23y);
+
+    /* and on the triangle */
+    double n123 = e12x * e13y - e12y * e13x;
+    double d123_1 = n123 * (w2x * w3y - w2y * w3x);
+    double d123_2 = n123 * (w3x * w1y - w3y * w1x);
+    double d123_3 = n123 * (w1x * w2y - w1y * w2x);
+    double inv;
+
+    /* the first vertex */
+    if (d12_2 <= 0 && d13_2 <= 0) {
+        v1->weight = 1;
+        s->count = 1;
+        return;
+    }
+
+    /* the first edge */
+    if (d12_1 > 0 && d12_2 > 0 && d123_3 <= 0) {
+        inv = 1.0 / (d12_1 + d12_2);
+        v1->weight = d12_1 * inv;
+        v2->weight = d12_2 * inv;
+        s->count = 2;
+        return;
+    }
+
+    /* the second edge */
+    if (d13_1 > 0 && d13_2 > 0 && d123_2 <= 0) {
+        inv = 1.0 / (d13_1 + d13_2);
+        v1->weight = d13_1 * inv;
+        v3->weight = d13_2 * inv;
+        *v2 = *v3;
+        s->count = 2;
+        return;
+    }
+
+    /* the second vertex */
+    if (d12_1 <= 0 && d23_2 <= 0) {
+        v2->weight = 1;
+        *v1 = *v2;
+        s->count = 1;
+        return;
+    }
+
+    /* the third vertex */
+    if (d13_1 <= 0 && d23_1 <= 0) {
+        v3->weight = 1;
+        *v1 = *v3;
+        s->count = 1;
+        return;
+    }
+
+    /* the third edge */
+    if (d23_1 > 0 && d23_2 > 0 && d123_1 <= 0) {
+        inv = 1.0 / (d23_1 + d23_2);
+        v2->weight = d23_1 * inv;
+        v3->weight = d23_2 * inv;
+        *v1 = *v3;
+        s->count = 2;
+        return;
+    }
+
+    /* the inside of the triangle */
+    inv = 1.0 / (d123_1 + d123_2 + d123_3);
+    v1->weight = d123_1 * inv;
+    v2->weight = d123_2 * inv;
+    v3->weight = d123_3 * inv;
+}
+
+/*
+ * Finds the distance between two convex shapes with the GJK algorithm, and
+ * the closest points of the shapes, point_a being on A and point_b on B.
+ * The algorithm looks for the point of the Minkowski difference of the
+ * vertices of the shapes closest to the origin, only using the vertex of
+ * each shape the furthest along a direction, then takes the radii of the
+ * shapes off. When the shapes overlap, the distance is 0 and both points are
+ * the same point between them. Polygons are used as their convex hull.
+ *
+ * The simplex starts from the cache if it's given and matches the shapes,
+ * and is saved to it afterwards, so that querying shapes that moved a little
+ * since the last query only takes one or two iterations.
+ *
+ * returns the number of iterations it took
+ */
+static int
+pgGJK_Distance(pgGJKShape *A, pgGJKShape *B, pgGJKCache *cache,
+               double *distance, double *point_a, double *point_b)
+{
+    pgGJKSimplex s;
+    pgGJKVertex *v;
+    Py_ssize_t saved_a[3], saved_b[3];
+    double dx, dy, ax = 0, ay = 0, bx = 0, by = 0, length, radii;
+    int i, saved_count, duplicate, iterations = 0;
+
+    _pg_gjk_read_cache(&s, cache, A, B);
+
+    while (iterations < PG_GJK_MAX_ITERATIONS) {
+        saved_count = s.count;
+        for (i = 0; i < s.count; i++) {
+            saved_a[i] = s.v[i].index_a;
+            saved_b[i] = s.v[i].index_b;
+        }
+
+        if (s.count == 2) {
+            _pg_gjk_solve2(&s);
+        }
+        else if (s.count == 3) {
+            _pg_gjk_solve3(&s);
+        }
+
+        /* the origin is inside of the triangle, so the shapes overlap */
+        if (s.count == 3) {
+            break;
+        }
+
+        /* search from the simplex towards the origin */
+        if (s.count == 1) {
+            dx = -s.v[0].wx;
+            dy = -s.v[0].wy;
+        }
+        else {
+            double ex = s.v[1].wx - s.v[0].wx, ey = s.v[1].wy - s.v[0].wy;
+
+            /* perpendicular to the segment, on the side of the origin */
+            if (ey * s.v[0].wx - ex * s.v[0].wy > 0) {
+                dx = -ey;
+                dy = ex;
+            }
+            else {
+                dx = ey;
+                dy = -ex;
+            }
+        }
+
+        /* the origin is on the simplex, so the shapes touch */
+        if (dx * dx + dy * dy < DBL_EPSILON * DBL_EPSILON) {
+            break;
+        }
+
+        v = &s.v[s.count];
+        _pg_gjk_set_vertex(v, A, B, _pg_gjk_support(A, dx, dy),
+                           _pg_gjk_support(B, -dx, -dy));
+        iterations++;
+
+        /* a vertex that is already in the simplex can't bring it any closer
+         * to the origin */
+        duplicate = 0;
+        for (i = 0; i < saved_count; i++) {
+            if (saved_a[i] == v->index_a && saved_b[i] == v->index_b) {
+                duplicate = 1;
+                break;
+            }
+        }
+        if (duplicate) {
+            break;
+        }
+
+        s.count++;
+    }
+
+    for (i = 0; i < s.count; i++) {
+        ax += s.v[i].weight * s.v[i].ax;
+        ay += s.v[i].weight * s.v[i].ay;
+        bx += s.v[i].weight * s.v[i].bx;
+        by += s.v[i].weight * s.v[i].by;
+    }
+    if (s.count == 3) {
+        bx = ax;
+        by = ay;
+    }
+
+    if (cache) {
+        _pg_gjk_write_cache(&s, cache);
+    }
+
+    length = hypot(bx - ax, by - ay);
+    radii = A->radius + B->radius;
+
+    if (length > radii) {
+        /* move the points from the vertices of the shapes to their
+         * surfaces */
+        dx = (bx - ax) / length;
+        dy = (by - ay) / length;
+        point_a[0] = ax + A->radius * dx;
+        point_a[1] = ay + A->radius * dy;
+        point_b[0] = bx - B->radius * dx;
+        point_b[1] = by - B->radius * dy;
+        *distance = length - radii;
+    }
+    else {
+        point_a[0] = point_b[0] = (ax + bx) / 2;
+        point_a[1] = point_b[1] = (ay + by) / 2;
+        *distance = 0;
+    }
+
+    return iterations;
+}
+
+static PyObject *
+pg_distancecache_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
+{
+    pgDistanceCacheObject *self =
+        (pgDistanceCacheObject *)type->tp_alloc(type, 0);
+
+    if (self) {
+        self->cache.count = 0;
+        self->cache.metric = 0;
+        self->weakreflist = NULL;
+    }
+    return (PyObject *)self;
+}
+
+static int
+pg_distancecache_init(pgDistanceCacheObject *self, PyObject *args,
+                      PyObject *kwds)
+{
+    static char *keywords[] = {NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, ":DistanceCache", keywords)) {
+        return -1;
+    }
+
+    self->cache.count = 0;
+    self->cache.metric = 0;
+    return 0;
+}
+
+static void
+pg_distancecache_dealloc(pgDistanceCacheObject *self)
+{
+    if (self->weakreflist != NULL) {
+        PyObject_ClearWeakRefs((PyObject *)self);
+    }
+
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+static PyObject *
+pg_distancecache_repr(pgDistanceCacheObject *self)
+{
+    return PyUnicode_FromFormat("<DistanceCache(%d)>", self->cache.count);
+}
+
+static PyObject *
+pg_distancecache_clear(pgDistanceCacheObject *self, PyObject *_null)
+{
+    self->cache.count = 0;
+    self->cache.metric = 0;
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+pg_distancecache_get_count(pgDistanceCacheObject *self, void *closure)
+{
+    return PyLong_FromLong(self->cache.count);
+}
+
+static struct PyMethodDef pg_distancecache_methods[] = {
+    {"clear", (PyCFunction)pg_distancecache_clear, METH_NOARGS, NULL},
+    {NULL, NULL, 0, NULL}};
+
+static PyGetSetDef pg_distancecache_getsets[] = {
+    {"count", (getter)pg_distancecache_get_count, NULL, NULL, NULL},
+    {NULL, 0, NULL, NULL, NULL} /* Sentinel */
+};
+
+static PyTypeObject pgDistanceCache_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0).tp_name = "pygame.DistanceCache",
+    .tp_basicsize = sizeof(pgDistanceCacheObject),
+    .tp_dealloc = (destructor)pg_distancecache_dealloc,
+    .tp_repr = (reprfunc)pg_distancecache_repr,
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_doc = NULL,
+    .tp_weaklistoffset = offsetof(pgDistanceCacheObject, weakreflist),
+    .tp_methods = pg_distancecache_methods,
+    .tp_getset = pg_distancecache_getsets,
+    .tp_init = (initproc)pg_distancecache_init,
+    .tp_new = pg_distancecache_new,
+};
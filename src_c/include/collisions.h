@@ -39,6 +39,74 @@ static int
 pgRaycast_LineRect(pgLineBase *, SDL_Rect *, double, double *);
 static int
 pgRaycast_LineCircle(pgLineBase *, pgCircleBase *, double, double *);
+static int
+pgRaycast_LineAABB(pgLineBase *, double, double, double, double, double,
+                   double *);
+static int
+pgRaycast_LinePolygon(pgLineBase *, pgPolygonBase *, double, double *);
+static int
+pgRaycast_RayRect(pgRayBase *, SDL_Rect *, double, double *);
+static int
+pgRaycast_RayAABB(pgRayBase *, double, double, double, double, double,
+                  double *);
+static int
+pgRaycast_RayMask(pgRayBase *, bitmask_t *, double, double, double, double *,
+                  double *, double *);
+
+/* The shapes a pgCollider can hold */
+#define PG_COLLIDER_LINE 0
+#define PG_COLLIDER_CIRCLE 1
+#define PG_COLLIDER_RECT 2
+#define PG_COLLIDER_POLYGON 3
+
+/* A collider of any shape along with its axis aligned bounding box */
+typedef struct pgCollider {
+    int type;
+    union {
+        pgLineBase line;
+        pgCircleBase circle;
+        SDL_Rect rect;
+        pgPolygonBase polygon;
+    } shape;
+    double min_x, min_y, max_x, max_y;
+} pgCollider;
+
+/* A convex shape as seen by the GJK algorithm, made of the points within
+ * radius of the convex hull of its vertices */
+typedef struct {
+    double *vertices;
+    Py_ssize_t verts_num;
+    double radius;
+    /* holds the vertices of the shapes that aren't polygons */
+    double buffer[8];
+} pgGJKShape;
+
+/* How deep two shapes overlap: B moves by depth along the normal to only
+ * touch A, and the shapes touch at up to 2 points */
+typedef struct {
+    double normal_x, normal_y;
+    double depth;
+    double points[4];
+    int points_num;
+} pgPenetration;
+
+static int
+pgCollider_FromObject(PyObject *, pgCollider *, int);
+
+static int
+pgRaycast_LineCollider(pgLineBase *, pgCollider *, double, double *);
+
+static double
+pgDistanceSquared_PointSegment(double, double, double, double, double, double);
+static int
+pgCirclecast_LineSegment(pgLineBase *, double, double, double, double, double,
+                         double, double *);
+static int
+pgCirclecast_LinePolygon(pgLineBase *, double, double *, Py_ssize_t, double,
+                         double *);
+static int
+pgCirclecast_LineCollider(pgLineBase *, double, pgCollider *, double,
+                          double *);
 
 static int
 pgCollision_PolygonPoint(pgPolygonBase *, double, double);
@@ -47,6 +115,31 @@ static int
 pgCollision_PolygonLine(pgPolygonBase *, pgLineBase *, int);
 static int
 pgCollision_CirclePolygon(pgCircleBase *, pgPolygonBase *, int);
+static int
+pgCollision_PolygonPolygon(pgPolygonBase *, pgPolygonBase *, int);
+static int
+pgCollision_PolygonRect(pgPolygonBase *, SDL_Rect *, int);
+static int
+pgCollision_ColliderCollider(pgCollider *, pgCollider *);
+
+static int
+pgShapecast_PolygonCollider(pgPolygonBase *, double, double, pgCollider *,
+                            double, double *, double *);
+
+static void
+pgGJKShape_FromCollider(pgCollider *, pgGJKShape *);
+static void
+pgGJKShape_FromPoint(double, double, pgGJKShape *);
+static int
+pgGJK_Distance(pgGJKShape *, pgGJKShape *, pgGJKCache *, double *, double *,
+               double *);
+
+static int
+pgPenetration_ShapeShape(pgGJKShape *, pgGJKShape *, pgPenetration *);
+static int
+pgPenetration_ColliderCollider(pgCollider *, pgCollider *, pgPenetration *);
+static PyObject *
+pgPenetration_ColliderObject(pgCollider *, PyObject *);
 
 static int
 pgIntersection_CircleCircle(pgCircleBase *A, pgCircleBase *B,
@@ -41,6 +41,26 @@ typedef struct {
 #define pgLine_GETX2(self) (pgLine_CAST(self)->line.xb)
 #define pgLine_GETY2(self) (pgLine_CAST(self)->line.yb)
 
+/* A ray cast from (x, y) along (dx, dy). inv_dx and inv_dy are the inverses
+ * of the components of the direction of the segment from (x, y) to
+ * (x + dx, y + dy), or 0 for a null component, so that the slab tests don't
+ * need any division. The direction of a Ray is a unit vector and its
+ * max_dist is DBL_MAX when it's infinite. */
+typedef struct {
+    double x, y;
+    double dx, dy;
+    double inv_dx, inv_dy;
+    double max_dist;
+} pgRayBase;
+
+typedef struct {
+    PyObject_HEAD pgRayBase ray;
+    PyObject *weakreflist;
+} pgRayObject;
+
+#define pgRay_CAST(o) ((pgRayObject *)(o))
+#define pgRay_AsRay(o) (pgRay_CAST(o)->ray)
+
 // return 1 if success and 0 if failure
 static int
 pgLine_FromObject(PyObject *obj, pgLineBase *out);
@@ -59,6 +79,12 @@ pgCircle_FromObjectFastcall(PyObject *const *args, Py_ssize_t nargs,
 static PyTypeObject pgCircle_Type;
 static PyTypeObject pgLine_Type;
 static PyTypeObject pgPolygon_Type;
+static PyTypeObject pgRay_Type;
+
+static void
+pgRay_FromLine(pgLineBase *line, double max_t, pgRayBase *out);
+static void
+pgRay_AsLine(pgRayBase *ray, pgLineBase *line, double *max_t);
 
 typedef struct {
     Py_ssize_t verts_num;
@@ -86,9 +112,90 @@ static int
 pgPolygon_FromObjectFastcall(PyObject *const *args, Py_ssize_t nargs,
                              pgPolygonBase *out, int *was_sequence);
 
+/* A RaycastGrid keeps the colliders it was built from in colliders and a
+ * copy of them in shapes */
+typedef struct {
+    PyObject_HEAD PyObject *colliders;
+    struct pgCollider *shapes;
+    Py_ssize_t shapes_num;
+    /* the cells cover [min_x, min_x + cols * cell_size) horizontally and
+     * [min_y, min_y + rows * cell_size) vertically */
+    double min_x, min_y, cell_size;
+    Py_ssize_t cols, rows;
+    /* the indices of the colliders overlapping the cell i are stored in
+     * cell_items[cell_start[i]] to cell_items[cell_start[i + 1] - 1] */
+    Py_ssize_t *cell_start;
+    Py_ssize_t *cell_items;
+    /* the number of threaded raycasts reading the grid without holding the
+     * GIL, the grid can't be reinitialized while it isn't 0 */
+    Py_ssize_t busy;
+    PyObject *weakreflist;
+} pgRaycastGridObject;
+
+static PyTypeObject pgRaycastGrid_Type;
+
+#define pgRaycastGrid_CAST(o) ((pgRaycastGridObject *)(o))
+#define pgRaycastGrid_Check(o) ((o)->ob_type == &pgRaycastGrid_Type)
+
+/* A node of a RaycastBVH, bounding the colliders below it */
+typedef struct {
+    double min_x, min_y, max_x, max_y;
+    /* for leaves, the index in items of the first collider of the node,
+     * otherwise the index of the second child, the first one being the
+     * node right after this one */
+    Py_ssize_t offset;
+    /* the number of colliders of a leaf, 0 for the other nodes */
+    Py_ssize_t count;
+} pgRaycastBVHNode;
+
+/* A RaycastBVH keeps the colliders it was built from in colliders and a
+ * copy of them in shapes */
+typedef struct {
+    PyObject_HEAD PyObject *colliders;
+    struct pgCollider *shapes;
+    Py_ssize_t shapes_num;
+    /* the nodes of the tree in depth-first order, nodes[0] being the root */
+    pgRaycastBVHNode *nodes;
+    Py_ssize_t nodes_num;
+    /* the indices of the colliders, grouped by leaf */
+    Py_ssize_t *items;
+    Py_ssize_t leaf_size;
+    int depth;
+    /* the number of threaded raycasts reading the tree without holding the
+     * GIL, the tree can't be reinitialized while it isn't 0 */
+    Py_ssize_t busy;
+    PyObject *weakreflist;
+} pgRaycastBVHObject;
+
+static PyTypeObject pgRaycastBVH_Type;
+
+#define pgRaycastBVH_CAST(o) ((pgRaycastBVHObject *)(o))
+#define pgRaycastBVH_Check(o) ((o)->ob_type == &pgRaycastBVH_Type)
+
+/* The simplex a GJK distance query ended with, as the indices of the
+ * vertices of both shapes making up its points, which a query on the same
+ * shapes after they moved a little can start from */
+typedef struct {
+    int count;
+    Py_ssize_t index_a[3], index_b[3];
+    /* the size of the simplex, to tell when it's no longer valid */
+    double metric;
+} pgGJKCache;
+
+typedef struct {
+    PyObject_HEAD pgGJKCache cache;
+    PyObject *weakreflist;
+} pgDistanceCacheObject;
+
+static PyTypeObject pgDistanceCache_Type;
+
+#define pgDistanceCache_CAST(o) ((pgDistanceCacheObject *)(o))
+#define pgDistanceCache_Check(o) ((o)->ob_type == &pgDistanceCache_Type)
+
 #define pgCircle_Check(o) ((o)->ob_type == &pgCircle_Type)
 #define pgLine_Check(o) ((o)->ob_type == &pgLine_Type)
 #define pgPolygon_Check(o) ((o)->ob_type == &pgPolygon_Type)
+#define pgRay_Check(o) ((o)->ob_type == &pgRay_Type)
 
 /* Constants */
 
@@ -147,6 +254,20 @@ PG_FREEPOLY_COND(pgPolygonBase *poly, int was_sequence)
     }
 }
 
+/* Makes the size of a rect positive, keeping the area it covers */
+static PG_FORCE_INLINE void
+_normalize_rect(SDL_Rect *rect)
+{
+    if (rect->w < 0) {
+        rect->x += rect->w;
+        rect->w = -rect->w;
+    }
+    if (rect->h < 0) {
+        rect->y += rect->h;
+        rect->h = -rect->h;
+    }
+}
+
 static int
 double_compare(double a, double b)
 {
@@ -203,6 +203,51 @@ void **_PGSLOTS_rect;
 
 #define import_pygame_rect() _LOAD_SLOTS_FROM_PYGAME(rect)
 
+/* The bits of a pygame.mask.Mask are stored column by column, each word
+ * holding BITMASK_W_LEN consecutive pixels of a row */
+#define BITMASK_W unsigned long int
+#define BITMASK_W_LEN (sizeof(BITMASK_W) * CHAR_BIT)
+#define BITMASK_W_MASK (BITMASK_W_LEN - 1)
+#define BITMASK_N(n) ((BITMASK_W)1 << (n))
+
+typedef struct bitmask {
+    int w, h;
+    BITMASK_W bits[1];
+} bitmask_t;
+
+#define bitmask_getbit(m, x, y)                       \
+    (((m)->bits[(x) / BITMASK_W_LEN * (m)->h + (y)] & \
+      BITMASK_N((x) & BITMASK_W_MASK)) != 0)
+
+typedef struct {
+    PyObject_HEAD bitmask_t *mask;
+    void *bufdata;
+} pgMaskObject;
+
+/* pygame.mask doesn't export a C API, so its Mask type is taken from the
+ * module itself */
+static PyTypeObject *_PGTYPE_mask = NULL;
+
+#define pgMask_AsBitmap(x) (((pgMaskObject *)x)->mask)
+#define pgMask_Type (*_PGTYPE_mask)
+
+#define pgMask_Check(x) (PyObject_TypeCheck(x, &pgMask_Type))
+
+#define import_pygame_mask()                                             \
+    {                                                                    \
+        PyObject *_module = PyImport_ImportModule("pygame.mask");        \
+        if (_module != NULL) {                                           \
+            _PGTYPE_mask =                                               \
+                (PyTypeObject *)PyObject_GetAttrString(_module, "Mask"); \
+            Py_DECREF(_module);                                          \
+            if (_PGTYPE_mask != NULL && !PyType_Check(_PGTYPE_mask)) {   \
+                Py_CLEAR(_PGTYPE_mask);                                  \
+                PyErr_SetString(PyExc_TypeError,                         \
+                                "pygame.mask.Mask is not a type");       \
+            }                                                            \
+        }                                                                \
+    }
+
 #ifndef HAVE_IMMINTRIN_H
 #if (defined(_M_IX86) || defined(_M_X64) || defined(_M_AMD64)) && \
     (defined(_MSC_VER) && _MSC_VER >= 1600)
@@ -393,41 +393,205 @@ pg_line_is_perpendicular(pgLineObject *self, PyObject *const *args,
     return PyBool_FromLong(dot == 0);
 }
 
-static PyObject *
-pg_line_collideswith(pgLineObject *self, PyObject *arg)
+static PG_FORCEINLINE int
+_pg_line_collideswith(pgLineBase *sline, PyObject *arg)
 {
-    int result = 0;
     if (pgLine_Check(arg)) {
-        result = pgCollision_LineLine(&self->line, &pgLine_AsLine(arg));
+        return pgCollision_LineLine(sline, &pgLine_AsLine(arg));
     }
     else if (pgRect_Check(arg)) {
-        result = pgCollision_RectLine(&pgRect_AsRect(arg), &self->line);
+        return pgCollision_RectLine(&pgRect_AsRect(arg), sline);
     }
     else if (pgCircle_Check(arg)) {
-        result = pgCollision_LineCircle(&self->line, &pgCircle_AsCircle(arg));
+        return pgCollision_LineCircle(sline, &pgCircle_AsCircle(arg));
     }
     else if (pgPolygon_Check(arg)) {
-        result =
-            pgCollision_PolygonLine(&pgPolygon_AsPolygon(arg), &self->line, 0);
+        return pgCollision_PolygonLine(&pgPolygon_AsPolygon(arg), sline, 0);
     }
     else if (PySequence_Check(arg)) {
         double x, y;
         if (!pg_TwoDoublesFromObj(arg, &x, &y)) {
-            return RAISE(
+            PyErr_SetString(
                 PyExc_TypeError,
                 "Invalid point argument, must be a sequence of 2 numbers");
+            return -1;
         }
-        result = pgCollision_LinePoint(&self->line, x, y);
+        return pgCollision_LinePoint(sline, x, y);
     }
-    else {
-        return RAISE(PyExc_TypeError,
-                     "Invalid shape argument, must be a CircleType, RectType, "
-                     "LineType, PolygonType or a sequence of 2 numbers");
+
+    PyErr_SetString(PyExc_TypeError,
+                    "Invalid shape argument, must be a CircleType, RectType, "
+                    "LineType, PolygonType or a sequence of 2 numbers");
+    return -1;
+}
+
+static PyObject *
+pg_line_collideswith(pgLineObject *self, PyObject *arg)
+{
+    int result = _pg_line_collideswith(&self->line, arg);
+    if (result == -1) {
+        return NULL;
     }
 
     return PyBool_FromLong(result);
 }
 
+static PyObject *
+pg_line_penetration(pgLineObject *self, PyObject *arg)
+{
+    pgCollider collider;
+
+    collider.type = PG_COLLIDER_LINE;
+    collider.shape.line = self->line;
+    return pgPenetration_ColliderObject(&collider, arg);
+}
+
+static PyObject *
+pg_line_collidelist(pgLineObject *self, PyObject *arg)
+{
+    Py_ssize_t i;
+    pgLineBase *sline = &self->line;
+    int colliding;
+
+    if (!PySequence_Check(arg)) {
+        return RAISE(PyExc_TypeError, "Argument must be a sequence");
+    }
+
+    /* fast path */
+    if (PySequence_FAST_CHECK(arg)) {
+        PyObject **items = PySequence_Fast_ITEMS(arg);
+        for (i = 0; i < PySequence_Fast_GET_SIZE(arg); i++) {
+            if ((colliding = _pg_line_collideswith(sline, items[i])) == -1) {
+                /*invalid shape*/
+                return NULL;
+            }
+            if (colliding) {
+                return PyLong_FromSsize_t(i);
+            }
+        }
+        return PyLong_FromLong(-1);
+    }
+
+    /* general sequence path */
+    for (i = 0; i < PySequence_Length(arg); i++) {
+        PyObject *obj = PySequence_GetItem(arg, i);
+        if (!obj) {
+            return NULL;
+        }
+
+        if ((colliding = _pg_line_collideswith(sline, obj)) == -1) {
+            /*invalid shape*/
+            Py_DECREF(obj);
+            return NULL;
+        }
+        Py_DECREF(obj);
+
+        if (colliding) {
+            return PyLong_FromSsize_t(i);
+        }
+    }
+
+    return PyLong_FromLong(-1);
+}
+
+static PyObject *
+pg_line_collidelistall(pgLineObject *self, PyObject *const *args,
+                       Py_ssize_t nargs, PyObject *kwnames)
+{
+    Py_ssize_t i;
+    pgLineBase *sline = &self->line;
+    PyObject *arg;
+    pgHitList hits;
+    int colliding;
+
+    if (!_pg_hits_init(&hits, args, nargs, kwnames)) {
+        return NULL;
+    }
+    arg = args[0];
+
+    /* fast path */
+    if (PySequence_FAST_CHECK(arg)) {
+        PyObject **items = PySequence_Fast_ITEMS(arg);
+
+        for (i = 0; i < PySequence_Fast_GET_SIZE(arg); i++) {
+            if ((colliding = _pg_line_collideswith(sline, items[i])) == -1) {
+                /*invalid shape*/
+                _pg_hits_free(&hits);
+                return NULL;
+            }
+
+            if (colliding && !_pg_hits_add(&hits, i)) {
+                _pg_hits_free(&hits);
+                return NULL;
+            }
+        }
+
+        return _pg_hits_finish(&hits);
+    }
+
+    /* general sequence path */
+    for (i = 0; i < PySequence_Length(arg); i++) {
+        PyObject *obj = PySequence_GetItem(arg, i);
+        if (!obj) {
+            _pg_hits_free(&hits);
+            return NULL;
+        }
+
+        if ((colliding = _pg_line_collideswith(sline, obj)) == -1) {
+            /*invalid shape*/
+            _pg_hits_free(&hits);
+            Py_DECREF(obj);
+            return NULL;
+        }
+        Py_DECREF(obj);
+
+        if (colliding && !_pg_hits_add(&hits, i)) {
+            _pg_hits_free(&hits);
+            return NULL;
+        }
+    }
+
+    return _pg_hits_finish(&hits);
+}
+
+static int
+_pg_line_collideswith_shape(void *line, PyObject *arg)
+{
+    return _pg_line_collideswith((pgLineBase *)line, arg);
+}
+
+static PyObject *
+pg_line_collideobjects(pgLineObject *self, PyObject *const *args,
+                       Py_ssize_t nargs, PyObject *kwnames)
+{
+    return pg_shape_collideobjects(&self->line, _pg_line_collideswith_shape,
+                                   args, nargs, kwnames, 0);
+}
+
+static PyObject *
+pg_line_collideobjectsall(pgLineObject *self, PyObject *const *args,
+                          Py_ssize_t nargs, PyObject *kwnames)
+{
+    return pg_shape_collideobjects(&self->line, _pg_line_collideswith_shape,
+                                   args, nargs, kwnames, 1);
+}
+
+static PyObject *
+pg_line_collidedict(pgLineObject *self, PyObject *const *args,
+                    Py_ssize_t nargs, PyObject *kwnames)
+{
+    return pg_shape_collidedict(&self->line, _pg_line_collideswith_shape, args,
+                                nargs, kwnames, 0);
+}
+
+static PyObject *
+pg_line_collidedictall(pgLineObject *self, PyObject *const *args,
+                       Py_ssize_t nargs, PyObject *kwnames)
+{
+    return pg_shape_collidedict(&self->line, _pg_line_collideswith_shape, args,
+                                nargs, kwnames, 1);
+}
+
 static PyObject *
 pg_line_move(pgLineObject *self, PyObject *const *args, Py_ssize_t nargs)
 {
@@ -851,6 +1015,18 @@ static struct PyMethodDef pg_line_methods[] = {
     {"collidecircle", (PyCFunction)pg_line_collidecircle, METH_FASTCALL, NULL},
     {"colliderect", (PyCFunction)pg_line_colliderect, METH_FASTCALL, NULL},
     {"collideswith", (PyCFunction)pg_line_collideswith, METH_O, NULL},
+    {"penetration", (PyCFunction)pg_line_penetration, METH_O, NULL},
+    {"collidelist", (PyCFunction)pg_line_collidelist, METH_O, NULL},
+    {"collidelistall", (PyCFunction)pg_line_collidelistall,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"collideobjects", (PyCFunction)pg_line_collideobjects,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"collideobjectsall", (PyCFunction)pg_line_collideobjectsall,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"collidedict", (PyCFunction)pg_line_collidedict,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"collidedictall", (PyCFunction)pg_line_collidedictall,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
     {"collidepolygon", (PyCFunction)pg_line_collidepolygon, METH_FASTCALL,
      NULL},
     {"as_rect", (PyCFunction)pg_line_as_rect, METH_NOARGS, NULL},
@@ -0,0 +1,559 @@
+#include "include/geometry.h"
+#include "include/collisions.h"
+
+static PyTypeObject *pgPenetration_Type = NULL;
+
+static PyStructSequence_Field _pg_penetration_fields[] = {
+    {"normal",
+     "the unit vector to move the other shape along to separate "
+     "the shapes"},
+    {"depth", "the distance to move the other shape by"},
+    {"points", "the contact points of the shapes"},
+    {NULL, NULL}};
+
+static PyStructSequence_Desc _pg_penetration_desc = {
+    "pygame.Penetration",
+    "How deep two shapes overlap and where they touch",
+    _pg_penetration_fields,
+    3,
+};
+
+static int
+_pg_penetration_compare_points(const void *a, const void *b)
+{
+    const double *p = (const double *)a, *q = (const double *)b;
+
+    if (p[0] != q[0]) {
+        return p[0] < q[0] ? -1 : 1;
+    }
+    if (p[1] != q[1]) {
+        return p[1] < q[1] ? -1 : 1;
+    }
+    return 0;
+}
+
+static PG_FORCE_INLINE double
+_pg_penetration_turn(const double *o, const double *a, const double *b)
+{
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0]);
+}
+
+/*
+ * Gets the convex hull of points with the monotone chain algorithm. The
+ * points are sorted in place and hull must have room for 2 * points_num
+ * points.
+ *
+ * returns the number of vertices of the hull
+ */
+static Py_ssize_t
+_pg_penetration_hull(double *points, Py_ssize_t points_num, double *hull)
+{
+    Py_ssize_t i, k = 0, lower;
+
+    qsort(points, points_num, 2 * sizeof(double),
+          _pg_penetration_compare_points);
+
+    for (i = 0; i < points_num; i++) {
+        while (k >= 2 &&
+               _pg_penetration_turn(&hull[(k - 2) * 2], &hull[(k - 1) * 2],
+                                    &points[i * 2]) <= 0) {
+            k--;
+        }
+        hull[k * 2] = points[i * 2];
+        hull[k * 2 + 1] = points[i * 2 + 1];
+        k++;
+    }
+
+    for (i = points_num - 2, lower = k + 1; i >= 0; i--) {
+        while (k >= lower &&
+               _pg_penetration_turn(&hull[(k - 2) * 2], &hull[(k - 1) * 2],
+                                    &points[i * 2]) <= 0) {
+            k--;
+        }
+        hull[k * 2] = points[i * 2];
+        hull[k * 2 + 1] = points[i * 2 + 1];
+        k++;
+    }
+
+    /* the last vertex is the first one again */
+    return MAX(k - 1, 1);
+}
+
+/*
+ * Tests the shapes along an axis, keeping it when the shapes overlap less
+ * along it than along the axes tested before, or when it separates them.
+ *
+ * 1 if the shapes overlap along the axis
+ * 0 if the axis separates them
+ */
+static int
+_pg_penetration_axis(pgGJKShape *A, pgGJKShape *B, double nx, double ny,
+                     pgPenetration *result)
+{
+    double length = hypot(nx, ny);
+    double dot, min_a, max_a, min_b, max_b, forward, backward;
+    Py_ssize_t i;
+
+    /* a degenerate edge doesn't tell anything */
+    if (length == 0) {
+        return 1;
+    }
+    nx /= length;
+    ny /= length;
+
+    min_a = max_a = A->vertices[0] * nx + A->vertices[1] * ny;
+    for (i = 1; i < A->verts_num; i++) {
+        dot = A->vertices[i * 2] * nx + A->vertices[i * 2 + 1] * ny;
+        min_a = MIN(min_a, dot);
+        max_a = MAX(max_a, dot);
+    }
+    min_b = max_b = B->vertices[0] * nx + B->vertices[1] * ny;
+    for (i = 1; i < B->verts_num; i++) {
+        dot = B->vertices[i * 2] * nx + B->vertices[i * 2 + 1] * ny;
+        min_b = MIN(min_b, dot);
+        max_b = MAX(max_b, dot);
+    }
+
+    /* how far B must move along the axis, or against it, to leave A */
+    forward = max_a + A->radius - (min_b - B->radius);
+    backward = max_b + B->radius - (min_a - A->radius);
+
+    /* the axis separates the shapes, the depth is minus the gap between
+     * them */
+    if (forward <= 0) {
+        result->depth = forward;
+        result->normal_x = nx;
+        result->normal_y = ny;
+        return 0;
+    }
+    if (backward <= 0) {
+        result->depth = backward;
+        result->normal_x = -nx;
+        result->normal_y = -ny;
+        return 0;
+    }
+
+    if (forward < result->depth) {
+        result->depth = forward;
+        result->normal_x = nx;
+        result->normal_y = ny;
+    }
+    if (backward < result->depth) {
+        result->depth = backward;
+        result->normal_x = -nx;
+        result->normal_y = -ny;
+    }
+
+    return 1;
+}
+
+/*
+ * Tests the axes a shape brings to the separating axis test: the normals of
+ * its edges, the direction of a line, and for a circle the direction to the
+ * closest vertex of the other shape.
+ *
+ * 1 if the shapes overlap along every axis
+ * 0 if one of them separates them
+ */
+static int
+_pg_penetration_shape_axes(pgGJKShape *shape, pgGJKShape *other, pgGJKShape *A,
+                           pgGJKShape *B, pgPenetration *result)
+{
+    double *v = shape->vertices, dx, dy, best, dist;
+    Py_ssize_t i, j, closest = 0;
+
+    if (shape->verts_num == 1) {
+        best = DBL_MAX;
+        for (i = 0; i < other->verts_num; i++) {
+            dx = other->vertices[i * 2] - v[0];
+            dy = other->vertices[i * 2 + 1] - v[1];
+            if ((dist = dx * dx + dy * dy) < best) {
+                best = dist;
+                closest = i;
+            }
+        }
+        return _pg_penetration_axis(A, B, other->vertices[closest * 2] - v[0],
+                                    other->vertices[closest * 2 + 1] - v[1],
+                                    result);
+    }
+
+    if (shape->verts_num == 2 &&
+        !_pg_penetration_axis(A, B, v[2] - v[0], v[3] - v[1], result)) {
+        return 0;
+    }
+
+    for (i = 0; i < shape->verts_num; i++) {
+        j = (i + 1) % shape->verts_num;
+        if (!_pg_penetration_axis(A, B, v[j * 2 + 1] - v[i * 2 + 1],
+                                  v[i * 2] - v[j * 2], result)) {
+            return 0;
+        }
+    }
+
+    return 1;
+}
+
+/*
+ * Finds the normal and depth of the overlap of two shapes with the
+ * separating axis test on their vertices as they are, which is exact for
+ * convex shapes. A concave shape only brings the axes of its own edges, so
+ * its overlap may be missed but is never found where there is none.
+ *
+ * 1 if the shapes overlap
+ * 0 if they don't, shapes that only touch don't overlap, and the normal and
+ * the depth are then those of the axis that separates them
+ */
+static int
+pgPenetration_ShapeShape(pgGJKShape *A, pgGJKShape *B, pgPenetration *result)
+{
+    result->depth = DBL_MAX;
+    result->normal_x = 1;
+    result->normal_y = 0;
+    result->points_num = 0;
+
+    if (!_pg_penetration_shape_axes(A, B, A, B, result) ||
+        !_pg_penetration_shape_axes(B, A, A, B, result)) {
+        return 0;
+    }
+
+    /* the shapes are circles with the same center */
+    if (result->depth == DBL_MAX) {
+        result->depth = A->radius + B->radius;
+    }
+
+    return 1;
+}
+
+/* Gets 1 if the vertices of a shape turn counterclockwise, -1 if they turn
+ * clockwise */
+static double
+_pg_penetration_winding(pgGJKShape *shape)
+{
+    double *v = shape->vertices, area = 0;
+    Py_ssize_t i, j;
+
+    for (i = 0; i < shape->verts_num; i++) {
+        j = (i + 1) % shape->verts_num;
+        area += v[i * 2] * v[j * 2 + 1] - v[j * 2] * v[i * 2 + 1];
+    }
+
+    return area < 0 ? -1 : 1;
+}
+
+/*
+ * Finds the edge of a shape whose outward normal is the most aligned with
+ * (nx, ny), and how aligned it is.
+ *
+ * returns the index of the first vertex of the edge, -1 if all the edges
+ * are degenerate
+ */
+static Py_ssize_t
+_pg_penetration_face(pgGJKShape *shape, double nx, double ny,
+                     double *alignment)
+{
+    double *v = shape->vertices, winding = _pg_penetration_winding(shape);
+    double ex, ey, length, dot;
+    Py_ssize_t i, j, best = -1;
+
+    *alignment = -DBL_MAX;
+
+    for (i = 0; i < shape->verts_num; i++) {
+        j = (i + 1) % shape->verts_num;
+        ex = v[j * 2] - v[i * 2];
+        ey = v[j * 2 + 1] - v[i * 2 + 1];
+        if ((length = hypot(ex, ey)) == 0) {
+            continue;
+        }
+        dot = winding * (ey * nx - ex * ny) / length;
+        if (dot > *alignment) {
+            *alignment = dot;
+            best = i;
+        }
+    }
+
+    return best;
+}
+
+/*
+ * Clips a segment to the points p where t . p <= offset.
+ *
+ * returns the number of points left
+ */
+static int
+_pg_penetration_clip(double *points, double tx, double ty, double offset)
+{
+    double d0 = tx * points[0] + ty * points[1] - offset;
+    double d1 = tx * points[2] + ty * points[3] - offset;
+    double t;
+
+    if (d0 > 0 && d1 > 0) {
+        return 0;
+    }
+    if (d0 > 0) {
+        t = d0 / (d0 - d1);
+        points[0] += t * (points[2] - points[0]);
+        points[1] += t * (points[3] - points[1]);
+    }
+    else if (d1 > 0) {
+        t = d1 / (d1 - d0);
+        points[2] += t * (points[0] - points[2]);
+        points[3] += t * (points[1] - points[3]);
+    }
+
+    return 2;
+}
+
+/*
+ * Finds the contact points of two shapes without radius by clipping the
+ * edge of one shape facing the other against the edge of the other shape
+ * facing it. The points are on the first edge and inside of the second
+ * shape.
+ *
+ * returns the number of contact points
+ */
+static int
+_pg_penetration_clip_faces(pgGJKShape *A, pgGJKShape *B, double nx, double ny,
+                           double *points)
+{
+    pgGJKShape *ref = A, *inc = B;
+    double align_a, align_b, rx, ry, ex, ey, length, winding;
+    double clipped[4], *v1, *v2;
+    Py_ssize_t face_a, face_b, ref_face, inc_face, next;
+    int i, count = 0;
+
+    face_a = _pg_penetration_face(A, nx, ny, &align_a);
+    face_b = _pg_penetration_face(B, -nx, -ny, &align_b);
+    if (face_a == -1 || face_b == -1) {
+        return 0;
+    }
+
+    /* the edge the most aligned with the normal is the reference */
+    ref_face = face_a;
+    inc_face = face_b;
+    if (align_b > align_a + 1e-9) {
+        ref = B;
+        inc = A;
+        ref_face = face_b;
+        inc_face = face_a;
+    }
+
+    next = (inc_face + 1) % inc->verts_num;
+    clipped[0] = inc->vertices[inc_face * 2];
+    clipped[1] = inc->vertices[inc_face * 2 + 1];
+    clipped[2] = inc->vertices[next * 2];
+    clipped[3] = inc->vertices[next * 2 + 1];
+
+    next = (ref_face + 1) % ref->verts_num;
+    v1 = &ref->vertices[ref_face * 2];
+    v2 = &ref->vertices[next * 2];
+    ex = v2[0] - v1[0];
+    ey = v2[1] - v1[1];
+    length = hypot(ex, ey);
+    ex /= length;
+    ey /= length;
+
+    /* keep the part of the incident edge alongside the reference edge */
+    if (!_pg_penetration_clip(clipped, -ex, -ey, -(ex * v1[0] + ey * v1[1])) ||
+        !_pg_penetration_clip(clipped, ex, ey, ex * v2[0] + ey * v2[1])) {
+        return 0;
+    }
+
+    /* then the points behind the reference edge */
+    winding = _pg_penetration_winding(ref);
+    rx = winding * ey;
+    ry = -winding * ex;
+    for (i = 0; i < 2; i++) {
+        if (rx * (clipped[i * 2] - v1[0]) +
+                ry * (clipped[i * 2 + 1] - v1[1]) <=
+            0) {
+            points[count * 2] = clipped[i * 2];
+            points[count * 2 + 1] = clipped[i * 2 + 1];
+            count++;
+        }
+    }
+
+    /* both ends of the incident edge are the same point */
+    if (count == 2 && points[0] == points[2] && points[1] == points[3]) {
+        count = 1;
+    }
+
+    return count;
+}
+
+/*
+ * Finds how deep two shapes overlap with the separating axis test: the
+ * direction and the distance B has to move by so that the shapes only touch,
+ * and the points where they touch. The normal points from A towards B.
+ * Concave polygons are first tested exactly, then handled as their convex
+ * hull.
+ *
+ * sets the error messages
+ * 1 if the shapes overlap
+ * 0 if they don't, shapes that only touch don't overlap
+ * -1 if it fails
+ */
+static int
+pgPenetration_ColliderCollider(pgCollider *A, pgCollider *B,
+                               pgPenetration *result)
+{
+    pgGJKShape shape_a, shape_b, center, *circle;
+    pgPolygonBase *poly;
+    double *hulls = NULL, *points, nx, ny, support, dot, distance, point[2];
+    Py_ssize_t i, best, size = 0;
+    int ret = 0, concave_a, concave_b;
+
+    concave_a = A->type == PG_COLLIDER_POLYGON &&
+                !_pg_polygon_is_convex_helper(&A->shape.polygon);
+    concave_b = B->type == PG_COLLIDER_POLYGON &&
+                !_pg_polygon_is_convex_helper(&B->shape.polygon);
+
+    if ((concave_a || concave_b) && !pgCollision_ColliderCollider(A, B)) {
+        return 0;
+    }
+
+    pgGJKShape_FromCollider(A, &shape_a);
+    pgGJKShape_FromCollider(B, &shape_b);
+
+    if (concave_a || concave_b) {
+        /* room to sort the vertices of each polygon and build its hull */
+        size = (concave_a ? A->shape.polygon.verts_num * 3 : 0) +
+               (concave_b ? B->shape.polygon.verts_num * 3 : 0);
+        if (!(hulls = PyMem_New(double, size * 2))) {
+            PyErr_NoMemory();
+            return -1;
+        }
+        points = hulls;
+        if (concave_a) {
+            poly = &A->shape.polygon;
+            memcpy(points, poly->vertices,
+                   poly->verts_num * 2 * sizeof(double));
+            shape_a.vertices = points + poly->verts_num * 2;
+            shape_a.verts_num = _pg_penetration_hull(points, poly->verts_num,
+                                                     shape_a.vertices);
+            points += poly->verts_num * 6;
+        }
+        if (concave_b) {
+            poly = &B->shape.polygon;
+            memcpy(points, poly->vertices,
+                   poly->verts_num * 2 * sizeof(double));
+            shape_b.vertices = points + poly->verts_num * 2;
+            shape_b.verts_num = _pg_penetration_hull(points, poly->verts_num,
+                                                     shape_b.vertices);
+        }
+    }
+
+    if (!pgPenetration_ShapeShape(&shape_a, &shape_b, result)) {
+        goto end;
+    }
+    ret = 1;
+
+    nx = result->normal_x;
+    ny = result->normal_y;
+
+    /* a circle touches at the point of the other shape the closest to its
+     * center, which is in both shapes */
+    if (shape_a.verts_num == 1 || shape_b.verts_num == 1) {
+        circle = shape_a.verts_num == 1 ? &shape_a : &shape_b;
+        pgGJKShape_FromPoint(circle->vertices[0], circle->vertices[1],
+                             &center);
+        pgGJK_Distance(&center, circle == &shape_a ? &shape_b : &shape_a, NULL,
+                       &distance, point, result->points);
+        result->points_num = 1;
+    }
+    else {
+        result->points_num = _pg_penetration_clip_faces(&shape_a, &shape_b, nx,
+                                                        ny, result->points);
+    }
+
+    /* otherwise the vertex of B the deepest in A */
+    if (!result->points_num) {
+        best = 0;
+        support = shape_b.vertices[0] * nx + shape_b.vertices[1] * ny;
+        for (i = 1; i < shape_b.verts_num; i++) {
+            dot = shape_b.vertices[i * 2] * nx +
+                  shape_b.vertices[i * 2 + 1] * ny;
+            if (dot < support) {
+                support = dot;
+                best = i;
+            }
+        }
+        result->points[0] = shape_b.vertices[best * 2];
+        result->points[1] = shape_b.vertices[best * 2 + 1];
+        result->points_num = 1;
+    }
+
+end:
+    PyMem_Free(hulls);
+    return ret;
+}
+
+/*
+ * Finds how deep an object overlaps the collider of a shape, shared by the
+ * penetration methods of the shapes. The methods build the collider from
+ * their own shape, so that subclasses of the shapes work too.
+ *
+ * sets the error messages
+ * a Penetration if they overlap
+ * None if they don't
+ * NULL if it fails
+ */
+static PyObject *
+pgPenetration_ColliderObject(pgCollider *a, PyObject *other)
+{
+    pgCollider b;
+    pgPenetration penetration;
+    PyObject *ret, *item, *points;
+    int i, result;
+
+    if ((result = pgCollider_FromObject(other, &b, 0)) != 1) {
+        if (!result) {
+            PyErr_SetString(PyExc_TypeError,
+                            "Invalid shape argument, must be a CircleType, "
+                            "RectType, LineType or PolygonType");
+        }
+        return NULL;
+    }
+    if (b.type == PG_COLLIDER_RECT) {
+        _normalize_rect(&b.shape.rect);
+    }
+    if ((result = pgPenetration_ColliderCollider(a, &b, &penetration)) != 1) {
+        if (result == -1) {
+            return NULL;
+        }
+        Py_RETURN_NONE;
+    }
+
+    if (!(ret = PyStructSequence_New(pgPenetration_Type))) {
+        return NULL;
+    }
+
+    /* adding 0 turns -0.0 into 0.0 */
+    if (!(item = pg_TupleFromDoublePair(penetration.normal_x + 0.0,
+                                        penetration.normal_y + 0.0))) {
+        Py_DECREF(ret);
+        return NULL;
+    }
+    PyStructSequence_SET_ITEM(ret, 0, item);
+
+    if (!(item = PyFloat_FromDouble(penetration.depth))) {
+        Py_DECREF(ret);
+        return NULL;
+    }
+    PyStructSequence_SET_ITEM(ret, 1, item);
+
+    if (!(points = PyTuple_New(penetration.points_num))) {
+        Py_DECREF(ret);
+        return NULL;
+    }
+    PyStructSequence_SET_ITEM(ret, 2, points);
+    for (i = 0; i < penetration.points_num; i++) {
+        if (!(item = pg_TupleFromDoublePair(penetration.points[i * 2],
+                                            penetration.points[i * 2 + 1]))) {
+            Py_DECREF(ret);
+            return NULL;
+        }
+        PyTuple_SET_ITEM(points, i, item);
+    }
+
+    return ret;
+}
@@ -562,6 +562,8 @@ _pg_polygon_subtype_new2(PyTypeObject *type, double *vertices,
         return NULL;
     }
 
+    /* replace the vertices allocated by tp_new */
+    PyMem_Free(polygon_obj->polygon.vertices);
     if (!(polygon_obj->polygon.vertices =
               _pg_new_vertices_from_vertices(vertices, verts_num))) {
         Py_DECREF(polygon_obj);
@@ -593,6 +595,8 @@ _pg_polygon_subtype_new2_copy(PyTypeObject *type, pgPolygonBase *polygon)
         return NULL;
     }
 
+    /* replace the vertices allocated by tp_new */
+    PyMem_Free(polygon_obj->polygon.vertices);
     if (!(polygon_obj->polygon.vertices =
               _pg_new_vertices_from_polygon(polygon))) {
         Py_DECREF(polygon_obj);
@@ -655,6 +659,8 @@ pgPolygon_New4(double *vertices, Py_ssize_t verts_num, double centerx,
         return NULL;
     }
 
+    /* replace the vertices allocated by tp_new */
+    PyMem_Free(polygon_obj->polygon.vertices);
     if (!(polygon_obj->polygon.vertices =
               _pg_new_vertices_from_vertices(vertices, verts_num))) {
         Py_DECREF(polygon_obj);
@@ -1142,6 +1148,25 @@ pg_polygon_as_rect(pgPolygonObject *self, PyObject *_null)
                        (int)ceil(max_y - min_y + 1));
 }
 
+/* Counts the changes of sign of the values given one after the other,
+ * ignoring zeros */
+static PG_FORCEINLINE void
+_pg_polygon_count_flips(double value, int *first, int *last, int *flips)
+{
+    int sign = (value > 0) - (value < 0);
+
+    if (!sign) {
+        return;
+    }
+    if (!*first) {
+        *first = sign;
+    }
+    else if (sign != *last) {
+        (*flips)++;
+    }
+    *last = sign;
+}
+
 /*
  * this function takes in `pgPolygonBase *` and
  * it returns an int representing whether the polygon is convex or not
@@ -1151,13 +1176,16 @@ static int
 _pg_polygon_is_convex_helper(pgPolygonBase *poly)
 {
     /* A polygon is convex if and only if the cross products of all the
-     * adjacent edges are all of the same sign.
+     * adjacent edges are all of the same sign, and it only turns around
+     * once, which star shaped polygons like pentagrams don't.
      */
     Py_ssize_t i, i0, i1, i2;
     Py_ssize_t verts_num = poly->verts_num;
     Py_ssize_t count = 2 * verts_num;
     double *vertices = poly->vertices;
     int sign = 0;
+    int x_first = 0, x_last = 0, x_flips = 0;
+    int y_first = 0, y_last = 0, y_flips = 0;
 
     for (i = 0; i < verts_num; i++) {
         i0 = 2 * i % count;
@@ -1170,6 +1198,9 @@ _pg_polygon_is_convex_helper(pgPolygonBase *poly)
 
         double cross = dx1 * dy2 - dy1 * dx2;
 
+        _pg_polygon_count_flips(dx1, &x_first, &x_last, &x_flips);
+        _pg_polygon_count_flips(dy1, &y_first, &y_last, &y_flips);
+
         if (cross == 0) {
             /* The polygon is not convex if any two edges are colinear. */
             return 0;
@@ -1185,7 +1216,12 @@ _pg_polygon_is_convex_helper(pgPolygonBase *poly)
         }
     }
 
-    return 1;
+    /* going around a convex polygon, the edges only go right then left
+     * once, and down then up once */
+    x_flips += x_first != x_last;
+    y_flips += y_first != y_last;
+
+    return x_flips <= 2 && y_flips <= 2;
 }
 
 static PyObject *
@@ -1302,6 +1338,282 @@ pg_polygon_collidecircle(pgPolygonObject *self, PyObject *const *args,
         pgCollision_CirclePolygon(&circle, &self->polygon, only_edges));
 }
 
+static PyObject *
+pg_polygon_collidepolygon(pgPolygonObject *self, PyObject *const *args,
+                          Py_ssize_t nargs)
+{
+    int was_sequence, result, only_edges = 0;
+    pgPolygonBase poly;
+
+    /* Check for the optional only_edges argument */
+    if (nargs && PyBool_Check(args[nargs - 1])) {
+        only_edges = args[nargs - 1] == Py_True;
+        nargs--;
+    }
+
+    if (!pgPolygon_FromObjectFastcall(args, nargs, &poly, &was_sequence)) {
+        return RAISE(
+            PyExc_TypeError,
+            "collidepolygon requires a PolygonType or PolygonLike object");
+    }
+
+    result = pgCollision_PolygonPolygon(&self->polygon, &poly, only_edges);
+
+    PG_FREEPOLY_COND(&poly, was_sequence);
+
+    return PyBool_FromLong(result);
+}
+
+static PyObject *
+pg_polygon_colliderect(pgPolygonObject *self, PyObject *const *args,
+                       Py_ssize_t nargs)
+{
+    SDL_Rect temp, *tmp = &temp;
+    int only_edges = 0;
+
+    /* Check for the optional only_edges argument */
+    if (nargs && PyBool_Check(args[nargs - 1])) {
+        only_edges = args[nargs - 1] == Py_True;
+        nargs--;
+    }
+
+    if (nargs == 1) {
+        if (!(tmp = pgRect_FromObject(args[0], &temp))) {
+            if (PyErr_Occurred())
+                return NULL;
+            else
+                return RAISE(PyExc_TypeError,
+                             "Invalid rect, all 4 fields must be numeric");
+        }
+    }
+    else if (nargs == 2) {
+        if (!pg_TwoIntsFromObj(args[0], &temp.x, &temp.y) ||
+            !pg_TwoIntsFromObj(args[1], &temp.w, &temp.h)) {
+            return RAISE(PyExc_TypeError,
+                         "Invalid rect, all 4 fields must be numeric");
+        }
+    }
+    else if (nargs == 4) {
+        if (!pg_IntFromObj(args[0], &temp.x) ||
+            !pg_IntFromObj(args[1], &temp.y) ||
+            !pg_IntFromObj(args[2], &temp.w) ||
+            !pg_IntFromObj(args[3], &temp.h)) {
+            return RAISE(PyExc_TypeError,
+                         "Invalid rect, all 4 fields must be numeric");
+        }
+    }
+    else {
+        return RAISE(PyExc_TypeError,
+                     "Invalid arguments number, must be 1, 2 or 4");
+    }
+
+    return PyBool_FromLong(
+        pgCollision_PolygonRect(&self->polygon, tmp, only_edges));
+}
+
+static PG_FORCEINLINE int
+_pg_polygon_collideswith(pgPolygonBase *spoly, PyObject *arg)
+{
+    if (pgPolygon_Check(arg)) {
+        return pgCollision_PolygonPolygon(spoly, &pgPolygon_AsPolygon(arg), 0);
+    }
+    else if (pgRect_Check(arg)) {
+        return pgCollision_PolygonRect(spoly, &pgRect_AsRect(arg), 0);
+    }
+    else if (pgCircle_Check(arg)) {
+        return pgCollision_CirclePolygon(&pgCircle_AsCircle(arg), spoly, 0);
+    }
+    else if (pgLine_Check(arg)) {
+        return pgCollision_PolygonLine(spoly, &pgLine_AsLine(arg), 0);
+    }
+    else if (PySequence_Check(arg)) {
+        double x, y;
+        if (!pg_TwoDoublesFromObj(arg, &x, &y)) {
+            PyErr_SetString(
+                PyExc_TypeError,
+                "Invalid point argument, must be a sequence of 2 numbers");
+            return -1;
+        }
+        return pgCollision_PolygonPoint(spoly, x, y);
+    }
+
+    PyErr_SetString(PyExc_TypeError,
+                    "Invalid shape argument, must be a CircleType, RectType, "
+                    "LineType, PolygonType or a sequence of 2 numbers");
+    return -1;
+}
+
+static PyObject *
+pg_polygon_collideswith(pgPolygonObject *self, PyObject *arg)
+{
+    int result = _pg_polygon_collideswith(&self->polygon, arg);
+    if (result == -1) {
+        return NULL;
+    }
+
+    return PyBool_FromLong(result);
+}
+
+static PyObject *
+pg_polygon_penetration(pgPolygonObject *self, PyObject *arg)
+{
+    pgCollider collider;
+
+    collider.type = PG_COLLIDER_POLYGON;
+    collider.shape.polygon = self->polygon;
+    return pgPenetration_ColliderObject(&collider, arg);
+}
+
+static PyObject *
+pg_polygon_collidelist(pgPolygonObject *self, PyObject *arg)
+{
+    Py_ssize_t i;
+    pgPolygonBase *spoly = &self->polygon;
+    int colliding;
+
+    if (!PySequence_Check(arg)) {
+        return RAISE(PyExc_TypeError, "Argument must be a sequence");
+    }
+
+    /* fast path */
+    if (PySequence_FAST_CHECK(arg)) {
+        PyObject **items = PySequence_Fast_ITEMS(arg);
+        for (i = 0; i < PySequence_Fast_GET_SIZE(arg); i++) {
+            if ((colliding = _pg_polygon_collideswith(spoly, items[i])) ==
+                -1) {
+                /*invalid shape*/
+                return NULL;
+            }
+            if (colliding) {
+                return PyLong_FromSsize_t(i);
+            }
+        }
+        return PyLong_FromLong(-1);
+    }
+
+    /* general sequence path */
+    for (i = 0; i < PySequence_Length(arg); i++) {
+        PyObject *obj = PySequence_GetItem(arg, i);
+        if (!obj) {
+            return NULL;
+        }
+
+        if ((colliding = _pg_polygon_collideswith(spoly, obj)) == -1) {
+            /*invalid shape*/
+            Py_DECREF(obj);
+            return NULL;
+        }
+        Py_DECREF(obj);
+
+        if (colliding) {
+            return PyLong_FromSsize_t(i);
+        }
+    }
+
+    return PyLong_FromLong(-1);
+}
+
+static PyObject *
+pg_polygon_collidelistall(pgPolygonObject *self, PyObject *const *args,
+                          Py_ssize_t nargs, PyObject *kwnames)
+{
+    Py_ssize_t i;
+    pgPolygonBase *spoly = &self->polygon;
+    PyObject *arg;
+    pgHitList hits;
+    int colliding;
+
+    if (!_pg_hits_init(&hits, args, nargs, kwnames)) {
+        return NULL;
+    }
+    arg = args[0];
+
+    /* fast path */
+    if (PySequence_FAST_CHECK(arg)) {
+        PyObject **items = PySequence_Fast_ITEMS(arg);
+
+        for (i = 0; i < PySequence_Fast_GET_SIZE(arg); i++) {
+            if ((colliding = _pg_polygon_collideswith(spoly, items[i])) ==
+                -1) {
+                /*invalid shape*/
+                _pg_hits_free(&hits);
+                return NULL;
+            }
+
+            if (colliding && !_pg_hits_add(&hits, i)) {
+                _pg_hits_free(&hits);
+                return NULL;
+            }
+        }
+
+        return _pg_hits_finish(&hits);
+    }
+
+    /* general sequence path */
+    for (i = 0; i < PySequence_Length(arg); i++) {
+        PyObject *obj = PySequence_GetItem(arg, i);
+        if (!obj) {
+            _pg_hits_free(&hits);
+            return NULL;
+        }
+
+        if ((colliding = _pg_polygon_collideswith(spoly, obj)) == -1) {
+            /*invalid shape*/
+            _pg_hits_free(&hits);
+            Py_DECREF(obj);
+            return NULL;
+        }
+        Py_DECREF(obj);
+
+        if (colliding && !_pg_hits_add(&hits, i)) {
+            _pg_hits_free(&hits);
+            return NULL;
+        }
+    }
+
+    return _pg_hits_finish(&hits);
+}
+
+static int
+_pg_polygon_collideswith_shape(void *polygon, PyObject *arg)
+{
+    return _pg_polygon_collideswith((pgPolygonBase *)polygon, arg);
+}
+
+static PyObject *
+pg_polygon_collideobjects(pgPolygonObject *self, PyObject *const *args,
+                          Py_ssize_t nargs, PyObject *kwnames)
+{
+    return pg_shape_collideobjects(&self->polygon,
+                                   _pg_polygon_collideswith_shape, args, nargs,
+                                   kwnames, 0);
+}
+
+static PyObject *
+pg_polygon_collideobjectsall(pgPolygonObject *self, PyObject *const *args,
+                             Py_ssize_t nargs, PyObject *kwnames)
+{
+    return pg_shape_collideobjects(&self->polygon,
+                                   _pg_polygon_collideswith_shape, args, nargs,
+                                   kwnames, 1);
+}
+
+static PyObject *
+pg_polygon_collidedict(pgPolygonObject *self, PyObject *const *args,
+                       Py_ssize_t nargs, PyObject *kwnames)
+{
+    return pg_shape_collidedict(&self->polygon, _pg_polygon_collideswith_shape,
+                                args, nargs, kwnames, 0);
+}
+
+static PyObject *
+pg_polygon_collidedictall(pgPolygonObject *self, PyObject *const *args,
+                          Py_ssize_t nargs, PyObject *kwnames)
+{
+    return pg_shape_collidedict(&self->polygon, _pg_polygon_collideswith_shape,
+                                args, nargs, kwnames, 1);
+}
+
 static struct PyMethodDef pg_polygon_methods[] = {
     {"as_segments", (PyCFunction)pg_polygon_as_segments, METH_NOARGS, NULL},
     {"move", (PyCFunction)pg_polygon_move, METH_FASTCALL, NULL},
@@ -1313,6 +1625,22 @@ static struct PyMethodDef pg_polygon_methods[] = {
     {"collideline", (PyCFunction)pg_polygon_collideline, METH_FASTCALL, NULL},
     {"collidecircle", (PyCFunction)pg_polygon_collidecircle, METH_FASTCALL,
      NULL},
+    {"collidepolygon", (PyCFunction)pg_polygon_collidepolygon, METH_FASTCALL,
+     NULL},
+    {"colliderect", (PyCFunction)pg_polygon_colliderect, METH_FASTCALL, NULL},
+    {"collideswith", (PyCFunction)pg_polygon_collideswith, METH_O, NULL},
+    {"penetration", (PyCFunction)pg_polygon_penetration, METH_O, NULL},
+    {"collidelist", (PyCFunction)pg_polygon_collidelist, METH_O, NULL},
+    {"collidelistall", (PyCFunction)pg_polygon_collidelistall,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"collideobjects", (PyCFunction)pg_polygon_collideobjects,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"collideobjectsall", (PyCFunction)pg_polygon_collideobjectsall,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"collidedict", (PyCFunction)pg_polygon_collidedict,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
+    {"collidedictall", (PyCFunction)pg_polygon_collidedictall,
+     METH_FASTCALL | METH_KEYWORDS, NULL},
     {"as_rect", (PyCFunction)pg_polygon_as_rect, METH_NOARGS, NULL},
     {"is_convex", (PyCFunction)pg_polygon_is_convex, METH_NOARGS, NULL},
     {"__copy__", (PyCFunction)pg_polygon_copy, METH_NOARGS, NULL},
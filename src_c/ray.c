@@ -0,0 +1,364 @@
+#include "include/geometry.h"
+#include "include/collisions.h"
+
+static void
+pgRay_FromLine(pgLineBase *line, double max_t, pgRayBase *out)
+{
+    out->x = line->xa;
+    out->y = line->ya;
+    out->dx = line->xb - line->xa;
+    out->dy = line->yb - line->ya;
+    out->inv_dx = out->dx != 0 ? 1.0 / out->dx : 0;
+    out->inv_dy = out->dy != 0 ? 1.0 / out->dy : 0;
+    out->max_dist = max_t;
+}
+
+static void
+pgRay_AsLine(pgRayBase *ray, pgLineBase *line, double *max_t)
+{
+    /* the direction is a unit vector so the t values are distances */
+    line->xa = ray->x;
+    line->ya = ray->y;
+    line->xb = ray->x + ray->dx;
+    line->yb = ray->y + ray->dy;
+    *max_t = ray->max_dist;
+}
+
+/* Updates the inverse direction of the ray. It's the inverse of the
+ * direction of the segment the ray is cast along, from its origin to its
+ * origin plus its direction, so that the slab tests give the same results
+ * as if the ray was given as a line. */
+static void
+_pg_ray_update_inverse(pgRayBase *ray)
+{
+    double dx = (ray->x + ray->dx) - ray->x;
+    double dy = (ray->y + ray->dy) - ray->y;
+
+    ray->inv_dx = dx != 0 ? 1.0 / dx : 0;
+    ray->inv_dy = dy != 0 ? 1.0 / dy : 0;
+}
+
+/* Sets the ray's direction to the normalized (dx, dy). */
+static int
+_pg_ray_set_direction(pgRayBase *ray, double dx, double dy)
+{
+    double length = sqrt(dx * dx + dy * dy);
+
+    if (!(length > 0) || length == Py_HUGE_VAL) {
+        PyErr_SetString(PyExc_ValueError,
+                        "Invalid ray direction value, must be nonzero");
+        return 0;
+    }
+
+    ray->dx = dx / length;
+    ray->dy = dy / length;
+    _pg_ray_update_inverse(ray);
+
+    return 1;
+}
+
+/* Sets the ray's max distance, a negative max_dist making it infinite. */
+static int
+_pg_ray_set_max_dist(pgRayBase *ray, double max_dist)
+{
+    if (max_dist < 0 || max_dist == Py_HUGE_VAL) {
+        ray->max_dist = DBL_MAX;
+        return 1;
+    }
+    if (!(max_dist > 0)) {
+        PyErr_SetString(
+            PyExc_ValueError,
+            "Invalid max distance value, must be nonzero numeric value");
+        return 0;
+    }
+
+    ray->max_dist = max_dist;
+    return 1;
+}
+
+/* Gets a direction from either a pair of numbers or an angle in degrees,
+ * the angle being interpreted like the one given to raycast. */
+static int
+_pg_ray_direction_from_obj(PyObject *obj, double *dx, double *dy)
+{
+    double angle;
+
+    if (PyNumber_Check(obj)) {
+        if (!pg_DoubleFromObj(obj, &angle)) {
+            PyErr_SetString(PyExc_TypeError,
+                            "Invalid ray angle value, must be numeric");
+            return 0;
+        }
+        angle = DEG_TO_RAD(angle);
+        *dx = -cos(angle);
+        *dy = -sin(angle);
+        return 1;
+    }
+    if (!pg_TwoDoublesFromObj(obj, dx, dy)) {
+        PyErr_SetString(PyExc_TypeError,
+                        "expected a pair of floats or a single float");
+        return 0;
+    }
+
+    return 1;
+}
+
+static PyObject *
+_pg_ray_subtype_new(PyTypeObject *type, pgRayBase *ray)
+{
+    pgRayObject *ray_obj = (pgRayObject *)pgRay_Type.tp_new(type, NULL, NULL);
+
+    if (ray_obj) {
+        ray_obj->ray = *ray;
+    }
+    return (PyObject *)ray_obj;
+}
+
+static PyObject *
+pg_ray_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
+{
+    pgRayObject *self = (pgRayObject *)type->tp_alloc(type, 0);
+
+    if (self) {
+        self->ray.x = self->ray.y = 0;
+        self->ray.dx = self->ray.inv_dx = 1;
+        self->ray.dy = self->ray.inv_dy = 0;
+        self->ray.max_dist = DBL_MAX;
+        self->weakreflist = NULL;
+    }
+    return (PyObject *)self;
+}
+
+static void
+pg_ray_dealloc(pgRayObject *self)
+{
+    if (self->weakreflist != NULL) {
+        PyObject_ClearWeakRefs((PyObject *)self);
+    }
+
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+static int
+pg_ray_init(pgRayObject *self, PyObject *args, PyObject *kwds)
+{
+    static char *keywords[] = {"origin", "direction", "max_dist", NULL};
+    PyObject *origin, *direction = NULL, *max_dist_obj = NULL;
+    pgRayBase ray;
+    pgLineBase line;
+    double dx, dy, max_dist = -1;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|OO:Ray", keywords, &origin,
+                                     &direction, &max_dist_obj)) {
+        return -1;
+    }
+
+    /* a line gives a ray going from its first point to its second one */
+    if (!direction) {
+        if (max_dist_obj || !pgLine_FromObject(origin, &line)) {
+            PyErr_SetString(PyExc_TypeError,
+                            "Ray requires a line or an origin and a "
+                            "direction");
+            return -1;
+        }
+        ray.x = line.xa;
+        ray.y = line.ya;
+        dx = line.xb - line.xa;
+        dy = line.yb - line.ya;
+        max_dist = pgLine_Length(&line);
+    }
+    else {
+        if (!pg_TwoDoublesFromObj(origin, &ray.x, &ray.y)) {
+            PyErr_SetString(
+                PyExc_TypeError,
+                "Invalid ray origin value, must be a pair of numeric values");
+            return -1;
+        }
+        if (!_pg_ray_direction_from_obj(direction, &dx, &dy)) {
+            return -1;
+        }
+        if (max_dist_obj && !pg_DoubleFromObj(max_dist_obj, &max_dist)) {
+            PyErr_SetString(
+                PyExc_TypeError,
+                "Invalid ray max distance threshold value, must be numeric");
+            return -1;
+        }
+    }
+
+    if (!_pg_ray_set_direction(&ray, dx, dy) ||
+        !_pg_ray_set_max_dist(&ray, max_dist)) {
+        return -1;
+    }
+
+    self->ray = ray;
+    return 0;
+}
+
+static PyObject *
+pg_ray_copy(pgRayObject *self, PyObject *_null)
+{
+    return _pg_ray_subtype_new(Py_TYPE(self), &self->ray);
+}
+
+static PyObject *
+pg_ray_at(pgRayObject *self, PyObject *obj)
+{
+    double distance;
+
+    if (!pg_DoubleFromObj(obj, &distance)) {
+        return RAISE(PyExc_TypeError,
+                     "Expected a numeric value for the distance parameter");
+    }
+
+    return pg_TupleFromDoublePair(self->ray.x + distance * self->ray.dx,
+                                  self->ray.y + distance * self->ray.dy);
+}
+
+static struct PyMethodDef pg_ray_methods[] = {
+    {"copy", (PyCFunction)pg_ray_copy, METH_NOARGS, NULL},
+    {"__copy__", (PyCFunction)pg_ray_copy, METH_NOARGS, NULL},
+    {"at", (PyCFunction)pg_ray_at, METH_O, NULL},
+    {NULL, NULL, 0, NULL}};
+
+static PyObject *
+pg_ray_repr(pgRayObject *self)
+{
+    PyObject *result, *origin, *direction, *max_dist;
+
+    origin = pg_TupleFromDoublePair(self->ray.x, self->ray.y);
+    if (!origin) {
+        return NULL;
+    }
+    direction = pg_TupleFromDoublePair(self->ray.dx, self->ray.dy);
+    if (!direction) {
+        Py_DECREF(origin);
+        return NULL;
+    }
+    max_dist = PyFloat_FromDouble(
+        self->ray.max_dist == DBL_MAX ? -1.0 : self->ray.max_dist);
+    if (!max_dist) {
+        Py_DECREF(origin);
+        Py_DECREF(direction);
+        return NULL;
+    }
+
+    result =
+        PyUnicode_FromFormat("<Ray(%R, %R, %R)>", origin, direction, max_dist);
+
+    Py_DECREF(origin);
+    Py_DECREF(direction);
+    Py_DECREF(max_dist);
+
+    return result;
+}
+
+static PyObject *
+pg_ray_get_origin(pgRayObject *self, void *closure)
+{
+    return pg_TupleFromDoublePair(self->ray.x, self->ray.y);
+}
+
+static int
+pg_ray_set_origin(pgRayObject *self, PyObject *value, void *closure)
+{
+    double x, y;
+
+    DEL_ATTR_NOT_SUPPORTED_CHECK_NO_NAME(value);
+    if (!pg_TwoDoublesFromObj(value, &x, &y)) {
+        PyErr_SetString(PyExc_TypeError, "Expected a sequence of 2 numbers");
+        return -1;
+    }
+
+    self->ray.x = x;
+    self->ray.y = y;
+    _pg_ray_update_inverse(&self->ray);
+    return 0;
+}
+
+static PyObject *
+pg_ray_get_direction(pgRayObject *self, void *closure)
+{
+    return pg_TupleFromDoublePair(self->ray.dx, self->ray.dy);
+}
+
+static int
+pg_ray_set_direction(pgRayObject *self, PyObject *value, void *closure)
+{
+    double dx, dy;
+
+    DEL_ATTR_NOT_SUPPORTED_CHECK_NO_NAME(value);
+    if (!pg_TwoDoublesFromObj(value, &dx, &dy)) {
+        PyErr_SetString(PyExc_TypeError, "Expected a sequence of 2 numbers");
+        return -1;
+    }
+
+    return _pg_ray_set_direction(&self->ray, dx, dy) ? 0 : -1;
+}
+
+static PyObject *
+pg_ray_get_angle(pgRayObject *self, void *closure)
+{
+    return PyFloat_FromDouble(RAD_TO_DEG(atan2(-self->ray.dy, -self->ray.dx)));
+}
+
+static int
+pg_ray_set_angle(pgRayObject *self, PyObject *value, void *closure)
+{
+    double angle;
+
+    DEL_ATTR_NOT_SUPPORTED_CHECK_NO_NAME(value);
+    if (!pg_DoubleFromObj(value, &angle)) {
+        PyErr_SetString(PyExc_TypeError, "Expected a numeric value");
+        return -1;
+    }
+
+    angle = DEG_TO_RAD(angle);
+    return _pg_ray_set_direction(&self->ray, -cos(angle), -sin(angle)) ? 0
+                                                                       : -1;
+}
+
+static PyObject *
+pg_ray_get_max_dist(pgRayObject *self, void *closure)
+{
+    return PyFloat_FromDouble(
+        self->ray.max_dist == DBL_MAX ? -1.0 : self->ray.max_dist);
+}
+
+static int
+pg_ray_set_max_dist(pgRayObject *self, PyObject *value, void *closure)
+{
+    double max_dist;
+
+    DEL_ATTR_NOT_SUPPORTED_CHECK_NO_NAME(value);
+    if (!pg_DoubleFromObj(value, &max_dist)) {
+        PyErr_SetString(PyExc_TypeError, "Expected a numeric value");
+        return -1;
+    }
+
+    return _pg_ray_set_max_dist(&self->ray, max_dist) ? 0 : -1;
+}
+
+static PyGetSetDef pg_ray_getsets[] = {
+    {"origin", (getter)pg_ray_get_origin, (setter)pg_ray_set_origin, NULL,
+     NULL},
+    {"direction", (getter)pg_ray_get_direction, (setter)pg_ray_set_direction,
+     NULL, NULL},
+    {"angle", (getter)pg_ray_get_angle, (setter)pg_ray_set_angle, NULL, NULL},
+    {"max_dist", (getter)pg_ray_get_max_dist, (setter)pg_ray_set_max_dist,
+     NULL, NULL},
+    {NULL, 0, NULL, NULL, NULL} /* Sentinel */
+};
+
+static PyTypeObject pgRay_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0).tp_name = "pygame.Ray",
+    .tp_basicsize = sizeof(pgRayObject),
+    .tp_dealloc = (destructor)pg_ray_dealloc,
+    .tp_repr = (reprfunc)pg_ray_repr,
+    .tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE,
+    .tp_doc = NULL,
+    .tp_weaklistoffset = offsetof(pgRayObject, weakreflist),
+    .tp_methods = pg_ray_methods,
+    .tp_getset = pg_ray_getsets,
+    .tp_init = (initproc)pg_ray_init,
+    .tp_new = pg_ray_new,
+};
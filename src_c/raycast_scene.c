@@ -0,0 +1,1407 @@
+#include "include/geometry.h"
+#include "include/collisions.h"
+
+/* The shape swept along the ray of a cast: a point, a circle when radius is
+ * positive, or a polygon moving with the ray's origin when polygon isn't
+ * NULL */
+typedef struct {
+    double radius;
+    pgPolygonBase *polygon;
+} pgCastShape;
+
+/* The highest number of cells a RaycastGrid can be made of */
+#define PG_RAYCASTGRID_MAX_CELLS (1 << 24)
+
+/*
+ * Fills a pgCollider with the shape and bounding box of a Line, Circle, Rect
+ * or Polygon object. If copy is nonzero the vertices of a polygon are copied
+ * and must be freed with pgCollider_Free, otherwise they are borrowed from
+ * the object.
+ *
+ * 1 if success
+ * 0 if the object isn't a collider, no error is set
+ * -1 if it fails, an error is set
+ */
+static int
+pgCollider_FromObject(PyObject *obj, pgCollider *collider, int copy)
+{
+    Py_ssize_t i;
+
+    if (pgLine_Check(obj)) {
+        pgLineBase *line = &collider->shape.line;
+        collider->type = PG_COLLIDER_LINE;
+        *line = pgLine_AsLine(obj);
+        collider->min_x = MIN(line->xa, line->xb);
+        collider->min_y = MIN(line->ya, line->yb);
+        collider->max_x = MAX(line->xa, line->xb);
+        collider->max_y = MAX(line->ya, line->yb);
+    }
+    else if (pgCircle_Check(obj)) {
+        pgCircleBase *circle = &collider->shape.circle;
+        collider->type = PG_COLLIDER_CIRCLE;
+        *circle = pgCircle_AsCircle(obj);
+        collider->min_x = circle->x - circle->r;
+        collider->min_y = circle->y - circle->r;
+        collider->max_x = circle->x + circle->r;
+        collider->max_y = circle->y + circle->r;
+    }
+    else if (pgRect_Check(obj)) {
+        SDL_Rect *rect = &collider->shape.rect;
+        collider->type = PG_COLLIDER_RECT;
+        *rect = pgRect_AsRect(obj);
+        collider->min_x = MIN(rect->x, rect->x + rect->w);
+        collider->min_y = MIN(rect->y, rect->y + rect->h);
+        collider->max_x = MAX(rect->x, rect->x + rect->w);
+        collider->max_y = MAX(rect->y, rect->y + rect->h);
+    }
+    else if (pgPolygon_Check(obj)) {
+        pgPolygonBase *poly = &collider->shape.polygon;
+        collider->type = PG_COLLIDER_POLYGON;
+        *poly = pgPolygon_AsPolygon(obj);
+        if (copy) {
+            if (!(poly->vertices = PyMem_New(double, poly->verts_num * 2))) {
+                PyErr_NoMemory();
+                return -1;
+            }
+            memcpy(poly->vertices, pgPolygon_GETVERTICES(obj),
+                   poly->verts_num * 2 * sizeof(double));
+        }
+        collider->min_x = collider->max_x = poly->vertices[0];
+        collider->min_y = collider->max_y = poly->vertices[1];
+        for (i = 1; i < poly->verts_num; i++) {
+            collider->min_x = MIN(collider->min_x, poly->vertices[i * 2]);
+            collider->min_y = MIN(collider->min_y, poly->vertices[i * 2 + 1]);
+            collider->max_x = MAX(collider->max_x, poly->vertices[i * 2]);
+            collider->max_y = MAX(collider->max_y, poly->vertices[i * 2 + 1]);
+        }
+    }
+    else {
+        return 0;
+    }
+
+    return 1;
+}
+
+/* Frees the vertices copied by pgCollider_FromSequence, then the colliders */
+static void
+pgCollider_Free(pgCollider *colliders, Py_ssize_t colliders_num)
+{
+    Py_ssize_t i;
+
+    if (!colliders) {
+        return;
+    }
+
+    for (i = 0; i < colliders_num; i++) {
+        if (colliders[i].type == PG_COLLIDER_POLYGON) {
+            PyMem_Free(colliders[i].shape.polygon.vertices);
+        }
+    }
+
+    PyMem_Free(colliders);
+}
+
+/*
+ * Copies a sequence of collider objects into a new array of pgColliders,
+ * which must be freed with pgCollider_Free.
+ *
+ * sets the error messages
+ * the colliders if success
+ * NULL if it fails
+ */
+static pgCollider *
+pgCollider_FromSequence(PyObject **objects, Py_ssize_t objects_num)
+{
+    pgCollider *colliders;
+    Py_ssize_t i;
+    int result;
+
+    if (!(colliders = PyMem_New(pgCollider, MAX(objects_num, 1)))) {
+        PyErr_NoMemory();
+        return NULL;
+    }
+
+    for (i = 0; i < objects_num; i++) {
+        result = pgCollider_FromObject(objects[i], &colliders[i], 1);
+        if (result != 1) {
+            if (!result) {
+                PyErr_SetString(PyExc_TypeError,
+                                "collisions must be a sequence of "
+                                "Line, Circle, Rect or Polygon objects");
+            }
+            pgCollider_Free(colliders, i);
+            return NULL;
+        }
+    }
+
+    return colliders;
+}
+
+/* Computes the unit normal of the collider's surface at the given point,
+ * oriented so that it faces against the ray's direction. */
+static void
+pgCollider_RayNormal(pgCollider *collider, pgLineBase *ray, double x, double y,
+                     double *nx, double *ny)
+{
+    double len;
+
+    *nx = *ny = 0;
+
+    if (collider->type == PG_COLLIDER_CIRCLE) {
+        pgCircleBase *circle = &collider->shape.circle;
+        *nx = (x - circle->x) / circle->r;
+        *ny = (y - circle->y) / circle->r;
+    }
+    else if (collider->type == PG_COLLIDER_LINE) {
+        pgLineBase *line = &collider->shape.line;
+        len = pgLine_Length(line);
+        *nx = (line->ya - line->yb) / len;
+        *ny = (line->xb - line->xa) / len;
+    }
+    else if (collider->type == PG_COLLIDER_RECT) {
+        SDL_Rect *rect = &collider->shape.rect;
+        /* pick the side of the rect closest to the hit point */
+        double d_left = fabs(x - rect->x);
+        double d_right = fabs(x - (rect->x + rect->w));
+        double d_top = fabs(y - rect->y);
+        double d_bottom = fabs(y - (rect->y + rect->h));
+
+        if (MIN(d_left, d_right) <= MIN(d_top, d_bottom)) {
+            *nx = d_left <= d_right ? -1 : 1;
+        }
+        else {
+            *ny = d_top <= d_bottom ? -1 : 1;
+        }
+    }
+    else if (collider->type == PG_COLLIDER_POLYGON) {
+        pgPolygonBase *poly = &collider->shape.polygon;
+        double *vertices = poly->vertices;
+        double best_dist = DBL_MAX;
+        Py_ssize_t i, j;
+
+        /* pick the edge closest to the hit point */
+        for (i = 0, j = poly->verts_num - 1; i < poly->verts_num; j = i++) {
+            double ex = vertices[i * 2] - vertices[j * 2];
+            double ey = vertices[i * 2 + 1] - vertices[j * 2 + 1];
+            double px = x - vertices[j * 2];
+            double py = y - vertices[j * 2 + 1];
+            double len_sqr = ex * ex + ey * ey;
+            double t, dist;
+
+            if (len_sqr == 0) {
+                continue;
+            }
+
+            t = (px * ex + py * ey) / len_sqr;
+            t = MAX(0, MIN(1, t));
+            px -= t * ex;
+            py -= t * ey;
+            dist = px * px + py * py;
+
+            if (dist < best_dist) {
+                best_dist = dist;
+                len = sqrt(len_sqr);
+                *nx = -ey / len;
+                *ny = ex / len;
+            }
+        }
+    }
+
+    /* make the normal face the ray */
+    if (*nx * (ray->xb - ray->xa) + *ny * (ray->yb - ray->ya) > 0) {
+        *nx = -*nx;
+        *ny = -*ny;
+    }
+}
+
+/* Finds the point of the collider closest to the given point, which is the
+ * point itself when it is inside of a Circle, Rect or Polygon. */
+static void
+pgCollider_ClosestPoint(pgCollider *collider, double x, double y, double *px,
+                        double *py)
+{
+    double dx, dy, len;
+
+    *px = x;
+    *py = y;
+
+    if (collider->type == PG_COLLIDER_CIRCLE) {
+        pgCircleBase *circle = &collider->shape.circle;
+        dx = x - circle->x;
+        dy = y - circle->y;
+        len = sqrt(dx * dx + dy * dy);
+        if (len > circle->r) {
+            *px = circle->x + dx / len * circle->r;
+            *py = circle->y + dy / len * circle->r;
+        }
+    }
+    else if (collider->type == PG_COLLIDER_RECT) {
+        *px = MAX(collider->min_x, MIN(x, collider->max_x));
+        *py = MAX(collider->min_y, MIN(y, collider->max_y));
+    }
+    else {
+        double *vertices, segment[4], best_dist = DBL_MAX, t;
+        Py_ssize_t i, j, verts_num;
+
+        if (collider->type == PG_COLLIDER_LINE) {
+            pgLineBase *line = &collider->shape.line;
+            segment[0] = line->xa;
+            segment[1] = line->ya;
+            segment[2] = line->xb;
+            segment[3] = line->yb;
+            vertices = segment;
+            verts_num = 2;
+        }
+        else {
+            pgPolygonBase *poly = &collider->shape.polygon;
+            if (pgCollision_PolygonPoint(poly, x, y)) {
+                return;
+            }
+            vertices = poly->vertices;
+            verts_num = poly->verts_num;
+        }
+
+        /* pick the closest point of the closest edge */
+        for (i = 0, j = verts_num - 1; i < verts_num; j = i++) {
+            double ex = vertices[i * 2] - vertices[j * 2];
+            double ey = vertices[i * 2 + 1] - vertices[j * 2 + 1];
+            double len_sqr = ex * ex + ey * ey;
+
+            t = 0;
+            if (len_sqr > 0) {
+                t = ((x - vertices[j * 2]) * ex +
+                     (y - vertices[j * 2 + 1]) * ey) /
+                    len_sqr;
+                t = MAX(0, MIN(1, t));
+            }
+            dx = x - (vertices[j * 2] + t * ex);
+            dy = y - (vertices[j * 2 + 1] + t * ey);
+
+            if (dx * dx + dy * dy < best_dist) {
+                best_dist = dx * dx + dy * dy;
+                *px = x - dx;
+                *py = y - dy;
+            }
+        }
+    }
+}
+
+/*
+ * Tests the shape of a cast moving along the ray against a collider.
+ *
+ * 1 if the shape touches the collider, T is set to the t value of the ray
+ * at the first contact
+ * 0 if it doesn't
+ */
+static int
+pgCastShape_Collider(pgCastShape *cast, pgLineBase *ray, pgCollider *collider,
+                     double max_t, double *T)
+{
+    double hit[4];
+
+    if (cast->polygon) {
+        return pgShapecast_PolygonCollider(cast->polygon, ray->xb - ray->xa,
+                                           ray->yb - ray->ya, collider, max_t,
+                                           T, hit);
+    }
+    if (cast->radius > 0) {
+        return pgCirclecast_LineCollider(ray, cast->radius, collider, max_t,
+                                         T);
+    }
+
+    return pgRaycast_LineCollider(ray, collider, max_t, T);
+}
+
+/* Sets margins to how far the left, top, right and bottom sides of a
+ * bounding box must be moved out for the ray to hit the grown box whenever
+ * the shape of the cast touches the box. */
+static void
+pgCastShape_Margins(pgCastShape *cast, pgLineBase *ray, double *margins)
+{
+    Py_ssize_t i;
+
+    if (cast->polygon) {
+        pgPolygonBase *poly = cast->polygon;
+        margins[0] = margins[2] = margins[1] = margins[3] = 0;
+        for (i = 0; i < poly->verts_num; i++) {
+            margins[0] = MAX(margins[0], poly->vertices[i * 2] - ray->xa);
+            margins[1] = MAX(margins[1], poly->vertices[i * 2 + 1] - ray->ya);
+            margins[2] = MAX(margins[2], ray->xa - poly->vertices[i * 2]);
+            margins[3] = MAX(margins[3], ray->ya - poly->vertices[i * 2 + 1]);
+        }
+        return;
+    }
+
+    margins[0] = margins[1] = margins[2] = margins[3] = MAX(cast->radius, 0);
+}
+
+static PG_FORCE_INLINE Py_ssize_t
+_pg_raycastgrid_cell_coord(double value, double min, double cell_size,
+                           Py_ssize_t cells_num)
+{
+    double coord = floor((value - min) / cell_size);
+
+    if (coord < 0) {
+        return 0;
+    }
+    if (coord >= (double)cells_num) {
+        return cells_num - 1;
+    }
+    return (Py_ssize_t)coord;
+}
+
+/* Finds the range of cells overlapped by the bounding box of a collider.
+ * The box is padded so that colliders lying on the border between two cells
+ * are stored in both of them. */
+static void
+_pg_raycastgrid_cell_range(pgRaycastGridObject *grid, pgCollider *collider,
+                           Py_ssize_t *x0, Py_ssize_t *y0, Py_ssize_t *x1,
+                           Py_ssize_t *y1)
+{
+    double pad = grid->cell_size * 1e-9;
+
+    *x0 = _pg_raycastgrid_cell_coord(collider->min_x - pad, grid->min_x,
+                                     grid->cell_size, grid->cols);
+    *y0 = _pg_raycastgrid_cell_coord(collider->min_y - pad, grid->min_y,
+                                     grid->cell_size, grid->rows);
+    *x1 = _pg_raycastgrid_cell_coord(collider->max_x + pad, grid->min_x,
+                                     grid->cell_size, grid->cols);
+    *y1 = _pg_raycastgrid_cell_coord(collider->max_y + pad, grid->min_y,
+                                     grid->cell_size, grid->rows);
+}
+
+/* Checks if a collider should be stored in a cell of its range. Diagonal
+ * lines are only stored in the cells they actually cross. */
+static int
+_pg_raycastgrid_collider_in_cell(pgRaycastGridObject *grid,
+                                 pgCollider *collider, Py_ssize_t cx,
+                                 Py_ssize_t cy)
+{
+    double pad = grid->cell_size * 1e-9;
+
+    if (collider->type != PG_COLLIDER_LINE) {
+        return 1;
+    }
+
+    return pgRaycast_LineAABB(
+        &collider->shape.line, grid->min_x + cx * grid->cell_size - pad,
+        grid->min_y + cy * grid->cell_size - pad,
+        grid->min_x + (cx + 1) * grid->cell_size + pad,
+        grid->min_y + (cy + 1) * grid->cell_size + pad, 1.0, NULL);
+}
+
+static void
+_pg_raycastgrid_clear(pgRaycastGridObject *self)
+{
+    Py_CLEAR(self->colliders);
+    pgCollider_Free(self->shapes, self->shapes_num);
+    PyMem_Free(self->cell_start);
+    PyMem_Free(self->cell_items);
+    self->shapes = NULL;
+    self->shapes_num = 0;
+    self->cell_start = NULL;
+    self->cell_items = NULL;
+    self->cols = self->rows = 0;
+}
+
+/*
+ * Bins the colliders of the grid into its cells, cell_size being 0 to pick
+ * a cell size that gives about one cell per collider.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+_pg_raycastgrid_build(pgRaycastGridObject *self, double cell_size)
+{
+    Py_ssize_t i, cell, cells_num, items_num = 0;
+    Py_ssize_t x0, y0, x1, y1, cx, cy;
+    double max_x, max_y, width, height, cols, rows;
+
+    if (!self->shapes_num) {
+        self->min_x = self->min_y = 0;
+        max_x = max_y = 0;
+    }
+    else {
+        self->min_x = self->shapes[0].min_x;
+        self->min_y = self->shapes[0].min_y;
+        max_x = self->shapes[0].max_x;
+        max_y = self->shapes[0].max_y;
+    }
+    for (i = 1; i < self->shapes_num; i++) {
+        self->min_x = MIN(self->min_x, self->shapes[i].min_x);
+        self->min_y = MIN(self->min_y, self->shapes[i].min_y);
+        max_x = MAX(max_x, self->shapes[i].max_x);
+        max_y = MAX(max_y, self->shapes[i].max_y);
+    }
+    width = max_x - self->min_x;
+    height = max_y - self->min_y;
+
+    if (cell_size == 0) {
+        if (width > 0 && height > 0) {
+            cell_size = sqrt(width * height / MAX(self->shapes_num, 1));
+        }
+        else {
+            cell_size = MAX(width, height) / MAX(self->shapes_num, 1);
+        }
+        if (cell_size == 0) {
+            cell_size = 1.0;
+        }
+    }
+    self->cell_size = cell_size;
+
+    cols = MAX(ceil(width / cell_size), 1);
+    rows = MAX(ceil(height / cell_size), 1);
+    if (cols * rows > PG_RAYCASTGRID_MAX_CELLS) {
+        PyErr_SetString(PyExc_ValueError,
+                        "cell_size is too small for the size of the scene");
+        return 0;
+    }
+    self->cols = (Py_ssize_t)cols;
+    self->rows = (Py_ssize_t)rows;
+    cells_num = self->cols * self->rows;
+
+    if (!(self->cell_start = PyMem_New(Py_ssize_t, cells_num + 1))) {
+        PyErr_NoMemory();
+        return 0;
+    }
+    memset(self->cell_start, 0, (cells_num + 1) * sizeof(Py_ssize_t));
+
+    /* count the colliders of every cell, then turn the counts into the
+     * offsets of the cells in cell_items */
+    for (i = 0; i < self->shapes_num; i++) {
+        _pg_raycastgrid_cell_range(self, &self->shapes[i], &x0, &y0, &x1, &y1);
+        for (cy = y0; cy <= y1; cy++) {
+            for (cx = x0; cx <= x1; cx++) {
+                if (_pg_raycastgrid_collider_in_cell(self, &self->shapes[i],
+                                                     cx, cy)) {
+                    self->cell_start[cy * self->cols + cx + 1]++;
+                    items_num++;
+                }
+            }
+        }
+    }
+    for (i = 0; i < cells_num; i++) {
+        self->cell_start[i + 1] += self->cell_start[i];
+    }
+
+    if (!(self->cell_items = PyMem_New(Py_ssize_t, MAX(items_num, 1)))) {
+        PyErr_NoMemory();
+        return 0;
+    }
+
+    /* fill the cells back to front so that cell_start ends up pointing to
+     * the first collider of every cell, in the order of the colliders */
+    for (i = self->shapes_num - 1; i >= 0; i--) {
+        _pg_raycastgrid_cell_range(self, &self->shapes[i], &x0, &y0, &x1, &y1);
+        for (cy = y0; cy <= y1; cy++) {
+            for (cx = x0; cx <= x1; cx++) {
+                if (_pg_raycastgrid_collider_in_cell(self, &self->shapes[i],
+                                                     cx, cy)) {
+                    cell = cy * self->cols + cx;
+                    self->cell_items[--self->cell_start[cell + 1]] = i;
+                }
+            }
+        }
+    }
+    /* cell_start[i + 1] now points to the start of cell i */
+    memmove(self->cell_start, self->cell_start + 1,
+            cells_num * sizeof(Py_ssize_t));
+    self->cell_start[cells_num] = items_num;
+
+    return 1;
+}
+
+/* Tests the colliders of the cells from (x0, y0) to (x1, y1), clipped to
+ * the grid, against the ray or the shape of the cast, keeping the closest
+ * hit in record_t and record_index. */
+static PG_FORCE_INLINE void
+_pg_raycastgrid_test_cells(pgRaycastGridObject *grid, pgLineBase *ray,
+                           pgCastShape *cast, Py_ssize_t x0, Py_ssize_t y0,
+                           Py_ssize_t x1, Py_ssize_t y1, Uint32 *layers,
+                           Uint32 mask, double *record_t,
+                           Py_ssize_t *record_index)
+{
+    Py_ssize_t cx, cy, i, index, cell;
+    double temp_t;
+
+    x0 = MAX(x0, 0);
+    y0 = MAX(y0, 0);
+    x1 = MIN(x1, grid->cols - 1);
+    y1 = MIN(y1, grid->rows - 1);
+
+    for (cy = y0; cy <= y1; cy++) {
+        for (cx = x0; cx <= x1; cx++) {
+            cell = cy * grid->cols + cx;
+            for (i = grid->cell_start[cell]; i < grid->cell_start[cell + 1];
+                 i++) {
+                index = grid->cell_items[i];
+                if (layers && !(layers[index] & mask)) {
+                    continue;
+                }
+                if (cast ? !pgCastShape_Collider(cast, ray,
+                                                 &grid->shapes[index],
+                                                 *record_t, &temp_t)
+                         : !pgRaycast_LineCollider(ray, &grid->shapes[index],
+                                                   *record_t, &temp_t)) {
+                    continue;
+                }
+                /* on ties keep the collider that comes first in the
+                 * sequence */
+                if (temp_t < *record_t ||
+                    (temp_t == *record_t && *record_index != -1 &&
+                     index < *record_index)) {
+                    *record_t = temp_t;
+                    *record_index = index;
+                }
+            }
+        }
+    }
+}
+
+/*
+ * Finds the closest hit of a ray against the colliders of a grid, walking
+ * the cells crossed by the ray in order with a DDA until a cell contains a
+ * hit closer than the point where the ray leaves it. Colliders whose layer
+ * bits don't intersect the mask are skipped when layers isn't NULL. Gives
+ * the same result as testing every collider in order.
+ * When cast isn't NULL its shape is swept along the ray instead. Every cell
+ * crossed by the ray then stands for the block of cells around it that the
+ * shape can overlap while its origin is in that cell, so the walk also
+ * starts and ends outside of the grid as long as these blocks overlap it.
+ */
+static void
+pgRaycastGrid_Raycast(pgRaycastGridObject *grid, pgLineBase *ray,
+                      pgCastShape *cast, double max_t, Uint32 *layers,
+                      Uint32 mask, double *record_t, Py_ssize_t *record_index)
+{
+    double dx = ray->xb - ray->xa, dy = ray->yb - ray->ya;
+    double cell_size = grid->cell_size;
+    double margins[4] = {0, 0, 0, 0};
+    double t, t_max_x, t_max_y, t_delta_x, t_delta_y, t_exit, min_x, min_y;
+    Py_ssize_t ix, iy, step_x, step_y, index;
+    /* the block of the cell (ix, iy) goes from ix - lo_x to ix + hi_x and
+     * from iy - lo_y to iy + hi_y */
+    Py_ssize_t lo_x = 0, lo_y = 0, hi_x = 0, hi_y = 0;
+
+    *record_t = max_t;
+    *record_index = -1;
+
+    if (!grid->shapes_num) {
+        return;
+    }
+
+    if (cast) {
+        pgCastShape_Margins(cast, ray, margins);
+        lo_x = (Py_ssize_t)MIN(floor(margins[2] / cell_size) + 1, grid->cols);
+        lo_y = (Py_ssize_t)MIN(floor(margins[3] / cell_size) + 1, grid->rows);
+        hi_x = (Py_ssize_t)MIN(floor(margins[0] / cell_size) + 1, grid->cols);
+        hi_y = (Py_ssize_t)MIN(floor(margins[1] / cell_size) + 1, grid->rows);
+    }
+
+    /* the cells whose block overlaps the grid */
+    min_x = grid->min_x - hi_x * cell_size;
+    min_y = grid->min_y - hi_y * cell_size;
+    if (!pgRaycast_LineAABB(
+            ray, min_x, min_y, grid->min_x + (grid->cols + lo_x) * cell_size,
+            grid->min_y + (grid->rows + lo_y) * cell_size, max_t, &t)) {
+        return;
+    }
+
+    ix = _pg_raycastgrid_cell_coord(ray->xa + dx * t, min_x, cell_size,
+                                    grid->cols + lo_x + hi_x) -
+         hi_x;
+    iy = _pg_raycastgrid_cell_coord(ray->ya + dy * t, min_y, cell_size,
+                                    grid->rows + lo_y + hi_y) -
+         hi_y;
+
+    if (dx > 0) {
+        step_x = 1;
+        t_max_x = (grid->min_x + (ix + 1) * cell_size - ray->xa) / dx;
+        t_delta_x = cell_size / dx;
+    }
+    else if (dx < 0) {
+        step_x = -1;
+        t_max_x = (grid->min_x + ix * cell_size - ray->xa) / dx;
+        t_delta_x = -cell_size / dx;
+    }
+    else {
+        step_x = 0;
+        t_max_x = t_delta_x = DBL_MAX;
+    }
+
+    if (dy > 0) {
+        step_y = 1;
+        t_max_y = (grid->min_y + (iy + 1) * cell_size - ray->ya) / dy;
+        t_delta_y = cell_size / dy;
+    }
+    else if (dy < 0) {
+        step_y = -1;
+        t_max_y = (grid->min_y + iy * cell_size - ray->ya) / dy;
+        t_delta_y = -cell_size / dy;
+    }
+    else {
+        step_y = 0;
+        t_max_y = t_delta_y = DBL_MAX;
+    }
+
+    /* the block of the first cell, then only the cells each step adds to
+     * it, as the cells left behind were already tested */
+    _pg_raycastgrid_test_cells(grid, ray, cast, ix - lo_x, iy - lo_y,
+                               ix + hi_x, iy + hi_y, layers, mask, record_t,
+                               record_index);
+
+    for (;;) {
+        t_exit = MIN(t_max_x, t_max_y);
+
+        /* no collider in the next cells can be hit before this one */
+        if (*record_index != -1 && *record_t <= t_exit) {
+            break;
+        }
+        if (t_exit > max_t) {
+            break;
+        }
+
+        if (t_max_x < t_max_y) {
+            ix += step_x;
+            if (ix < -hi_x || ix >= grid->cols + lo_x) {
+                break;
+            }
+            t_max_x += t_delta_x;
+            index = step_x > 0 ? ix + hi_x : ix - lo_x;
+            _pg_raycastgrid_test_cells(grid, ray, cast, index, iy - lo_y,
+                                       index, iy + hi_y, layers, mask,
+                                       record_t, record_index);
+        }
+        else {
+            iy += step_y;
+            if (iy < -hi_y || iy >= grid->rows + lo_y) {
+                break;
+            }
+            t_max_y += t_delta_y;
+            index = step_y > 0 ? iy + hi_y : iy - lo_y;
+            _pg_raycastgrid_test_cells(grid, ray, cast, ix - lo_x, index,
+                                       ix + hi_x, index, layers, mask,
+                                       record_t, record_index);
+        }
+    }
+}
+
+static PyObject *
+pg_raycastgrid_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
+{
+    pgRaycastGridObject *self = (pgRaycastGridObject *)type->tp_alloc(type, 0);
+
+    if (self) {
+        self->colliders = NULL;
+        self->shapes = NULL;
+        self->shapes_num = 0;
+        self->cell_size = 1.0;
+        self->cols = self->rows = 0;
+        self->cell_start = NULL;
+        self->cell_items = NULL;
+        self->busy = 0;
+        self->weakreflist = NULL;
+    }
+
+    return (PyObject *)self;
+}
+
+static int
+pg_raycastgrid_init(pgRaycastGridObject *self, PyObject *args, PyObject *kwds)
+{
+    static char *keywords[] = {"colliders", "cell_size", NULL};
+    PyObject *colliders, *cell_size_obj = Py_None;
+    double cell_size = 0;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|O:RaycastGrid", keywords,
+                                     &colliders, &cell_size_obj)) {
+        return -1;
+    }
+
+    if (cell_size_obj != Py_None) {
+        if (!pg_DoubleFromObj(cell_size_obj, &cell_size)) {
+            PyErr_SetString(PyExc_TypeError, "cell_size must be a number");
+            return -1;
+        }
+        if (!(cell_size > 0) || cell_size == Py_HUGE_VAL) {
+            PyErr_SetString(PyExc_ValueError,
+                            "cell_size must be a positive number");
+            return -1;
+        }
+    }
+
+    if (!PySequence_FAST_CHECK(colliders)) {
+        PyErr_SetString(PyExc_TypeError,
+                        "colliders parameter must be a sequence");
+        return -1;
+    }
+
+    if (self->busy) {
+        PyErr_SetString(PyExc_RuntimeError,
+                        "cannot reinitialize a RaycastGrid while it is being "
+                        "raycast by another thread");
+        return -1;
+    }
+
+    _pg_raycastgrid_clear(self);
+
+    if (!(self->colliders = PySequence_Tuple(colliders))) {
+        return -1;
+    }
+    if (!(self->shapes =
+              pgCollider_FromSequence(PySequence_Fast_ITEMS(self->colliders),
+                                      PyTuple_GET_SIZE(self->colliders)))) {
+        _pg_raycastgrid_clear(self);
+        return -1;
+    }
+    self->shapes_num = PyTuple_GET_SIZE(self->colliders);
+
+    if (!_pg_raycastgrid_build(self, cell_size)) {
+        _pg_raycastgrid_clear(self);
+        return -1;
+    }
+
+    return 0;
+}
+
+static void
+pg_raycastgrid_dealloc(pgRaycastGridObject *self)
+{
+    if (self->weakreflist != NULL) {
+        PyObject_ClearWeakRefs((PyObject *)self);
+    }
+
+    _pg_raycastgrid_clear(self);
+
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+static PyObject *
+pg_raycastgrid_repr(pgRaycastGridObject *self)
+{
+    PyObject *result, *cell_size;
+
+    if (!(cell_size = PyFloat_FromDouble(self->cell_size))) {
+        return NULL;
+    }
+
+    result = PyUnicode_FromFormat("<RaycastGrid(%zd colliders, cell_size=%R)>",
+                                  self->shapes_num, cell_size);
+
+    Py_DECREF(cell_size);
+
+    return result;
+}
+
+static Py_ssize_t
+pg_raycastgrid_len(pgRaycastGridObject *self)
+{
+    return self->shapes_num;
+}
+
+static PyObject *
+pg_raycastgrid_get_colliders(pgRaycastGridObject *self, void *closure)
+{
+    if (!self->colliders) {
+        return PyTuple_New(0);
+    }
+    Py_INCREF(self->colliders);
+    return self->colliders;
+}
+
+static PyObject *
+pg_raycastgrid_get_cell_size(pgRaycastGridObject *self, void *closure)
+{
+    return PyFloat_FromDouble(self->cell_size);
+}
+
+static PyObject *
+pg_raycastgrid_get_size(pgRaycastGridObject *self, void *closure)
+{
+    return Py_BuildValue("(nn)", self->cols, self->rows);
+}
+
+static PyGetSetDef pg_raycastgrid_getsets[] = {
+    {"colliders", (getter)pg_raycastgrid_get_colliders, NULL,
+     "The colliders the grid was built from", NULL},
+    {"cell_size", (getter)pg_raycastgrid_get_cell_size, NULL,
+     "The size of the cells of the grid", NULL},
+    {"size", (getter)pg_raycastgrid_get_size, NULL,
+     "The number of columns and rows of the grid", NULL},
+    {NULL, 0, NULL, NULL, NULL} /* Sentinel */
+};
+
+static PySequenceMethods pg_raycastgrid_as_sequence = {
+    .sq_length = (lenfunc)pg_raycastgrid_len,
+};
+
+static PyTypeObject pgRaycastGrid_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0).tp_name = "pygame.RaycastGrid",
+    .tp_basicsize = sizeof(pgRaycastGridObject),
+    .tp_dealloc = (destructor)pg_raycastgrid_dealloc,
+    .tp_repr = (reprfunc)pg_raycastgrid_repr,
+    .tp_as_sequence = &pg_raycastgrid_as_sequence,
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_doc = NULL,
+    .tp_weaklistoffset = offsetof(pgRaycastGridObject, weakreflist),
+    .tp_getset = pg_raycastgrid_getsets,
+    .tp_init = (initproc)pg_raycastgrid_init,
+    .tp_new = pg_raycastgrid_new,
+};
+
+/* The number of bins the centroids are sorted into when looking for the
+ * best split of a RaycastBVH node */
+#define PG_RAYCASTBVH_BINS 16
+/* Below this depth nodes are split with the surface area heuristic, deeper
+ * nodes are split at their median so the depth of the tree stays bounded */
+#define PG_RAYCASTBVH_SAH_DEPTH 48
+#define PG_RAYCASTBVH_MAX_DEPTH (PG_RAYCASTBVH_SAH_DEPTH + 64)
+
+static PG_FORCE_INLINE void
+_pg_raycastbvh_box_reset(pgRaycastBVHNode *box)
+{
+    box->min_x = box->min_y = DBL_MAX;
+    box->max_x = box->max_y = -DBL_MAX;
+    box->count = 0;
+}
+
+static PG_FORCE_INLINE void
+_pg_raycastbvh_box_grow(pgRaycastBVHNode *box, double min_x, double min_y,
+                        double max_x, double max_y)
+{
+    box->min_x = MIN(box->min_x, min_x);
+    box->min_y = MIN(box->min_y, min_y);
+    box->max_x = MAX(box->max_x, max_x);
+    box->max_y = MAX(box->max_y, max_y);
+}
+
+/* The 2D equivalent of the surface area of a box, which the chance of a
+ * random ray hitting the box is proportional to */
+static PG_FORCE_INLINE double
+_pg_raycastbvh_box_area(pgRaycastBVHNode *box)
+{
+    return (box->max_x - box->min_x) + (box->max_y - box->min_y);
+}
+
+/* Reorders items[start:end] so that the item at nth has the nth smallest
+ * centroid on the axis, with the smaller ones before it and the larger ones
+ * after it. */
+static void
+_pg_raycastbvh_select(Py_ssize_t *items, double *centroids, int axis,
+                      Py_ssize_t start, Py_ssize_t end, Py_ssize_t nth)
+{
+    Py_ssize_t i, j, tmp;
+    double pivot;
+
+    while (end - start > 1) {
+        pivot = centroids[items[start + (end - start) / 2] * 2 + axis];
+        i = start;
+        j = end - 1;
+        while (i <= j) {
+            while (centroids[items[i] * 2 + axis] < pivot) {
+                i++;
+            }
+            while (centroids[items[j] * 2 + axis] > pivot) {
+                j--;
+            }
+            if (i <= j) {
+                tmp = items[i];
+                items[i] = items[j];
+                items[j] = tmp;
+                i++;
+                j--;
+            }
+        }
+
+        if (nth <= j) {
+            end = j + 1;
+        }
+        else if (nth >= i) {
+            start = i;
+        }
+        else {
+            return;
+        }
+    }
+}
+
+/*
+ * Finds where to split items[start:end] with a binned surface area
+ * heuristic, reordering the items so that the ones of the first child come
+ * first.
+ *
+ * the index of the first item of the second child, which is start or end if
+ * no split was found
+ */
+static Py_ssize_t
+_pg_raycastbvh_split_sah(pgRaycastBVHObject *self, double *centroids, int axis,
+                         double c_min, double c_max, Py_ssize_t start,
+                         Py_ssize_t end)
+{
+    pgRaycastBVHNode bins[PG_RAYCASTBVH_BINS], box;
+    double right_area[PG_RAYCASTBVH_BINS];
+    Py_ssize_t right_count[PG_RAYCASTBVH_BINS];
+    double scale = PG_RAYCASTBVH_BINS / (c_max - c_min);
+    double cost, best_cost = DBL_MAX;
+    Py_ssize_t i, j, count, best_bin = -1, tmp;
+    pgCollider *shape;
+    int bin;
+
+#define _PG_BVH_BIN(item)                                      \
+    MIN((int)((centroids[(item) * 2 + axis] - c_min) * scale), \
+        PG_RAYCASTBVH_BINS - 1)
+
+    for (bin = 0; bin < PG_RAYCASTBVH_BINS; bin++) {
+        _pg_raycastbvh_box_reset(&bins[bin]);
+    }
+    for (i = start; i < end; i++) {
+        shape = &self->shapes[self->items[i]];
+        bin = _PG_BVH_BIN(self->items[i]);
+        _pg_raycastbvh_box_grow(&bins[bin], shape->min_x, shape->min_y,
+                                shape->max_x, shape->max_y);
+        bins[bin].count++;
+    }
+
+    /* sweep from the right to get the cost of every second child... */
+    _pg_raycastbvh_box_reset(&box);
+    count = 0;
+    for (bin = PG_RAYCASTBVH_BINS - 1; bin > 0; bin--) {
+        if (bins[bin].count) {
+            _pg_raycastbvh_box_grow(&box, bins[bin].min_x, bins[bin].min_y,
+                                    bins[bin].max_x, bins[bin].max_y);
+            count += bins[bin].count;
+        }
+        right_area[bin] = count ? _pg_raycastbvh_box_area(&box) : 0;
+        right_count[bin] = count;
+    }
+
+    /* ...then from the left to find the cheapest split */
+    _pg_raycastbvh_box_reset(&box);
+    count = 0;
+    for (bin = 0; bin < PG_RAYCASTBVH_BINS - 1; bin++) {
+        if (bins[bin].count) {
+            _pg_raycastbvh_box_grow(&box, bins[bin].min_x, bins[bin].min_y,
+                                    bins[bin].max_x, bins[bin].max_y);
+            count += bins[bin].count;
+        }
+        if (!count || !right_count[bin + 1]) {
+            continue;
+        }
+        cost = _pg_raycastbvh_box_area(&box) * count +
+               right_area[bin + 1] * right_count[bin + 1];
+        if (cost < best_cost) {
+            best_cost = cost;
+            best_bin = bin;
+        }
+    }
+
+    if (best_bin == -1) {
+        return start;
+    }
+
+    /* move the items of the first child to the front */
+    for (i = start, j = end - 1; i <= j;) {
+        if (_PG_BVH_BIN(self->items[i]) <= best_bin) {
+            i++;
+        }
+        else {
+            tmp = self->items[i];
+            self->items[i] = self->items[j];
+            self->items[j--] = tmp;
+        }
+    }
+
+#undef _PG_BVH_BIN
+
+    return i;
+}
+
+static void
+_pg_raycastbvh_clear(pgRaycastBVHObject *self)
+{
+    Py_CLEAR(self->colliders);
+    pgCollider_Free(self->shapes, self->shapes_num);
+    PyMem_Free(self->nodes);
+    PyMem_Free(self->items);
+    self->shapes = NULL;
+    self->shapes_num = 0;
+    self->nodes = NULL;
+    self->nodes_num = 0;
+    self->items = NULL;
+    self->depth = 0;
+}
+
+/*
+ * Builds the tree of the colliders of a RaycastBVH top-down, splitting the
+ * nodes until they hold at most leaf_size colliders.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+_pg_raycastbvh_build(pgRaycastBVHObject *self)
+{
+    struct {
+        Py_ssize_t start, end, parent;
+        int depth;
+    } stack[PG_RAYCASTBVH_MAX_DEPTH + 1], task;
+    int stack_size = 0, axis;
+    double *centroids;
+    pgRaycastBVHNode *node, bounds;
+    pgCollider *shape;
+    Py_ssize_t i, index, mid;
+
+    if (!self->shapes_num) {
+        return 1;
+    }
+
+    self->nodes = PyMem_New(pgRaycastBVHNode, self->shapes_num * 2 - 1);
+    self->items = PyMem_New(Py_ssize_t, self->shapes_num);
+    centroids = PyMem_New(double, self->shapes_num * 2);
+    if (!self->nodes || !self->items || !centroids) {
+        PyMem_Free(centroids);
+        PyErr_NoMemory();
+        return 0;
+    }
+
+    for (i = 0; i < self->shapes_num; i++) {
+        shape = &self->shapes[i];
+        self->items[i] = i;
+        centroids[i * 2] = (shape->min_x + shape->max_x) / 2;
+        centroids[i * 2 + 1] = (shape->min_y + shape->max_y) / 2;
+    }
+
+    stack[stack_size].start = 0;
+    stack[stack_size].end = self->shapes_num;
+    stack[stack_size].parent = -1;
+    stack[stack_size++].depth = 0;
+
+    while (stack_size) {
+        task = stack[--stack_size];
+        index = self->nodes_num++;
+        node = &self->nodes[index];
+        self->depth = MAX(self->depth, task.depth);
+
+        /* the first child always follows its parent, only the second one
+         * has to be linked */
+        if (task.parent != -1) {
+            self->nodes[task.parent].offset = index;
+        }
+
+        _pg_raycastbvh_box_reset(node);
+        _pg_raycastbvh_box_reset(&bounds);
+        for (i = task.start; i < task.end; i++) {
+            shape = &self->shapes[self->items[i]];
+            _pg_raycastbvh_box_grow(node, shape->min_x, shape->min_y,
+                                    shape->max_x, shape->max_y);
+            _pg_raycastbvh_box_grow(&bounds, centroids[self->items[i] * 2],
+                                    centroids[self->items[i] * 2 + 1],
+                                    centroids[self->items[i] * 2],
+                                    centroids[self->items[i] * 2 + 1]);
+        }
+
+        if (task.end - task.start <= self->leaf_size) {
+            node->offset = task.start;
+            node->count = task.end - task.start;
+            continue;
+        }
+
+        axis = bounds.max_x - bounds.min_x < bounds.max_y - bounds.min_y;
+        mid = task.start;
+        if (task.depth < PG_RAYCASTBVH_SAH_DEPTH &&
+            (axis ? bounds.max_y > bounds.min_y
+                  : bounds.max_x > bounds.min_x)) {
+            mid = _pg_raycastbvh_split_sah(
+                self, centroids, axis, axis ? bounds.min_y : bounds.min_x,
+                axis ? bounds.max_y : bounds.max_x, task.start, task.end);
+        }
+        if (mid == task.start || mid == task.end) {
+            mid = task.start + (task.end - task.start) / 2;
+            _pg_raycastbvh_select(self->items, centroids, axis, task.start,
+                                  task.end, mid);
+        }
+
+        node->count = 0;
+
+        stack[stack_size].start = mid;
+        stack[stack_size].end = task.end;
+        stack[stack_size].parent = index;
+        stack[stack_size++].depth = task.depth + 1;
+
+        stack[stack_size].start = task.start;
+        stack[stack_size].end = mid;
+        stack[stack_size].parent = -1;
+        stack[stack_size++].depth = task.depth + 1;
+    }
+
+    PyMem_Free(centroids);
+
+    return 1;
+}
+
+/*
+ * Finds the closest hit of a ray against the colliders of a BVH, visiting
+ * the nodes front to back and skipping the ones that start after the
+ * closest hit found so far. Colliders whose layer bits don't intersect the
+ * mask are skipped when layers isn't NULL. Gives the same result as testing
+ * every collider in order.
+ * When cast isn't NULL its shape is swept along the ray instead, the node
+ * boxes being grown by the extent of the shape.
+ */
+static void
+pgRaycastBVH_Raycast(pgRaycastBVHObject *bvh, pgLineBase *ray,
+                     pgCastShape *cast, double max_t, Uint32 *layers,
+                     Uint32 mask, double *record_t, Py_ssize_t *record_index)
+{
+    Py_ssize_t stack[PG_RAYCASTBVH_MAX_DEPTH + 1];
+    double stack_t[PG_RAYCASTBVH_MAX_DEPTH + 1];
+    double margins[4] = {0, 0, 0, 0};
+    pgRaycastBVHNode *node, *first, *second;
+    Py_ssize_t i, index, near, far;
+    double t, first_t, second_t, temp_t;
+    int stack_size = 0, first_hit, second_hit;
+    pgRayBase slab;
+
+    *record_t = max_t;
+    *record_index = -1;
+
+    if (cast) {
+        pgCastShape_Margins(cast, ray, margins);
+    }
+
+    /* the inverse of the ray's direction is shared by every node test */
+    pgRay_FromLine(ray, max_t, &slab);
+
+    node = bvh->nodes;
+    if (!bvh->nodes_num ||
+        !pgRaycast_RayAABB(&slab, node->min_x - margins[0],
+                           node->min_y - margins[1], node->max_x + margins[2],
+                           node->max_y + margins[3], max_t, &t)) {
+        return;
+    }
+    stack[stack_size] = 0;
+    stack_t[stack_size++] = t;
+
+    while (stack_size) {
+        stack_size--;
+        /* the node starts after the closest hit found since it was pushed */
+        if (stack_t[stack_size] > *record_t) {
+            continue;
+        }
+        node = &bvh->nodes[stack[stack_size]];
+
+        if (node->count) {
+            for (i = node->offset; i < node->offset + node->count; i++) {
+                index = bvh->items[i];
+                if (layers && !(layers[index] & mask)) {
+                    continue;
+                }
+                if (cast
+                        ? !pgCastShape_Collider(cast, ray, &bvh->shapes[index],
+                                                *record_t, &temp_t)
+                        : !pgRaycast_LineCollider(ray, &bvh->shapes[index],
+                                                  *record_t, &temp_t)) {
+                    continue;
+                }
+                /* on ties keep the collider that comes first in the
+                 * sequence */
+                if (temp_t < *record_t ||
+                    (temp_t == *record_t && *record_index != -1 &&
+                     index < *record_index)) {
+                    *record_t = temp_t;
+                    *record_index = index;
+                }
+            }
+            continue;
+        }
+
+        first = node + 1;
+        second = &bvh->nodes[node->offset];
+        first_hit = pgRaycast_RayAABB(
+            &slab, first->min_x - margins[0], first->min_y - margins[1],
+            first->max_x + margins[2], first->max_y + margins[3], *record_t,
+            &first_t);
+        second_hit = pgRaycast_RayAABB(
+            &slab, second->min_x - margins[0], second->min_y - margins[1],
+            second->max_x + margins[2], second->max_y + margins[3], *record_t,
+            &second_t);
+
+        /* push the farthest child first so the nearest one is visited
+         * first */
+        if (first_hit && second_hit) {
+            near = first - bvh->nodes;
+            far = node->offset;
+            if (second_t < first_t) {
+                near = node->offset;
+                far = first - bvh->nodes;
+                t = first_t;
+                first_t = second_t;
+                second_t = t;
+            }
+            stack[stack_size] = far;
+            stack_t[stack_size++] = second_t;
+            stack[stack_size] = near;
+            stack_t[stack_size++] = first_t;
+        }
+        else if (first_hit) {
+            stack[stack_size] = first - bvh->nodes;
+            stack_t[stack_size++] = first_t;
+        }
+        else if (second_hit) {
+            stack[stack_size] = node->offset;
+            stack_t[stack_size++] = second_t;
+        }
+    }
+}
+
+static PyObject *
+pg_raycastbvh_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
+{
+    pgRaycastBVHObject *self = (pgRaycastBVHObject *)type->tp_alloc(type, 0);
+
+    if (self) {
+        self->colliders = NULL;
+        self->shapes = NULL;
+        self->shapes_num = 0;
+        self->nodes = NULL;
+        self->nodes_num = 0;
+        self->items = NULL;
+        self->leaf_size = 4;
+        self->depth = 0;
+        self->busy = 0;
+        self->weakreflist = NULL;
+    }
+
+    return (PyObject *)self;
+}
+
+static int
+pg_raycastbvh_init(pgRaycastBVHObject *self, PyObject *args, PyObject *kwds)
+{
+    static char *keywords[] = {"colliders", "leaf_size", NULL};
+    PyObject *colliders;
+    Py_ssize_t leaf_size = 4;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|n:RaycastBVH", keywords,
+                                     &colliders, &leaf_size)) {
+        return -1;
+    }
+
+    if (leaf_size < 1) {
+        PyErr_SetString(PyExc_ValueError,
+                        "leaf_size must be a positive integer");
+        return -1;
+    }
+
+    if (!PySequence_FAST_CHECK(colliders)) {
+        PyErr_SetString(PyExc_TypeError,
+                        "colliders parameter must be a sequence");
+        return -1;
+    }
+
+    if (self->busy) {
+        PyErr_SetString(PyExc_RuntimeError,
+                        "cannot reinitialize a RaycastBVH while it is being "
+                        "raycast by another thread");
+        return -1;
+    }
+
+    _pg_raycastbvh_clear(self);
+    self->leaf_size = leaf_size;
+
+    if (!(self->colliders = PySequence_Tuple(colliders))) {
+        return -1;
+    }
+    if (!(self->shapes =
+              pgCollider_FromSequence(PySequence_Fast_ITEMS(self->colliders),
+                                      PyTuple_GET_SIZE(self->colliders)))) {
+        _pg_raycastbvh_clear(self);
+        return -1;
+    }
+    self->shapes_num = PyTuple_GET_SIZE(self->colliders);
+
+    if (!_pg_raycastbvh_build(self)) {
+        _pg_raycastbvh_clear(self);
+        return -1;
+    }
+
+    return 0;
+}
+
+static void
+pg_raycastbvh_dealloc(pgRaycastBVHObject *self)
+{
+    if (self->weakreflist != NULL) {
+        PyObject_ClearWeakRefs((PyObject *)self);
+    }
+
+    _pg_raycastbvh_clear(self);
+
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+static PyObject *
+pg_raycastbvh_repr(pgRaycastBVHObject *self)
+{
+    return PyUnicode_FromFormat("<RaycastBVH(%zd colliders, depth=%d)>",
+                                self->shapes_num, self->depth);
+}
+
+static Py_ssize_t
+pg_raycastbvh_len(pgRaycastBVHObject *self)
+{
+    return self->shapes_num;
+}
+
+static PyObject *
+pg_raycastbvh_get_colliders(pgRaycastBVHObject *self, void *closure)
+{
+    if (!self->colliders) {
+        return PyTuple_New(0);
+    }
+    Py_INCREF(self->colliders);
+    return self->colliders;
+}
+
+static PyObject *
+pg_raycastbvh_get_leaf_size(pgRaycastBVHObject *self, void *closure)
+{
+    return PyLong_FromSsize_t(self->leaf_size);
+}
+
+static PyObject *
+pg_raycastbvh_get_depth(pgRaycastBVHObject *self, void *closure)
+{
+    return PyLong_FromLong(self->depth);
+}
+
+static PyGetSetDef pg_raycastbvh_getsets[] = {
+    {"colliders", (getter)pg_raycastbvh_get_colliders, NULL,
+     "The colliders the tree was built from", NULL},
+    {"leaf_size", (getter)pg_raycastbvh_get_leaf_size, NULL,
+     "The highest number of colliders in a leaf of the tree", NULL},
+    {"depth", (getter)pg_raycastbvh_get_depth, NULL,
+     "The depth of the deepest leaf of the tree", NULL},
+    {NULL, 0, NULL, NULL, NULL} /* Sentinel */
+};
+
+static PySequenceMethods pg_raycastbvh_as_sequence = {
+    .sq_length = (lenfunc)pg_raycastbvh_len,
+};
+
+static PyTypeObject pgRaycastBVH_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0).tp_name = "pygame.RaycastBVH",
+    .tp_basicsize = sizeof(pgRaycastBVHObject),
+    .tp_dealloc = (destructor)pg_raycastbvh_dealloc,
+    .tp_repr = (reprfunc)pg_raycastbvh_repr,
+    .tp_as_sequence = &pg_raycastbvh_as_sequence,
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_doc = NULL,
+    .tp_weaklistoffset = offsetof(pgRaycastBVHObject, weakreflist),
+    .tp_getset = pg_raycastbvh_getsets,
+    .tp_init = (initproc)pg_raycastbvh_init,
+    .tp_new = pg_raycastbvh_new,
+};
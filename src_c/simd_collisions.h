@@ -1,3 +1,6 @@
+#ifndef _SIMD_COLLISIONS_H
+#define _SIMD_COLLISIONS_H
+
 #include "include/pygame.h"
 #include "include/collisions.h"
 #include <stdio.h>
@@ -29,7 +32,25 @@ pgIntersection_LineRect_avx2(pgLineBase *line, SDL_Rect *rect, double *X,
                              double *Y, double *T);
 PG_FORCEINLINE static int
 pgCollision_RectLine_avx2(SDL_Rect *rect, pgLineBase *line);
-PG_FORCEINLINE static int
-pgRaycast_LineRect_avx2(pgLineBase *line, SDL_Rect *rect, double max_t,
-                        double *T);
-#endif
\ No newline at end of file
+#endif
+
+#if AVX2_IS_SUPPORTED
+/* Four rays, one per lane, along with the inverses of the components of
+ * their directions, 0 for null components */
+typedef struct {
+    __m256d xa, ya, xb, yb;
+    __m256d inv_dx, inv_dy;
+} pgRayPacket;
+
+PG_FORCEINLINE static __m256d
+pgRaycast_PacketLine_avx2(pgRayPacket *packet, pgLineBase *line, __m256d max_t,
+                          __m256d *T);
+PG_FORCEINLINE static __m256d
+pgRaycast_PacketRect_avx2(pgRayPacket *packet, SDL_Rect *rect, __m256d max_t,
+                          __m256d *T);
+PG_FORCEINLINE static __m256d
+pgRaycast_PacketCircle_avx2(pgRayPacket *packet, pgCircleBase *circle,
+                            __m256d max_t, __m256d *T);
+#endif /* ~AVX2_IS_SUPPORTED */
+
+#endif /* ~_SIMD_COLLISIONS_H */
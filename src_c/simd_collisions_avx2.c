@@ -216,88 +216,185 @@ pgCollision_RectLine_avx2(SDL_Rect *rect, pgLineBase *line)
     return _mm256_movemask_pd(t_u_256d) != 0x0;
 }
 
-PG_FORCEINLINE static int
-pgRaycast_LineRect_avx2(pgLineBase *line, SDL_Rect *rect, double max_t,
-                        double *T)
+/* The packet functions cast the four rays of a packet against a single
+ * collider. They return a mask of the lanes that hit the collider and set
+ * the t values of these lanes in T, computing them with the same operations
+ * as the scalar functions so that both give the exact same results. */
+
+PG_FORCEINLINE static __m256d
+pgRaycast_PacketLine_avx2(pgRayPacket *packet, pgLineBase *line, __m256d max_t,
+                          __m256d *T)
 {
-    double Rx = (double)rect->x;
-    double Ry = (double)rect->y;
-    double Rw = (double)rect->w;
-    double Rh = (double)rect->h;
-
-    // here we start to setup the variables
-    __m256d x1_256d = _mm256_set1_pd(line->xa);
-    __m256d y1_256d = _mm256_set1_pd(line->ya);
-    __m256d x2_256d = _mm256_set1_pd(line->xb);
-    __m256d y2_256d = _mm256_set1_pd(line->yb);
-    __m256d x3_256d = _mm256_set_pd(Rx, Rx, Rx, Rx + Rw);
-    __m256d y3_256d = _mm256_set_pd(Ry, Ry, Ry + Rh, Ry);
-    __m256d x4_256d = _mm256_set_pd(Rx + Rw, Rx, Rx + Rw, Rx + Rw);
-    __m256d y4_256d = _mm256_set_pd(Ry, Ry + Rh, Ry + Rh, Ry + Rh);
+    __m256d zeros_256d = _mm256_setzero_pd();
+    __m256d ones_256d = _mm256_set1_pd(1.0);
+    __m256d sign_256d = _mm256_set1_pd(-0.0);
+    __m256d x3_256d = _mm256_set1_pd(line->xa);
+    __m256d y3_256d = _mm256_set1_pd(line->ya);
+    __m256d y3_m_y4_256d = _mm256_set1_pd(line->ya - line->yb);
+    __m256d x3_m_x4_256d = _mm256_set1_pd(line->xa - line->xb);
 
-    // here we calculate the differences between the the coords of the points
-    __m256d x1_m_x2_256d = _mm256_sub_pd(x1_256d, x2_256d);
-    __m256d y3_m_y4_256d = _mm256_sub_pd(y3_256d, y4_256d);
-    __m256d y1_m_y2_256d = _mm256_sub_pd(y1_256d, y2_256d);
-    __m256d x3_m_x4_256d = _mm256_sub_pd(x3_256d, x4_256d);
+    __m256d x1_m_x2_256d = _mm256_sub_pd(packet->xa, packet->xb);
+    __m256d y1_m_y2_256d = _mm256_sub_pd(packet->ya, packet->yb);
 
-    // we calculate the denominator of the equations
     __m256d den_256d =
         _mm256_sub_pd(_mm256_mul_pd(x1_m_x2_256d, y3_m_y4_256d),
                       _mm256_mul_pd(y1_m_y2_256d, x3_m_x4_256d));
 
-    // if the denominator is 0 then the line is parallel to the other line
-    // in this occasion this can't be true here as a line will never be
-    // parallel to all four sides of a rectangle
-    __m256d den_zero_256d =
-        _mm256_cmp_pd(den_256d, _mm256_setzero_pd(), _CMP_EQ_OQ);
-
-    // we dont want to cause any floating point errors by dividing by 0
-    // so we set the ones that are equal to 0 to 1
-    den_256d = _mm256_or_pd(den_zero_256d, den_256d);
+    __m256d x1_m_x3_256d = _mm256_sub_pd(packet->xa, x3_256d);
+    __m256d y1_m_y3_256d = _mm256_sub_pd(packet->ya, y3_256d);
 
-    // we calculate the rest of the differences between the coords of the
-    // points
-    __m256d x1_m_x3_256d = _mm256_sub_pd(x1_256d, x3_256d);
-    __m256d y1_m_y3_256d = _mm256_sub_pd(y1_256d, y3_256d);
-
-    // calculate the t values
+    // the lanes where the denominator is 0 are masked out below, so the
+    // infinities and NaNs the divisions give there don't matter
     __m256d t_256d = _mm256_sub_pd(_mm256_mul_pd(x1_m_x3_256d, y3_m_y4_256d),
                                    _mm256_mul_pd(y1_m_y3_256d, x3_m_x4_256d));
     t_256d = _mm256_div_pd(t_256d, den_256d);
 
-    // calculate the u values
     __m256d u_256d = _mm256_sub_pd(_mm256_mul_pd(x1_m_x2_256d, y1_m_y3_256d),
                                    _mm256_mul_pd(y1_m_y2_256d, x1_m_x3_256d));
-    u_256d =
-        _mm256_mul_pd(_mm256_div_pd(u_256d, den_256d), _mm256_set1_pd(-1.0));
+    u_256d = _mm256_div_pd(u_256d, _mm256_xor_pd(den_256d, sign_256d));
 
-    // we check this condition t >= 0 && t <= max_t && u >= 0 && u <= 1
-    __m256d ones_256d = _mm256_set1_pd(1.0);
-    __m256d zeros_256d = _mm256_set1_pd(0.0);
-    __m256d t_zero_256d = _mm256_cmp_pd(t_256d, zeros_256d, _CMP_GE_OQ);
-    __m256d t_one_256d =
-        _mm256_cmp_pd(t_256d, _mm256_set1_pd(max_t), _CMP_LE_OQ);
-    __m256d u_zero_256d = _mm256_cmp_pd(u_256d, zeros_256d, _CMP_GE_OQ);
-    __m256d u_one_256d = _mm256_cmp_pd(u_256d, ones_256d, _CMP_LE_OQ);
-    __m256d condition_256d =
-        _mm256_and_pd(_mm256_and_pd(t_zero_256d, t_one_256d),
-                      _mm256_and_pd(u_zero_256d, u_one_256d));
+    // den != 0 && t >= 0 && u >= 0 && u <= 1 && t <= max_t
+    __m256d condition_256d = _mm256_and_pd(
+        _mm256_and_pd(_mm256_cmp_pd(den_256d, zeros_256d, _CMP_NEQ_OQ),
+                      _mm256_cmp_pd(t_256d, zeros_256d, _CMP_GE_OQ)),
+        _mm256_and_pd(
+            _mm256_and_pd(_mm256_cmp_pd(u_256d, zeros_256d, _CMP_GE_OQ),
+                          _mm256_cmp_pd(u_256d, ones_256d, _CMP_LE_OQ)),
+            _mm256_cmp_pd(t_256d, max_t, _CMP_LE_OQ)));
 
-    // if no lines touch the rectangle then this will be false
-    if (_mm256_movemask_pd(condition_256d) == 0x0) {
-        return 0;
-    }
+    *T = t_256d;
 
-    __m256d blended_256d =
-        _mm256_blendv_pd(_mm256_set1_pd(DBL_MAX), t_256d, condition_256d);
-
-    __m128d min_256d = _mm_min_pd(_mm256_extractf128_pd(blended_256d, 0),
-                                  _mm256_extractf128_pd(blended_256d, 1));
-    double *min_ptr = (double *)&min_256d;
+    return condition_256d;
+}
 
-    *T = min_ptr[0] < min_ptr[1] ? min_ptr[0] : min_ptr[1];
+PG_FORCEINLINE static __m256d
+pgRaycast_PacketRect_avx2(pgRayPacket *packet, SDL_Rect *rect, __m256d max_t,
+                          __m256d *T)
+{
+    double x = (double)rect->x;
+    double y = (double)rect->y;
+    double w = (double)rect->w;
+    double h = (double)rect->h;
+
+    __m256d zeros_256d = _mm256_setzero_pd();
+    __m256d all_256d = _mm256_castsi256_pd(_mm256_set1_epi64x(-1));
+    __m256d min_x_256d = _mm256_set1_pd(MIN(x, x + w));
+    __m256d max_x_256d = _mm256_set1_pd(MAX(x, x + w));
+    __m256d min_y_256d = _mm256_set1_pd(MIN(y, y + h));
+    __m256d max_y_256d = _mm256_set1_pd(MAX(y, y + h));
+
+    // the slabs of the lanes with a null direction component are unbounded
+    // as long as their origin is between the sides of the rect
+    __m256d dx_zero_256d =
+        _mm256_cmp_pd(packet->inv_dx, zeros_256d, _CMP_EQ_OQ);
+    __m256d dy_zero_256d =
+        _mm256_cmp_pd(packet->inv_dy, zeros_256d, _CMP_EQ_OQ);
+    __m256d inside_x_256d =
+        _mm256_and_pd(_mm256_cmp_pd(packet->xa, min_x_256d, _CMP_GE_OQ),
+                      _mm256_cmp_pd(packet->xa, max_x_256d, _CMP_LE_OQ));
+    __m256d inside_y_256d =
+        _mm256_and_pd(_mm256_cmp_pd(packet->ya, min_y_256d, _CMP_GE_OQ),
+                      _mm256_cmp_pd(packet->ya, max_y_256d, _CMP_LE_OQ));
+
+    __m256d t1_256d =
+        _mm256_mul_pd(_mm256_sub_pd(min_x_256d, packet->xa), packet->inv_dx);
+    __m256d t2_256d =
+        _mm256_mul_pd(_mm256_sub_pd(max_x_256d, packet->xa), packet->inv_dx);
+    __m256d tx_min_256d =
+        _mm256_blendv_pd(_mm256_min_pd(t1_256d, t2_256d),
+                         _mm256_set1_pd(-DBL_MAX), dx_zero_256d);
+    __m256d tx_max_256d =
+        _mm256_blendv_pd(_mm256_max_pd(t1_256d, t2_256d),
+                         _mm256_set1_pd(DBL_MAX), dx_zero_256d);
+
+    t1_256d =
+        _mm256_mul_pd(_mm256_sub_pd(min_y_256d, packet->ya), packet->inv_dy);
+    t2_256d =
+        _mm256_mul_pd(_mm256_sub_pd(max_y_256d, packet->ya), packet->inv_dy);
+    __m256d ty_min_256d =
+        _mm256_blendv_pd(_mm256_min_pd(t1_256d, t2_256d),
+                         _mm256_set1_pd(-DBL_MAX), dy_zero_256d);
+    __m256d ty_max_256d =
+        _mm256_blendv_pd(_mm256_max_pd(t1_256d, t2_256d),
+                         _mm256_set1_pd(DBL_MAX), dy_zero_256d);
+
+    __m256d t_enter_256d = _mm256_max_pd(tx_min_256d, ty_min_256d);
+    __m256d t_exit_256d = _mm256_min_pd(tx_max_256d, ty_max_256d);
+
+    // use the exit point of the rect when the ray starts inside of it
+    __m256d t_256d =
+        _mm256_blendv_pd(t_enter_256d, t_exit_256d,
+                         _mm256_cmp_pd(t_enter_256d, zeros_256d, _CMP_LT_OQ));
+
+    // lanes with a null direction component whose origin is outside of the
+    // rect's sides miss it
+    __m256d valid_256d = _mm256_and_pd(
+        _mm256_or_pd(_mm256_xor_pd(dx_zero_256d, all_256d), inside_x_256d),
+        _mm256_or_pd(_mm256_xor_pd(dy_zero_256d, all_256d), inside_y_256d));
+
+    // t_enter <= t_exit && t >= 0 && t <= max_t
+    __m256d condition_256d = _mm256_and_pd(
+        _mm256_and_pd(valid_256d,
+                      _mm256_cmp_pd(t_enter_256d, t_exit_256d, _CMP_LE_OQ)),
+        _mm256_and_pd(_mm256_cmp_pd(t_256d, zeros_256d, _CMP_GE_OQ),
+                      _mm256_cmp_pd(t_256d, max_t, _CMP_LE_OQ)));
+
+    *T = t_256d;
+
+    return condition_256d;
+}
 
-    return 1;
+PG_FORCEINLINE static __m256d
+pgRaycast_PacketCircle_avx2(pgRayPacket *packet, pgCircleBase *circle,
+                            __m256d max_t, __m256d *T)
+{
+    __m256d zeros_256d = _mm256_setzero_pd();
+    __m256d xc_256d = _mm256_set1_pd(circle->x);
+    __m256d yc_256d = _mm256_set1_pd(circle->y);
+    __m256d r_sqr_256d = _mm256_set1_pd(circle->r * circle->r);
+
+    __m256d x1_m_xc_256d = _mm256_sub_pd(packet->xa, xc_256d);
+    __m256d y1_m_yc_256d = _mm256_sub_pd(packet->ya, yc_256d);
+
+    __m256d dx_256d = _mm256_sub_pd(packet->xb, packet->xa);
+    __m256d dy_256d = _mm256_sub_pd(packet->yb, packet->ya);
+
+    __m256d A_256d = _mm256_add_pd(_mm256_mul_pd(dx_256d, dx_256d),
+                                   _mm256_mul_pd(dy_256d, dy_256d));
+    __m256d B_256d =
+        _mm256_mul_pd(_mm256_set1_pd(2.0),
+                      _mm256_add_pd(_mm256_mul_pd(dx_256d, x1_m_xc_256d),
+                                    _mm256_mul_pd(dy_256d, y1_m_yc_256d)));
+    __m256d C_256d =
+        _mm256_sub_pd(_mm256_add_pd(_mm256_mul_pd(x1_m_xc_256d, x1_m_xc_256d),
+                                    _mm256_mul_pd(y1_m_yc_256d, y1_m_yc_256d)),
+                      r_sqr_256d);
+
+    __m256d discriminant_256d = _mm256_sub_pd(
+        _mm256_mul_pd(B_256d, B_256d),
+        _mm256_mul_pd(_mm256_mul_pd(_mm256_set1_pd(4.0), A_256d), C_256d));
+
+    // the lanes with a negative discriminant are masked out below
+    __m256d sqrt_d_256d = _mm256_sqrt_pd(discriminant_256d);
+    __m256d minus_b_256d = _mm256_xor_pd(B_256d, _mm256_set1_pd(-0.0));
+    __m256d two_a_256d = _mm256_mul_pd(_mm256_set1_pd(2.0), A_256d);
+
+    // use the exit point of the circle when the ray starts inside of it
+    __m256d t_256d =
+        _mm256_div_pd(_mm256_sub_pd(minus_b_256d, sqrt_d_256d), two_a_256d);
+    __m256d t2_256d =
+        _mm256_div_pd(_mm256_add_pd(minus_b_256d, sqrt_d_256d), two_a_256d);
+    t_256d = _mm256_blendv_pd(t_256d, t2_256d,
+                              _mm256_cmp_pd(t_256d, zeros_256d, _CMP_LT_OQ));
+
+    // discriminant >= 0 && t >= 0 && t <= max_t
+    __m256d condition_256d = _mm256_and_pd(
+        _mm256_cmp_pd(discriminant_256d, zeros_256d, _CMP_GE_OQ),
+        _mm256_and_pd(_mm256_cmp_pd(t_256d, zeros_256d, _CMP_GE_OQ),
+                      _mm256_cmp_pd(t_256d, max_t, _CMP_LE_OQ)));
+
+    *T = t_256d;
+
+    return condition_256d;
 }
 #endif /* ~AVX2_IS_SUPPORTED */
@@ -0,0 +1,733 @@
+#include "include/geometry.h"
+#include "include/collisions.h"
+
+/* Number of segments the visible arc of a circle is approximated with */
+#define PG_VISIBILITY_CIRCLE_SEGMENTS 16
+
+/* The segments blocking the view from the origin */
+typedef struct {
+    pgLineBase *items;
+    Py_ssize_t length, capacity;
+} pgVisibilitySegments;
+
+/* The angular span of a segment seen from the origin, going counterclockwise
+ * from start to end. slot is the position of the segment in the list of
+ * segments crossed by the current ray, or -1 if it isn't crossed. */
+typedef struct {
+    double start, end;
+    Py_ssize_t slot;
+} pgVisibilitySpan;
+
+/* The points where the segments crossed by a ray can change */
+typedef struct {
+    double angle, x, y;
+    /* the segments the point belongs to, seg_b being -1 for endpoints */
+    Py_ssize_t seg_a, seg_b;
+    /* 1 if the point starts seg_a, -1 if it ends it, 0 for crossings */
+    int kind;
+} pgVisibilityEvent;
+
+static int
+_pg_visibility_event_compare(const void *a, const void *b)
+{
+    double angle_a = ((const pgVisibilityEvent *)a)->angle;
+    double angle_b = ((const pgVisibilityEvent *)b)->angle;
+
+    return (angle_a > angle_b) - (angle_a < angle_b);
+}
+
+/*
+ * Adds a segment to the list, ignoring the ones of length 0.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+_pg_visibility_add_segment(pgVisibilitySegments *segments, double xa,
+                           double ya, double xb, double yb)
+{
+    pgLineBase *items;
+    Py_ssize_t capacity;
+
+    if (xa == xb && ya == yb) {
+        return 1;
+    }
+
+    if (segments->length == segments->capacity) {
+        capacity = MAX(segments->capacity * 2, 64);
+        items = PyMem_Realloc(segments->items, capacity * sizeof(pgLineBase));
+        if (!items) {
+            PyErr_NoMemory();
+            return 0;
+        }
+        segments->items = items;
+        segments->capacity = capacity;
+    }
+
+    segments->items[segments->length].xa = xa;
+    segments->items[segments->length].ya = ya;
+    segments->items[segments->length].xb = xb;
+    segments->items[segments->length].yb = yb;
+    segments->length++;
+
+    return 1;
+}
+
+/*
+ * Adds the edges of a collider to the list. The arc of a circle facing the
+ * origin is approximated with segments going through its tangent points.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+_pg_visibility_add_collider(pgVisibilitySegments *segments,
+                            pgCollider *collider, double ox, double oy)
+{
+    Py_ssize_t i, j;
+
+    switch (collider->type) {
+        case PG_COLLIDER_LINE: {
+            pgLineBase *line = &collider->shape.line;
+            return _pg_visibility_add_segment(segments, line->xa, line->ya,
+                                              line->xb, line->yb);
+        }
+        case PG_COLLIDER_RECT: {
+            double x = collider->min_x, y = collider->min_y;
+            double x2 = collider->max_x, y2 = collider->max_y;
+            return _pg_visibility_add_segment(segments, x, y, x2, y) &&
+                   _pg_visibility_add_segment(segments, x2, y, x2, y2) &&
+                   _pg_visibility_add_segment(segments, x2, y2, x, y2) &&
+                   _pg_visibility_add_segment(segments, x, y2, x, y);
+        }
+        case PG_COLLIDER_POLYGON: {
+            pgPolygonBase *poly = &collider->shape.polygon;
+            double *vertices = poly->vertices;
+            for (i = 0, j = poly->verts_num - 1; i < poly->verts_num;
+                 j = i++) {
+                if (!_pg_visibility_add_segment(
+                        segments, vertices[j * 2], vertices[j * 2 + 1],
+                        vertices[i * 2], vertices[i * 2 + 1])) {
+                    return 0;
+                }
+            }
+            return 1;
+        }
+        case PG_COLLIDER_CIRCLE: {
+            pgCircleBase *circle = &collider->shape.circle;
+            double dx = ox - circle->x, dy = oy - circle->y;
+            double dist = sqrt(dx * dx + dy * dy);
+            double start, span, angle, x, y, prev_x, prev_y, first_x, first_y;
+            Py_ssize_t count;
+
+            if (dist <= circle->r) {
+                /* the origin is inside of the circle, all of it is visible */
+                start = 0;
+                span = 2 * M_PI;
+                count = PG_VISIBILITY_CIRCLE_SEGMENTS * 2;
+            }
+            else {
+                span = 2 * acos(circle->r / dist);
+                start = atan2(dy, dx) - span / 2;
+                count = PG_VISIBILITY_CIRCLE_SEGMENTS;
+            }
+
+            first_x = prev_x = circle->x + circle->r * cos(start);
+            first_y = prev_y = circle->y + circle->r * sin(start);
+            for (i = 1; i <= count; i++) {
+                angle = start + span * i / count;
+                x = circle->x + circle->r * cos(angle);
+                y = circle->y + circle->r * sin(angle);
+                /* close the circle exactly so no light leaks through it */
+                if (i == count && span == 2 * M_PI) {
+                    x = first_x;
+                    y = first_y;
+                }
+                if (!_pg_visibility_add_segment(segments, prev_x, prev_y, x,
+                                                y)) {
+                    return 0;
+                }
+                prev_x = x;
+                prev_y = y;
+            }
+            return 1;
+        }
+    }
+
+    return 1;
+}
+
+/*
+ * Adds an event to the list, growing it if needed.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+_pg_visibility_add_event(pgVisibilityEvent **events, Py_ssize_t *length,
+                         Py_ssize_t *capacity, double ox, double oy, double x,
+                         double y, Py_ssize_t seg_a, Py_ssize_t seg_b,
+                         int kind)
+{
+    pgVisibilityEvent *items;
+
+    if (*length == *capacity) {
+        *capacity = MAX(*capacity * 2, 64);
+        items = PyMem_Realloc(*events, *capacity * sizeof(pgVisibilityEvent));
+        if (!items) {
+            PyErr_NoMemory();
+            return 0;
+        }
+        *events = items;
+    }
+
+    (*events)[*length].angle = atan2(y - oy, x - ox);
+    (*events)[*length].x = x;
+    (*events)[*length].y = y;
+    (*events)[*length].seg_a = seg_a;
+    (*events)[*length].seg_b = seg_b;
+    (*events)[*length].kind = kind;
+    (*length)++;
+
+    return 1;
+}
+
+/* Finds the point of a segment in the direction of the events of a group,
+ * using the exact point of an event when the segment owns it. */
+static void
+_pg_visibility_point_at(pgLineBase *segment, Py_ssize_t index,
+                        pgVisibilityEvent *group, Py_ssize_t group_length,
+                        double ox, double oy, double *x, double *y)
+{
+    double dx = group->x - ox, dy = group->y - oy;
+    double ex = segment->xb - segment->xa, ey = segment->yb - segment->ya;
+    double den = dx * ey - dy * ex, t;
+    Py_ssize_t i;
+
+    for (i = 0; i < group_length; i++) {
+        if (group[i].seg_a == index || group[i].seg_b == index) {
+            *x = group[i].x;
+            *y = group[i].y;
+            return;
+        }
+    }
+
+    if (den == 0) {
+        *x = segment->xa;
+        *y = segment->ya;
+        return;
+    }
+
+    t = ((segment->xa - ox) * ey - (segment->ya - oy) * ex) / den;
+    *x = ox + t * dx;
+    *y = oy + t * dy;
+}
+
+/*
+ * Computes the polygon visible from an origin surrounded by segments, with
+ * an angular sweep: the rays going through the endpoints and crossings of
+ * the segments split the view into sectors in which the closest segment
+ * doesn't change. The segments crossed by the rays are kept up to date at
+ * every endpoint, so only them are tested to find the closest one of every
+ * sector. The vertices are the points where the closest segment changes.
+ *
+ * The vertices are stored in a new array of x, y pairs, which must be freed
+ * with PyMem_Free.
+ *
+ * sets the error messages
+ * the number of vertices if success
+ * -1 if it fails
+ */
+static Py_ssize_t
+pgVisibility_Polygon(pgVisibilitySegments *segments, double ox, double oy,
+                     double **vertices)
+{
+    pgVisibilityEvent *events = NULL;
+    pgVisibilitySpan *spans = NULL;
+    Py_ssize_t *groups = NULL, *nearest = NULL, *active = NULL;
+    Py_ssize_t events_num = 0, events_capacity = 0, groups_num = 0;
+    Py_ssize_t active_num = 0, verts_num = -1, i, j, g, s;
+    pgLineBase *a, *b;
+    double span, mid, mx, my, t, best_t, den, u;
+    double x, y, prev_x, prev_y;
+
+    *vertices = NULL;
+
+    spans = PyMem_New(pgVisibilitySpan, MAX(segments->length, 1));
+    active = PyMem_New(Py_ssize_t, MAX(segments->length, 1));
+    if (!spans || !active) {
+        PyErr_NoMemory();
+        goto end;
+    }
+
+    /* the endpoints, ordered counterclockwise around the origin */
+    for (i = 0; i < segments->length; i++) {
+        a = &segments->items[i];
+        spans[i].start = atan2(a->ya - oy, a->xa - ox);
+        spans[i].end = atan2(a->yb - oy, a->xb - ox);
+        spans[i].slot = -1;
+
+        span = spans[i].end - spans[i].start;
+        if (span > M_PI) {
+            span -= 2 * M_PI;
+        }
+        else if (span <= -M_PI) {
+            span += 2 * M_PI;
+        }
+
+        /* the segments pointing to the origin or going through it can't be
+         * the closest one of a sector */
+        if (span == 0 || span == M_PI) {
+            spans[i].end = spans[i].start;
+            continue;
+        }
+
+        if (!_pg_visibility_add_event(&events, &events_num, &events_capacity,
+                                      ox, oy, a->xa, a->ya, i, -1,
+                                      span > 0 ? 1 : -1) ||
+            !_pg_visibility_add_event(&events, &events_num, &events_capacity,
+                                      ox, oy, a->xb, a->yb, i, -1,
+                                      span > 0 ? -1 : 1)) {
+            goto end;
+        }
+        if (span < 0) {
+            t = spans[i].start;
+            spans[i].start = spans[i].end;
+            spans[i].end = t;
+        }
+    }
+
+    /* the crossings of the segments */
+    for (i = 0; i < segments->length; i++) {
+        a = &segments->items[i];
+        if (spans[i].start == spans[i].end) {
+            continue;
+        }
+        for (j = i + 1; j < segments->length; j++) {
+            b = &segments->items[j];
+            if (spans[j].start == spans[j].end ||
+                MAX(a->xa, a->xb) < MIN(b->xa, b->xb) ||
+                MAX(b->xa, b->xb) < MIN(a->xa, a->xb) ||
+                MAX(a->ya, a->yb) < MIN(b->ya, b->yb) ||
+                MAX(b->ya, b->yb) < MIN(a->ya, a->yb)) {
+                continue;
+            }
+
+            den = (a->xb - a->xa) * (b->yb - b->ya) -
+                  (a->yb - a->ya) * (b->xb - b->xa);
+            if (den == 0) {
+                continue;
+            }
+            t = ((b->xa - a->xa) * (b->yb - b->ya) -
+                 (b->ya - a->ya) * (b->xb - b->xa)) /
+                den;
+            u = ((b->xa - a->xa) * (a->yb - a->ya) -
+                 (b->ya - a->ya) * (a->xb - a->xa)) /
+                den;
+            if (t <= 0 || t >= 1 || u <= 0 || u >= 1) {
+                continue;
+            }
+
+            if (!_pg_visibility_add_event(
+                    &events, &events_num, &events_capacity, ox, oy,
+                    a->xa + t * (a->xb - a->xa), a->ya + t * (a->yb - a->ya),
+                    i, j, 0)) {
+                goto end;
+            }
+        }
+    }
+
+    if (events_num < 2) {
+        PyErr_SetString(PyExc_ValueError,
+                        "could not compute the visibility polygon");
+        goto end;
+    }
+
+    qsort(events, events_num, sizeof(pgVisibilityEvent),
+          _pg_visibility_event_compare);
+
+    /* group the events at the same angle, the sectors being between two
+     * consecutive groups */
+    groups = PyMem_New(Py_ssize_t, events_num + 1);
+    nearest = PyMem_New(Py_ssize_t, events_num);
+    if (!groups || !nearest) {
+        PyErr_NoMemory();
+        goto end;
+    }
+    for (i = 0; i < events_num; i++) {
+        if (!i || events[i].angle != events[i - 1].angle) {
+            groups[groups_num++] = i;
+        }
+    }
+    groups[groups_num] = events_num;
+
+    if (groups_num < 2) {
+        PyErr_SetString(PyExc_ValueError,
+                        "could not compute the visibility polygon");
+        goto end;
+    }
+
+    for (g = 0; g < groups_num; g++) {
+        if (g + 1 < groups_num) {
+            mid = (events[groups[g]].angle + events[groups[g + 1]].angle) / 2;
+        }
+        else {
+            mid = (events[groups[g]].angle + events[0].angle + 2 * M_PI) / 2;
+            if (mid > M_PI) {
+                mid -= 2 * M_PI;
+            }
+        }
+
+        if (!g) {
+            /* find the segments crossed by the first sector */
+            for (i = 0; i < segments->length; i++) {
+                if (spans[i].start == spans[i].end) {
+                    continue;
+                }
+                if (spans[i].start < spans[i].end
+                        ? spans[i].start < mid && mid < spans[i].end
+                        : spans[i].start < mid || mid < spans[i].end) {
+                    spans[i].slot = active_num;
+                    active[active_num++] = i;
+                }
+            }
+        }
+        else {
+            /* update them with the segments starting and ending here, the
+             * segments starting and ending at the same angle being skipped */
+            for (i = groups[g]; i < groups[g + 1]; i++) {
+                s = events[i].seg_a;
+                if (events[i].kind == 1 && spans[s].slot == -1) {
+                    spans[s].slot = active_num;
+                    active[active_num++] = s;
+                }
+            }
+            for (i = groups[g]; i < groups[g + 1]; i++) {
+                s = events[i].seg_a;
+                if (events[i].kind == -1 && spans[s].slot != -1) {
+                    active[spans[s].slot] = active[--active_num];
+                    spans[active[spans[s].slot]].slot = spans[s].slot;
+                    spans[s].slot = -1;
+                }
+            }
+        }
+
+        mx = cos(mid);
+        my = sin(mid);
+        best_t = DBL_MAX;
+        nearest[g] = -1;
+        for (i = 0; i < active_num; i++) {
+            a = &segments->items[active[i]];
+            den = mx * (a->yb - a->ya) - my * (a->xb - a->xa);
+            if (den == 0) {
+                continue;
+            }
+            t = ((a->xa - ox) * (a->yb - a->ya) -
+                 (a->ya - oy) * (a->xb - a->xa)) /
+                den;
+            if (t > 0 && t < best_t) {
+                best_t = t;
+                nearest[g] = active[i];
+            }
+        }
+
+        if (nearest[g] == -1) {
+            PyErr_SetString(PyExc_ValueError,
+                            "could not compute the visibility polygon");
+            goto end;
+        }
+    }
+
+    /* the vertices are where the closest segment changes */
+    if (!(*vertices = PyMem_New(double, groups_num * 4))) {
+        PyErr_NoMemory();
+        goto end;
+    }
+    verts_num = 0;
+    for (g = 0; g < groups_num; g++) {
+        s = nearest[g ? g - 1 : groups_num - 1];
+        if (s == nearest[g]) {
+            continue;
+        }
+
+        _pg_visibility_point_at(&segments->items[s], s, &events[groups[g]],
+                                groups[g + 1] - groups[g], ox, oy, &prev_x,
+                                &prev_y);
+        _pg_visibility_point_at(&segments->items[nearest[g]], nearest[g],
+                                &events[groups[g]], groups[g + 1] - groups[g],
+                                ox, oy, &x, &y);
+
+        (*vertices)[verts_num * 2] = prev_x;
+        (*vertices)[verts_num * 2 + 1] = prev_y;
+        verts_num++;
+        if (x != prev_x || y != prev_y) {
+            (*vertices)[verts_num * 2] = x;
+            (*vertices)[verts_num * 2 + 1] = y;
+            verts_num++;
+        }
+    }
+
+    if (verts_num < 3) {
+        PyErr_SetString(PyExc_ValueError,
+                        "could not compute the visibility polygon");
+        PyMem_Free(*vertices);
+        *vertices = NULL;
+        verts_num = -1;
+    }
+
+end:
+    PyMem_Free(events);
+    PyMem_Free(spans);
+    PyMem_Free(groups);
+    PyMem_Free(nearest);
+    PyMem_Free(active);
+
+    return verts_num;
+}
+
+/* Number of angular sectors the colliders are sorted into around every
+ * point tested by pgVisibility_Matrix */
+#define PG_VISIBILITY_SECTORS 64
+/* Pseudo-angle by which the span of a collider is widened to absorb rounding
+ * errors */
+#define PG_VISIBILITY_SECTOR_EPSILON 1e-9
+/* Fraction of a segment within which a hit counts as touching one of its
+ * end points rather than blocking it */
+#define PG_VISIBILITY_ENDPOINT_EPSILON 1e-9
+
+/* A cheaper replacement for atan2 going from 0 to 4 over a full turn. It
+ * grows along with the angle of (x, y), and half a turn always adds 2. */
+static PG_FORCE_INLINE double
+_pg_visibility_pseudo_angle(double x, double y)
+{
+    double p = x / (fabs(x) + fabs(y));
+
+    return y < 0 ? 3 + p : 1 - p;
+}
+
+static PG_FORCE_INLINE Py_ssize_t
+_pg_visibility_sector(double angle)
+{
+    Py_ssize_t sector;
+
+    /* wrap the pseudo-angle into [0, 4) */
+    if (angle >= 4) {
+        angle -= 4;
+    }
+    else if (angle < 0) {
+        angle += 4;
+    }
+
+    sector = (Py_ssize_t)(angle * (PG_VISIBILITY_SECTORS / 4.0));
+
+    return MAX(0, MIN(PG_VISIBILITY_SECTORS - 1, sector));
+}
+
+/* Sets first and count to the sectors around the origin covered by the
+ * bounding box of a collider, going counterclockwise from first. */
+static void
+_pg_visibility_collider_sectors(pgCollider *collider, double ox, double oy,
+                                Py_ssize_t *first, Py_ssize_t *count)
+{
+    double corners[8] = {collider->min_x, collider->min_y, collider->max_x,
+                         collider->min_y, collider->max_x, collider->max_y,
+                         collider->min_x, collider->max_y};
+    double center, delta, min_delta = 0, max_delta = 0;
+    Py_ssize_t i, last;
+
+    if (ox >= collider->min_x && ox <= collider->max_x &&
+        oy >= collider->min_y && oy <= collider->max_y) {
+        *first = 0;
+        *count = PG_VISIBILITY_SECTORS;
+        return;
+    }
+
+    /* the box doesn't contain the origin, so it spans less than half a
+     * turn around the direction of its center */
+    center = _pg_visibility_pseudo_angle(
+        (collider->min_x + collider->max_x) / 2 - ox,
+        (collider->min_y + collider->max_y) / 2 - oy);
+    for (i = 0; i < 4; i++) {
+        delta = _pg_visibility_pseudo_angle(corners[i * 2] - ox,
+                                            corners[i * 2 + 1] - oy) -
+                center;
+        if (delta > 2) {
+            delta -= 4;
+        }
+        else if (delta < -2) {
+            delta += 4;
+        }
+        min_delta = MIN(min_delta, delta);
+        max_delta = MAX(max_delta, delta);
+    }
+
+    *first = _pg_visibility_sector(center + min_delta -
+                                   PG_VISIBILITY_SECTOR_EPSILON);
+    last = _pg_visibility_sector(center + max_delta +
+                                 PG_VISIBILITY_SECTOR_EPSILON);
+    *count =
+        (last - *first + PG_VISIBILITY_SECTORS) % PG_VISIBILITY_SECTORS + 1;
+}
+
+/*
+ * Tests whether a segment whose start touches a collider also hits it
+ * strictly between its end points. The segment is split at its middle and
+ * both halves are cast from there, so that the touch at the start is only
+ * found at the far end of a half.
+ */
+static int
+_pg_visibility_hits_inside(pgLineBase *segment, pgCollider *collider)
+{
+    pgLineBase half;
+    double t;
+
+    half.xa = (segment->xa + segment->xb) / 2;
+    half.ya = (segment->ya + segment->yb) / 2;
+    half.xb = segment->xa;
+    half.yb = segment->ya;
+    if (pgRaycast_LineCollider(&half, collider, 1.0, &t) &&
+        t < 1.0 - 2 * PG_VISIBILITY_ENDPOINT_EPSILON) {
+        return 1;
+    }
+
+    half.xb = segment->xb;
+    half.yb = segment->yb;
+    return pgRaycast_LineCollider(&half, collider, 1.0, &t) &&
+           t < 1.0 - 2 * PG_VISIBILITY_ENDPOINT_EPSILON;
+}
+
+/*
+ * Fills out, a points_num * points_num matrix, with 1 where the segment
+ * between two points doesn't hit any collider strictly between them and 0
+ * where it does, so that colliders touching a point never block it. Colliders
+ * whose layer bits don't intersect the mask are skipped when layers isn't
+ * NULL.
+ * The colliders are sorted once per point into the angular sectors their
+ * bounding boxes cover, so the segments starting at that point are only
+ * tested against the colliders of the sector they go through.
+ *
+ * sets the error messages
+ * 1 if success
+ * 0 if it fails
+ */
+static int
+pgVisibility_Matrix(pgCollider *colliders, Py_ssize_t colliders_num,
+                    Uint32 *layers, Uint32 mask, double *points,
+                    Py_ssize_t points_num, unsigned char *out)
+{
+    Py_ssize_t sector_start[PG_VISIBILITY_SECTORS + 1];
+    Py_ssize_t *first = NULL, *count = NULL, *items = NULL;
+    Py_ssize_t i, j, k, s, items_num, capacity = 0;
+    double ox, oy, min_x, min_y, max_x, max_y, t;
+    pgCollider *collider;
+    pgLineBase ray;
+    int visible, ret = 0;
+
+    for (i = 0; i < points_num; i++) {
+        out[i * points_num + i] = 1;
+    }
+
+    if (points_num < 2) {
+        return 1;
+    }
+
+    first = PyMem_New(Py_ssize_t, MAX(colliders_num, 1));
+    count = PyMem_New(Py_ssize_t, MAX(colliders_num, 1));
+    if (!first || !count) {
+        PyErr_NoMemory();
+        goto end;
+    }
+
+    for (i = 0; i < points_num - 1; i++) {
+        ox = points[i * 2];
+        oy = points[i * 2 + 1];
+
+        /* count the colliders of every sector, then store their indices */
+        memset(sector_start, 0, sizeof(sector_start));
+        items_num = 0;
+        for (k = 0; k < colliders_num; k++) {
+            count[k] = 0;
+            if (layers && !(layers[k] & mask)) {
+                continue;
+            }
+            _pg_visibility_collider_sectors(&colliders[k], ox, oy, &first[k],
+                                            &count[k]);
+            for (s = 0; s < count[k]; s++) {
+                sector_start[(first[k] + s) % PG_VISIBILITY_SECTORS + 1]++;
+            }
+            items_num += count[k];
+        }
+        for (s = 0; s < PG_VISIBILITY_SECTORS; s++) {
+            sector_start[s + 1] += sector_start[s];
+        }
+
+        if (items_num > capacity) {
+            PyMem_Free(items);
+            capacity = MAX(items_num, capacity * 2);
+            if (!(items = PyMem_New(Py_ssize_t, capacity))) {
+                PyErr_NoMemory();
+                goto end;
+            }
+        }
+        for (k = 0; k < colliders_num; k++) {
+            for (s = 0; s < count[k]; s++) {
+                items[sector_start[(first[k] + s) % PG_VISIBILITY_SECTORS]++] =
+                    k;
+            }
+        }
+        /* filling the sectors moved every start to the next sector's one */
+        for (s = PG_VISIBILITY_SECTORS; s > 0; s--) {
+            sector_start[s] = sector_start[s - 1];
+        }
+        sector_start[0] = 0;
+
+        ray.xa = ox;
+        ray.ya = oy;
+        for (j = i + 1; j < points_num; j++) {
+            ray.xb = points[j * 2];
+            ray.yb = points[j * 2 + 1];
+            visible = 1;
+
+            if (ray.xb != ox || ray.yb != oy) {
+                min_x = MIN(ox, ray.xb);
+                min_y = MIN(oy, ray.yb);
+                max_x = MAX(ox, ray.xb);
+                max_y = MAX(oy, ray.yb);
+                s = _pg_visibility_sector(
+                    _pg_visibility_pseudo_angle(ray.xb - ox, ray.yb - oy));
+
+                for (k = sector_start[s]; k < sector_start[s + 1]; k++) {
+                    collider = &colliders[items[k]];
+                    if (collider->min_x > max_x || collider->max_x < min_x ||
+                        collider->min_y > max_y || collider->max_y < min_y) {
+                        continue;
+                    }
+                    /* hits on either point don't count, the one on the
+                     * origin hiding any further hit of the collider */
+                    if (pgRaycast_LineCollider(&ray, collider, 1.0, &t) &&
+                        t < 1.0 - PG_VISIBILITY_ENDPOINT_EPSILON &&
+                        (t > PG_VISIBILITY_ENDPOINT_EPSILON ||
+                         _pg_visibility_hits_inside(&ray, collider))) {
+                        visible = 0;
+                        break;
+                    }
+                }
+            }
+
+            out[i * points_num + j] = out[j * points_num + i] =
+                (unsigned char)visible;
+        }
+    }
+
+    ret = 1;
+
+end:
+    PyMem_Free(first);
+    PyMem_Free(count);
+    PyMem_Free(items);
+
+    return ret;
+}
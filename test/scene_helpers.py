@@ -0,0 +1,79 @@
+"""Random scenes and rays shared by the raycast tests."""
+
+import random
+
+from pygame import Rect
+
+from geometry import Circle, Line, Polygon, Ray, regular_polygon
+
+
+def random_scene(
+    count,
+    size=1000,
+    seed=0,
+    kinds=(Line, Circle, Rect, Polygon),
+    scales=(30,),
+    centered=False,
+    diagonal=True,
+):
+    """Returns a list of count random colliders, cycling through kinds.
+
+    The colliders are placed in [0, size) on both axes, or in [-size, size) if
+    centered is set, and each one spans up to a scale picked from scales.
+    Unless diagonal is False, a long line crossing the whole scene is added
+    last."""
+    rng = random.Random(seed)
+    low = -size if centered else 0
+
+    colliders = []
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        x, y = rng.uniform(low, size), rng.uniform(low, size)
+        s = rng.choice(scales)
+        if kind is Line:
+            colliders.append(Line(x, y, x + rng.uniform(-s, s), y + rng.uniform(-s, s)))
+        elif kind is Circle:
+            colliders.append(Circle(x, y, rng.uniform(1, s)))
+        elif kind is Rect:
+            colliders.append(
+                Rect(int(x), int(y), rng.randint(-s, s), rng.randint(1, s))
+            )
+        else:
+            colliders.append(
+                regular_polygon(rng.randint(3, 8), (x, y), rng.uniform(1, s))
+            )
+
+    if diagonal:
+        colliders.append(Line(low, low, size, size))
+    return colliders
+
+
+def random_rays(count, size=1000, seed=1, centered=False, as_rays=False):
+    """Returns count random rays cast around a scene made by random_scene with
+    the same size and centered arguments.
+
+    Every third ray is a Line and the others are (origin, angle, max_dist)
+    tuples, unless as_rays is set, in which case they are all Rays. Axis
+    aligned angles are picked often since the traversals special-case them."""
+    rng = random.Random(seed)
+    low = -size if centered else 0
+    margin = (size - low) / 10
+
+    def random_pos():
+        return (
+            rng.uniform(low - margin, size + margin),
+            rng.uniform(low - margin, size + margin),
+        )
+
+    rays = []
+    for i in range(count):
+        if not as_rays and i % 3 == 0:
+            rays.append(Line(random_pos(), random_pos()))
+            continue
+        ray = (
+            random_pos(),
+            rng.choice([0, 90, 180, 270, rng.uniform(0, 360)]),
+            rng.choice([-1, 50, 400]),
+        )
+        rays.append(Ray(*ray) if as_rays else ray)
+    return rays
@@ -1,5 +1,6 @@
 import math
 import unittest
+from array import array
 from math import sqrt
 
 from geometry import Circle, Line, Polygon, regular_polygon
@@ -918,6 +919,57 @@ class CircleTypeTest(unittest.TestCase):
         self.assertTrue(c.collideswith(po1), E_T + "polygon should collide here")
         self.assertFalse(c.collideswith(po2), E_F + "polygon should not collide here")
 
+    def test_penetration(self):
+        c = Circle(0, 0, 5)
+
+        p = c.penetration(Circle(8, 0, 5))
+        self.assertEqual(p.normal, (1, 0))
+        self.assertEqual(p.depth, 2)
+        self.assertEqual(p.points, ((3, 0),))
+
+        p = c.penetration(Rect(4, -1, 2, 2))
+        self.assertEqual(p.normal, (1, 0))
+        self.assertEqual(p.depth, 1)
+        self.assertEqual(p.points, ((4, 0),))
+
+        p = c.penetration(Line(-10, 4, 10, 4))
+        self.assertEqual(p.normal, (0, 1))
+        self.assertEqual(p.depth, 1)
+        self.assertEqual(p.points, ((0, 4),))
+
+        p = c.penetration(Polygon([(3, -1), (8, -1), (8, 1), (3, 1)]))
+        self.assertEqual(p.normal, (1, 0))
+        self.assertEqual(p.depth, 2)
+        self.assertEqual(p.points, ((3, 0),))
+
+        # the result is a named tuple
+        normal, depth, points = p
+        self.assertEqual((normal, depth, points), (p.normal, p.depth, p.points))
+
+        # shapes that only touch don't overlap
+        self.assertIsNone(c.penetration(Circle(10, 0, 5)))
+        self.assertIsNone(c.penetration(Rect(20, 20, 5, 5)))
+        self.assertIsNone(c.penetration(Line(6, -10, 6, 10)))
+
+    def test_penetration_subclass(self):
+        class MyCircle(Circle):
+            pass
+
+        p = MyCircle(0, 0, 5).penetration(Circle(8, 0, 5))
+        self.assertEqual(p.normal, (1, 0))
+        self.assertEqual(p.depth, 2)
+        self.assertIsNone(MyCircle(0, 0, 5).penetration(Circle(20, 0, 5)))
+
+    def test_penetration_invalid_args(self):
+        c = Circle(0, 0, 5)
+        for value in (None, [], "1", (1, 1), Vector2(1, 1), 1):
+            with self.assertRaises(TypeError):
+                c.penetration(value)
+        with self.assertRaises(TypeError):
+            c.penetration()
+        with self.assertRaises(TypeError):
+            c.penetration(Circle(0, 0, 1), Circle(0, 0, 1))
+
     def test_as_rect_invalid_args(self):
         c = Circle(0, 0, 10)
 
@@ -1684,6 +1736,179 @@ class CircleTypeTest(unittest.TestCase):
         for objects, expected in zip([circles, rects, lines, polygons], expected):
             self.assertEqual(c.collidelistall(objects), expected)
 
+    def test_collidelistall_output(self):
+        """Ensures that collidelistall returns the hit indices in the requested
+        format"""
+        c = Circle(10, 10, 4)
+
+        objects = [
+            Circle(1000, 1000, 2),
+            Circle(5, 10, 5),
+            (10, 10),
+            Rect(1000, 200, 5, 5),
+            Line(10, 10, 4, 4),
+        ] * 5
+        expected = c.collidelistall(objects)
+
+        indices = c.collidelistall(objects, output="indices")
+        self.assertEqual(indices.format, "q")
+        self.assertEqual(indices.tolist(), expected)
+
+        bitmask = c.collidelistall(objects, output="bitmask")
+        self.assertEqual(bitmask.format, "B")
+        self.assertEqual(len(bitmask), 4)
+        self.assertEqual(
+            [i for i in range(len(objects)) if bitmask[i // 8] >> (i % 8) & 1],
+            expected,
+        )
+
+        self.assertEqual(c.collidelistall(objects, output="list"), expected)
+        self.assertEqual(c.collidelistall([], output="indices").tolist(), [])
+        self.assertEqual(c.collidelistall([], output="bitmask").tolist(), [])
+
+    def test_collidelistall_out(self):
+        """Ensures that collidelistall writes into the given buffer and returns
+        the number of hits"""
+        c = Circle(10, 10, 4)
+
+        objects = [Circle(5, 10, 5), Circle(1000, 1000, 2), (10, 10)] * 4
+        expected = c.collidelistall(objects)
+
+        out = array("q", [-1] * 20)
+        self.assertEqual(c.collidelistall(objects, output="indices", out=out), 8)
+        self.assertEqual(out[:8].tolist(), expected)
+        self.assertEqual(out[8:].tolist(), [-1] * 12)
+
+        out = bytearray(b"\xff" * 3)
+        self.assertEqual(c.collidelistall(objects, output="bitmask", out=out), 8)
+        self.assertEqual(out, bytearray(b"\x6d\x0b\xff"))
+
+    def test_collidelistall_output_errors(self):
+        c = Circle(10, 10, 4)
+        objects = [Circle(5, 10, 5)] * 10
+
+        with self.assertRaises(ValueError):
+            c.collidelistall(objects, output="array")
+        with self.assertRaises(TypeError):
+            c.collidelistall(objects, output=1)
+        with self.assertRaises(ValueError):
+            c.collidelistall(objects, out=array("q", [0] * 10))
+        with self.assertRaises(TypeError):
+            c.collidelistall(objects, output="indices", out=array("d", [0] * 10))
+        with self.assertRaises(TypeError):
+            c.collidelistall(objects, output="bitmask", out=array("q", [0] * 10))
+        with self.assertRaises(ValueError):
+            c.collidelistall(objects, output="indices", out=array("q", [0] * 9))
+        with self.assertRaises(ValueError):
+            c.collidelistall(objects, output="bitmask", out=bytearray(1))
+        with self.assertRaises(BufferError):
+            c.collidelistall(objects, output="indices", out=b"\x00" * 80)
+        with self.assertRaises(TypeError):
+            c.collidelistall(objects, invalid=True)
+
+    def test_collideobjects(self):
+        """Ensures that collideobjects returns the first colliding object, using
+        the key to get its shape"""
+
+        class Sprite:
+            def __init__(self, shape):
+                self.shape = shape
+
+        c = Circle(10, 10, 4)
+
+        sprites = [
+            Sprite(Circle(1000, 1000, 2)),
+            Sprite(Rect(5, 10, 7, 3)),
+            Sprite(Line(10, 10, 4, 4)),
+        ]
+
+        self.assertIs(c.collideobjects(sprites, key="shape"), sprites[1])
+        self.assertIs(c.collideobjects(sprites, key=lambda s: s.shape), sprites[1])
+        self.assertIs(c.collideobjects(tuple(sprites), key="shape"), sprites[1])
+        self.assertIsNone(c.collideobjects(sprites[:1], key="shape"))
+        self.assertIsNone(c.collideobjects([], key="shape"))
+
+        shapes = [Circle(1000, 1000, 2), (10, 10)]
+        self.assertIs(c.collideobjects(shapes), shapes[1])
+        self.assertIs(c.collideobjects(shapes, key=None), shapes[1])
+
+    def test_collideobjectsall(self):
+        """Ensures that collideobjectsall returns every colliding object"""
+
+        class Sprite:
+            def __init__(self, shape):
+                self.shape = shape
+
+        c = Circle(10, 10, 4)
+
+        sprites = [
+            Sprite(Circle(1000, 1000, 2)),
+            Sprite(Rect(5, 10, 7, 3)),
+            Sprite(Line(10, 10, 4, 4)),
+            Sprite(Polygon([(100, 100), (34, 10), (4, 43)])),
+        ]
+
+        self.assertEqual(c.collideobjectsall(sprites, key="shape"), sprites[1:3])
+        self.assertEqual(
+            c.collideobjectsall(sprites, key=lambda s: s.shape), sprites[1:3]
+        )
+        self.assertEqual(
+            c.collideobjectsall([s.shape for s in sprites]),
+            [s.shape for s in sprites[1:3]],
+        )
+        self.assertEqual(c.collideobjectsall([], key="shape"), [])
+
+    def test_collidedict(self):
+        """Ensures that collidedict and collidedictall return the colliding items
+        of a dict, testing either its keys or its values"""
+        c = Circle(10, 10, 4)
+
+        points = {(1000, 1000): "a", (10, 10): "b", (11, 11): "c"}
+        self.assertEqual(c.collidedict(points), ((10, 10), "b"))
+        self.assertEqual(c.collidedictall(points), [((10, 10), "b"), ((11, 11), "c")])
+        self.assertIsNone(c.collidedict({(1000, 1000): "a"}))
+        self.assertEqual(c.collidedictall({}), [])
+
+        shapes = {"a": Circle(1000, 1000, 2), "b": Rect(5, 10, 7, 3)}
+        self.assertEqual(c.collidedict(shapes, True), ("b", shapes["b"]))
+        self.assertEqual(c.collidedictall(shapes, values=True), [("b", shapes["b"])])
+
+        sprites = {"a": [Circle(1000, 1000, 2)], "b": [Line(10, 10, 4, 4)]}
+        self.assertEqual(
+            c.collidedictall(sprites, values=True, key=lambda v: v[0]),
+            [("b", sprites["b"])],
+        )
+
+    def test_collideobjects_errors(self):
+        c = Circle(10, 10, 4)
+        sprites = [Circle(1, 1, 1)]
+
+        for func in (c.collideobjects, c.collideobjectsall):
+            with self.assertRaises(TypeError):
+                func()
+            with self.assertRaises(TypeError):
+                func(1)
+            with self.assertRaises(TypeError):
+                func(sprites, None)
+            with self.assertRaises(TypeError):
+                func(sprites, key=1)
+            with self.assertRaises(TypeError):
+                func(sprites, invalid=True)
+            with self.assertRaises(TypeError):
+                func(["1"])
+            with self.assertRaises(AttributeError):
+                func(sprites, key="shape")
+            with self.assertRaises(ZeroDivisionError):
+                func(sprites, key=lambda s: 1 / 0)
+
+        for func in (c.collidedict, c.collidedictall):
+            with self.assertRaises(TypeError):
+                func(sprites)
+            with self.assertRaises(TypeError):
+                func({}, True, values=True)
+            with self.assertRaises(TypeError):
+                func({"a": 1}, True)
+
     def test_intersect_argtype(self):
         """Tests if the function correctly handles incorrect types as parameters"""
 
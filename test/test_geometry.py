@@ -1,7 +1,20 @@
+import random
 import unittest
 import pygame
 import geometry
-from geometry import Line, Circle, Polygon, is_line, is_circle, is_polygon
+from geometry import (
+    Line,
+    Circle,
+    Polygon,
+    collide_lists,
+    collide_pairs,
+    distance,
+    DistanceCache,
+    is_line,
+    is_circle,
+    is_polygon,
+    regular_polygon,
+)
 from pygame import Rect
 
 
@@ -14,6 +27,38 @@ def _get_vertices_from_rect(rect: pygame.Rect):
     ]
 
 
+def _collide(a, b):
+    if isinstance(a, Rect):
+        a, b = b, a
+    if isinstance(a, Rect):
+        return a.colliderect(b)
+    return a.collideswith(b)
+
+
+def _random_shapes(count, size=200, seed=0, long_lines=False):
+    rng = random.Random(seed)
+
+    shapes = []
+    for i in range(count):
+        x, y = rng.uniform(-size, size), rng.uniform(-size, size)
+        kind = i % 4
+        if kind == 0:
+            shapes.append(Rect(int(x), int(y), rng.randint(0, 20), rng.randint(0, 20)))
+        elif kind == 1:
+            shapes.append(Circle(x, y, rng.uniform(1, 10)))
+        elif kind == 2 and long_lines:
+            shapes.append(Line(x - size, y, x + size, y + rng.uniform(-5, 5)))
+        elif kind == 2:
+            shapes.append(
+                Line(x, y, x + rng.uniform(-30, 30), y + rng.uniform(-30, 30))
+            )
+        else:
+            shapes.append(
+                regular_polygon(rng.randint(3, 6), (x, y), rng.uniform(2, 15))
+            )
+    return shapes
+
+
 class TestGeometry(unittest.TestCase):
     def test_rect_to_polygon(self):
         rects_base = [
@@ -203,6 +248,201 @@ class TestGeometry(unittest.TestCase):
         self.assertEqual(cy, p.centery)
         # =================================================
 
+    def test_collide_pairs(self):
+        """Test that collide_pairs finds the same pairs as testing every pair
+        of shapes"""
+        shapes = _random_shapes(400)
+
+        expected = [
+            [i, j]
+            for i in range(len(shapes))
+            for j in range(i + 1, len(shapes))
+            if _collide(shapes[i], shapes[j])
+        ]
+
+        pairs = collide_pairs(shapes)
+        self.assertEqual(pairs.format, "q")
+        self.assertEqual(pairs.shape, (len(expected), 2))
+        self.assertEqual(pairs.tolist(), expected)
+        self.assertEqual(collide_pairs(tuple(shapes)).tolist(), expected)
+
+    def test_collide_pairs_edge_cases(self):
+        self.assertEqual(collide_pairs([]).tolist(), [])
+        self.assertEqual(collide_pairs([Circle(0, 0, 5)]).tolist(), [])
+
+        shapes = [
+            Rect(0, 0, 10, 10),
+            Rect(10, 0, 10, 10),  # only touches the first rect
+            Rect(5, 5, 0, 10),  # has no area
+            Rect(15, 15, -10, -10),  # has a negative size
+            Line(-5, 20, 5, 20),
+            Circle(0, 22, 2),
+        ]
+        self.assertEqual(collide_pairs(shapes).tolist(), [[0, 3], [1, 3], [4, 5]])
+
+    def test_collide_pairs_invalid_args(self):
+        for value in (None, 1, Circle(0, 0, 1)):
+            with self.assertRaises(TypeError):
+                collide_pairs(value)
+        for value in ([Circle(0, 0, 1), 1], [(0, 0, 1, 1)], ["Rect"]):
+            with self.assertRaises(TypeError):
+                collide_pairs(value)
+        with self.assertRaises(TypeError):
+            collide_pairs()
+        with self.assertRaises(TypeError):
+            collide_pairs([], [])
+
+    def test_collide_lists(self):
+        """Test that collide_lists finds the same pairs as testing every shape
+        of the first list against every shape of the second one, with lists
+        that are tested one by one, binned into a grid or swept"""
+        for a, b in (
+            (_random_shapes(10, 50, 1), _random_shapes(20, 50, 2)),
+            (_random_shapes(300, 200, 1), _random_shapes(100, 200, 2)),
+            (_random_shapes(100, 200, 1), _random_shapes(300, 200, 2)),
+            (
+                _random_shapes(200, 200, 1, long_lines=True),
+                _random_shapes(200, 200, 2, long_lines=True),
+            ),
+        ):
+            expected = [
+                [i, j]
+                for i in range(len(a))
+                for j in range(len(b))
+                if _collide(a[i], b[j])
+            ]
+
+            pairs = collide_lists(a, b)
+            self.assertEqual(pairs.format, "q")
+            self.assertEqual(pairs.shape, (len(expected), 2))
+            self.assertEqual(pairs.tolist(), expected)
+            self.assertEqual(
+                collide_lists(b, a).tolist(), sorted([j, i] for i, j in expected)
+            )
+
+    def test_collide_lists_edge_cases(self):
+        self.assertEqual(collide_lists([], []).tolist(), [])
+        self.assertEqual(collide_lists([Circle(0, 0, 1)], []).tolist(), [])
+        self.assertEqual(collide_lists([], [Circle(0, 0, 1)]).tolist(), [])
+
+        circle = Circle(0, 0, 1)
+        self.assertEqual(collide_lists([circle], (circle,)).tolist(), [[0, 0]])
+
+        a = [Rect(0, 0, 10, 10), Rect(20, 0, -10, 10), Line(-5, 20, 5, 20)]
+        b = [Rect(10, 0, 10, 10), Circle(0, 22, 2), Rect(5, 5, 0, 10)]
+        self.assertEqual(collide_lists(a, b).tolist(), [[1, 0], [2, 1]])
+
+        # shapes with NaN values don't collide with anything
+        nan = float("nan")
+        a = [Circle(nan, 0, 1)] * 50 + [Circle(0, 0, 1)] * 50
+        self.assertEqual(collide_lists(a, a).shape, (2500, 2))
+
+    def test_collide_lists_invalid_args(self):
+        for a, b in (
+            (None, []),
+            ([], 1),
+            ([Circle(0, 0, 1), 1], []),
+            ([], [(0, 0, 1, 1)]),
+        ):
+            with self.assertRaises(TypeError):
+                collide_lists(a, b)
+        with self.assertRaises(TypeError):
+            collide_lists([])
+        with self.assertRaises(TypeError):
+            collide_lists([], [], [])
+
+    def test_distance(self):
+        result = distance(Circle(0, 0, 1), Circle(5, 0, 2))
+        self.assertEqual(result.distance, 2)
+        self.assertEqual(result.point_a, (1, 0))
+        self.assertEqual(result.point_b, (3, 0))
+
+        square = Polygon([(0, 0), (2, 0), (2, 2), (0, 2)])
+        result = distance((1, 5), square)
+        self.assertEqual(result.distance, 3)
+        self.assertEqual(result.point_a, (1, 5))
+        self.assertEqual(result.point_b, (1, 2))
+
+        result = distance(Rect(0, 0, 10, 10), Line(20, 0, 20, 10))
+        self.assertEqual(result.distance, 10)
+        self.assertEqual(result.point_a[0], 10)
+        self.assertEqual(result.point_b[0], 20)
+
+        result = distance(Line(0, 0, 10, 10), Line(0, 10, 10, 0))
+        self.assertEqual(result.distance, 0)
+        self.assertAlmostEqual(result.point_a[0], 5)
+        self.assertAlmostEqual(result.point_a[1], 5)
+
+        # the result is a named tuple
+        d, point_a, point_b, iterations = result
+        self.assertEqual(d, result.distance)
+        self.assertIsInstance(iterations, int)
+
+    def test_distance_random(self):
+        """Test that distance agrees with collideswith and gives closest points
+        that are as far apart as the distance"""
+        rng = random.Random(0)
+        shapes = [
+            shape
+            for shape in _random_shapes(200, 60, 3)
+            if not isinstance(shape, Rect) or shape.w and shape.h
+        ]
+        for _ in range(2000):
+            a, b = rng.sample(shapes, 2)
+            result = distance(a, b)
+
+            if result.distance > 1e-9:
+                self.assertFalse(_collide(a, b))
+                self.assertAlmostEqual(
+                    (
+                        (result.point_a[0] - result.point_b[0]) ** 2
+                        + (result.point_a[1] - result.point_b[1]) ** 2
+                    )
+                    ** 0.5,
+                    result.distance,
+                )
+            elif not isinstance(a, Rect) or not isinstance(b, Rect):
+                self.assertTrue(_collide(a, b))
+
+    def test_distance_cache(self):
+        a = regular_polygon(40, (0, 0), 30)
+        b = regular_polygon(40, (100, 10), 30, 3)
+        cache = DistanceCache()
+        self.assertEqual(cache.count, 0)
+
+        first = distance(a, b, cache=cache)
+        self.assertGreater(cache.count, 0)
+
+        # the shapes moved a bit, the query starts from the cached points
+        a.move_ip(0.5, 0.5)
+        cached = distance(a, b, cache=cache)
+        uncached = distance(a, b)
+        self.assertAlmostEqual(cached.distance, uncached.distance)
+        self.assertLess(cached.iterations, first.iterations)
+
+        # a cache that doesn't match the shapes is reset
+        cached = distance(Circle(0, 0, 1), (5, 0), cache=cache)
+        self.assertEqual(cached.distance, 4)
+        self.assertEqual(cache.count, 1)
+
+        cache.clear()
+        self.assertEqual(cache.count, 0)
+
+    def test_distance_invalid_args(self):
+        for a, b in ((None, Circle(0, 0, 1)), (Circle(0, 0, 1), "ab"), (1, 2)):
+            with self.assertRaises(TypeError):
+                distance(a, b)
+        with self.assertRaises(TypeError):
+            distance(Circle(0, 0, 1))
+        with self.assertRaises(TypeError):
+            distance(Circle(0, 0, 1), (0, 0), DistanceCache())
+        with self.assertRaises(TypeError):
+            distance(Circle(0, 0, 1), (0, 0), cache=1)
+        with self.assertRaises(TypeError):
+            distance(Circle(0, 0, 1), (0, 0), other=None)
+        with self.assertRaises(TypeError):
+            DistanceCache(1)
+
 
 if __name__ == "__main__":
     unittest.main()
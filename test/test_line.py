@@ -1,5 +1,7 @@
 import math
+import random
 import unittest
+from array import array
 from math import sqrt
 
 from pygame import Vector2, Vector3, Rect
@@ -581,6 +583,225 @@ class LineTypeTest(unittest.TestCase):
         self.assertTrue(l4.collideswith(po4))
         self.assertTrue(l4.collideswith(po5))
 
+    def test_penetration(self):
+        l = Line(0, 0, 10, 0)
+
+        p = l.penetration(Line(5, -1, 5, 3))
+        self.assertEqual(p.normal, (0, 1))
+        self.assertEqual(p.depth, 1)
+        self.assertEqual(p.points, ((5, -1),))
+
+        p = Line(-10, 4, 10, 4).penetration(Circle(0, 0, 5))
+        self.assertEqual(p.normal, (0, -1))
+        self.assertEqual(p.depth, 1)
+        self.assertEqual(p.points, ((0, 4),))
+
+        # a line inside of a shape overlaps it
+        p = Line(1, 1, 3, 1).penetration(Rect(0, 0, 10, 10))
+        self.assertEqual(p.normal, (0, 1))
+        self.assertEqual(p.depth, 1)
+
+        self.assertIsNone(l.penetration(Line(0, 1, 10, 1)))
+        self.assertIsNone(l.penetration(Line(11, 0, 20, 0)))
+        self.assertIsNone(l.penetration(Circle(5, 3, 2)))
+
+    def test_penetration_subclass(self):
+        class MyLine(Line):
+            pass
+
+        p = MyLine(0, 0, 10, 0).penetration(Line(5, -1, 5, 3))
+        self.assertEqual(p.normal, (0, 1))
+        self.assertEqual(p.depth, 1)
+        self.assertIsNone(MyLine(0, 0, 10, 0).penetration(Line(0, 1, 10, 1)))
+
+    def test_penetration_invalid_args(self):
+        l = Line(0, 0, 10, 0)
+        for value in (None, [], "1", (1, 1), Vector2(1, 1), 1):
+            with self.assertRaises(TypeError):
+                l.penetration(value)
+        with self.assertRaises(TypeError):
+            l.penetration()
+
+    def test_collidelist_argtype(self):
+        """Tests if the function correctly handles incorrect types as parameters"""
+        invalid_types = (None, "1", (1,), 1, (1, 2, 3), True, False)
+
+        l = Line(10, 10, 60, 60)
+
+        for value in invalid_types:
+            with self.assertRaises(TypeError):
+                l.collidelist(value)
+
+    def test_collidelist_argnum(self):
+        """Tests if the function correctly handles incorrect number of parameters"""
+        l = Line(10, 10, 60, 60)
+
+        with self.assertRaises(TypeError):
+            l.collidelist()
+
+        with self.assertRaises(TypeError):
+            l.collidelist([Line(10, 10, 4, 4)], 1)
+
+    def test_collidelist(self):
+        """Ensures that the collidelist method works correctly"""
+        l = Line(0, 0, 20, 20)
+
+        circles = [Circle(1000, 1000, 2), Circle(30, 10, 5), Circle(20, 10, 8)]
+        rects = [Rect(1000, 1000, 4, 4), Rect(15, 0, 5, 5), Rect(5, 4, 3, 3)]
+        lines = [Line(20, 0, 40, 20), Line(0, 20, 20, 0), Line(10, 0, 10, 20)]
+        polygons = [
+            Polygon([(100, 100), (34, 10), (4, 43)]),
+            Polygon([(30, 10), (34, 10), (40, 43)]),
+            Polygon([(10, 10), (34, 10), (4, 43)]),
+        ]
+        points = [(1, 0), (5, 5), (21, 21)]
+        expected = [2, 2, 1, 2, 1]
+
+        for objects, expected in zip(
+            [circles, rects, lines, polygons, points], expected
+        ):
+            self.assertEqual(l.collidelist(objects), expected)
+            self.assertEqual(l.collidelist(tuple(objects)), expected)
+
+        self.assertEqual(l.collidelist([]), -1)
+        self.assertEqual(l.collidelist([Circle(100, 100, 1)]), -1)
+
+        with self.assertRaises(TypeError):
+            l.collidelist([Circle(100, 100, 1), "1"])
+
+    def test_collidelistall_argtype(self):
+        """Tests if the function correctly handles incorrect types as parameters"""
+        invalid_types = (None, "1", (1,), 1, (1, 2, 3), True, False)
+
+        l = Line(10, 10, 60, 60)
+
+        for value in invalid_types:
+            with self.assertRaises(TypeError):
+                l.collidelistall(value)
+
+    def test_collidelistall_argnum(self):
+        """Tests if the function correctly handles incorrect number of parameters"""
+        l = Line(10, 10, 60, 60)
+
+        with self.assertRaises(TypeError):
+            l.collidelistall()
+
+        with self.assertRaises(TypeError):
+            l.collidelistall([Line(10, 10, 4, 4)], 1)
+
+    def test_collidelistall(self):
+        """Ensures that the collidelistall method works correctly"""
+        l = Line(0, 0, 20, 20)
+
+        circles = [Circle(1000, 1000, 2), Circle(30, 10, 5), Circle(20, 10, 8)]
+        rects = [Rect(1000, 1000, 4, 4), Rect(15, 0, 5, 5), Rect(5, 4, 3, 3)]
+        lines = [Line(20, 0, 40, 20), Line(0, 20, 20, 0), Line(10, 0, 10, 20)]
+        polygons = [
+            Polygon([(100, 100), (34, 10), (4, 43)]),
+            Polygon([(30, 10), (34, 10), (40, 43)]),
+            Polygon([(10, 10), (34, 10), (4, 43)]),
+        ]
+        points = [(1, 0), (5, 5), (20, 20)]
+        expected = [[2], [2], [1, 2], [2], [1, 2]]
+
+        for objects, expected in zip(
+            [circles, rects, lines, polygons, points], expected
+        ):
+            self.assertEqual(l.collidelistall(objects), expected)
+            self.assertEqual(l.collidelistall(tuple(objects)), expected)
+
+        self.assertEqual(l.collidelistall([]), [])
+
+    def test_collidelistall_output(self):
+        """Ensures that collidelistall returns the hit indices in the requested
+        format"""
+        rng = random.Random(1)
+        l = Line(-50, -20, 60, 40)
+
+        objects = [
+            Circle(rng.uniform(-100, 100), rng.uniform(-100, 100), 10)
+            for _ in range(100)
+        ]
+        expected = l.collidelistall(objects)
+
+        self.assertEqual(l.collidelistall(objects, output="indices").tolist(), expected)
+
+        bitmask = l.collidelistall(objects, output="bitmask")
+        self.assertEqual(
+            [i for i in range(len(objects)) if bitmask[i // 8] >> (i % 8) & 1],
+            expected,
+        )
+
+        out = array("q", [0] * len(objects))
+        self.assertEqual(
+            l.collidelistall(objects, output="indices", out=out), len(expected)
+        )
+        self.assertEqual(out[: len(expected)].tolist(), expected)
+
+        with self.assertRaises(ValueError):
+            l.collidelistall(objects, output="array")
+
+    def test_collideobjects(self):
+        """Ensures that collideobjects and collideobjectsall return the colliding
+        objects, using the key to get their shapes"""
+
+        class Sprite:
+            def __init__(self, shape):
+                self.shape = shape
+
+        l = Line(0, 0, 20, 20)
+        sprites = [
+            Sprite(Circle(100, 100, 1)),
+            Sprite(Circle(10, 10, 1)),
+            Sprite((5, 5)),
+        ]
+
+        self.assertIs(l.collideobjects(sprites, key="shape"), sprites[1])
+        self.assertIs(l.collideobjects(sprites, key=lambda s: s.shape), sprites[1])
+        self.assertIsNone(l.collideobjects(sprites[:1], key="shape"))
+        self.assertEqual(l.collideobjectsall(sprites, key="shape"), sprites[1:])
+        self.assertEqual(
+            l.collideobjectsall([s.shape for s in sprites]),
+            [s.shape for s in sprites[1:]],
+        )
+
+        with self.assertRaises(AttributeError):
+            l.collideobjects(sprites, key="circle")
+
+    def test_collidedict(self):
+        """Ensures that collidedict and collidedictall return the colliding items
+        of a dict"""
+        l = Line(0, 0, 20, 20)
+
+        shapes = {"a": Circle(100, 100, 1), "b": Circle(10, 10, 1)}
+        self.assertEqual(l.collidedict(shapes, True), ("b", shapes["b"]))
+        self.assertEqual(l.collidedictall(shapes, values=True), [("b", shapes["b"])])
+        self.assertEqual(l.collidedictall({(5, 5): 1, (50, 0): 2}), [((5, 5), 1)])
+        self.assertIsNone(l.collidedict({}))
+
+    def test_collidelist_matches_collideswith(self):
+        """Ensures that collidelist and collidelistall agree with collideswith"""
+        rng = random.Random(0)
+        l = Line(-50, -20, 60, 40)
+
+        objects = []
+        for _ in range(200):
+            x, y = rng.uniform(-100, 100), rng.uniform(-100, 100)
+            objects.append(
+                rng.choice(
+                    [
+                        Circle(x, y, rng.uniform(1, 10)),
+                        Rect(int(x), int(y), 10, 10),
+                        Line(x, y, x + 20, y - 5),
+                        regular_polygon(5, (x, y), 8),
+                    ]
+                )
+            )
+
+        expected = [i for i, obj in enumerate(objects) if l.collideswith(obj)]
+        self.assertEqual(l.collidelistall(objects), expected)
+        self.assertEqual(l.collidelist(objects), expected[0] if expected else -1)
+
     def test_meth_copy(self):
         line = Line(1, 2, 3, 4)
         # check 1 arg passed
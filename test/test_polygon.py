@@ -1,5 +1,6 @@
 import unittest
 import random
+from array import array
 
 from pygame import Vector2, Vector3, Rect
 
@@ -1708,6 +1709,19 @@ class PolygonTypeTest(unittest.TestCase):
         self.assertTrue(p1.is_convex())
         self.assertFalse(p2.is_convex())
 
+        # every corner of a pentagram turns the same way, but it's not convex
+        pentagram = Polygon(
+            [
+                (
+                    math.cos(math.radians(90 + 144 * i)),
+                    math.sin(math.radians(90 + 144 * i)),
+                )
+                for i in range(5)
+            ]
+        )
+        self.assertFalse(pentagram.is_convex())
+        self.assertTrue(regular_polygon(100, (0, 0), 10).is_convex())
+
     def test_collidecircle_argtype(self):
         """Tests if the function correctly handles incorrect types as parameters"""
 
@@ -2178,6 +2192,455 @@ class PolygonTypeTest(unittest.TestCase):
         # line touches polygon vertex
         self.assertTrue(l.collidepolygon(p5, True))
 
+    def test_collidepolygon_convex(self):
+        """Ensures that collidepolygon correctly determines if two convex
+        polygons collide"""
+        p = Polygon((0, 0), (10, 0), (10, 10), (0, 10))
+
+        # overlapping
+        self.assertTrue(p.collidepolygon(Polygon((5, 5), (15, 5), (10, 15))))
+        # touching on an edge or on a vertex
+        self.assertTrue(p.collidepolygon(Polygon((10, 0), (20, 0), (20, 10))))
+        self.assertTrue(p.collidepolygon(Polygon((10, 10), (20, 10), (20, 20))))
+        # inside of each other
+        self.assertTrue(p.collidepolygon(Polygon((2, 2), (4, 2), (3, 4))))
+        self.assertTrue(Polygon((2, 2), (4, 2), (3, 4)).collidepolygon(p))
+        # only separated by a diagonal, while their bounding boxes overlap
+        self.assertFalse(p.collidepolygon(Polygon((11, 5), (16, 0), (16, 5))))
+        self.assertFalse(
+            Polygon((0, 0), (10, 10), (0, 10)).collidepolygon(
+                Polygon((1, 0), (11, 0), (11, 10))
+            )
+        )
+        # far away
+        self.assertFalse(p.collidepolygon(Polygon((50, 50), (60, 50), (55, 60))))
+
+        # only the edges
+        self.assertFalse(p.collidepolygon(Polygon((2, 2), (4, 2), (3, 4)), True))
+        self.assertTrue(p.collidepolygon(Polygon((5, 5), (15, 5), (10, 15)), True))
+
+        # other ways of giving the polygon
+        self.assertTrue(p.collidepolygon([(5, 5), (15, 5), (10, 15)]))
+        self.assertTrue(p.collidepolygon((5, 5), (15, 5), (10, 15)))
+        self.assertTrue(p.collidepolygon((5, 5), (15, 5), (10, 15), False))
+
+    def test_collidepolygon_concave(self):
+        """Ensures that collidepolygon correctly determines if concave polygons
+        collide, including when they don't collide while the convex hulls
+        do"""
+        u_shape = Polygon(
+            (0, 0), (30, 0), (30, 30), (20, 30), (20, 10), (10, 10), (10, 30), (0, 30)
+        )
+        self.assertFalse(u_shape.is_convex())
+
+        # in the hole of the U
+        self.assertFalse(u_shape.collidepolygon(Polygon((12, 15), (18, 15), (15, 25))))
+        self.assertFalse(
+            u_shape.collidepolygon(Polygon((12, 15), (18, 15), (15, 25)), True)
+        )
+        # crossing an arm of the U
+        self.assertTrue(u_shape.collidepolygon(Polygon((5, 15), (18, 15), (15, 25))))
+        # inside of an arm of the U
+        self.assertTrue(u_shape.collidepolygon(Polygon((2, 15), (8, 15), (5, 25))))
+        self.assertFalse(
+            u_shape.collidepolygon(Polygon((2, 15), (8, 15), (5, 25)), True)
+        )
+
+    def test_collidepolygon_matches_edges_and_points(self):
+        """Ensures that collidepolygon gives the same results as testing the
+        edges and the containment of the vertices"""
+        rng = random.Random(0)
+
+        for _ in range(500):
+            a = regular_polygon(
+                rng.randint(3, 8),
+                (rng.uniform(-20, 20), rng.uniform(-20, 20)),
+                rng.uniform(1, 15),
+                rng.uniform(0, 360),
+            )
+            b = regular_polygon(
+                rng.randint(3, 8),
+                (rng.uniform(-20, 20), rng.uniform(-20, 20)),
+                rng.uniform(1, 15),
+                rng.uniform(0, 360),
+            )
+            expected = (
+                a.collidepolygon(b, True)
+                or a.collidepoint(b.vertices[0])
+                or b.collidepoint(a.vertices[0])
+            )
+            self.assertEqual(a.collidepolygon(b), expected)
+            self.assertEqual(b.collidepolygon(a), expected)
+            self.assertEqual(a.collideswith(b), expected)
+
+    def test_collidepolygon_argtype(self):
+        """Tests if the function correctly handles incorrect types as parameters"""
+        p = Polygon((0, 0), (10, 0), (10, 10), (0, 10))
+
+        for value in (None, 1, "1", [], (1,), Circle(0, 0, 1), Line(0, 0, 1, 1)):
+            with self.assertRaises(TypeError):
+                p.collidepolygon(value)
+            with self.assertRaises(TypeError):
+                p.collidepolygon(value, True)
+        with self.assertRaises(TypeError):
+            p.collidepolygon()
+
+    def test_colliderect(self):
+        """Ensures that colliderect correctly determines if a polygon collides
+        with a rect"""
+        triangle = Polygon((0, 0), (10, 0), (0, 10))
+        u_shape = Polygon(
+            (0, 0), (30, 0), (30, 30), (20, 30), (20, 10), (10, 10), (10, 30), (0, 30)
+        )
+
+        # overlapping, touching and inside
+        self.assertTrue(triangle.colliderect(Rect(5, -5, 10, 10)))
+        self.assertTrue(triangle.colliderect(Rect(10, 0, 5, 5)))
+        self.assertTrue(triangle.colliderect(Rect(1, 1, 2, 2)))
+        self.assertTrue(triangle.colliderect(Rect(-10, -10, 30, 30)))
+        # past the hypotenuse, while the bounding boxes overlap
+        self.assertFalse(triangle.colliderect(Rect(6, 6, 4, 4)))
+        # far away
+        self.assertFalse(triangle.colliderect(Rect(50, 50, 4, 4)))
+        # with a negative size
+        self.assertTrue(triangle.colliderect(Rect(15, 5, -10, -10)))
+
+        # concave polygons
+        self.assertFalse(u_shape.colliderect(Rect(12, 15, 6, 10)))
+        self.assertTrue(u_shape.colliderect(Rect(5, 15, 10, 10)))
+        self.assertTrue(u_shape.colliderect(Rect(2, 15, 6, 10)))
+
+        # only the edges
+        self.assertFalse(triangle.colliderect(Rect(1, 1, 2, 2), True))
+        self.assertTrue(triangle.colliderect(Rect(-10, -10, 30, 30), False))
+        self.assertFalse(triangle.colliderect(Rect(-10, -10, 30, 30), True))
+        self.assertTrue(triangle.colliderect(Rect(5, -5, 10, 10), True))
+
+        # other ways of giving the rect
+        self.assertTrue(triangle.colliderect((5, -5, 10, 10)))
+        self.assertTrue(triangle.colliderect((5, -5), (10, 10)))
+        self.assertTrue(triangle.colliderect(5, -5, 10, 10))
+        self.assertTrue(triangle.colliderect(5, -5, 10, 10, True))
+        self.assertFalse(triangle.colliderect(6, 6, 4, 4))
+
+        # like Rect.colliderect, rects without area collide with nothing
+        for rect in (Rect(1, 1, 0, 5), Rect(1, 1, 5, 0), Rect(0, 0, 0, 0)):
+            self.assertFalse(triangle.colliderect(rect))
+            self.assertFalse(triangle.colliderect(rect, True))
+            self.assertFalse(triangle.collideswith(rect))
+            self.assertFalse(Rect(-10, -10, 30, 30).colliderect(rect))
+        self.assertFalse(triangle.colliderect(1, 1, 0, 5))
+
+        for _ in range(200):
+            rect = Rect(
+                random.randint(-15, 15),
+                random.randint(-15, 15),
+                random.randint(1, 15),
+                random.randint(1, 15),
+            )
+            self.assertEqual(
+                triangle.colliderect(rect),
+                triangle.collidepolygon(geometry.rect_to_polygon(rect)),
+            )
+            self.assertEqual(triangle.colliderect(rect), triangle.collideswith(rect))
+
+    def test_colliderect_argtype(self):
+        """Tests if the function correctly handles incorrect types as parameters"""
+        p = Polygon((0, 0), (10, 0), (10, 10), (0, 10))
+
+        for value in (None, "1", [], (1,), Circle(0, 0, 1)):
+            with self.assertRaises(TypeError):
+                p.colliderect(value)
+        for args in ((), (1, 2), (1, 2, 3), (1, 2, 3, 4, 5), ("1", 2, 3, 4)):
+            with self.assertRaises(TypeError):
+                p.colliderect(*args)
+
+    def test_collideswith_argtype(self):
+        """Tests if the function correctly handles incorrect types as parameters"""
+        invalid_types = (None, [], "1", (1,), Vector3(1, 1, 1), 1)
+
+        poly = Polygon(_some_vertices)
+
+        for value in invalid_types:
+            with self.assertRaises(TypeError):
+                poly.collideswith(value)
+
+    def test_collideswith_argnum(self):
+        """Tests if the function correctly handles incorrect number of parameters"""
+        poly = Polygon(_some_vertices)
+
+        with self.assertRaises(TypeError):
+            poly.collideswith()
+
+        with self.assertRaises(TypeError):
+            poly.collideswith((1, 2), (3, 4))
+
+    def test_collideswith(self):
+        """Ensures the collideswith method correctly registers collisions with
+        polygons, rects, circles, lines and points"""
+        poly = Polygon((0, 0), (10, 0), (10, 10), (0, 10))
+
+        # polygon
+        self.assertTrue(poly.collideswith(Polygon((5, 5), (15, 5), (15, 15))))
+        self.assertTrue(poly.collideswith(regular_polygon(4, (5, 5), 2)))
+        self.assertTrue(poly.collideswith(regular_polygon(4, (5, 5), 100)))
+        self.assertFalse(poly.collideswith(Polygon((11, 0), (20, 0), (20, 10))))
+
+        # rect
+        self.assertTrue(poly.collideswith(Rect(5, 5, 10, 10)))
+        self.assertTrue(poly.collideswith(Rect(2, 2, 2, 2)))
+        self.assertTrue(poly.collideswith(Rect(-10, -10, 40, 40)))
+        self.assertFalse(poly.collideswith(Rect(11, 0, 5, 5)))
+
+        # circle
+        self.assertTrue(poly.collideswith(Circle(12, 5, 3)))
+        self.assertTrue(poly.collideswith(Circle(5, 5, 1)))
+        self.assertFalse(poly.collideswith(Circle(15, 5, 3)))
+
+        # line
+        self.assertTrue(poly.collideswith(Line(-5, 5, 15, 5)))
+        self.assertTrue(poly.collideswith(Line(2, 2, 3, 3)))
+        self.assertFalse(poly.collideswith(Line(11, 0, 11, 10)))
+
+        # point
+        self.assertTrue(poly.collideswith((5, 5)))
+        self.assertTrue(poly.collideswith(Vector2(1, 9)))
+        self.assertFalse(poly.collideswith([15, 5]))
+
+    def test_penetration(self):
+        square = Polygon([(0, 0), (10, 0), (10, 10), (0, 10)])
+
+        p = square.penetration(Rect(2, 9, 4, 4))
+        self.assertEqual(p.normal, (0, 1))
+        self.assertEqual(p.depth, 1)
+        self.assertEqual(sorted(p.points), [(2, 9), (6, 9)])
+
+        p = square.penetration(Line(5, -2, 5, 3))
+        self.assertEqual(p.normal, (0, -1))
+        self.assertEqual(p.depth, 3)
+        self.assertEqual(p.points, ((5, 3),))
+
+        p = square.penetration(Circle(12, 5, 3))
+        self.assertEqual(p.normal, (1, 0))
+        self.assertEqual(p.depth, 1)
+        self.assertEqual(p.points, ((10, 5),))
+
+        self.assertIsNone(square.penetration(Rect(10, 0, 5, 5)))
+        self.assertIsNone(square.penetration(Circle(20, 5, 3)))
+
+        # the exact collision test is used for concave polygons
+        u_shape = Polygon(
+            [(0, 0), (10, 0), (10, 10), (8, 10), (8, 2), (2, 2), (2, 10), (0, 10)]
+        )
+        self.assertIsNone(u_shape.penetration(Circle(5, 6, 1)))
+        self.assertIsNotNone(u_shape.penetration(Circle(5, 2.5, 1)))
+
+    def test_penetration_separates(self):
+        """Test that moving the other shape by the depth along the normal
+        separates the shapes, and that moving it by less doesn't"""
+        rng = random.Random(0)
+
+        def random_shape():
+            x, y = rng.uniform(-8, 8), rng.uniform(-8, 8)
+            kind = rng.randrange(3)
+            if kind == 0:
+                return regular_polygon(
+                    rng.randint(3, 7), (x, y), rng.uniform(1, 4), rng.uniform(0, 90)
+                )
+            if kind == 1:
+                return Circle(x, y, rng.uniform(0.5, 4))
+            return Line(x, y, x + rng.uniform(-8, 8), y + rng.uniform(-8, 8))
+
+        for _ in range(1000):
+            a = regular_polygon(
+                rng.randint(3, 7),
+                (rng.uniform(-8, 8), rng.uniform(-8, 8)),
+                rng.uniform(1, 4),
+                rng.uniform(0, 90),
+            )
+            b = random_shape()
+            p = a.penetration(b)
+            self.assertEqual(p is not None, a.collideswith(b))
+            if p is None:
+                continue
+
+            self.assertAlmostEqual(math.hypot(*p.normal), 1)
+            for pt in p.points:
+                self.assertLessEqual(geometry.distance(a, pt).distance, p.depth + 1e-9)
+                self.assertLessEqual(geometry.distance(b, pt).distance, p.depth + 1e-9)
+
+            moved = b.copy()
+            moved.move_ip(
+                p.normal[0] * (p.depth + 1e-6), p.normal[1] * (p.depth + 1e-6)
+            )
+            self.assertFalse(a.collideswith(moved))
+
+            if p.depth > 1e-3:
+                moved = b.copy()
+                moved.move_ip(
+                    p.normal[0] * (p.depth - 1e-4), p.normal[1] * (p.depth - 1e-4)
+                )
+                self.assertTrue(a.collideswith(moved))
+
+    def test_penetration_subclass(self):
+        class MyPolygon(Polygon):
+            pass
+
+        square = MyPolygon([(0, 0), (10, 0), (10, 10), (0, 10)])
+        p = square.penetration(Circle(12, 5, 3))
+        self.assertEqual(p.normal, (1, 0))
+        self.assertEqual(p.depth, 1)
+        self.assertIsNone(square.penetration(Circle(20, 5, 3)))
+
+    def test_penetration_invalid_args(self):
+        poly = Polygon([(0, 0), (10, 0), (10, 10)])
+        for value in (None, [], "1", (1, 1), Vector2(1, 1), 1):
+            with self.assertRaises(TypeError):
+                poly.penetration(value)
+        with self.assertRaises(TypeError):
+            poly.penetration()
+
+    def test_collidelist_argtype(self):
+        """Tests if the function correctly handles incorrect types as parameters"""
+        invalid_types = (None, "1", (1,), 1, (1, 2, 3), True, False)
+
+        poly = Polygon(_some_vertices)
+
+        for value in invalid_types:
+            with self.assertRaises(TypeError):
+                poly.collidelist(value)
+            with self.assertRaises(TypeError):
+                poly.collidelistall(value)
+
+    def test_collidelist(self):
+        """Ensures that the collidelist method works correctly"""
+        poly = Polygon((0, 0), (10, 0), (10, 10), (0, 10))
+
+        objects = [
+            Circle(100, 100, 2),
+            (20, 20),
+            Rect(9, 9, 5, 5),
+            Line(-5, 5, 15, 5),
+            Polygon((11, 0), (20, 0), (20, 10)),
+        ]
+
+        self.assertEqual(poly.collidelist(objects), 2)
+        self.assertEqual(poly.collidelist(tuple(objects)), 2)
+        self.assertEqual(poly.collidelist(objects[:2]), -1)
+        self.assertEqual(poly.collidelist([]), -1)
+
+        with self.assertRaises(TypeError):
+            poly.collidelist([Circle(100, 100, 1), "1"])
+
+    def test_collidelistall(self):
+        """Ensures that the collidelistall method works correctly"""
+        poly = Polygon((0, 0), (10, 0), (10, 10), (0, 10))
+
+        objects = [
+            Circle(100, 100, 2),
+            (5, 5),
+            Rect(9, 9, 5, 5),
+            Line(11, 0, 11, 10),
+            Polygon((10, 0), (20, 0), (20, 10)),
+        ]
+
+        self.assertEqual(poly.collidelistall(objects), [1, 2, 4])
+        self.assertEqual(poly.collidelistall(tuple(objects)), [1, 2, 4])
+        self.assertEqual(poly.collidelistall([]), [])
+
+    def test_collidelistall_output(self):
+        """Ensures that collidelistall returns the hit indices in the requested
+        format"""
+        rng = random.Random(1)
+        poly = regular_polygon(7, (0, 0), 40)
+
+        objects = [
+            Circle(rng.uniform(-100, 100), rng.uniform(-100, 100), 10)
+            for _ in range(100)
+        ]
+        expected = poly.collidelistall(objects)
+
+        self.assertEqual(
+            poly.collidelistall(objects, output="indices").tolist(), expected
+        )
+
+        bitmask = poly.collidelistall(objects, output="bitmask")
+        self.assertEqual(
+            [i for i in range(len(objects)) if bitmask[i // 8] >> (i % 8) & 1],
+            expected,
+        )
+
+        out = array("q", [0] * len(objects))
+        self.assertEqual(
+            poly.collidelistall(objects, output="indices", out=out), len(expected)
+        )
+        self.assertEqual(out[: len(expected)].tolist(), expected)
+
+        with self.assertRaises(ValueError):
+            poly.collidelistall(objects, output="array")
+
+    def test_collideobjects(self):
+        """Ensures that collideobjects and collideobjectsall return the colliding
+        objects, using the key to get their shapes"""
+
+        class Sprite:
+            def __init__(self, shape):
+                self.shape = shape
+
+        poly = Polygon((0, 0), (10, 0), (10, 10), (0, 10))
+        sprites = [
+            Sprite(Rect(11, 0, 5, 5)),
+            Sprite(Rect(5, 5, 10, 10)),
+            Sprite((5, 5)),
+        ]
+
+        self.assertIs(poly.collideobjects(sprites, key="shape"), sprites[1])
+        self.assertIs(poly.collideobjects(sprites, key=lambda s: s.shape), sprites[1])
+        self.assertIsNone(poly.collideobjects(sprites[:1], key="shape"))
+        self.assertEqual(poly.collideobjectsall(sprites, key="shape"), sprites[1:])
+        self.assertEqual(
+            poly.collideobjectsall([s.shape for s in sprites]),
+            [s.shape for s in sprites[1:]],
+        )
+
+        with self.assertRaises(AttributeError):
+            poly.collideobjects(sprites, key="circle")
+
+    def test_collidedict(self):
+        """Ensures that collidedict and collidedictall return the colliding items
+        of a dict"""
+        poly = Polygon((0, 0), (10, 0), (10, 10), (0, 10))
+
+        shapes = {"a": Rect(11, 0, 5, 5), "b": Rect(5, 5, 10, 10)}
+        self.assertEqual(poly.collidedict(shapes, True), ("b", shapes["b"]))
+        self.assertEqual(poly.collidedictall(shapes, values=True), [("b", shapes["b"])])
+        self.assertEqual(poly.collidedictall({(5, 5): 1, (50, 0): 2}), [((5, 5), 1)])
+        self.assertIsNone(poly.collidedict({}))
+
+    def test_collidelist_matches_collideswith(self):
+        """Ensures that collidelist and collidelistall agree with collideswith"""
+        rng = random.Random(0)
+        poly = regular_polygon(7, (0, 0), 40)
+
+        objects = []
+        for _ in range(200):
+            x, y = rng.uniform(-100, 100), rng.uniform(-100, 100)
+            objects.append(
+                rng.choice(
+                    [
+                        Circle(x, y, rng.uniform(1, 10)),
+                        Rect(int(x), int(y), 10, 10),
+                        Line(x, y, x + 20, y - 5),
+                        regular_polygon(5, (x, y), 8),
+                        (x, y),
+                    ]
+                )
+            )
+
+        expected = [i for i, obj in enumerate(objects) if poly.collideswith(obj)]
+        self.assertEqual(poly.collidelistall(objects), expected)
+        self.assertEqual(poly.collidelist(objects), expected[0] if expected else -1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,226 @@
+import math
+import unittest
+
+from pygame import Rect
+
+from geometry import (
+    Circle,
+    Line,
+    Polygon,
+    Ray,
+    RaycastBVH,
+    RaycastGrid,
+    multiraycast,
+    multiraycast_all,
+    raycast,
+    raycast_all,
+)
+
+from .scene_helpers import random_rays, random_scene
+
+# a small scene centered on the origin without lines
+_SCENE = dict(
+    size=200, kinds=(Rect, Circle, Polygon), scales=(20,), centered=True, diagonal=False
+)
+
+
+class RayTypeTest(unittest.TestCase):
+    def test_init(self):
+        ray = Ray((1, 2), (3, 4), 10)
+        self.assertEqual(ray.origin, (1.0, 2.0))
+        self.assertEqual(ray.direction, (0.6, 0.8))
+        self.assertEqual(ray.max_dist, 10.0)
+
+        ray = Ray((1, 2), (0, -5))
+        self.assertEqual(ray.direction, (0.0, -1.0))
+        self.assertEqual(ray.max_dist, -1.0)
+
+        ray = Ray(origin=(0, 0), direction=(2, 0), max_dist=math.inf)
+        self.assertEqual(ray.max_dist, -1.0)
+
+        ray = Ray(Line(0, 0, 0, 10))
+        self.assertEqual(ray.origin, (0.0, 0.0))
+        self.assertEqual(ray.direction, (0.0, 1.0))
+        self.assertEqual(ray.max_dist, 10.0)
+
+    def test_init_angle(self):
+        """Test that an angle gives the same direction as in raycast."""
+        ray = Ray((0, 0), 0, 100)
+        self.assertAlmostEqual(ray.direction[0], -1.0)
+        self.assertAlmostEqual(ray.direction[1], 0.0)
+        self.assertAlmostEqual(ray.angle, 0.0)
+
+        for angle in (30, 90, 135, -100):
+            point = raycast(Ray((0, 0), angle, 100), [Circle(0, 0, 50)])
+            expected = raycast((0, 0), angle, 100, [Circle(0, 0, 50)])
+            self.assertAlmostEqual(point[0], expected[0])
+            self.assertAlmostEqual(point[1], expected[1])
+
+    def test_init_invalid_args(self):
+        with self.assertRaises(TypeError):
+            Ray()
+        with self.assertRaises(TypeError):
+            Ray((0, 0))
+        with self.assertRaises(TypeError):
+            Ray("origin", (1, 0))
+        with self.assertRaises(TypeError):
+            Ray((0, 0), "1")
+        with self.assertRaises(TypeError):
+            Ray((0, 0), (1, 0), "10")
+        with self.assertRaises(TypeError):
+            Ray(Line(0, 0, 1, 0), max_dist=10)
+        with self.assertRaises(ValueError):
+            Ray((0, 0), (0, 0))
+        with self.assertRaises(ValueError):
+            Ray((0, 0), (1, 0), 0)
+
+    def test_attributes(self):
+        ray = Ray((0, 0), (1, 0), 10)
+
+        ray.origin = (5, 6)
+        self.assertEqual(ray.origin, (5.0, 6.0))
+
+        ray.direction = (0, 3)
+        self.assertEqual(ray.direction, (0.0, 1.0))
+
+        ray.angle = 180
+        self.assertAlmostEqual(ray.direction[0], 1.0)
+        self.assertAlmostEqual(ray.direction[1], 0.0)
+
+        ray.max_dist = 20
+        self.assertEqual(ray.max_dist, 20.0)
+        ray.max_dist = -5
+        self.assertEqual(ray.max_dist, -1.0)
+
+        with self.assertRaises(ValueError):
+            ray.direction = (0, 0)
+        with self.assertRaises(ValueError):
+            ray.max_dist = 0
+        with self.assertRaises(TypeError):
+            ray.origin = "origin"
+        with self.assertRaises(TypeError):
+            ray.angle = "1"
+        with self.assertRaises(AttributeError):
+            del ray.origin
+
+    def test_copy_at_repr(self):
+        ray = Ray((1, 1), (1, 0), 10)
+
+        copy = ray.copy()
+        self.assertIsNot(copy, ray)
+        self.assertEqual(repr(copy), repr(ray))
+        self.assertEqual(repr(ray), "<Ray((1.0, 1.0), (1.0, 0.0), 10.0)>")
+
+        self.assertEqual(ray.at(4), (5.0, 1.0))
+        with self.assertRaises(TypeError):
+            ray.at("4")
+
+
+class RayRaycastTest(unittest.TestCase):
+    def test_raycast(self):
+        colliders = [Rect(20, -5, 10, 10), Circle(50, 0, 3), Line(40, -10, 40, 10)]
+
+        self.assertEqual(raycast(Ray((0, 0), (1, 0)), colliders), (20.0, 0.0))
+        self.assertEqual(raycast(Ray((25, 0), (1, 0)), colliders), (30.0, 0.0))
+        self.assertEqual(raycast(Ray((0, 0), (1, 0), 21), colliders), (20.0, 0.0))
+        self.assertIsNone(raycast(Ray((0, 0), (1, 0), 19), colliders))
+        self.assertIsNone(raycast(Ray((0, 0), (-1, 0)), colliders))
+
+        hit = raycast(Ray((45, 0), (1, 0)), colliders, return_hit=True)
+        self.assertEqual(hit.point, (47.0, 0.0))
+        self.assertEqual(hit.normal, (-1.0, 0.0))
+        self.assertEqual(hit.distance, 2.0)
+        self.assertEqual(hit.index, 1)
+
+        self.assertEqual(
+            raycast_all(Ray((0, 0), (1, 0)), colliders),
+            [(20.0, 0.0), (40.0, 0.0), (47.0, 0.0)],
+        )
+
+    def test_rect_slab(self):
+        """Test the rect hits, including rays starting inside of the rect or
+        running along its sides."""
+        rect = Rect(10, 10, 20, 10)
+
+        self.assertEqual(raycast(Ray((0, 15), (1, 0)), [rect]), (10.0, 15.0))
+        self.assertEqual(raycast(Ray((15, 15), (1, 0)), [rect]), (30.0, 15.0))
+        self.assertEqual(raycast(Ray((15, 0), (0, 1)), [rect]), (15.0, 10.0))
+        self.assertEqual(raycast(Ray((0, 10), (1, 0)), [rect]), (10.0, 10.0))
+        self.assertEqual(raycast(Ray((10, 10), (1, 1)), [rect]), (10.0, 10.0))
+        self.assertIsNone(raycast(Ray((0, 9), (1, 0)), [rect]))
+        self.assertIsNone(raycast(Ray((40, 15), (1, 0)), [rect]))
+        self.assertIsNone(raycast(Ray((0, 15), (1, 0), 9), [rect]))
+
+    def test_matches_tuple_rays(self):
+        colliders = random_scene(150, **_SCENE)
+        rays = random_rays(500, size=200, centered=True, as_rays=True)
+
+        hits = multiraycast(rays, colliders, return_hit=True)
+        expected = multiraycast(
+            [(ray.origin, ray.angle, ray.max_dist) for ray in rays],
+            colliders,
+            return_hit=True,
+        )
+
+        self.assertEqual(len(hits), len(expected))
+        for hit, expected_hit in zip(hits, expected):
+            if expected_hit is None:
+                self.assertIsNone(hit)
+                continue
+            self.assertEqual(hit.index, expected_hit.index)
+            self.assertAlmostEqual(hit.distance, expected_hit.distance)
+
+    def test_direction_is_relative(self):
+        """Test that the direction of a Ray is relative to its origin, while
+        the second pair of a raycast tuple is a point the ray goes through."""
+        colliders = [Line(15, -5, 15, 5)]
+        origin, direction = (10, 0), (1, 0)
+
+        self.assertIsNone(raycast(origin, direction, 100, colliders))
+        self.assertEqual(
+            raycast(Ray(origin, direction, 100), colliders),
+            raycast(origin, (11, 0), 100, colliders),
+        )
+        self.assertEqual(raycast(Ray(origin, direction, 100), colliders), (15.0, 0.0))
+
+    def test_same_results_everywhere(self):
+        """Test that every raycast function and prepared scene gives the same
+        hits for Rays."""
+        colliders = random_scene(150, **_SCENE)
+        rays = random_rays(500, size=200, centered=True, as_rays=True)
+
+        expected = multiraycast(rays, colliders, return_hit=True)
+
+        self.assertEqual(
+            [raycast(ray, colliders, return_hit=True) for ray in rays], expected
+        )
+        self.assertEqual(
+            multiraycast(rays, colliders, return_hit=True, threads=4), expected
+        )
+        self.assertEqual(
+            multiraycast(rays, RaycastGrid(colliders), return_hit=True), expected
+        )
+        self.assertEqual(
+            multiraycast(rays, RaycastBVH(colliders), return_hit=True), expected
+        )
+        self.assertEqual(
+            multiraycast_all(rays, colliders),
+            multiraycast_all(rays, RaycastBVH(colliders)),
+        )
+
+    def test_reuse(self):
+        """Test that moving a Ray moves the rays cast with it."""
+        ray = Ray((0, 0), (1, 0), 100)
+        colliders = [Rect(50, -5, 10, 10), Rect(50, 45, 10, 10)]
+
+        self.assertEqual(raycast(ray, colliders), (50.0, 0.0))
+        ray.origin = (0, 50)
+        self.assertEqual(raycast(ray, colliders), (50.0, 50.0))
+        ray.origin = (55, 50)
+        self.assertEqual(raycast(ray, colliders), (60.0, 50.0))
+        ray.direction = (0, -1)
+        self.assertEqual(raycast(ray, colliders), (55.0, 45.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
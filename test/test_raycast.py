@@ -1,8 +1,33 @@
 import unittest
 
-from geometry import raycast, Circle, Line, multiraycast, Polygon
+from geometry import (
+    raycast,
+    raycast_all,
+    raycast_bounce,
+    raycast_fan,
+    raycast_mask,
+    circlecast,
+    Circle,
+    Line,
+    multicirclecast,
+    multiraycast,
+    multiraycast_all,
+    multiraycast_buffer,
+    Polygon,
+    polygoncast,
+    Ray,
+    RaycastBVH,
+    RaycastGrid,
+    RaycastHit,
+    regular_polygon,
+    visibility_matrix,
+    visibility_polygon,
+)
 from pygame import Rect
+from pygame.mask import Mask
+from array import array
 import math
+import random
 
 
 def dist(p1, p2):
@@ -209,7 +234,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.1045284632676, 254.10452846326766)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 112.0, 150, colliders),
@@ -224,7 +249,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.37460659341593, 254.3746065934159)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 117.0, 150, colliders),
@@ -239,7 +264,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.4539904997396, 254.45399049973955)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 119.0, 150, colliders),
@@ -254,7 +279,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.4848096202463, 254.48480962024632)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 123.0, 150, colliders),
@@ -269,7 +294,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.54463903501505, 254.54463903501502)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 128.0, 150, colliders),
@@ -284,7 +309,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.6156614753257, 254.61566147532565)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 154.0, 150, colliders),
@@ -299,7 +324,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.89879404629914, 254.89879404629917)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 157.0, 150, colliders),
@@ -314,7 +339,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.9205048534524, 254.92050485345243)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 164.0, 150, colliders),
@@ -329,7 +354,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.96126169593833, 254.96126169593833)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 165.0, 150, colliders),
@@ -344,7 +369,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.9659258262891, 254.96592582628907)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 167.0, 150, colliders),
@@ -359,7 +384,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.97437006478526, 254.97437006478523)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 168.0, 150, colliders),
@@ -374,7 +399,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.9781476007338, 254.9781476007338)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 169.0, 150, colliders),
@@ -389,7 +414,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.98162718344764, 254.98162718344767)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 171.0, 150, colliders),
@@ -404,7 +429,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.9876883405951, 254.98768834059513)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 173.0, 150, colliders),
@@ -419,7 +444,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.9925461516413, 254.99254615164133)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 176.0, 150, colliders),
@@ -434,7 +459,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.9975640502598, 254.99756405025983)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 181.0, 150, colliders),
@@ -449,7 +474,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.9998476951564, 254.9998476951564)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 202.0, 150, colliders),
@@ -464,7 +489,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.9271838545668, 254.92718385456678)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 209.00000000000003, 150, colliders),
@@ -479,7 +504,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.8746197071394, 254.8746197071394)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 211.0, 150, colliders),
@@ -494,7 +519,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.8571673007021, 254.85716730070212)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 212.0, 150, colliders),
@@ -509,7 +534,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.84804809615645, 254.84804809615642)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 215.0, 150, colliders),
@@ -524,7 +549,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.819152044289, 254.81915204428898)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 217.0, 150, colliders),
@@ -539,7 +564,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.7986355100473, 254.7986355100473)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 218.99999999999997, 150, colliders),
@@ -554,7 +579,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.777145961457, 254.77714596145697)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 222.0, 150, colliders),
@@ -569,7 +594,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.7431448254774, 254.7431448254774)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 234.0, 150, colliders),
@@ -584,7 +609,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.58778525229246, 254.58778525229246)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 239.0, 150, colliders),
@@ -599,7 +624,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.5150380749101, 254.51503807491005)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 240.99999999999997, 150, colliders),
@@ -614,7 +639,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.4848096202463, 254.48480962024632)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 244.0, 150, colliders),
@@ -629,7 +654,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.43837114678905, 254.43837114678908)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 258.0, 150, colliders),
@@ -644,7 +669,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.20791169081775, 254.20791169081775)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 259.0, 150, colliders),
@@ -659,7 +684,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.1908089953765, 254.19080899537656)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 263.0, 150, colliders),
@@ -674,7 +699,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.12186934340514, 254.12186934340514)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 267.0, 150, colliders),
@@ -689,7 +714,7 @@ class RaycastTest(unittest.TestCase):
                     Line((450.0, 254.0, 450.0523359562429, 254.05233595624296)),
                     colliders,
                 ),
-                (450.0, 254.0),
+                None,
             ),
             (
                 raycast(origin_pos, 273.0, 150, colliders),
@@ -747,17 +772,17 @@ class RaycastTest(unittest.TestCase):
                 raycast(origin_pos, [449.562, 253.562], 150, colliders),
                 (353.28849270664995, 157.2884927066437),
             ),
-            (raycast(origin_pos, 328.0, 150, colliders), (450.0, 254.0)),
+            (raycast(origin_pos, 328.0, 150, colliders), None),
             (
                 raycast(origin_pos, [449.152, 253.152], 150, colliders),
                 (353.2884927066425, 157.28849270664577),
             ),
-            (raycast(origin_pos, 335.0, 150, colliders), (450.0, 254.0)),
+            (raycast(origin_pos, 335.0, 150, colliders), None),
             (
                 raycast(origin_pos, [449.094, 253.094], 150, colliders),
                 (353.2884927066427, 157.28849270664574),
             ),
-            (raycast(origin_pos, 337.0, 150, colliders), (450.0, 254.0)),
+            (raycast(origin_pos, 337.0, 150, colliders), None),
             (
                 raycast(origin_pos, [449.079, 253.079], 150, colliders),
                 (353.28849270664506, 157.28849270664506),
@@ -770,6 +795,125 @@ class RaycastTest(unittest.TestCase):
                 self.assertAlmostEqual(output[0], expected[0])
                 self.assertAlmostEqual(output[1], expected[1])
 
+    def test_raycast_circle_out_of_range(self):
+        """Test that a circle farther than the ray's max distance is not hit."""
+        self.assertIsNone(raycast((0, 0), (1, 0), 5, [Circle(100, 0, 10)]))
+        self.assertEqual(
+            raycast((0, 0), (1, 0), 5, [Circle(100, 0, 10), Line(3, -1, 3, 1)]),
+            (3.0, 0.0),
+        )
+
+    def test_raycast_return_hit(self):
+        """Test that raycast returns a RaycastHit when return_hit is True."""
+        colliders = [
+            Circle(100, 0, 10),
+            Line(50, -10, 50, 10),
+            Rect(20, -5, 10, 10),
+            Circle(0, 40, 10),
+        ]
+        rays = [
+            (((0, 0), (1, 0), 200), (20.0, 0.0), (-1.0, 0.0), 20.0, 2),
+            (((0, 0), (0, 1), 200), (0.0, 30.0), (0.0, -1.0), 30.0, 3),
+            (((60, 0), (59, 0), 200), (50.0, 0.0), (1.0, 0.0), 10.0, 1),
+            (((200, 0), (199, 0), 200), (110.0, 0.0), (1.0, 0.0), 90.0, 0),
+            (((0, 40), (1, 40), 200), (10.0, 40.0), (-1.0, 0.0), 10.0, 3),
+        ]
+
+        for args, point, normal, distance, index in rays:
+            hit = raycast(*args, colliders, return_hit=True)
+            self.assertIsInstance(hit, RaycastHit)
+            self.assertEqual(hit.point, raycast(*args, colliders))
+            self.assertAlmostEqual(hit.point[0], point[0])
+            self.assertAlmostEqual(hit.point[1], point[1])
+            self.assertAlmostEqual(hit.normal[0], normal[0])
+            self.assertAlmostEqual(hit.normal[1], normal[1])
+            self.assertAlmostEqual(hit.distance, distance)
+            self.assertEqual(hit.index, index)
+            self.assertEqual(tuple(hit), (hit.point, hit.normal, hit.distance, index))
+
+    def test_raycast_return_hit_miss(self):
+        """Test that raycast returns None when return_hit is True and the ray
+        doesn't hit anything."""
+        colliders = [Line(50, -10, 50, 10), Rect(20, 5, 10, 10)]
+
+        self.assertIsNone(raycast((0, 0), (0, -1), 100, colliders, return_hit=True))
+        self.assertIsNone(raycast(Line(0, 0, 10, 0), colliders, return_hit=True))
+        self.assertEqual(
+            raycast((0, 0), (1, 0), 100, colliders, return_hit=False), (50.0, 0.0)
+        )
+
+    def test_raycast_return_hit_line(self):
+        """Test that the distance of a hit is measured from the ray's origin
+        when the ray is a Line."""
+        hit = raycast(Line(0, 0, 0, 100), [Line(-10, 80, 10, 60)], return_hit=True)
+
+        self.assertAlmostEqual(hit.point[0], 0.0)
+        self.assertAlmostEqual(hit.point[1], 70.0)
+        self.assertAlmostEqual(hit.distance, 70.0)
+        self.assertAlmostEqual(hit.normal[0], -math.sqrt(2) / 2)
+        self.assertAlmostEqual(hit.normal[1], -math.sqrt(2) / 2)
+        self.assertEqual(hit.index, 0)
+
+    def test_raycast_invalid_keyword(self):
+        """Test that raycast and multiraycast raise a TypeError when given an
+        unknown keyword argument."""
+        colliders = [Line(50, -10, 50, 10)]
+
+        with self.assertRaises(TypeError):
+            raycast((0, 0), (1, 0), 100, colliders, hit=True)
+
+        with self.assertRaises(TypeError):
+            multiraycast([Line(0, 0, 100, 0)], colliders, hit=True)
+
+    def test_raycast_polygon(self):
+        """Test that raycast works with polygons as colliders and gives the same
+        result as casting against the polygon's edges."""
+        polygons = [
+            Polygon((10, -10), (30, -10), (30, 10), (10, 10)),
+            Polygon((50, 0), (70, -20), (90, 0), (70, 20)),
+            Polygon((-40, -40), (-20, -60), (-10, -30)),
+        ]
+        rays = [
+            ((0, 0), (1, 0), 200),
+            ((0, 0), (-1, -1), 200),
+            ((0, 0), (0, 1), 200),
+            ((40, 0), (41, 0), 200),
+            ((20, 0), (21, 1), 200),
+            ((0, 0), (1, 0), 5),
+        ]
+
+        for ray in rays:
+            for polygon in polygons:
+                self.assertEqual(
+                    raycast(*ray, [polygon]), raycast(*ray, polygon.as_segments())
+                )
+            segments = [seg for polygon in polygons for seg in polygon.as_segments()]
+            self.assertEqual(raycast(*ray, polygons), raycast(*ray, segments))
+
+        self.assertEqual(raycast((0, 0), (1, 0), 200, polygons), (10.0, 0.0))
+        self.assertEqual(raycast((40, 0), (41, 0), 200, polygons), (50.0, 0.0))
+        self.assertIsNone(raycast((0, 0), (0, 1), 200, polygons))
+        self.assertIsNone(raycast((0, 0), (1, 0), 5, polygons))
+
+    def test_raycast_polygon_return_hit(self):
+        """Test that the RaycastHit of a polygon has the normal of the hit edge."""
+        colliders = [Line(0, 100, 10, 100), Polygon((50, 0), (70, -20), (90, 0))]
+
+        hit = raycast((60, 50), (60, 49), 200, colliders, return_hit=True)
+        self.assertEqual(hit.index, 1)
+        self.assertAlmostEqual(hit.point[0], 60.0)
+        self.assertAlmostEqual(hit.point[1], 0.0)
+        self.assertAlmostEqual(hit.normal[0], 0.0)
+        self.assertAlmostEqual(hit.normal[1], 1.0)
+        self.assertAlmostEqual(hit.distance, 50.0)
+
+        hit = raycast((0, -10), (1, -10), 200, colliders, return_hit=True)
+        self.assertEqual(hit.index, 1)
+        self.assertAlmostEqual(hit.point[0], 60.0)
+        self.assertAlmostEqual(hit.point[1], -10.0)
+        self.assertAlmostEqual(hit.normal[0], -math.sqrt(2) / 2)
+        self.assertAlmostEqual(hit.normal[1], -math.sqrt(2) / 2)
+
     def test_multiraycast_no_rays(self):
         """Test that multiraycast returns an empty list when no rays are given."""
         rays = []
@@ -1065,6 +1209,1335 @@ class RaycastTest(unittest.TestCase):
             [raycast(*ray, colliders) for ray in rays],
         )
 
+    def test_multiraycast_return_hit(self):
+        """Test that multiraycast returns RaycastHits when return_hit is True."""
+        rays = [
+            Line((0, 0), (100, 0)),
+            ((0, 0), (0, 1), 100),
+            ((0, 0), 90, 100),
+            ((0, 0), (-100, 0)),
+        ]
+        colliders = [
+            Circle(60, 0, 10),
+            Line((-10, 30), (10, 30)),
+            Rect(-10, -80, 20, 10),
+        ]
+
+        hits = multiraycast(rays, colliders, return_hit=True)
+
+        self.assertEqual(len(hits), len(rays))
+        self.assertIsNone(hits[3])
+        for hit, ray, index in zip(hits[:3], rays, [0, 1, 2]):
+            self.assertIsInstance(hit, RaycastHit)
+            self.assertEqual(hit.index, index)
+            if isinstance(ray, Line):
+                self.assertEqual(hit, raycast(ray, colliders, return_hit=True))
+            else:
+                self.assertEqual(hit, raycast(*ray, colliders, return_hit=True))
+
+    def test_multiraycast_with_polygons(self):
+        """Test that multiraycast returns the correct results for a list of
+        polygons."""
+        rays = [
+            Line((0, 0), (100, 0)),
+            Line((0, 0), (100, 100)),
+            Line((0, 0), (0, 100)),
+            Line((0, 0), (-100, 100)),
+            Line((0, 0), (-100, 0)),
+            Line((0, 0), (-100, -100)),
+            Line((0, 0), (0, -100)),
+            Line((0, 0), (100, -100)),
+        ]
+        colliders = [
+            Polygon((10, -10), (30, -10), (30, 10), (10, 10)),
+            Polygon((-50, 0), (-70, -20), (-90, 0), (-70, 20)),
+            Polygon((-40, -40), (-20, -60), (-10, -30)),
+            Polygon((5, 40), (40, 5), (40, 40)),
+        ]
+
+        self.assertEqual(
+            multiraycast(rays, colliders),
+            [raycast(ray, colliders) for ray in rays],
+        )
+
+    def test_multiraycast_matches_raycast(self):
+        """Test that multiraycast gives the same results as casting the rays one
+        by one, whatever the number of rays and the shapes of the colliders."""
+        colliders = [
+            Line((-50, 40), (50, 40)),
+            Circle(30, -20, 15),
+            Rect(-60, -30, 20, 50),
+            Polygon((10, 60), (30, 90), (-10, 80)),
+            Circle(0, 0, 5),
+            Line((70, -70), (70, 70)),
+            Rect(-5, -80, 10, 10),
+        ]
+        layers = [1, 2, 3, 1, 2, 3, 1]
+
+        for rays_num in range(1, 14):
+            rays = []
+            for i in range(rays_num):
+                angle = i * 360 / rays_num
+                if i % 3 == 0:
+                    rays.append(((0, 0), angle, -1))
+                elif i % 3 == 1:
+                    rays.append(((0, 10), angle, 40))
+                else:
+                    rays.append(Line((-100, i * 7), (100, -i * 7)))
+
+            for kwargs in ({}, {"return_hit": True}, {"layers": layers, "mask": 2}):
+                expected = [
+                    (
+                        raycast(ray, colliders, **kwargs)
+                        if isinstance(ray, Line)
+                        else raycast(*ray, colliders, **kwargs)
+                    )
+                    for ray in rays
+                ]
+                self.assertEqual(multiraycast(rays, colliders, **kwargs), expected)
+
+        with self.assertRaises(TypeError):
+            multiraycast([Line(0, 0, 1, 0)] * 8, colliders + [1])
+
+    def test_multiraycast_threads(self):
+        """Test that splitting the rays across threads gives the same hits."""
+        rng = random.Random(4)
+        colliders = [
+            Circle(rng.uniform(0, 500), rng.uniform(0, 500), rng.uniform(1, 20))
+            for _ in range(30)
+        ] + [
+            Line(0, 0, 500, 500),
+            Rect(100, 300, 40, 20),
+            regular_polygon(5, (300, 100), 30),
+        ]
+        rays = [
+            ((rng.uniform(0, 500), rng.uniform(0, 500)), rng.uniform(0, 360), -1)
+            for _ in range(1001)
+        ]
+
+        expected = multiraycast(rays, colliders, return_hit=True)
+        for threads in (1, 2, 3, 8):
+            self.assertEqual(
+                multiraycast(rays, colliders, return_hit=True, threads=threads),
+                expected,
+            )
+        for scene in (RaycastGrid(colliders), RaycastBVH(colliders)):
+            self.assertEqual(
+                multiraycast(rays, scene, return_hit=True, threads=4), expected
+            )
+
+        layers = [i % 2 for i in range(len(colliders))]
+        self.assertEqual(
+            multiraycast(rays, colliders, layers=layers, mask=1, threads=4),
+            multiraycast(rays, colliders, layers=layers, mask=1),
+        )
+        self.assertEqual(
+            multiraycast(rays[:10], colliders, return_hit=True, threads=4),
+            expected[:10],
+        )
+
+    def test_multiraycast_threads_errors(self):
+        rays = [((0, 0), (1, 0), -1)] * 200
+
+        with self.assertRaises(TypeError):
+            multiraycast(rays, [Circle(5, 0, 1)], threads=2.0)
+        with self.assertRaises(ValueError):
+            multiraycast(rays, [Circle(5, 0, 1)], threads=0)
+        with self.assertRaises(ValueError):
+            multiraycast(rays, [Circle(5, 0, 1)], threads=1000)
+        with self.assertRaises(TypeError):
+            multiraycast(rays, [Circle(5, 0, 1), 1], threads=2)
+        with self.assertRaises(TypeError):
+            multiraycast(rays + [1], [Circle(5, 0, 1)], threads=2)
+        with self.assertRaises(TypeError):
+            raycast((0, 0), (1, 0), -1, [Circle(5, 0, 1)], threads=2)
+
+    def test_raycast_all(self):
+        """Test that raycast_all returns every hit sorted by distance."""
+        colliders = [
+            Circle(50, 0, 5),
+            Line(10, -5, 10, 5),
+            Rect(30, -2, 4, 4),
+            Polygon((70, -5), (80, 0), (70, 5)),
+            Line(0, 100, 10, 100),
+        ]
+
+        self.assertEqual(
+            raycast_all((0, 0), (1, 0), 200, colliders),
+            [(10.0, 0.0), (30.0, 0.0), (45.0, 0.0), (70.0, 0.0)],
+        )
+        self.assertEqual(
+            raycast_all((0, 0), (1, 0), 40, colliders), [(10.0, 0.0), (30.0, 0.0)]
+        )
+        self.assertEqual(
+            raycast_all(Line(100, 0, 0, 0), colliders),
+            [(80.0, 0.0), (55.0, 0.0), (34.0, 0.0), (10.0, 0.0)],
+        )
+        self.assertEqual(raycast_all((0, 0), (0, -1), 200, colliders), [])
+        self.assertEqual(raycast_all((0, 0), (1, 0), 200, []), [])
+
+        # the closest hit is always the same as the one found by raycast
+        for angle in range(0, 360, 15):
+            hits = raycast_all((40, 0), angle, 200, colliders)
+            closest = raycast((40, 0), angle, 200, colliders)
+            if closest is None:
+                self.assertEqual(hits, [])
+            else:
+                self.assertEqual(hits[0], closest)
+
+    def test_raycast_all_return_hit(self):
+        """Test that raycast_all returns RaycastHits when return_hit is True."""
+        colliders = [Circle(50, 0, 5), Line(10, -5, 10, 5), Rect(30, -2, 4, 4)]
+
+        hits = raycast_all((0, 0), (1, 0), 200, colliders, return_hit=True)
+
+        self.assertEqual([hit.index for hit in hits], [1, 2, 0])
+        self.assertEqual([hit.distance for hit in hits], [10.0, 30.0, 45.0])
+        for hit in hits:
+            self.assertIsInstance(hit, RaycastHit)
+            self.assertEqual(hit.normal, (-1.0, 0.0))
+
+    def test_raycast_all_errors(self):
+        """Test that raycast_all raises the same errors as raycast."""
+        with self.assertRaises(TypeError):
+            raycast_all()
+        with self.assertRaises(TypeError):
+            raycast_all((0, 0), (1, 0), 10)
+        with self.assertRaises(TypeError):
+            raycast_all((0, 0), (1, 0), 10, Line(0, 0, 1, 1))
+        with self.assertRaises(TypeError):
+            raycast_all((0, 0), (1, 0), 10, [Line(0, 0, 1, 1), 1])
+        with self.assertRaises(TypeError):
+            raycast_all((0, 0), (1, 0), 10, [], hit=True)
+        with self.assertRaises(ValueError):
+            raycast_all((0, 0), (1, 0), 0, [])
+
+    def test_multiraycast_all(self):
+        """Test that multiraycast_all returns the same hits as raycast_all."""
+        rays = [
+            Line((0, 0), (100, 0)),
+            ((0, 0), (1, 0), 40),
+            ((0, 0), 180, 100),
+            ((0, 0), (0, 100)),
+        ]
+        colliders = [
+            Circle(50, 0, 5),
+            Line(10, -5, 10, 5),
+            Rect(30, -2, 4, 4),
+            Polygon((70, -5), (80, 0), (70, 5)),
+        ]
+
+        self.assertEqual(
+            multiraycast_all(rays, colliders),
+            [
+                (
+                    raycast_all(*ray, colliders)
+                    if isinstance(ray, tuple) and len(ray) == 3
+                    else raycast_all(ray, colliders)
+                )
+                for ray in rays
+            ],
+        )
+        self.assertEqual(
+            multiraycast_all(rays, colliders, return_hit=True)[0],
+            raycast_all(rays[0], colliders, return_hit=True),
+        )
+        self.assertEqual(multiraycast_all(rays, []), [[], [], [], []])
+        self.assertEqual(multiraycast_all([], colliders), [])
+
+        with self.assertRaises(TypeError):
+            multiraycast_all(rays, Circle(0, 0, 1))
+        with self.assertRaises(TypeError):
+            multiraycast_all([Rect(0, 0, 1, 1)], colliders)
+        with self.assertRaises(TypeError):
+            multiraycast_all(rays)
+
+    def test_raycast_fan(self):
+        """Test that raycast_fan matches casting every ray with raycast."""
+        colliders = [
+            Circle(50, 0, 5),
+            Line(-10, -60, 10, -60),
+            Rect(-40, -2, 4, 4),
+            Polygon((-5, 70), (0, 80), (5, 70)),
+        ]
+
+        for max_dist in (-1, 45, 100):
+            fan = raycast_fan((0, 0), 15, 360, 200, max_dist, colliders)
+            self.assertEqual(len(fan), 200)
+            for i, point in enumerate(fan):
+                expected = raycast((0, 0), 15 + i * 1.8, max_dist, colliders)
+                if expected is None:
+                    self.assertIsNone(point)
+                else:
+                    self.assertAlmostEqual(point[0], expected[0])
+                    self.assertAlmostEqual(point[1], expected[1])
+
+        # a 90 degree fan with 3 rays casts at 180, 210 and 240 degrees
+        point = raycast_fan((0, 0), 180, 90, 3, 100, colliders)[0]
+        self.assertAlmostEqual(point[0], 45.0)
+        self.assertAlmostEqual(point[1], 0.0)
+
+        hits = raycast_fan((0, 0), 180, 360, 4, 100, colliders, return_hit=True)
+        self.assertEqual([hit.index for hit in hits], [0, 3, 2, 1])
+        self.assertTrue(all(isinstance(hit, RaycastHit) for hit in hits))
+
+        self.assertEqual(raycast_fan((0, 0), 0, 360, 0, 100, colliders), [])
+        self.assertEqual(raycast_fan((0, 0), 0, 360, 4, 100, []), [None] * 4)
+
+    def test_raycast_fan_errors(self):
+        with self.assertRaises(TypeError):
+            raycast_fan((0, 0), 0, 360, 10, 100)
+        with self.assertRaises(TypeError):
+            raycast_fan("origin", 0, 360, 10, 100, [])
+        with self.assertRaises(TypeError):
+            raycast_fan((0, 0), "0", 360, 10, 100, [])
+        with self.assertRaises(TypeError):
+            raycast_fan((0, 0), 0, 360, 10.5, 100, [])
+        with self.assertRaises(TypeError):
+            raycast_fan((0, 0), 0, 360, 10, 100, Circle(0, 0, 1))
+        with self.assertRaises(TypeError):
+            raycast_fan((0, 0), 0, 360, 10, 100, [1])
+        with self.assertRaises(TypeError):
+            raycast_fan((0, 0), 0, 360, 10, 100, [], hit=True)
+        with self.assertRaises(ValueError):
+            raycast_fan((0, 0), 0, 360, -1, 100, [])
+        with self.assertRaises(ValueError):
+            raycast_fan((0, 0), 0, 360, 10, 0, [])
+
+    def test_raycast_bounce(self):
+        """Test that raycast_bounce reflects the ray off every collider type."""
+        colliders = [Rect(80, 0, 10, 100), Circle(0, 50, 10)]
+
+        points, indices = raycast_bounce((50, 50), (51, 50), 120, 5, colliders)
+        self.assertEqual(indices, [0, 1])
+        self.assertEqual(len(points), 4)
+        self.assertEqual(points[0], (50.0, 50.0))
+        self.assertAlmostEqual(points[1][0], 80)
+        self.assertAlmostEqual(points[2][0], 10)
+        # the ray ends where it runs out of distance
+        self.assertAlmostEqual(points[3][0], 30, places=5)
+        for point in points:
+            self.assertAlmostEqual(point[1], 50)
+
+        # a 45 degree ray inside a box of lines
+        walls = [
+            Line(0, 50, 100, 0),
+            Line(100, 0, 100, 100),
+            Polygon((0, 100), (50, 99), (100, 100), (50, 120)),
+        ]
+        points, indices = raycast_bounce((50, 50), 225, -1, 1, walls)
+        self.assertEqual(indices, [1, 2])
+        self.assertAlmostEqual(points[1][0], 100)
+        self.assertAlmostEqual(points[1][1], 100)
+
+        points, indices = raycast_bounce(Line(50, 50, 150, 50), 0, colliders)
+        self.assertEqual(indices, [0])
+        self.assertEqual(points, [(50.0, 50.0), (80.0, 50.0)])
+
+    def test_raycast_bounce_max_bounces(self):
+        """Test that the ray stops after max_bounces reflections."""
+        walls = [Line(0, 0, 0, 100), Line(100, 0, 100, 100)]
+
+        for max_bounces in range(5):
+            points, indices = raycast_bounce((50, 50), (51, 50), -1, max_bounces, walls)
+            self.assertEqual(len(indices), max_bounces + 1)
+            self.assertEqual(len(points), max_bounces + 2)
+            self.assertEqual(indices, [(i + 1) % 2 for i in range(max_bounces + 1)])
+
+    def test_raycast_bounce_far_from_origin(self):
+        """Test that the ray leaves the surface it bounced off at large
+        coordinates."""
+        walls = [Line(1e10 + 5, -5, 1e10 + 5, 5), Line(1e10 + 15, -5, 1e10 + 15, 5)]
+
+        points, indices = raycast_bounce((1e10 + 10, 0), (1e10 + 11, 0), -1, 4, walls)
+        self.assertEqual(indices, [1, 0, 1, 0, 1])
+        self.assertEqual(
+            [x for x, _ in points[1:]], [1e10 + 15, 1e10 + 5] * 2 + [1e10 + 15]
+        )
+
+    def test_raycast_bounce_distance(self):
+        """Test that a bounced ray travels exactly max_dist."""
+        points, indices = raycast_bounce((0, 0), (1, 0), 100, 3, [Line(10, -5, 10, 5)])
+        self.assertEqual(indices, [0])
+        self.assertEqual(points, [(0.0, 0.0), (10.0, 0.0), (-80.0, 0.0)])
+
+    def test_raycast_bounce_miss(self):
+        points, indices = raycast_bounce((0, 0), (1, 0), -1, 3, [Circle(0, 50, 5)])
+        self.assertEqual(points, [(0.0, 0.0)])
+        self.assertEqual(indices, [])
+
+        points, indices = raycast_bounce((0, 0), (1, 0), 10, 3, [])
+        self.assertEqual(points, [(0.0, 0.0), (10.0, 0.0)])
+        self.assertEqual(indices, [])
+
+    def test_raycast_bounce_errors(self):
+        with self.assertRaises(TypeError):
+            raycast_bounce((0, 0), (1, 0), 10, [])
+        with self.assertRaises(TypeError):
+            raycast_bounce((0, 0), (1, 0), 10, 1.5, [])
+        with self.assertRaises(TypeError):
+            raycast_bounce((0, 0), (1, 0), 10, 1, Circle(0, 0, 1))
+        with self.assertRaises(TypeError):
+            raycast_bounce((0, 0), (1, 0), 10, 1, [1])
+        with self.assertRaises(ValueError):
+            raycast_bounce((0, 0), (1, 0), 10, -1, [])
+        with self.assertRaises(ValueError):
+            raycast_bounce((0, 0), (1, 0), 0, 1, [])
+        with self.assertRaises(ValueError):
+            raycast_bounce((0, 0), (0, 0), 10, 1, [])
+
+    def test_raycast_layers(self):
+        """Test that colliders whose layers don't match the mask are skipped."""
+        colliders = [
+            Line(10, -5, 10, 5),
+            Circle(30, 0, 5),
+            Rect(50, -5, 10, 10),
+            Polygon((70, -5), (80, 0), (70, 5)),
+        ]
+        layers = [0b001, 0b010, 0b100, 0b110]
+        ray = ((0, 0), (1, 0), 100)
+
+        self.assertEqual(raycast(*ray, colliders, layers=layers), (10.0, 0.0))
+        self.assertEqual(
+            raycast(*ray, colliders, layers=layers, mask=0b010), (25.0, 0.0)
+        )
+        self.assertEqual(
+            raycast(*ray, colliders, layers=layers, mask=0b100), (50.0, 0.0)
+        )
+        self.assertIsNone(raycast(*ray, colliders, layers=layers, mask=0b1000))
+        # the mask is ignored when there are no layers
+        self.assertEqual(raycast(*ray, colliders, mask=0), (10.0, 0.0))
+
+        # a parallel array of booleans enables or disables colliders
+        hit = raycast(
+            *ray, colliders, layers=[False, False, True, True], return_hit=True
+        )
+        self.assertEqual(hit.index, 2)
+
+        self.assertEqual(
+            multiraycast([ray, Line(0, 0, 100, 0)], colliders, layers=layers, mask=4),
+            [(50.0, 0.0), (50.0, 0.0)],
+        )
+        self.assertEqual(
+            [
+                hit.index
+                for hit in raycast_all(
+                    *ray, colliders, layers=layers, mask=0b110, return_hit=True
+                )
+            ],
+            [1, 2, 3],
+        )
+        self.assertEqual(
+            multiraycast_all([ray], colliders, layers=layers, mask=0b001),
+            [[(10.0, 0.0)]],
+        )
+        fan = raycast_fan((0, 0), 180, 360, 2, 100, colliders, layers=layers, mask=2)
+        self.assertAlmostEqual(fan[0][0], 25.0)
+        self.assertIsNone(fan[1])
+
+    def test_raycast_layers_errors(self):
+        colliders = [Circle(30, 0, 5), Line(10, -5, 10, 5)]
+        ray = ((0, 0), (1, 0), 100)
+
+        with self.assertRaises(ValueError):
+            raycast(*ray, colliders, layers=[1])
+        with self.assertRaises(ValueError):
+            multiraycast([ray], colliders, layers=[1, 2, 3])
+        with self.assertRaises(TypeError):
+            raycast(*ray, colliders, layers=[1, "2"])
+        with self.assertRaises(TypeError):
+            raycast(*ray, colliders, layers=3)
+        with self.assertRaises(TypeError):
+            raycast(*ray, colliders, layers=[1, 2], mask=1.5)
+        with self.assertRaises(TypeError):
+            raycast_all(*ray, colliders, layers=[1, None])
+        with self.assertRaises(OverflowError):
+            raycast(*ray, colliders, layers=[1, 2], mask=1 << 32)
+        with self.assertRaises(OverflowError):
+            raycast(*ray, colliders, layers=[1 << 40, 2])
+        with self.assertRaises(OverflowError):
+            raycast(*ray, colliders, layers=[-(1 << 31) - 1, 2])
+        with self.assertRaises(TypeError):
+            raycast(*ray, colliders, layers=[1.0, 2])
+
+    def test_raycast_layers_index(self):
+        """Test that layers and mask take any integer type."""
+
+        class Layer:
+            def __init__(self, value):
+                self.value = value
+
+            def __index__(self):
+                return self.value
+
+        colliders = [Circle(30, 0, 5), Line(10, -5, 10, 5)]
+        ray = ((0, 0), (1, 0), 100)
+
+        self.assertEqual(
+            raycast(*ray, colliders, layers=[Layer(1), Layer(2)], mask=Layer(1)),
+            (25.0, 0.0),
+        )
+        self.assertEqual(
+            raycast(*ray, colliders, layers=[1, 1 << 31], mask=-(1 << 31)),
+            (10.0, 0.0),
+        )
+        self.assertEqual(
+            raycast(*ray, colliders, layers=[1, 0xFFFFFFFF], mask=-1), (10.0, 0.0)
+        )
+
+    @staticmethod
+    def _rays_buffer(rays, cols):
+        return (
+            memoryview(array("d", rays)).cast("B").cast("d", (len(rays) // cols, cols))
+        )
+
+    def test_multiraycast_buffer(self):
+        """Test that multiraycast_buffer returns the same hits as multiraycast."""
+        colliders = [
+            Circle(50, 0, 5),
+            Line(-10, -60, 10, -60),
+            Rect(-40, -2, 4, 4),
+            Polygon((-5, 70), (0, 80), (5, 70)),
+        ]
+        rays = [
+            ((0, 0), (100, 0)),
+            ((0, 0), (0, -100)),
+            ((0, 0), (-30, 0)),
+            ((0, 0), (100, 100)),
+        ]
+        expected = multiraycast(rays, colliders, return_hit=True)
+
+        hits, indices = multiraycast_buffer(
+            self._rays_buffer([c for ray in rays for p in ray for c in p], 4),
+            colliders,
+        )
+        self.assertEqual(hits.shape, (4, 3))
+        self.assertEqual(indices.shape, (4,))
+
+        for hit, row, index in zip(expected, hits.tolist(), indices.tolist()):
+            if hit is None:
+                self.assertTrue(all(math.isnan(value) for value in row))
+                self.assertEqual(index, -1)
+            else:
+                self.assertEqual(row, [*hit.point, hit.distance])
+                self.assertEqual(index, hit.index)
+
+    def test_multiraycast_buffer_origin_direction(self):
+        """Test that (N, 5) rays behave like (origin, direction, max_dist) tuples."""
+        colliders = [Circle(50, 0, 5), Line(0, 20, 10, 20)]
+        rays = [((0, 0), (1, 0), -1), ((0, 0), (1, 0), 30), ((5, 0), (5, 1), 100)]
+
+        hits, indices = multiraycast_buffer(
+            self._rays_buffer([0, 0, 1, 0, -1, 0, 0, 1, 0, 30, 5, 0, 5, 1, 100], 5),
+            colliders,
+        )
+        self.assertEqual(indices.tolist(), [0, -1, 1])
+        self.assertEqual(hits.tolist()[0], [45.0, 0.0, 45.0])
+        self.assertEqual(hits.tolist()[2], [5.0, 20.0, 20.0])
+        self.assertEqual(
+            multiraycast(rays, colliders), [(45.0, 0.0), None, (5.0, 20.0)]
+        )
+
+    def test_multiraycast_buffer_out(self):
+        """Test that the results are written into the given buffers."""
+        out = array("d", [0] * 6)
+        out_index = array("q", [7, 7])
+        rays = self._rays_buffer([0, 0, 100, 0, 0, 0, 0, 100], 4)
+
+        ret = multiraycast_buffer(
+            rays,
+            [Circle(50, 0, 5), Circle(0, 50, 5)],
+            out=out,
+            out_index=out_index,
+            layers=[1, 2],
+            mask=1,
+        )
+        self.assertIs(ret[0], out)
+        self.assertIs(ret[1], out_index)
+        self.assertEqual(out[:3].tolist(), [45.0, 0.0, 45.0])
+        self.assertTrue(math.isnan(out[3]))
+        self.assertEqual(out_index.tolist(), [0, -1])
+
+    def test_multiraycast_buffer_errors(self):
+        rays = self._rays_buffer([0, 0, 100, 0], 4)
+
+        with self.assertRaises(TypeError):
+            multiraycast_buffer(rays)
+        with self.assertRaises(TypeError):
+            multiraycast_buffer([((0, 0), (1, 0))], [])
+        with self.assertRaises(TypeError):
+            multiraycast_buffer(array("d", [0, 0, 100, 0]), [])
+        with self.assertRaises(TypeError):
+            multiraycast_buffer(self._rays_buffer([0, 0, 100], 3), [])
+        with self.assertRaises(TypeError):
+            multiraycast_buffer(
+                memoryview(array("f", [0, 0, 1, 0])).cast("B").cast("f", (1, 4)), []
+            )
+        with self.assertRaises(TypeError):
+            multiraycast_buffer(rays, [1])
+        with self.assertRaises(TypeError):
+            multiraycast_buffer(rays, [], out=array("f", [0] * 3))
+        with self.assertRaises(BufferError):
+            multiraycast_buffer(rays, [], out=b"\x00" * 24)
+        with self.assertRaises(TypeError):
+            multiraycast_buffer(rays, [], return_hit=True)
+        with self.assertRaises(ValueError):
+            multiraycast_buffer(rays, [], out=array("d", [0] * 4))
+        with self.assertRaises(ValueError):
+            multiraycast_buffer(rays, [], out_index=array("q", [0] * 2))
+        with self.assertRaises(ValueError):
+            multiraycast_buffer(self._rays_buffer([0, 0, 1, 0, 0], 5), [])
+
+    def test_visibility_polygon(self):
+        bounds = Rect(0, 0, 100, 100)
+
+        polygon = visibility_polygon((50, 50), [], bounds)
+        self.assertIsInstance(polygon, Polygon)
+        self.assertEqual(
+            polygon.vertices, [(0.0, 0.0), (100.0, 0.0), (100.0, 100.0), (0.0, 100.0)]
+        )
+
+        self.assertEqual(
+            visibility_polygon((50, 50), [Line(40, 30, 60, 30)], bounds).vertices,
+            [
+                (0.0, 0.0),
+                (25.0, 0.0),
+                (40.0, 30.0),
+                (60.0, 30.0),
+                (75.0, 0.0),
+                (100.0, 0.0),
+                (100.0, 100.0),
+                (0.0, 100.0),
+            ],
+        )
+
+        # the origin is enclosed by a rect
+        self.assertEqual(
+            visibility_polygon((50, 50), [Rect(40, 40, 20, 20)], bounds).vertices,
+            [(40.0, 40.0), (60.0, 40.0), (60.0, 60.0), (40.0, 60.0)],
+        )
+
+        # crossing lines
+        self.assertEqual(
+            visibility_polygon(
+                (50, 50), [Line(30, 20, 70, 40), Line(30, 40, 70, 20)], bounds
+            ).vertices,
+            [
+                (0.0, 25.0),
+                (30.0, 40.0),
+                (50.0, 30.0),
+                (70.0, 40.0),
+                (100.0, 25.0),
+                (100.0, 100.0),
+                (0.0, 100.0),
+            ],
+        )
+
+        # filtered out colliders don't cast shadows
+        self.assertEqual(
+            visibility_polygon(
+                (50, 50), [Rect(40, 40, 20, 20)], bounds, layers=[2], mask=1
+            ).vertices,
+            polygon.vertices,
+        )
+
+    def test_visibility_polygon_matches_raycast(self):
+        """Test that the points inside of the visibility polygon are the ones
+        that can be seen from its origin."""
+        rng = random.Random(0)
+        colliders = []
+        for _ in range(10):
+            colliders.append(
+                Line(
+                    rng.uniform(0, 500),
+                    rng.uniform(0, 500),
+                    rng.uniform(0, 500),
+                    rng.uniform(0, 500),
+                )
+            )
+            colliders.append(
+                Rect(
+                    rng.randrange(450),
+                    rng.randrange(450),
+                    rng.randrange(5, 50),
+                    rng.randrange(5, 50),
+                )
+            )
+            colliders.append(
+                regular_polygon(
+                    rng.randint(3, 7), (rng.uniform(0, 500), rng.uniform(0, 500)), 30
+                )
+            )
+        bounds = Rect(0, 0, 500, 500)
+
+        for _ in range(10):
+            origin = (rng.uniform(1, 499), rng.uniform(1, 499))
+            polygon = visibility_polygon(origin, colliders, bounds)
+            for _ in range(100):
+                point = (rng.uniform(0, 500), rng.uniform(0, 500))
+                self.assertEqual(
+                    polygon.collidepoint(point),
+                    raycast(Line(origin, point), colliders) is None,
+                )
+
+    def test_visibility_polygon_circle(self):
+        """Test that the shadow of a circle starts at its tangent points."""
+        polygon = visibility_polygon(
+            (0, 50), [Circle(50, 50, 25)], Rect(-1, 0, 102, 100)
+        )
+        tangent_angle = math.asin(25 / 50)
+        tangent_dist = math.sqrt(50**2 - 25**2)
+        tangent = (
+            tangent_dist * math.cos(tangent_angle),
+            50 + tangent_dist * math.sin(tangent_angle),
+        )
+
+        self.assertTrue(
+            any(
+                abs(x - tangent[0]) < 1e-9 and abs(y - tangent[1]) < 1e-9
+                for x, y in polygon.vertices
+            )
+        )
+        self.assertFalse(polygon.collidepoint(90, 50))
+        self.assertTrue(polygon.collidepoint(24, 50))
+
+        # the origin is inside of the circle
+        polygon = visibility_polygon(
+            (50, 50), [Circle(50, 50, 25)], Rect(0, 0, 100, 100)
+        )
+        for x, y in polygon.vertices:
+            self.assertAlmostEqual(math.hypot(x - 50, y - 50), 25)
+
+    def test_visibility_polygon_errors(self):
+        bounds = Rect(0, 0, 100, 100)
+
+        with self.assertRaises(TypeError):
+            visibility_polygon((50, 50), [])
+        with self.assertRaises(TypeError):
+            visibility_polygon("a", [], bounds)
+        with self.assertRaises(TypeError):
+            visibility_polygon((50, 50), 1, bounds)
+        with self.assertRaises(TypeError):
+            visibility_polygon((50, 50), [1], bounds)
+        with self.assertRaises(TypeError):
+            visibility_polygon((50, 50), [], "bounds")
+        with self.assertRaises(TypeError):
+            visibility_polygon((50, 50), [], bounds, return_hit=True)
+        with self.assertRaises(ValueError):
+            visibility_polygon((150, 50), [], bounds)
+        with self.assertRaises(ValueError):
+            visibility_polygon((0, 50), [], bounds)
+        with self.assertRaises(ValueError):
+            visibility_polygon((50, 50), [Line(0, 0, 1, 1)], bounds, layers=[1, 2])
+
+    def test_visibility_matrix(self):
+        colliders = [Line(50, -10, 50, 10), Circle(0, 50, 5), Rect(-60, -5, 10, 10)]
+        points = [(0, 0), (100, 0), (0, 100), (-100, 0), (100, 100)]
+        matrix = visibility_matrix(
+            self._rays_buffer([c for p in points for c in p], 2), colliders
+        )
+
+        self.assertEqual(matrix.shape, (5, 5))
+        self.assertEqual(
+            matrix.tolist(),
+            [
+                [True, False, False, False, True],
+                [False, True, True, False, True],
+                [False, True, True, True, True],
+                [False, False, True, True, False],
+                [True, True, True, False, True],
+            ],
+        )
+
+        # layers filter the colliders
+        matrix = visibility_matrix(
+            self._rays_buffer([c for p in points for c in p], 2),
+            colliders,
+            layers=[1, 2, 2],
+            mask=2,
+        )
+        self.assertTrue(matrix[0, 1])
+        self.assertFalse(matrix[0, 2])
+
+    def test_visibility_matrix_matches_raycast(self):
+        rng = random.Random(3)
+        colliders = []
+        for i in range(150):
+            x, y = rng.uniform(0, 1000), rng.uniform(0, 1000)
+            colliders.append(
+                (
+                    Line(x, y, x + rng.uniform(-80, 80), y + rng.uniform(-80, 80)),
+                    Circle(x, y, rng.uniform(1, 20)),
+                    Rect(int(x), int(y), rng.randint(1, 30), rng.randint(1, 30)),
+                    regular_polygon(rng.randint(3, 8), (x, y), rng.uniform(3, 20)),
+                )[i % 4]
+            )
+        points = [(rng.uniform(0, 1000), rng.uniform(0, 1000)) for _ in range(60)]
+        points[1] = points[0]
+        buffer = self._rays_buffer([c for p in points for c in p], 2)
+
+        matrix = visibility_matrix(buffer, colliders).tolist()
+        for i, a in enumerate(points):
+            for j, b in enumerate(points):
+                expected = a == b or raycast(Line(a, b), colliders) is None
+                self.assertEqual(matrix[i][j], expected, (i, j))
+
+        for scene in (RaycastGrid(colliders), RaycastBVH(colliders)):
+            self.assertEqual(visibility_matrix(buffer, scene).tolist(), matrix)
+
+    def test_visibility_matrix_endpoints(self):
+        """Test that colliders touching a point don't block it, whatever the
+        order of the points."""
+        points = [(0, 0), (10, 0), (20, 0), (30, 0)]
+        cases = [
+            (
+                [Line(10, -5, 10, 5)],
+                [
+                    [True, True, False, False],
+                    [True, True, True, True],
+                    [False, True, True, True],
+                    [False, True, True, True],
+                ],
+            ),
+            (
+                [Circle(20, 0, 10)],
+                [
+                    [True, True, False, False],
+                    [True, True, True, True],
+                    [False, True, True, True],
+                    [False, True, True, True],
+                ],
+            ),
+            (
+                [Rect(10, -5, 5, 10)],
+                [
+                    [True, True, False, False],
+                    [True, True, False, False],
+                    [False, False, True, True],
+                    [False, False, True, True],
+                ],
+            ),
+        ]
+
+        for colliders, expected in cases:
+            for order in (points, points[::-1]):
+                matrix = visibility_matrix(
+                    self._rays_buffer([c for p in order for c in p], 2), colliders
+                ).tolist()
+                for i, a in enumerate(order):
+                    for j, b in enumerate(order):
+                        self.assertEqual(
+                            matrix[i][j],
+                            expected[points.index(a)][points.index(b)],
+                            (colliders, a, b),
+                        )
+
+    def test_visibility_matrix_out(self):
+        out = bytearray(b"\x07" * 4)
+        points = self._rays_buffer([0, 0, 100, 0], 2)
+
+        self.assertIs(visibility_matrix(points, [Circle(50, 0, 5)], out=out), out)
+        self.assertEqual(list(out), [1, 0, 0, 1])
+
+        with self.assertRaises(ValueError):
+            visibility_matrix(points, [], out=bytearray(3))
+        with self.assertRaises(TypeError):
+            visibility_matrix(points, [], out=array("d", [0] * 4))
+
+    def test_visibility_matrix_errors(self):
+        points = self._rays_buffer([0, 0, 100, 0], 2)
+
+        with self.assertRaises(TypeError):
+            visibility_matrix(points)
+        with self.assertRaises(TypeError):
+            visibility_matrix([(0, 0), (100, 0)], [])
+        with self.assertRaises(TypeError):
+            visibility_matrix(self._rays_buffer([0, 0, 100, 0], 4), [])
+        with self.assertRaises(TypeError):
+            visibility_matrix(array("d", [0, 0, 100, 0]), [])
+        with self.assertRaises(TypeError):
+            visibility_matrix(points, 1)
+        with self.assertRaises(TypeError):
+            visibility_matrix(points, [1])
+        with self.assertRaises(TypeError):
+            visibility_matrix(points, [], out_index=array("q", [0, 0]))
+        with self.assertRaises(ValueError):
+            visibility_matrix(points, [Circle(0, 0, 1)], layers=[1, 2])
+
+    def test_circlecast(self):
+        self.assertEqual(circlecast((0, 0), (1, 0), 5, -1, [Circle(50, 0, 5)]), (40, 0))
+        self.assertEqual(
+            circlecast((0, 0), (1, 0), 2, -1, [Line(20, -10, 20, 10)]), (18, 0)
+        )
+        self.assertEqual(
+            circlecast((0, 0), (1, 0), 3, -1, [Rect(30, -10, 10, 20)]), (27, 0)
+        )
+        self.assertEqual(
+            circlecast((0, 0), (1, 0), 1, -1, [Polygon((40, -10), (40, 10), (60, 0))]),
+            (39, 0),
+        )
+        self.assertEqual(circlecast(Line(0, 0, 100, 0), 5, [Circle(50, 0, 5)]), (40, 0))
+
+        point = circlecast((0, 0), 180, 5, -1, [Circle(50, 0, 5)])
+        self.assertAlmostEqual(point[0], 40)
+        self.assertAlmostEqual(point[1], 0)
+
+        # the closest collider is touched first
+        colliders = [Circle(50, 0, 5), Rect(30, -10, 10, 20), Line(80, -5, 80, 5)]
+        self.assertEqual(circlecast((0, 0), (1, 0), 3, -1, colliders), (27, 0))
+
+        # out of range
+        self.assertIsNone(circlecast((0, 0), (1, 0), 5, 39, [Circle(50, 0, 5)]))
+        self.assertIsNone(circlecast(Line(0, 0, 30, 0), 5, [Circle(50, 0, 5)]))
+        self.assertIsNone(circlecast((0, 0), (1, 0), 5, -1, []))
+
+    def test_circlecast_grazing(self):
+        """Test the hits that a ray going through the center would miss."""
+        # the circle's edge touches a circle passing beside it
+        point = circlecast((0, 0), (1, 0), 5, -1, [Circle(50, 6, 2)])
+        self.assertAlmostEqual(point[0], 50 - math.sqrt(13))
+        self.assertEqual(point[1], 0)
+        self.assertIsNone(raycast((0, 0), (1, 0), -1, [Circle(50, 6, 2)]))
+
+        # the corner of a rect
+        point = circlecast((0, 0), (1, 0), 5, -1, [Rect(30, 2, 10, 10)])
+        self.assertAlmostEqual(point[0], 30 - math.sqrt(21))
+
+        # the endpoint of a line
+        point = circlecast((0, 0), (1, 0), 5, -1, [Line(30, 4, 30, 20)])
+        self.assertAlmostEqual(point[0], 27)
+
+        self.assertIsNone(circlecast((0, 0), (1, 0), 5, -1, [Line(0, 6, 100, 6)]))
+
+    def test_circlecast_overlap(self):
+        """Test that a circle starting on a collider touches it at its origin."""
+        for collider in (
+            Circle(3, 0, 1),
+            Line(-2, 10, 2, -10),
+            Rect(-4, 4, 10, 10),
+            Polygon((-10, -10), (10, -10), (0, 10)),
+        ):
+            hit = circlecast((0, 0), (1, 0), 5, 100, [collider], return_hit=True)
+            self.assertEqual(hit.distance, 0, collider)
+            self.assertEqual(hit.index, 0, collider)
+
+        self.assertEqual(
+            circlecast((0, 0), (1, 0), 5, 100, [Circle(3, 0, 1)]), (0.0, 0.0)
+        )
+        # the normal goes against the ray when the center is inside
+        hit = circlecast((0, 0), (1, 0), 5, 100, [Rect(-4, -4, 8, 8)], return_hit=True)
+        self.assertEqual(hit.point, (0, 0))
+        self.assertEqual(hit.normal, (-1, 0))
+
+    def test_circlecast_tangent_start(self):
+        """Test that a circle starting tangent to a collider is only stopped by
+        it when it moves into it"""
+        for collider in (
+            Circle(10, 0, 5),
+            Line(5, -20, 5, 20),
+            Rect(5, -20, 10, 40),
+            Polygon((5, -20), (15, -20), (15, 20), (5, 20)),
+        ):
+            # moving away from the collider or sliding along it
+            for direction in ((-1, 0), (0, 1), (0, -1), (-1, 1)):
+                self.assertIsNone(
+                    circlecast((0, 0), direction, 5, 10, [collider]), collider
+                )
+
+            # moving into the collider
+            for direction in ((1, 0), (1, 1)):
+                hit = circlecast((0, 0), direction, 5, 100, [collider], return_hit=True)
+                self.assertEqual(hit.distance, 0, collider)
+                self.assertEqual(math.copysign(1, hit.distance), 1, collider)
+                self.assertEqual(hit.point, (5, 0), collider)
+                self.assertEqual(hit.normal, (-1, 0), collider)
+
+    def test_circlecast_return_hit(self):
+        colliders = [Line(80, -5, 80, 5), Circle(50, 0, 5)]
+        hit = circlecast((0, 0), (1, 0), 5, -1, colliders, return_hit=True)
+        self.assertIsInstance(hit, RaycastHit)
+        self.assertEqual(hit.point, (45, 0))
+        self.assertEqual(hit.normal, (-1, 0))
+        self.assertEqual(hit.distance, 40)
+        self.assertEqual(hit.index, 1)
+
+        hit = circlecast((0, 0), (1, 0), 5, -1, [Rect(30, 2, 10, 10)], return_hit=True)
+        self.assertEqual(hit.point, (30, 2))
+        self.assertAlmostEqual(dist(hit.point, (30 - math.sqrt(21), 0)), 5)
+        self.assertAlmostEqual(hit.normal[0], -math.sqrt(21) / 5)
+        self.assertAlmostEqual(hit.normal[1], -2 / 5)
+
+        self.assertIsNone(
+            circlecast((0, 0), (1, 0), 5, -1, [Circle(50, 20, 5)], return_hit=True)
+        )
+
+    def test_circlecast_layers(self):
+        colliders = [Circle(50, 0, 5), Rect(30, -10, 10, 20)]
+        self.assertEqual(
+            circlecast((0, 0), (1, 0), 5, -1, colliders, layers=[1, 2], mask=1),
+            (40, 0),
+        )
+        self.assertIsNone(
+            circlecast((0, 0), (1, 0), 5, -1, colliders, layers=[1, 2], mask=4)
+        )
+
+    def test_circlecast_prepared_scenes(self):
+        """Test that grids and BVHs touch the same colliders as sequences."""
+        rng = random.Random(0)
+        colliders = []
+        for i in range(200):
+            x, y = rng.uniform(0, 1000), rng.uniform(0, 1000)
+            colliders.append(
+                (
+                    Line(x, y, x + rng.uniform(-50, 50), y + rng.uniform(-50, 50)),
+                    Circle(x, y, rng.uniform(1, 20)),
+                    Rect(int(x), int(y), rng.randint(1, 30), rng.randint(1, 30)),
+                    regular_polygon(rng.randint(3, 8), (x, y), rng.uniform(3, 20)),
+                )[i % 4]
+            )
+        casts = [
+            (
+                (rng.uniform(0, 1000), rng.uniform(0, 1000)),
+                rng.uniform(0, 360),
+                rng.uniform(0.5, 20),
+                rng.choice([-1, 100, 500]),
+            )
+            for _ in range(300)
+        ]
+
+        expected = multicirclecast(casts, colliders, return_hit=True)
+        self.assertTrue(any(hit is not None for hit in expected))
+        for scene in (RaycastGrid(colliders), RaycastBVH(colliders, 2)):
+            self.assertEqual(multicirclecast(casts, scene, return_hit=True), expected)
+
+        # the circle's center at the contact is radius away from the collider
+        for cast, hit in zip(casts, expected):
+            if hit is None or not hit.distance:
+                continue
+            point = circlecast(*cast, colliders)
+            self.assertAlmostEqual(dist(point, hit.point), cast[2])
+
+    def test_multicirclecast(self):
+        colliders = [Circle(50, 0, 5), Line(20, -10, 20, 10)]
+        casts = [
+            ((0, 0), (1, 0), 2, -1),
+            ((100, 0), 0, 5, -1),
+            (Line(0, 50, 100, 50), 1),
+            ((0, 0), (0, 1), 1, 10),
+        ]
+        results = multicirclecast(casts, colliders)
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results[0], (18, 0))
+        self.assertAlmostEqual(results[1][0], 60)
+        self.assertIsNone(results[2])
+        self.assertIsNone(results[3])
+
+        self.assertEqual(
+            multicirclecast(casts, colliders, return_hit=True),
+            [circlecast(*cast, colliders, return_hit=True) for cast in casts],
+        )
+        self.assertEqual(multicirclecast([], colliders), [])
+        self.assertEqual(multicirclecast(casts, []), [None] * 4)
+
+    def test_circlecast_errors(self):
+        colliders = [Circle(50, 0, 5)]
+
+        with self.assertRaises(TypeError):
+            circlecast((0, 0), (1, 0), 5, colliders)
+        with self.assertRaises(TypeError):
+            circlecast((0, 0), (1, 0), 5, -1, colliders, 1)
+        with self.assertRaises(TypeError):
+            circlecast((0, 0), (1, 0), "5", -1, colliders)
+        with self.assertRaises(TypeError):
+            circlecast(1, 5, colliders)
+        with self.assertRaises(TypeError):
+            circlecast((0, 0), (1, 0), 5, -1, 1)
+        with self.assertRaises(TypeError):
+            circlecast((0, 0), (1, 0), 5, -1, [1])
+        with self.assertRaises(TypeError):
+            circlecast((0, 0), (1, 0), 5, -1, colliders, invalid=True)
+        with self.assertRaises(ValueError):
+            circlecast((0, 0), (1, 0), 0, -1, colliders)
+        with self.assertRaises(ValueError):
+            circlecast((0, 0), (1, 0), -5, -1, colliders)
+        with self.assertRaises(ValueError):
+            circlecast((0, 0), (1, 0), 5, 0, colliders)
+        with self.assertRaises(ValueError):
+            circlecast((0, 0), (1, 0), 5, -1, colliders, layers=[1, 2])
+
+        with self.assertRaises(TypeError):
+            multicirclecast(colliders)
+        with self.assertRaises(TypeError):
+            multicirclecast(1, colliders)
+        with self.assertRaises(TypeError):
+            multicirclecast([Line(0, 0, 1, 1)], colliders)
+        with self.assertRaises(TypeError):
+            multicirclecast([(Line(0, 0, 1, 1),)], colliders)
+        with self.assertRaises(ValueError):
+            multicirclecast([(Line(0, 0, 1, 1), 0)], colliders)
+
+    def test_polygoncast(self):
+        square = Polygon((-5, -5), (5, -5), (5, 5), (-5, 5))
+
+        self.assertEqual(polygoncast(square, (1, 0), -1, [Circle(50, 0, 5)]), (40, 0))
+        self.assertEqual(
+            polygoncast(square, (1, 0), -1, [Line(20, -20, 20, 20)]), (15, 0)
+        )
+        self.assertEqual(
+            polygoncast(square, (1, 0), -1, [Rect(30, -20, 10, 40)]), (25, 0)
+        )
+        self.assertEqual(
+            polygoncast(square, (0, 1), -1, [Polygon((-10, 30), (10, 30), (0, 40))]),
+            (0, 25),
+        )
+        # move the polygon by a vector
+        self.assertEqual(polygoncast(square, (100, 0), [Circle(50, 0, 5)]), (40, 0))
+        self.assertIsNone(polygoncast(square, (30, 0), [Circle(50, 0, 5)]))
+
+        point = polygoncast(square, 180, -1, [Circle(50, 0, 5)])
+        self.assertAlmostEqual(point[0], 40)
+        self.assertAlmostEqual(point[1], 0)
+
+        # a vertex of the collider touches an edge of the polygon
+        self.assertEqual(
+            polygoncast(square, (1, 0), -1, [Polygon((30, 0), (40, -10), (40, 10))]),
+            (25, 0),
+        )
+        # grazing hits that a ray from the center would miss
+        self.assertEqual(
+            polygoncast(square, (1, 0), -1, [Line(20, 4, 20, 20)]), (15, 0)
+        )
+        self.assertIsNone(polygoncast(square, (1, 0), -1, [Line(0, 6, 100, 6)]))
+
+        self.assertIsNone(polygoncast(square, (1, 0), 30, [Circle(50, 0, 5)]))
+        self.assertIsNone(polygoncast(square, (1, 0), -1, []))
+
+        # the polygon isn't moved
+        self.assertEqual(square.center, (0, 0))
+
+    def test_polygoncast_return_hit(self):
+        square = Polygon((-5, -5), (5, -5), (5, 5), (-5, 5))
+        colliders = [Line(80, -5, 80, 5), Circle(50, 0, 5)]
+
+        hit = polygoncast(square, (1, 0), -1, colliders, return_hit=True)
+        self.assertIsInstance(hit, RaycastHit)
+        self.assertEqual(hit.point, (45, 0))
+        self.assertEqual(hit.normal, (-1, 0))
+        self.assertEqual(hit.distance, 40)
+        self.assertEqual(hit.index, 1)
+
+        # a vertex of the polygon touches the collider
+        diamond = Polygon((0, -5), (5, 0), (0, 5), (-5, 0))
+        hit = polygoncast(diamond, (1, 0), -1, [Rect(30, -20, 10, 40)], return_hit=True)
+        self.assertEqual(hit.point, (30, 0))
+        self.assertEqual(hit.normal, (-1, 0))
+        self.assertEqual(hit.distance, 25)
+
+        # a vertex of the collider touches the polygon
+        hit = polygoncast(
+            diamond,
+            (1, 0),
+            -1,
+            [Polygon((30, 0), (40, -10), (40, 10))],
+            return_hit=True,
+        )
+        self.assertEqual(hit.point, (30, 0))
+        self.assertEqual(hit.distance, 25)
+        self.assertAlmostEqual(hit.normal[0], -math.sqrt(0.5))
+
+        # an overlapping polygon touches the collider at its center
+        hit = polygoncast(square, (0, 2), 100, [Circle(3, 0, 5)], return_hit=True)
+        self.assertEqual(hit, ((0, 0), (0, -1), 0, 0))
+
+    def test_polygoncast_touching(self):
+        """Test that a polygon touching a collider is only stopped by it when
+        it moves into it"""
+        square = Polygon((-5, -5), (5, -5), (5, 5), (-5, 5))
+        for wall in (
+            Line(5, -20, 5, 20),
+            Rect(5, -20, 10, 40),
+            Polygon((5, -20), (15, -20), (15, 20), (5, 20)),
+            Circle(10, 0, 5),
+        ):
+            # moving away from the wall or sliding along it
+            for move_by in ((-5, 0), (0, 5), (0, -5), (-5, 5)):
+                self.assertIsNone(polygoncast(square, move_by, [wall]))
+
+            # moving into the wall
+            for move_by in ((5, 0), (5, 5)):
+                hit = polygoncast(square, move_by, [wall], return_hit=True)
+                self.assertEqual(hit.point, (0, 0))
+                self.assertEqual(hit.distance, 0)
+
+        # the position returned by a cast doesn't stop the next casts
+        walls = [Rect(30, -20, 10, 40)]
+        square.center = polygoncast(square, (1, 0), -1, walls)
+        self.assertEqual(square.center, (25, 0))
+        self.assertIsNone(polygoncast(square, (0, 10), walls))
+        self.assertIsNone(polygoncast(square, (-10, 0), walls))
+        self.assertEqual(polygoncast(square, (10, 0), walls), (25, 0))
+
+    def test_polygoncast_layers(self):
+        square = Polygon((-5, -5), (5, -5), (5, 5), (-5, 5))
+        colliders = [Circle(50, 0, 5), Rect(30, -10, 10, 20)]
+        self.assertEqual(
+            polygoncast(square, (1, 0), -1, colliders, layers=[1, 2], mask=1),
+            (40, 0),
+        )
+        self.assertIsNone(
+            polygoncast(square, (1, 0), -1, colliders, layers=[1, 2], mask=4)
+        )
+
+    def test_polygoncast_prepared_scenes(self):
+        """Test that grids and BVHs touch the same colliders as sequences."""
+        rng = random.Random(1)
+        colliders = []
+        for i in range(200):
+            x, y = rng.uniform(0, 1000), rng.uniform(0, 1000)
+            colliders.append(
+                (
+                    Line(x, y, x + rng.uniform(-50, 50), y + rng.uniform(-50, 50)),
+                    Circle(x, y, rng.uniform(1, 20)),
+                    Rect(int(x), int(y), rng.randint(1, 30), rng.randint(1, 30)),
+                    regular_polygon(rng.randint(3, 8), (x, y), rng.uniform(3, 20)),
+                )[i % 4]
+            )
+        scenes = (RaycastGrid(colliders), RaycastBVH(colliders, 2))
+
+        hits = 0
+        for _ in range(200):
+            polygon = regular_polygon(
+                rng.randint(3, 7),
+                (rng.uniform(0, 1000), rng.uniform(0, 1000)),
+                rng.uniform(2, 25),
+                rng.uniform(0, 360),
+            )
+            angle = rng.uniform(0, 360)
+            max_dist = rng.choice([-1, 100, 400])
+
+            expected = polygoncast(polygon, angle, max_dist, colliders, return_hit=True)
+            hits += expected is not None
+            for scene in scenes:
+                self.assertEqual(
+                    polygoncast(polygon, angle, max_dist, scene, return_hit=True),
+                    expected,
+                )
+        self.assertGreater(hits, 0)
+
+    def test_polygoncast_errors(self):
+        square = Polygon((-5, -5), (5, -5), (5, 5), (-5, 5))
+        colliders = [Circle(50, 0, 5)]
+
+        with self.assertRaises(TypeError):
+            polygoncast(square, colliders)
+        with self.assertRaises(TypeError):
+            polygoncast(square, (1, 0), -1, colliders, 1)
+        with self.assertRaises(TypeError):
+            polygoncast(((0, 0), (1, 0), (1, 1)), (1, 0), -1, colliders)
+        with self.assertRaises(TypeError):
+            polygoncast(square, "a", colliders)
+        with self.assertRaises(TypeError):
+            polygoncast(square, "a", -1, colliders)
+        with self.assertRaises(ValueError):
+            polygoncast(square, (1, 0), "a", colliders)
+        with self.assertRaises(TypeError):
+            polygoncast(square, (1, 0), -1, 1)
+        with self.assertRaises(TypeError):
+            polygoncast(square, (1, 0), -1, [1])
+        with self.assertRaises(TypeError):
+            polygoncast(square, (1, 0), -1, colliders, invalid=True)
+        with self.assertRaises(ValueError):
+            polygoncast(square, (1, 0), 0, colliders)
+        with self.assertRaises(ValueError):
+            polygoncast(square, (1, 0), -1, colliders, layers=[1, 2])
+
+    def test_raycast_mask(self):
+        mask = Mask((100, 50))
+        mask.draw(Mask((10, 10), fill=True), (60, 10))
+
+        self.assertEqual(raycast_mask(Ray((0, 15), (1, 0)), mask), (60.0, 15.0))
+        self.assertEqual(raycast_mask((0, 15), 180, -1, mask), (60.0, 15.0))
+        self.assertEqual(raycast_mask(((0, 15), (100, 15)), mask), (60.0, 15.0))
+        self.assertEqual(raycast_mask(Ray((65, 0), (0, 1)), mask), (65.0, 10.0))
+        self.assertEqual(raycast_mask(Ray((200, 15), (-1, 0)), mask), (70.0, 15.0))
+        self.assertEqual(
+            raycast_mask(Ray((0, 15), (1, 0)), mask, offset=(10, -2)), (70.0, 15.0)
+        )
+        self.assertEqual(raycast_mask(Ray((65, 15), (1, 0)), mask), (65.0, 15.0))
+
+        self.assertIsNone(raycast_mask(Ray((0, 15), (-1, 0)), mask))
+        self.assertIsNone(raycast_mask(Ray((0, 25), (1, 0)), mask))
+        self.assertIsNone(raycast_mask(Ray((0, 15), (1, 0), 60), mask))
+        self.assertIsNone(raycast_mask(Ray((0, 15), (1, 0)), mask, offset=(0, 10)))
+        self.assertIsNone(raycast_mask(Ray((0, 15), (1, 0)), Mask((0, 0))))
+
+    def test_raycast_mask_return_hit(self):
+        mask = Mask((100, 50))
+        mask.draw(Mask((10, 10), fill=True), (60, 10))
+
+        hit = raycast_mask(Ray((0, 15), (1, 0)), mask, return_hit=True)
+        self.assertIsInstance(hit, RaycastHit)
+        self.assertEqual(hit.point, (60.0, 15.0))
+        self.assertEqual(hit.normal, (-1.0, 0.0))
+        self.assertEqual(hit.distance, 60.0)
+        self.assertEqual(hit.index, 0)
+
+        hit = raycast_mask(Ray((65, 30), (0, -1)), mask, return_hit=True)
+        self.assertEqual(hit.point, (65.0, 20.0))
+        self.assertEqual(hit.normal, (0.0, 1.0))
+
+        # a ray starting in a set pixel hits it right away
+        hit = raycast_mask(Ray((65, 15), (0, 1)), mask, return_hit=True)
+        self.assertEqual(hit.point, (65.0, 15.0))
+        self.assertEqual(hit.normal, (0.0, -1.0))
+        self.assertEqual(hit.distance, 0.0)
+
+        self.assertIsNone(raycast_mask(Ray((0, 25), (1, 0)), mask, return_hit=True))
+
+    def test_raycast_mask_matches_raycast(self):
+        """Test that a mask filled in a rect is hit like the rect itself."""
+        rng = random.Random(0)
+
+        for _ in range(500):
+            w, h = rng.randint(1, 100), rng.randint(1, 60)
+            x, y = rng.randint(0, w - 1), rng.randint(0, h - 1)
+            rect = Rect(x, y, rng.randint(1, w - x), rng.randint(1, h - y))
+            offset = (rng.randint(-50, 50), rng.randint(-50, 50))
+
+            mask = Mask((w, h))
+            mask.draw(Mask(rect.size, fill=True), rect.topleft)
+            rect.move_ip(offset)
+
+            origin = (rng.uniform(-150, 150), rng.uniform(-150, 150))
+            if rect.collidepoint(origin):
+                continue
+            angle = rng.choice([0, 90, 180, 270, rng.uniform(0, 360)])
+
+            hit = raycast_mask(origin, angle, -1, mask, offset=offset, return_hit=True)
+            expected = raycast(origin, angle, -1, [rect], return_hit=True)
+
+            if expected is None:
+                self.assertIsNone(hit)
+                continue
+            self.assertAlmostEqual(hit.distance, expected.distance)
+            self.assertEqual(hit.normal, expected.normal)
+
+    def test_raycast_mask_errors(self):
+        mask = Mask((10, 10))
+
+        with self.assertRaises(TypeError):
+            raycast_mask(Ray((0, 0), (1, 0)))
+        with self.assertRaises(TypeError):
+            raycast_mask(Ray((0, 0), (1, 0)), [Rect(0, 0, 10, 10)])
+        with self.assertRaises(TypeError):
+            raycast_mask((0, 0), (1, 0), mask)
+        with self.assertRaises(TypeError):
+            raycast_mask(Ray((0, 0), (1, 0)), mask, offset="a")
+        with self.assertRaises(TypeError):
+            raycast_mask(Ray((0, 0), (1, 0)), mask, layers=[1])
+        with self.assertRaises(ValueError):
+            raycast_mask((0, 0), (1, 0), 0, mask)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,185 @@
+import unittest
+import threading
+
+from pygame import Rect
+
+from geometry import (
+    Circle,
+    Line,
+    Polygon,
+    RaycastBVH,
+    multiraycast,
+    multiraycast_all,
+    raycast,
+    raycast_all,
+    raycast_bounce,
+    raycast_fan,
+)
+
+from .scene_helpers import random_rays, random_scene
+
+
+class RaycastBVHTest(unittest.TestCase):
+    def test_init(self):
+        colliders = [Line(0, 0, 10, 10), Circle(50, 50, 5), Rect(20, 0, 5, 5)]
+        bvh = RaycastBVH(colliders)
+
+        self.assertEqual(len(bvh), 3)
+        self.assertEqual(bvh.colliders, tuple(colliders))
+        self.assertEqual(bvh.leaf_size, 4)
+        self.assertEqual(bvh.depth, 0)
+
+        bvh = RaycastBVH(colliders, leaf_size=1)
+        self.assertEqual(bvh.leaf_size, 1)
+        self.assertEqual(bvh.depth, 2)
+
+        bvh = RaycastBVH([])
+        self.assertEqual(len(bvh), 0)
+        self.assertEqual(bvh.colliders, ())
+
+    def test_init_invalid_args(self):
+        with self.assertRaises(TypeError):
+            RaycastBVH()
+        with self.assertRaises(TypeError):
+            RaycastBVH(Circle(0, 0, 1))
+        with self.assertRaises(TypeError):
+            RaycastBVH([Circle(0, 0, 1), 1])
+        with self.assertRaises(TypeError):
+            RaycastBVH([Circle(0, 0, 1)], "1")
+        with self.assertRaises(ValueError):
+            RaycastBVH([Circle(0, 0, 1)], 0)
+
+    def test_depth(self):
+        """Test that the depth of the tree stays bounded."""
+        bvh = RaycastBVH([Circle(5, 5, 1) for _ in range(1000)], leaf_size=1)
+        self.assertLessEqual(bvh.depth, 10)
+
+        colliders = [Circle(2 ** (i / 8), 0, 0.5) for i in range(2000)]
+        bvh = RaycastBVH(colliders, leaf_size=1)
+        self.assertLessEqual(bvh.depth, 128)
+        self.assertEqual(
+            raycast(Line(-10, 0.2, 1e100, 0.2), bvh),
+            raycast(Line(-10, 0.2, 1e100, 0.2), colliders),
+        )
+
+    def test_snapshot(self):
+        """Test that the tree isn't affected by changes to its colliders."""
+        circle = Circle(50, 0, 5)
+        colliders = [circle]
+        bvh = RaycastBVH(colliders)
+
+        circle.x = 500
+        colliders.append(Line(10, -5, 10, 5))
+
+        self.assertEqual(raycast((0, 0), (1, 0), -1, bvh), (45.0, 0.0))
+
+    def test_reinit_while_threaded(self):
+        """Test that the RaycastBVH can't be reinitialized while a threaded
+        multiraycast reads it."""
+        colliders = random_scene(400, scales=(2, 20, 200))
+        rays = random_rays(2000)
+        scene = RaycastBVH(colliders)
+        expected = multiraycast(rays, scene, return_hit=True)
+        stop = threading.Event()
+
+        def reinit():
+            while not stop.is_set():
+                try:
+                    scene.__init__(colliders)
+                except RuntimeError:
+                    pass
+
+        thread = threading.Thread(target=reinit)
+        thread.start()
+        try:
+            for _ in range(10):
+                self.assertEqual(
+                    multiraycast(rays, scene, return_hit=True, threads=4),
+                    expected,
+                )
+        finally:
+            stop.set()
+            thread.join()
+
+        self.assertEqual(multiraycast(rays, scene, return_hit=True), expected)
+
+    def test_raycast(self):
+        colliders = [
+            Circle(50, 0, 5),
+            Line(-10, -60, 10, -60),
+            Rect(-40, -2, 4, 4),
+            Polygon((-5, 70), (0, 80), (5, 70)),
+        ]
+        bvh = RaycastBVH(colliders, leaf_size=1)
+
+        self.assertEqual(raycast((0, 0), (1, 0), 100, bvh), (45.0, 0.0))
+        self.assertEqual(raycast((0, 0), (0, -1), -1, bvh), (0.0, -60.0))
+        self.assertEqual(raycast(Line(0, 0, -100, 0), bvh), (-36.0, 0.0))
+        self.assertEqual(raycast((0, 0), (0, 1), 100, bvh), (0.0, 70.0))
+        self.assertIsNone(raycast((0, 0), (1, 0), 40, bvh))
+        self.assertIsNone(raycast((0, 0), (1, 1), -1, bvh))
+        self.assertIsNone(raycast((0, 0), (1, 0), -1, RaycastBVH([])))
+
+        hit = raycast((0, 0), (0, 1), 100, bvh, return_hit=True)
+        self.assertEqual(hit.index, 3)
+        self.assertEqual(hit.distance, 70.0)
+        self.assertEqual(hit.normal, (0.0, -1.0))
+
+    def test_matches_flat_raycast(self):
+        """Test that the tree returns the same hits as the colliders list."""
+        colliders = random_scene(400, scales=(2, 20, 200))
+        rays = random_rays(600)
+
+        expected = multiraycast(rays, colliders, return_hit=True)
+
+        for leaf_size in (1, 2, 4, 16, 1000):
+            bvh = RaycastBVH(colliders, leaf_size)
+            self.assertEqual(
+                multiraycast(rays, bvh, return_hit=True), expected, leaf_size
+            )
+
+    def test_ties(self):
+        """Test that colliders hit at the same distance keep their order."""
+        colliders = [Line(50, 20, 50, -20), Line(9, 9, 9, 10), Line(50, -20, 50, 20)]
+        bvh = RaycastBVH(colliders, leaf_size=1)
+
+        self.assertEqual(raycast((0, 0), (1, 0), -1, bvh, return_hit=True).index, 0)
+        self.assertEqual(
+            raycast((0, 0), (1, 0), -1, bvh, return_hit=True, layers=[0, 1, 1]).index,
+            2,
+        )
+
+    def test_other_raycast_functions(self):
+        """Test that every raycast function accepts a tree."""
+        colliders = random_scene(100, scales=(2, 20, 200))
+        bvh = RaycastBVH(colliders)
+        rays = random_rays(50)
+        layers = [i % 3 for i in range(len(colliders))]
+
+        self.assertEqual(
+            multiraycast(rays, bvh, layers=layers, mask=1),
+            multiraycast(rays, colliders, layers=layers, mask=1),
+        )
+        self.assertEqual(
+            multiraycast_all(rays, bvh, return_hit=True),
+            multiraycast_all(rays, colliders, return_hit=True),
+        )
+        self.assertEqual(
+            raycast_all((500, 500), (501, 500), -1, bvh),
+            raycast_all((500, 500), (501, 500), -1, colliders),
+        )
+        self.assertEqual(
+            raycast_fan((500, 500), 0, 360, 90, -1, bvh),
+            raycast_fan((500, 500), 0, 360, 90, -1, colliders),
+        )
+        self.assertEqual(
+            raycast_bounce((500, 500), 30, 2000, 8, bvh),
+            raycast_bounce((500, 500), 30, 2000, 8, colliders),
+        )
+
+        with self.assertRaises(ValueError):
+            raycast((0, 0), (1, 0), -1, bvh, layers=[1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
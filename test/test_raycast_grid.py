@@ -0,0 +1,210 @@
+import random
+import unittest
+import threading
+
+from pygame import Rect
+
+from geometry import (
+    Circle,
+    Line,
+    Polygon,
+    RaycastGrid,
+    multicirclecast,
+    multiraycast,
+    multiraycast_all,
+    raycast,
+    raycast_all,
+    raycast_bounce,
+    raycast_fan,
+    polygoncast,
+    regular_polygon,
+)
+
+from .scene_helpers import random_rays, random_scene
+
+
+class RaycastGridTest(unittest.TestCase):
+    def test_init(self):
+        colliders = [Line(0, 0, 10, 10), Circle(50, 50, 5), Rect(20, 0, 5, 5)]
+        grid = RaycastGrid(colliders)
+
+        self.assertEqual(len(grid), 3)
+        self.assertEqual(grid.colliders, tuple(colliders))
+        self.assertGreater(grid.cell_size, 0)
+
+        grid = RaycastGrid(colliders, cell_size=10)
+        self.assertEqual(grid.cell_size, 10.0)
+        self.assertEqual(grid.size, (6, 6))
+
+        grid = RaycastGrid([])
+        self.assertEqual(len(grid), 0)
+        self.assertEqual(grid.colliders, ())
+
+    def test_init_invalid_args(self):
+        with self.assertRaises(TypeError):
+            RaycastGrid()
+        with self.assertRaises(TypeError):
+            RaycastGrid(Circle(0, 0, 1))
+        with self.assertRaises(TypeError):
+            RaycastGrid([Circle(0, 0, 1), 1])
+        with self.assertRaises(TypeError):
+            RaycastGrid([Circle(0, 0, 1)], "1")
+        with self.assertRaises(ValueError):
+            RaycastGrid([Circle(0, 0, 1)], 0)
+        with self.assertRaises(ValueError):
+            RaycastGrid([Circle(0, 0, 1)], -5)
+        with self.assertRaises(ValueError):
+            RaycastGrid([Line(0, 0, 1e9, 1e9)], 1)
+
+    def test_snapshot(self):
+        """Test that the grid isn't affected by changes to its colliders."""
+        circle = Circle(50, 0, 5)
+        colliders = [circle]
+        grid = RaycastGrid(colliders)
+
+        circle.x = 500
+        colliders.append(Line(10, -5, 10, 5))
+
+        self.assertEqual(raycast((0, 0), (1, 0), -1, grid), (45.0, 0.0))
+        self.assertIs(raycast((0, 0), (1, 0), -1, grid, return_hit=True).index, 0)
+
+    def test_reinit_while_threaded(self):
+        """Test that the RaycastGrid can't be reinitialized while a threaded
+        multiraycast reads it."""
+        colliders = random_scene(400)
+        rays = random_rays(2000)
+        scene = RaycastGrid(colliders)
+        expected = multiraycast(rays, scene, return_hit=True)
+        stop = threading.Event()
+
+        def reinit():
+            while not stop.is_set():
+                try:
+                    scene.__init__(colliders)
+                except RuntimeError:
+                    pass
+
+        thread = threading.Thread(target=reinit)
+        thread.start()
+        try:
+            for _ in range(10):
+                self.assertEqual(
+                    multiraycast(rays, scene, return_hit=True, threads=4),
+                    expected,
+                )
+        finally:
+            stop.set()
+            thread.join()
+
+        self.assertEqual(multiraycast(rays, scene, return_hit=True), expected)
+
+    def test_raycast(self):
+        colliders = [
+            Circle(50, 0, 5),
+            Line(-10, -60, 10, -60),
+            Rect(-40, -2, 4, 4),
+            Polygon((-5, 70), (0, 80), (5, 70)),
+        ]
+        grid = RaycastGrid(colliders, 7)
+
+        self.assertEqual(raycast((0, 0), (1, 0), 100, grid), (45.0, 0.0))
+        self.assertEqual(raycast((0, 0), (0, -1), -1, grid), (0.0, -60.0))
+        self.assertEqual(raycast(Line(0, 0, -100, 0), grid), (-36.0, 0.0))
+        self.assertEqual(raycast((0, 0), (0, 1), 100, grid), (0.0, 70.0))
+        self.assertIsNone(raycast((0, 0), (1, 0), 40, grid))
+        self.assertIsNone(raycast((0, 0), (1, 1), -1, grid))
+        self.assertIsNone(raycast((0, 0), (1, 0), -1, RaycastGrid([])))
+
+        hit = raycast((0, 0), (0, 1), 100, grid, return_hit=True)
+        self.assertEqual(hit.index, 3)
+        self.assertEqual(hit.distance, 70.0)
+        self.assertEqual(hit.normal, (0.0, -1.0))
+
+    def test_matches_flat_raycast(self):
+        """Test that the grid returns the same hits as the colliders list."""
+        colliders = random_scene(400)
+        rays = random_rays(600)
+
+        expected = multiraycast(rays, colliders, return_hit=True)
+
+        for cell_size in (None, 3, 25, 120, 2000):
+            grid = RaycastGrid(colliders, cell_size)
+            self.assertEqual(
+                multiraycast(rays, grid, return_hit=True), expected, cell_size
+            )
+
+    def test_ties(self):
+        """Test that colliders hit at the same distance keep their order."""
+        colliders = [Line(50, 20, 50, -20), Line(50, -20, 50, 20), Line(9, 9, 9, 10)]
+        grid = RaycastGrid(colliders, 1)
+
+        self.assertEqual(raycast((0, 0), (1, 0), -1, grid, return_hit=True).index, 0)
+        self.assertEqual(
+            raycast((0, 0), (1, 0), -1, grid, return_hit=True, layers=[0, 1, 1]).index,
+            1,
+        )
+
+    def test_shapecasts(self):
+        """Test that circles and polygons swept through the grid touch the same
+        colliders as with the colliders list, whatever the size of the cells
+        and of the shapes."""
+        rng = random.Random(2)
+        colliders = random_scene(300, scales=(2, 20, 200))
+        casts = [
+            (
+                (rng.uniform(-300, 1300), rng.uniform(-300, 1300)),
+                rng.choice([0, 90, 180, 270, rng.uniform(0, 360)]),
+                rng.choice([0.5, 5, 40, 300]),
+                rng.choice([-1, 50, 400]),
+            )
+            for _ in range(150)
+        ]
+
+        expected = multicirclecast(casts, colliders, return_hit=True)
+        self.assertTrue(any(hit is not None for hit in expected))
+        for cell_size in (None, 3, 50, 2000):
+            grid = RaycastGrid(colliders, cell_size)
+            self.assertEqual(
+                multicirclecast(casts, grid, return_hit=True), expected, cell_size
+            )
+            for origin, angle, radius, max_dist in casts[:40]:
+                polygon = regular_polygon(5, origin, radius, angle)
+                self.assertEqual(
+                    polygoncast(polygon, angle, max_dist, grid, return_hit=True),
+                    polygoncast(polygon, angle, max_dist, colliders, return_hit=True),
+                )
+
+    def test_other_raycast_functions(self):
+        """Test that every raycast function accepts a grid."""
+        colliders = random_scene(100)
+        grid = RaycastGrid(colliders)
+        rays = random_rays(50)
+        layers = [i % 3 for i in range(len(colliders))]
+
+        self.assertEqual(
+            multiraycast(rays, grid, layers=layers, mask=1),
+            multiraycast(rays, colliders, layers=layers, mask=1),
+        )
+        self.assertEqual(
+            multiraycast_all(rays, grid, return_hit=True),
+            multiraycast_all(rays, colliders, return_hit=True),
+        )
+        self.assertEqual(
+            raycast_all((500, 500), (501, 500), -1, grid),
+            raycast_all((500, 500), (501, 500), -1, colliders),
+        )
+        self.assertEqual(
+            raycast_fan((500, 500), 0, 360, 90, -1, grid),
+            raycast_fan((500, 500), 0, 360, 90, -1, colliders),
+        )
+        self.assertEqual(
+            raycast_bounce((500, 500), 30, 2000, 8, grid),
+            raycast_bounce((500, 500), 30, 2000, 8, colliders),
+        )
+
+        with self.assertRaises(ValueError):
+            raycast((0, 0), (1, 0), -1, grid, layers=[1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()